@@ -7,9 +7,24 @@ Handles automatic message responses with various triggers and interaction types.
 import discord
 from discord import ui
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import re
+import time
+
+from scheduling import cooldowns
+
+# Components built by this system carry compact custom_ids that resolve
+# straight to an auto-message: "am:<message id>" for buttons and
+# "am:s:<dropdown custom_id>" for dropdowns (option values = message ids)
+COMPONENT_PREFIX = "am:"
+SELECT_PREFIX = "am:s:"
+COMPONENT_TRIGGERS = ["button", "dropdown"]
+
+# How long a click on a disabled/unknown "am:" message skips the database
+MISSING_COMPONENT_TTL = 300
+MAX_MISSING_COMPONENTS = 10000
 
 
 class AutoMessageSystem:
@@ -23,8 +38,11 @@ class AutoMessageSystem:
         # Cache for active messages (guild_id -> list of messages)
         self.message_cache: Dict[str, List[Dict]] = {}
         
-        # Cooldown tracking (user_id:message_id -> timestamp)
-        self.cooldowns: Dict[str, datetime] = {}
+        # Component index (enabled button/dropdown messages, see load_component_index)
+        self.button_index: Dict[Tuple[str, str], Dict] = {}      # (guild_id, custom_id)
+        self.dropdown_index: Dict[Tuple[str, str], Dict] = {}    # (guild_id, "custom_id:value")
+        self.component_ids: Dict[str, Dict] = {}                 # str(_id)
+        self.missing_component_ids: Dict[str, float] = {}        # str(_id) -> expiry (disabled/unknown)
     
     # ==================== CREATE & MANAGE ====================
     
@@ -97,6 +115,7 @@ class AutoMessageSystem:
         # Invalidate cache
         if guild_id in self.message_cache:
             del self.message_cache[guild_id]
+        await self.refresh_component_index(guild_id)
         
         return message_data
     
@@ -117,6 +136,7 @@ class AutoMessageSystem:
         # Invalidate cache
         if guild_id in self.message_cache:
             del self.message_cache[guild_id]
+        await self.refresh_component_index(guild_id)
         
         return result.modified_count > 0
     
@@ -129,6 +149,7 @@ class AutoMessageSystem:
         # Invalidate cache
         if guild_id in self.message_cache:
             del self.message_cache[guild_id]
+        await self.refresh_component_index(guild_id)
         
         return result.deleted_count > 0
     
@@ -219,15 +240,10 @@ class AutoMessageSystem:
         guild_id: str,
         custom_id: str
     ) -> Optional[Dict]:
-        """Find auto-message for button custom_id"""
-        messages = await self.get_active_messages(guild_id)
-        
-        for message in messages:
-            if message["trigger"]["type"] == "button":
-                if message["trigger"]["value"] == custom_id:
-                    return message
-        
-        return None
+        """Find auto-message for button custom_id (component index, no database read)"""
+        if custom_id.startswith(COMPONENT_PREFIX):
+            return await self._resolve_component_id(guild_id, custom_id[len(COMPONENT_PREFIX):], "button")
+        return self.button_index.get((guild_id, custom_id))
     
     async def find_matching_dropdown(
         self,
@@ -235,18 +251,94 @@ class AutoMessageSystem:
         custom_id: str,
         selected_value: str
     ) -> Optional[Dict]:
-        """Find auto-message for dropdown selection"""
-        messages = await self.get_active_messages(guild_id)
-        
+        """Find auto-message for dropdown selection (component index, no database read)"""
+        if custom_id.startswith(SELECT_PREFIX):
+            custom_id = custom_id[len(SELECT_PREFIX):]
+            message = await self._resolve_component_id(guild_id, selected_value, "dropdown")
+            if message:
+                return message
+        # Format: "dropdown_id:option_value"
+        return self.dropdown_index.get((guild_id, f"{custom_id}:{selected_value}"))
+    
+    # ==================== COMPONENT INDEX ====================
+    
+    def _index_component(self, message: Dict):
+        guild_id = message["guild_id"]
+        trigger = message["trigger"]
+        if trigger["type"] == "button":
+            self.button_index[(guild_id, trigger["value"])] = message
+        else:
+            self.dropdown_index[(guild_id, trigger["value"])] = message
+        self.component_ids[str(message["_id"])] = message
+    
+    async def load_component_index(self) -> int:
+        """(Re)build the index of enabled button/dropdown messages with one query"""
+        messages = await self.messages_collection.find({
+            "trigger.type": {"$in": COMPONENT_TRIGGERS},
+            "settings.enabled": True
+        }).to_list(length=None)
+        
+        # Rebuilt without awaiting, so lookups never see a half-built index
+        self.button_index, self.dropdown_index, self.component_ids = {}, {}, {}
+        self.missing_component_ids = {}
         for message in messages:
-            if message["trigger"]["type"] == "dropdown":
-                # Format: "dropdown_id:option_value"
-                trigger = message["trigger"]["value"]
-                if trigger == f"{custom_id}:{selected_value}":
-                    return message
-        
+            self._index_component(message)
+        return len(messages)
+    
+    async def refresh_component_index(self, guild_id: str):
+        """Re-read one guild's component messages after it changed"""
+        messages = await self.messages_collection.find({
+            "guild_id": guild_id,
+            "trigger.type": {"$in": COMPONENT_TRIGGERS},
+            "settings.enabled": True
+        }).to_list(length=None)
+        
+        for index in (self.button_index, self.dropdown_index):
+            for key in [key for key in index if key[0] == guild_id]:
+                del index[key]
+        for message_id in [mid for mid, message in self.component_ids.items() if message["guild_id"] == guild_id]:
+            del self.component_ids[message_id]
+        # A message may have been re-enabled
+        self.missing_component_ids = {}
+        for message in messages:
+            self._index_component(message)
+    
+    async def _resolve_component_id(self, guild_id: str, message_id: str, trigger_type: str) -> Optional[Dict]:
+        message = self.component_ids.get(message_id)
+        if message is None and ObjectId.is_valid(message_id) and not self._known_missing(message_id):
+            # Encoded by this system but not indexed yet (created by another process)
+            message = await self.messages_collection.find_one({
+                "_id": ObjectId(message_id),
+                "settings.enabled": True
+            })
+            if message and message["trigger"]["type"] in COMPONENT_TRIGGERS:
+                self._index_component(message)
+            else:
+                self._mark_missing(message_id)
+        if message and message["guild_id"] == guild_id and message["trigger"]["type"] == trigger_type:
+            return message
         return None
     
+    def _known_missing(self, message_id: str) -> bool:
+        expires = self.missing_component_ids.get(message_id)
+        if expires is None:
+            return False
+        if expires <= time.monotonic():
+            del self.missing_component_ids[message_id]
+            return False
+        return True
+    
+    def _mark_missing(self, message_id: str):
+        """Disabled or deleted: skip the database read until the TTL or the next index load"""
+        if len(self.missing_component_ids) >= MAX_MISSING_COMPONENTS:
+            self.missing_component_ids = {}
+        self.missing_component_ids[message_id] = time.monotonic() + MISSING_COMPONENT_TTL
+    
+    def encode_button_id(self, guild_id: str, custom_id: Optional[str]) -> Optional[str]:
+        """Compact custom_id of a button that triggers an auto-message"""
+        message = self.button_index.get((guild_id, custom_id)) if custom_id else None
+        return f"{COMPONENT_PREFIX}{message['_id']}" if message else custom_id
+    
     # ==================== PERMISSIONS & CHECKS ====================
     
     def check_permissions(
@@ -273,26 +365,15 @@ class AutoMessageSystem:
         
         return True
     
-    def check_cooldown(self, user_id: str, message_name: str, cooldown_seconds: int) -> bool:
+    async def check_cooldown(self, user_id: str, message_name: str, cooldown_seconds: int) -> bool:
         """
-        Check if user is on cooldown for this message
+        Check if user is on cooldown for this message (and start the cooldown)
         
         Returns:
             True if can trigger, False if on cooldown
         """
-        if cooldown_seconds <= 0:
-            return True
-        
-        key = f"{user_id}:{message_name}"
-        
-        if key in self.cooldowns:
-            time_since = (datetime.utcnow() - self.cooldowns[key]).total_seconds()
-            if time_since < cooldown_seconds:
-                return False
-        
-        # Update cooldown
-        self.cooldowns[key] = datetime.utcnow()
-        return True
+        remaining = await cooldowns.acquire("automessages", f"{user_id}:{message_name}", cooldown_seconds)
+        return remaining is None
     
     # ==================== RESPONSE BUILDING ====================
     
@@ -342,8 +423,8 @@ class AutoMessageSystem:
         
         return embed
     
-    def build_buttons(self, buttons_data: List[Dict]) -> List[discord.ui.Button]:
-        """Build Discord buttons from data"""
+    def build_buttons(self, buttons_data: List[Dict], guild_id: Optional[str] = None) -> List[discord.ui.Button]:
+        """Build Discord buttons from data (custom_ids encoded when guild_id is given)"""
         buttons = []
         
         for btn_data in buttons_data:
@@ -356,11 +437,14 @@ class AutoMessageSystem:
             }
             
             style = style_map.get(btn_data.get("style", "secondary"), discord.ButtonStyle.secondary)
+            custom_id = btn_data.get("custom_id")
+            if guild_id is not None:
+                custom_id = self.encode_button_id(guild_id, custom_id)
             
             button = discord.ui.Button(
                 label=btn_data.get("label", "Button"),
                 style=style,
-                custom_id=btn_data.get("custom_id") if style != discord.ButtonStyle.link else None,
+                custom_id=custom_id if style != discord.ButtonStyle.link else None,
                 url=btn_data.get("url") if style == discord.ButtonStyle.link else None,
                 emoji=btn_data.get("emoji"),
                 disabled=btn_data.get("disabled", False)
@@ -370,14 +454,22 @@ class AutoMessageSystem:
         
         return buttons
     
-    def build_dropdown(self, dropdown_data: Dict) -> discord.ui.Select:
-        """Build Discord select menu from data"""
+    def build_dropdown(self, dropdown_data: Dict, guild_id: Optional[str] = None) -> discord.ui.Select:
+        """Build Discord select menu from data (custom_id/values encoded when guild_id is given)"""
         options = []
+        custom_id = dropdown_data.get("custom_id", "select")
+        encoded = False
         
         for opt_data in dropdown_data.get("options", []):
+            value = opt_data.get("value", "value")
+            if guild_id is not None:
+                target = self.dropdown_index.get((guild_id, f"{custom_id}:{value}"))
+                if target:
+                    value = str(target["_id"])
+                    encoded = True
             option = discord.SelectOption(
                 label=opt_data.get("label", "Option"),
-                value=opt_data.get("value", "value"),
+                value=value,
                 description=opt_data.get("description"),
                 emoji=opt_data.get("emoji"),
                 default=opt_data.get("default", False)
@@ -386,7 +478,7 @@ class AutoMessageSystem:
         
         select = discord.ui.Select(
             placeholder=dropdown_data.get("placeholder", "Select an option"),
-            custom_id=dropdown_data.get("custom_id", "select"),
+            custom_id=f"{SELECT_PREFIX}{custom_id}"[:100] if encoded else custom_id,
             min_values=dropdown_data.get("min_values", 1),
             max_values=dropdown_data.get("max_values", 1),
             options=options
@@ -406,13 +498,14 @@ class AutoMessageSystem:
         view = discord.ui.View(timeout=None)
         
         # Add buttons
+        guild_id = message_data.get("guild_id")
         for btn_data in buttons_data:
-            button = self.build_buttons([btn_data])[0]
+            button = self.build_buttons([btn_data], guild_id)[0]
             view.add_item(button)
         
         # Add dropdowns
         for dd_data in dropdowns_data:
-            select = self.build_dropdown(dd_data)
+            select = self.build_dropdown(dd_data, guild_id)
             view.add_item(select)
         
         return view
@@ -497,7 +590,7 @@ class AutoMessageSystem:
         
         # Check cooldown
         cooldown = message["settings"].get("cooldown_seconds", 0)
-        if not self.check_cooldown(str(member.id), message["name"], cooldown):
+        if not await self.check_cooldown(str(member.id), message["name"], cooldown):
             return False
         
         # Send response
@@ -528,7 +621,7 @@ class AutoMessageSystem:
         
         # Check cooldown
         cooldown = message["settings"].get("cooldown_seconds", 0)
-        if not self.check_cooldown(str(interaction.user.id), message["name"], cooldown):
+        if not await self.check_cooldown(str(interaction.user.id), message["name"], cooldown):
             await interaction.response.send_message(
                 f"⏰ عليك الانتظار قبل استخدام هذا مرة أخرى!",
                 ephemeral=True
@@ -588,7 +681,7 @@ class AutoMessageSystem:
         
         # Check cooldown
         cooldown = message["settings"].get("cooldown_seconds", 0)
-        if not self.check_cooldown(str(interaction.user.id), message["name"], cooldown):
+        if not await self.check_cooldown(str(interaction.user.id), message["name"], cooldown):
             await interaction.response.send_message(
                 f"⏰ عليك الانتظار قبل استخدام هذا مرة أخرى!",
                 ephemeral=True
@@ -24,12 +24,17 @@ from database.autoroles_schema import (
     get_all_reaction_roles_query,
     parse_emoji,
     emoji_to_string,
-    emojis_match,
     validate_reaction_role_mode,
     validate_level_role,
     validate_join_role_target_type,
     validate_delay_seconds
 )
+from .reaction_index import reaction_role_index, role_stats
+from .level_ladder import LevelRoleLadder, level_ladders
+from joins.snapshot import join_snapshots
+
+# مهام رتب الانضمام المؤجلة (مرجع يمنع جمعها قبل انتهائها)
+_delayed_join_grants = set()
 
 
 class AutoRoleSystem:
@@ -47,6 +52,12 @@ class AutoRoleSystem:
         self.level_roles = db.level_roles
         self.join_roles = db.join_roles
         self.config = db.guild_autoroles_config
+        
+        # فهرس رسائل Reaction Roles وعدادات الإحصائيات (مشتركة في العملية)
+        self.index = reaction_role_index
+        self.stats = role_stats
+        # سلالم Level Roles المرتبة لكل سيرفر (مشتركة في العملية)
+        self.ladders = level_ladders
     
     # ====================================
     # إدارة إعدادات السيرفر
@@ -92,6 +103,7 @@ class AutoRoleSystem:
             {"guild_id": guild_id},
             {"$set": updates}
         )
+        join_snapshots.invalidate(guild_id)
         
         return result.modified_count > 0
     
@@ -135,6 +147,8 @@ class AutoRoleSystem:
         rr_doc.update(kwargs)
         
         await self.reaction_roles.insert_one(rr_doc)
+        if self.index.loaded:
+            self.index.put(rr_doc)
         
         # تحديث العداد
         await self.config.update_one(
@@ -149,10 +163,27 @@ class AutoRoleSystem:
         guild_id: int,
         message_id: int
     ) -> Optional[Dict[str, Any]]:
-        """الحصول على Reaction Role من خلال معرف الرسالة"""
-        return await self.reaction_roles.find_one(
-            get_reaction_role_by_message_query(guild_id, message_id)
+        """الحصول على Reaction Role من خلال معرف الرسالة (من الفهرس في الذاكرة)"""
+        await self.index.ensure_loaded(self.reaction_roles)
+        return self.index.get(guild_id, message_id)
+    
+    async def _update_reaction_role_document(
+        self,
+        guild_id: int,
+        message_id: int,
+        update: Dict[str, Any]
+    ) -> bool:
+        """تحديث مستند Reaction Role وتحديث الفهرس بالنسخة الجديدة"""
+        rr = await self.reaction_roles.find_one_and_update(
+            get_reaction_role_by_message_query(guild_id, message_id),
+            update,
+            return_document=True
         )
+        if rr is None:
+            return False
+        if self.index.loaded:
+            self.index.put(rr)
+        return True
     
     async def get_all_reaction_roles(
         self,
@@ -190,15 +221,14 @@ class AutoRoleSystem:
         parsed_emoji = parse_emoji(emoji)
         role_data = add_role_to_reaction_role(parsed_emoji, role_id, label, description)
         
-        result = await self.reaction_roles.update_one(
-            get_reaction_role_by_message_query(guild_id, message_id),
+        return await self._update_reaction_role_document(
+            guild_id,
+            message_id,
             {
                 "$push": {"roles": role_data},
                 "$set": {"updated_at": datetime.utcnow()}
             }
         )
-        
-        return result.modified_count > 0
     
     async def remove_role_from_reaction(
         self,
@@ -209,15 +239,14 @@ class AutoRoleSystem:
         """إزالة رتبة من Reaction Role"""
         parsed_emoji = parse_emoji(emoji)
         
-        result = await self.reaction_roles.update_one(
-            get_reaction_role_by_message_query(guild_id, message_id),
+        return await self._update_reaction_role_document(
+            guild_id,
+            message_id,
             {
                 "$pull": {"roles": {"emoji": parsed_emoji}},
                 "$set": {"updated_at": datetime.utcnow()}
             }
         )
-        
-        return result.modified_count > 0
     
     async def update_reaction_role(
         self,
@@ -228,12 +257,11 @@ class AutoRoleSystem:
         """تحديث Reaction Role"""
         updates["updated_at"] = datetime.utcnow()
         
-        result = await self.reaction_roles.update_one(
-            get_reaction_role_by_message_query(guild_id, message_id),
+        return await self._update_reaction_role_document(
+            guild_id,
+            message_id,
             {"$set": updates}
         )
-        
-        return result.modified_count > 0
     
     async def delete_reaction_role(
         self,
@@ -246,6 +274,7 @@ class AutoRoleSystem:
         )
         
         if result.deleted_count > 0:
+            self.index.discard(message_id)
             await self.config.update_one(
                 {"guild_id": guild_id},
                 {"$inc": {"total_reaction_roles": -1}}
@@ -253,6 +282,34 @@ class AutoRoleSystem:
         
         return result.deleted_count > 0
     
+    async def _apply_role_changes(
+        self,
+        member: discord.Member,
+        add: List[discord.Role],
+        remove: List[discord.Role],
+        reason: str
+    ):
+        """
+        تطبيق تغييرات الرتب بطلب HTTP واحد
+        
+        تغيير واحد يستخدم add_roles/remove_roles (لا يلمس باقي الرتب)،
+        وأكثر من تغيير يرسل قائمة الرتب النهائية عبر member.edit
+        """
+        if len(add) + len(remove) == 1:
+            if add:
+                await member.add_roles(add[0], reason=reason)
+            else:
+                await member.remove_roles(remove[0], reason=reason)
+            return
+        
+        removed = {role.id for role in remove}
+        roles = [
+            role for role in member.roles
+            if role.id not in removed and not role.is_default()
+        ]
+        roles.extend(role for role in add if role not in roles)
+        await member.edit(roles=roles, reason=reason)
+    
     async def handle_reaction_add(
         self,
         payload: discord.RawReactionActionEvent,
@@ -268,20 +325,11 @@ class AutoRoleSystem:
         Returns:
             الرتبة الممنوحة أو None
         """
-        # الحصول على Reaction Role
-        rr = await self.get_reaction_role(payload.guild_id, payload.message_id)
-        if not rr or not rr.get("enabled", True):
-            return None
-        
-        # البحث عن الرتبة المطابقة للإيموجي
-        emoji_str = emoji_to_string(payload.emoji)
-        role_data = None
-        
-        for r in rr.get("roles", []):
-            if emojis_match(r["emoji"], emoji_str):
-                role_data = r
-                break
-        
+        # البحث في الفهرس (رسائل غير Reaction Roles تُرفض بدون قاعدة البيانات)
+        await self.index.ensure_loaded(self.reaction_roles)
+        rr, role_data = self.index.match(
+            payload.guild_id, payload.message_id, emoji_to_string(payload.emoji)
+        )
         if not role_data:
             return None
         
@@ -308,33 +356,35 @@ class AutoRoleSystem:
         # معالجة حسب النمط
         mode = rr.get("mode", "toggle")
         
+        remove = []
         if mode == "unique":
             # إزالة جميع الرتب الأخرى من هذا الـ reaction role
             for r in rr.get("roles", []):
                 if r["role_id"] != role_data["role_id"]:
                     other_role = guild.get_role(r["role_id"])
-                    if other_role and other_role in member.roles:
-                        try:
-                            await member.remove_roles(other_role, reason="Reaction Role (unique mode)")
-                        except:
-                            pass
-        
-        # إعطاء الرتبة
-        if role not in member.roles:
-            try:
-                await member.add_roles(role, reason="Reaction Role")
-                
-                # تحديث الإحصائيات
-                await self.config.update_one(
-                    {"guild_id": payload.guild_id},
-                    {"$inc": {"total_roles_given": 1}}
-                )
-                
-                return role
-            except discord.Forbidden:
-                pass
-            except discord.HTTPException:
-                pass
+                    if other_role and other_role in member.roles and other_role not in remove:
+                        remove.append(other_role)
+        
+        add = [role] if role not in member.roles else []
+        if not add and not remove:
+            return None
+        
+        try:
+            await self._apply_role_changes(
+                member,
+                add,
+                remove,
+                "Reaction Role (unique mode)" if remove else "Reaction Role"
+            )
+        except discord.Forbidden:
+            return None
+        except discord.HTTPException:
+            return None
+        
+        # تحديث الإحصائيات (تُكتب على دفعات)
+        if add:
+            self.stats.record(self.config, payload.guild_id, "total_roles_given")
+            return role
         
         return None
     
@@ -353,27 +403,18 @@ class AutoRoleSystem:
         Returns:
             الرتبة المزالة أو None
         """
-        # الحصول على Reaction Role
-        rr = await self.get_reaction_role(payload.guild_id, payload.message_id)
-        if not rr or not rr.get("enabled", True):
+        # البحث في الفهرس (رسائل غير Reaction Roles تُرفض بدون قاعدة البيانات)
+        await self.index.ensure_loaded(self.reaction_roles)
+        rr, role_data = self.index.match(
+            payload.guild_id, payload.message_id, emoji_to_string(payload.emoji)
+        )
+        if not role_data:
             return None
         
         # في نمط unique لا نزيل الرتبة
         if rr.get("mode") == "unique":
             return None
         
-        # البحث عن الرتبة
-        emoji_str = emoji_to_string(payload.emoji)
-        role_data = None
-        
-        for r in rr.get("roles", []):
-            if emojis_match(r["emoji"], emoji_str):
-                role_data = r
-                break
-        
-        if not role_data:
-            return None
-        
         # الحصول على العضو والرتبة
         guild = bot.get_guild(payload.guild_id)
         if not guild:
@@ -392,11 +433,8 @@ class AutoRoleSystem:
             try:
                 await member.remove_roles(role, reason="Reaction Role removed")
                 
-                # تحديث الإحصائيات
-                await self.config.update_one(
-                    {"guild_id": payload.guild_id},
-                    {"$inc": {"total_roles_removed": 1}}
-                )
+                # تحديث الإحصائيات (تُكتب على دفعات)
+                self.stats.record(self.config, payload.guild_id, "total_roles_removed")
                 
                 return role
             except discord.Forbidden:
@@ -439,6 +477,7 @@ class AutoRoleSystem:
         lr_doc.update(kwargs)
         
         await self.level_roles.insert_one(lr_doc)
+        self.ladders.invalidate(guild_id)
         
         # تحديث العداد
         await self.config.update_one(
@@ -472,6 +511,7 @@ class AutoRoleSystem:
         result = await self.level_roles.delete_one(query)
         
         if result.deleted_count > 0:
+            self.ladders.invalidate(guild_id)
             await self.config.update_one(
                 {"guild_id": guild_id},
                 {"$inc": {"total_level_roles": -1}}
@@ -499,6 +539,55 @@ class AutoRoleSystem:
             get_level_role_for_level_query(guild_id, level)
         ).to_list(length=None)
     
+    async def get_level_ladder(self, guild_id: int) -> LevelRoleLadder:
+        """سلّم Level Roles المرتب للسيرفر (من الذاكرة)"""
+        return await self.ladders.get(guild_id, lambda: self.get_level_roles(guild_id))
+    
+    async def reconcile_level_roles(
+        self,
+        member: discord.Member,
+        level: int,
+        ladder: LevelRoleLadder
+    ) -> Optional[Dict[str, List[discord.Role]]]:
+        """
+        مطابقة رتب العضو مع رتب مستواه بطلب HTTP واحد
+        
+        Args:
+            member: العضو
+            level: مستوى العضو
+            ladder: سلّم Level Roles للسيرفر
+        
+        Returns:
+            {"added": [...], "removed": [...]} أو None إذا فشل التطبيق
+        """
+        guild = member.guild
+        add_ids, remove_ids = ladder.reconcile(level, {role.id for role in member.roles})
+        
+        # تجاهل الرتب المحذوفة والرتب الأعلى من رتبة البوت
+        top_role = guild.me.top_role if guild.me else None
+        
+        def resolve(role_ids: List[int]) -> List[discord.Role]:
+            roles = []
+            for role_id in role_ids:
+                role = guild.get_role(role_id)
+                if role and (top_role is None or role < top_role):
+                    roles.append(role)
+            return roles
+        
+        add = resolve(add_ids)
+        remove = resolve(remove_ids)
+        if not add and not remove:
+            return {"added": [], "removed": []}
+        
+        try:
+            await self._apply_role_changes(member, add, remove, f"Level Role (Level {level})")
+        except discord.HTTPException:
+            return None
+        
+        if add:
+            self.stats.record(self.config, guild.id, "total_roles_given", len(add))
+        return {"added": add, "removed": remove}
+    
     async def assign_level_roles(
         self,
         guild_id: int,
@@ -509,6 +598,8 @@ class AutoRoleSystem:
         """
         إعطاء رتب المستوى للعضو (يُستدعى عند level up)
         
+        يحسب الرتب المطلوبة للمستوى من السلّم المخزن ويطبقها بطلب واحد
+        
         Args:
             guild_id: معرف السيرفر
             user_id: معرف المستخدم
@@ -518,16 +609,15 @@ class AutoRoleSystem:
         Returns:
             قائمة الرتب الممنوحة
         """
+        ladder = await self.get_level_ladder(guild_id)
+        if not ladder or level < ladder.min_level:
+            return []
+        
         # التحقق من التفعيل
         config = await self.get_guild_config(guild_id)
         if not config.get("level_roles_enabled", True):
             return []
         
-        # الحصول على رتب هذا المستوى
-        level_roles = await self.get_roles_for_level(guild_id, level)
-        if not level_roles:
-            return []
-        
         guild = bot.get_guild(guild_id)
         if not guild:
             return []
@@ -536,40 +626,73 @@ class AutoRoleSystem:
         if not member:
             return []
         
-        granted_roles = []
+        changes = await self.reconcile_level_roles(member, level, ladder)
+        return changes["added"] if changes else []
+    
+    async def resync_level_roles(
+        self,
+        guild: discord.Guild,
+        batch_size: int = 200,
+        edits_per_second: float = 2.0
+    ) -> Dict[str, int]:
+        """
+        مزامنة Level Roles لجميع أعضاء السيرفر حسب مستوياتهم
+        
+        يقرأ user_levels على دفعات (بدون تحميل المجموعة كاملة)، ويتجاوز
+        الأعضاء الذين يملكون رتبهم الصحيحة، ويباعد بين التعديلات حتى لا
+        يصطدم بحدود Discord
         
-        for lr in level_roles:
-            role = guild.get_role(lr["role_id"])
-            if not role:
+        Args:
+            guild: السيرفر
+            batch_size: عدد الأعضاء في كل دفعة من قاعدة البيانات
+            edits_per_second: الحد الأقصى لتعديلات الأعضاء في الثانية
+        
+        Returns:
+            إحصائيات المزامنة
+        """
+        summary = {"scanned": 0, "updated": 0, "added": 0, "removed": 0, "missing": 0, "failed": 0}
+        
+        self.ladders.invalidate(guild.id)
+        ladder = await self.get_level_ladder(guild.id)
+        if not ladder:
+            return summary
+        
+        interval = 1 / edits_per_second if edits_per_second > 0 else 0
+        next_edit = 0.0
+        loop = asyncio.get_running_loop()
+        
+        cursor = self.db.user_levels.find(
+            {"guild_id": str(guild.id), "level": {"$gte": ladder.min_level}},
+            {"_id": 0, "user_id": 1, "level": 1}
+        ).batch_size(batch_size)
+        
+        async for doc in cursor:
+            summary["scanned"] += 1
+            member = guild.get_member(int(doc["user_id"]))
+            if not member:
+                summary["missing"] += 1
                 continue
             
-            # إزالة رتب المستويات السابقة إذا كان مطلوباً
-            if lr.get("remove_previous", False):
-                all_level_roles = await self.get_level_roles(guild_id)
-                for other_lr in all_level_roles:
-                    if other_lr["level"] < level:
-                        other_role = guild.get_role(other_lr["role_id"])
-                        if other_role and other_role in member.roles:
-                            try:
-                                await member.remove_roles(other_role, reason="Level Role (previous level)")
-                            except:
-                                pass
+            level = doc.get("level", 0)
+            current = {role.id for role in member.roles}
+            if ladder.reconcile(level, current) == ([], []):
+                continue
             
-            # إعطاء الرتبة
-            if role not in member.roles:
-                try:
-                    await member.add_roles(role, reason=f"Level Role (Level {level})")
-                    granted_roles.append(role)
-                    
-                    # تحديث الإحصائيات
-                    await self.config.update_one(
-                        {"guild_id": guild_id},
-                        {"$inc": {"total_roles_given": 1}}
-                    )
-                except:
-                    pass
-        
-        return granted_roles
+            # المباعدة بين التعديلات
+            delay = next_edit - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            next_edit = loop.time() + interval
+            
+            changes = await self.reconcile_level_roles(member, level, ladder)
+            if changes is None:
+                summary["failed"] += 1
+            elif changes["added"] or changes["removed"]:
+                summary["updated"] += 1
+                summary["added"] += len(changes["added"])
+                summary["removed"] += len(changes["removed"])
+        
+        return summary
     
     # ====================================
     # Join Roles
@@ -608,6 +731,7 @@ class AutoRoleSystem:
         jr_doc.update(kwargs)
         
         await self.join_roles.insert_one(jr_doc)
+        join_snapshots.invalidate(guild_id)
         
         # تحديث العداد
         await self.config.update_one(
@@ -629,6 +753,7 @@ class AutoRoleSystem:
         })
         
         if result.deleted_count > 0:
+            join_snapshots.invalidate(guild_id)
             await self.config.update_one(
                 {"guild_id": guild_id},
                 {"$inc": {"total_join_roles": -1}}
@@ -648,62 +773,93 @@ class AutoRoleSystem:
     
     async def assign_join_roles(
         self,
-        member: discord.Member
+        member: discord.Member,
+        join_roles: Optional[List[Dict[str, Any]]] = None
     ) -> List[discord.Role]:
         """
         إعطاء رتب الانضمام للعضو الجديد (Event Handler)
         
+        الرتب الفورية تُعطى بطلب HTTP واحد، والرتب المؤجلة تُجمع حسب
+        التأخير وتُعطى في مهمة خلفية بدل انتظارها داخل الحدث
+        
         Args:
             member: العضو الجديد
+            join_roles: Join Roles المناسبة للعضو (من لقطة الإعدادات) -
+                تُقرأ من قاعدة البيانات إذا لم تُمرر
         
         Returns:
-            قائمة الرتب الممنوحة
+            قائمة الرتب الممنوحة فوراً
         """
-        # التحقق من التفعيل
-        config = await self.get_guild_config(member.guild.id)
-        if not config.get("join_roles_enabled", True):
-            return []
-        
-        # الحصول على Join Roles المناسبة
-        join_roles = await self.join_roles.find(
-            get_join_roles_for_target_query(member.guild.id, member.bot)
-        ).to_list(length=None)
+        if join_roles is None:
+            # التحقق من التفعيل
+            config = await self.get_guild_config(member.guild.id)
+            if not config.get("join_roles_enabled", True):
+                return []
+            
+            # الحصول على Join Roles المناسبة
+            join_roles = await self.join_roles.find(
+                get_join_roles_for_target_query(member.guild.id, member.bot)
+            ).to_list(length=None)
         
         if not join_roles:
             return []
         
-        granted_roles = []
+        # العضو لديه رتب بالفعل (عائد)
+        returning = len(member.roles) > 1
         
+        immediate = []
+        delayed: Dict[int, List[int]] = {}
         for jr in join_roles:
-            # التحقق من ignore_returning
-            if jr.get("ignore_returning", False) and len(member.roles) > 1:
-                # العضو لديه رتب بالفعل (عائد)
-                continue
-            
-            role = member.guild.get_role(jr["role_id"])
-            if not role:
+            if jr.get("ignore_returning", False) and returning:
                 continue
-            
-            # التأخير إذا كان مطلوباً
             delay = jr.get("delay_seconds", 0)
             if delay > 0:
-                await asyncio.sleep(delay)
-            
-            # إعطاء الرتبة
-            if role not in member.roles:
-                try:
-                    await member.add_roles(role, reason="Join Role")
-                    granted_roles.append(role)
-                    
-                    # تحديث الإحصائيات
-                    await self.config.update_one(
-                        {"guild_id": member.guild.id},
-                        {"$inc": {"total_roles_given": 1}}
-                    )
-                except:
-                    pass
-        
-        return granted_roles
+                delayed.setdefault(delay, []).append(jr["role_id"])
+            elif jr["role_id"] not in immediate:
+                immediate.append(jr["role_id"])
+        
+        for delay, role_ids in delayed.items():
+            task = asyncio.create_task(self._grant_join_roles_later(member, role_ids, delay))
+            _delayed_join_grants.add(task)
+            task.add_done_callback(_delayed_join_grants.discard)
+        
+        return await self._grant_join_roles(member, immediate)
+    
+    async def _grant_join_roles(
+        self,
+        member: discord.Member,
+        role_ids: List[int]
+    ) -> List[discord.Role]:
+        """إعطاء رتب الانضمام التي لا يملكها العضو بطلب واحد"""
+        roles = []
+        for role_id in role_ids:
+            role = member.guild.get_role(role_id)
+            if role and role not in member.roles:
+                roles.append(role)
+        
+        if not roles:
+            return []
+        
+        try:
+            await self._apply_role_changes(member, roles, [], "Join Role")
+        except discord.HTTPException:
+            return []
+        
+        self.stats.record(self.config, member.guild.id, "total_roles_given", len(roles))
+        return roles
+    
+    async def _grant_join_roles_later(
+        self,
+        member: discord.Member,
+        role_ids: List[int],
+        delay: int
+    ):
+        """إعطاء رتب الانضمام المؤجلة"""
+        await asyncio.sleep(delay)
+        # العضو غادر أثناء التأخير
+        if member.guild.get_member(member.id) is None:
+            return
+        await self._grant_join_roles(member, role_ids)
     
     # ====================================
     # دوال مساعدة
@@ -711,6 +867,7 @@ class AutoRoleSystem:
     
     async def get_statistics(self, guild_id: int) -> Dict[str, Any]:
         """الحصول على إحصائيات الرتب التلقائية"""
+        await self.stats.flush()
         config = await self.get_guild_config(guild_id)
         
         return {
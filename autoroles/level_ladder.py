@@ -0,0 +1,97 @@
+"""
+Level-Role Ladders
+Cached, sorted level-role ladders and the role set a member should hold.
+
+A guild's level roles form a ladder of rungs ``(level, role_id,
+remove_previous)`` sorted by level. For a member at level ``L`` the target
+is every rung role up to ``L``. A rung with ``remove_previous`` drops the
+roles of all lower levels, as ``assign_level_roles`` always did. Roles of
+rungs above ``L`` are never touched: they may have been given by hand.
+
+``LevelLadderCache`` keeps one ladder per guild. Entries are dropped when a
+level role is written through ``AutoRoleSystem`` and after
+``refresh_seconds``, so dashboard edits (another process) are picked up.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Set, Tuple
+
+from database.single_flight import SingleFlightCache
+
+Rung = Tuple[int, int, bool]
+
+
+class LevelRoleLadder:
+    """Sorted level-role rungs of one guild"""
+
+    __slots__ = ("rungs", "role_ids", "min_level")
+
+    def __init__(self, level_roles: Iterable[Dict[str, Any]]):
+        self.rungs: Tuple[Rung, ...] = tuple(sorted(
+            (lr["level"], lr["role_id"], bool(lr.get("remove_previous", False)))
+            for lr in level_roles
+        ))
+        self.role_ids = frozenset(role_id for _, role_id, _ in self.rungs)
+        self.min_level = self.rungs[0][0] if self.rungs else None
+
+    def __bool__(self) -> bool:
+        return bool(self.rungs)
+
+    def target(self, level: int) -> List[int]:
+        """Role ids a member at ``level`` should hold (ladder order)"""
+        target: List[int] = []
+        index = 0
+        rungs = self.rungs
+        while index < len(rungs) and rungs[index][0] <= level:
+            # Rungs of the same level are applied together
+            rung_level = rungs[index][0]
+            end = index
+            while end < len(rungs) and rungs[end][0] == rung_level:
+                end += 1
+            group = rungs[index:end]
+            if any(remove_previous for _, _, remove_previous in group):
+                target = []
+            for _, role_id, _ in group:
+                if role_id not in target:
+                    target.append(role_id)
+            index = end
+        return target
+
+    def reconcile(self, level: int, current: Set[int]) -> Tuple[List[int], List[int]]:
+        """
+        Changes that bring a member at ``level`` to the target.
+
+        Args:
+            current: Role ids the member holds
+
+        Returns:
+            (role ids to add, role ids to remove)
+        """
+        target = self.target(level)
+        keep = set(target)
+        add = [role_id for role_id in target if role_id not in current]
+        remove = []
+        for rung_level, role_id, _ in self.rungs:
+            if rung_level > level:
+                break
+            if role_id not in keep and role_id in current and role_id not in remove:
+                remove.append(role_id)
+        return add, remove
+
+
+class LevelLadderCache(SingleFlightCache):
+    """Per-guild ladders, loaded on a miss"""
+
+    async def get(
+        self,
+        guild_id: int,
+        loader: Callable[[], Awaitable[List[Dict[str, Any]]]]
+    ) -> LevelRoleLadder:
+        """The ladder of a guild (``loader`` returns its enabled level roles)"""
+        async def load():
+            return LevelRoleLadder(await loader())
+
+        return await self.get_or_load(guild_id, load)
+
+
+# Shared by every AutoRoleSystem of the process
+level_ladders = LevelLadderCache()
@@ -0,0 +1,152 @@
+"""
+Reaction-Role Index
+In-memory lookup of reaction-role messages and buffered role statistics.
+
+- ``ReactionRoleIndex`` keeps every reaction-role panel by message id, with
+  its emoji -> role table prebuilt. Raw reaction events on any other message
+  are rejected with one dictionary lookup instead of a database query. The
+  index is loaded once per process and kept current by ``AutoRoleSystem``'s
+  write methods (reaction roles are only written through them).
+- ``RoleStatsBuffer`` aggregates the ``total_roles_given`` /
+  ``total_roles_removed`` counters per guild and writes them with one bulk
+  write a few seconds later.
+
+Both are process-wide singletons: ``AutoRoleSystem`` is constructed per
+event in ``main.py``.
+"""
+
+import asyncio
+import logging
+from typing import Optional, Dict, Any, Tuple
+
+from pymongo import UpdateOne
+
+from database.autoroles_schema import parse_emoji
+from database.counter_buffer import CounterBuffer
+
+logger = logging.getLogger(__name__)
+
+
+def emoji_key(emoji: Any) -> str:
+    """Normalized emoji used as lookup key (same rules as ``emojis_match``)"""
+    return parse_emoji(str(emoji))
+
+
+class ReactionRoleIndex:
+    """message_id -> reaction-role document, with emoji -> role tables"""
+
+    def __init__(self):
+        self._panels: Dict[int, Dict[str, Any]] = {}
+        self._roles: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._load_lock = asyncio.Lock()
+        self.loaded = False
+        self.hits = 0
+        self.rejected = 0
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._panels
+
+    def __len__(self) -> int:
+        return len(self._panels)
+
+    async def ensure_loaded(self, collection):
+        """Load every reaction-role panel once (concurrent callers wait for the same load)"""
+        if self.loaded:
+            return
+        async with self._load_lock:
+            if not self.loaded:
+                await self.reload(collection)
+
+    async def reload(self, collection):
+        """Rebuild the index from the reaction_roles collection"""
+        panels = await collection.find({}).to_list(length=None)
+        self._panels.clear()
+        self._roles.clear()
+        for panel in panels:
+            self.put(panel)
+        self.loaded = True
+        logger.info(f"Reaction-role index loaded ({len(panels)} panels)")
+
+    def put(self, panel: Dict[str, Any]):
+        """Add or replace a panel"""
+        message_id = panel["message_id"]
+        roles = {}
+        for role_data in panel.get("roles", []):
+            # First entry wins, like the linear scan it replaces
+            roles.setdefault(emoji_key(role_data["emoji"]), role_data)
+        self._panels[message_id] = panel
+        self._roles[message_id] = roles
+
+    def discard(self, message_id: int):
+        self._panels.pop(message_id, None)
+        self._roles.pop(message_id, None)
+
+    def get(self, guild_id: int, message_id: int) -> Optional[Dict[str, Any]]:
+        """The panel of a message (None for any other message)"""
+        panel = self._panels.get(message_id)
+        if panel is None or panel["guild_id"] != guild_id:
+            self.rejected += 1
+            return None
+        self.hits += 1
+        return panel
+
+    def match(
+        self,
+        guild_id: int,
+        message_id: int,
+        emoji: Any
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(panel, role entry) for a reaction, (None, None) when irrelevant"""
+        panel = self.get(guild_id, message_id)
+        if panel is None or not panel.get("enabled", True):
+            return None, None
+        role_data = self._roles[message_id].get(emoji_key(emoji))
+        if role_data is None:
+            return None, None
+        return panel, role_data
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "panels": len(self._panels),
+            "loaded": self.loaded,
+            "hits": self.hits,
+            "rejected": self.rejected
+        }
+
+
+class RoleStatsBuffer:
+    """Per-guild role counters written in batches"""
+
+    def __init__(self, delay: float = 10.0):
+        """
+        Args:
+            delay: Seconds between the first buffered change and the flush
+        """
+        self.collection = None
+        self.counters = CounterBuffer(self._write, delay=delay, label="auto-role statistics")
+
+    @property
+    def pending(self) -> int:
+        return self.counters.pending
+
+    def record(self, collection, guild_id: int, field: str, amount: int = 1):
+        """Count a change of ``field`` (no I/O); a flush follows within ``delay`` seconds"""
+        self.collection = collection
+        self.counters.add(guild_id, {field: amount})
+
+    async def _write(self, counts) -> int:
+        operations = [
+            UpdateOne({"guild_id": guild_id}, {"$inc": fields})
+            for guild_id, fields in counts.items()
+        ]
+        await self.collection.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async def flush(self) -> int:
+        """Write the buffered counters. Returns the number of guilds updated."""
+        return await self.counters.flush()
+
+
+# Shared by every AutoRoleSystem of the process
+reaction_role_index = ReactionRoleIndex()
+role_stats = RoleStatsBuffer()
@@ -9,6 +9,8 @@ import logging
 from typing import Optional, Dict, Any
 from motor.motor_asyncio import AsyncIOMotorClient
 
+from templating import render_level_up, render_welcome_message
+
 logger = logging.getLogger(__name__)
 
 
@@ -277,12 +279,7 @@ class BrandingSystem:
         else:
             template = branding.get("welcome_message", "Welcome to {guild_name}, {user}!")
         
-        return template.format(
-            guild_name=guild.name,
-            user=user.mention,
-            username=user.name,
-            member_count=guild.member_count
-        )
+        return render_welcome_message(template, guild.name, user.mention, user.name, guild.member_count)
     
     async def format_level_up_message(
         self,
@@ -308,11 +305,7 @@ class BrandingSystem:
         else:
             template = branding.get("level_up_message", "🎉 Congratulations {user}! You've reached level {level}!")
         
-        return template.format(
-            user=user.mention,
-            username=user.name,
-            level=level
-        )
+        return render_level_up(template, user.mention, user.name, level)
     
     # ==================== Bot Nickname Management ====================
     
@@ -406,23 +399,14 @@ class BrandingSystem:
         if "welcome_message" in settings:
             embed.add_field(
                 name="Welcome Message Example",
-                value=settings["welcome_message"].format(
-                    guild_name="Your Server",
-                    user="@User",
-                    username="User",
-                    member_count=100
-                ),
+                value=render_welcome_message(settings["welcome_message"], "Your Server", "@User", "User", 100),
                 inline=False
             )
         
         if "level_up_message" in settings:
             embed.add_field(
                 name="Level Up Message Example",
-                value=settings["level_up_message"].format(
-                    user="@User",
-                    username="User",
-                    level=10
-                ),
+                value=render_level_up(settings["level_up_message"], "@User", "User", 10),
                 inline=False
             )
         
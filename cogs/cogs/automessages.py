@@ -5,8 +5,9 @@ Discord commands for managing automatic message responses.
 """
 
 import discord
+import asyncio
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 from typing import Optional, Literal
 from datetime import datetime
 
@@ -182,6 +183,26 @@ class AutoMessages(commands.Cog):
     async def cog_load(self):
         """Initialize auto-message system"""
         self.automessage_system = self.bot.automessage_system
+        # Button/dropdown clicks resolve from memory from the first interaction on
+        count = await self.automessage_system.load_component_index()
+        print(f"✅ Auto-message component index loaded ({count} triggers)")
+        self.component_index_task.start()
+    
+    def cog_unload(self):
+        self.component_index_task.cancel()
+    
+    @tasks.loop(minutes=5)
+    async def component_index_task(self):
+        """Pick up button/dropdown messages changed by other processes (dashboard)"""
+        try:
+            await self.automessage_system.load_component_index()
+        except Exception as e:
+            print(f"❌ Error reloading auto-message component index: {e}")
+    
+    @component_index_task.before_loop
+    async def before_component_index(self):
+        # The first load happens in cog_load
+        await asyncio.sleep(300)
     
     # Group: /automessage
     automessage_group = app_commands.Group(
@@ -91,13 +91,25 @@ class AutoRolesCog(commands.Cog):
         self.bot = bot
         self.db = None
         self.autorole_system = None
+        # السيرفرات التي تجري فيها مزامنة Level Roles حالياً
+        self._level_syncs = set()
     
     async def cog_load(self):
         """تحميل الـ Cog"""
         self.db = await get_db()
         self.autorole_system = AutoRoleSystem(self.db)
+        try:
+            await self.autorole_system.index.ensure_loaded(self.autorole_system.reaction_roles)
+        except Exception as e:
+            # الفهرس يُحمَّل عند أول استخدام (ensure_loaded في AutoRoleSystem)
+            print(f"⚠️ Reaction-role index not loaded, will load on first use: {e}")
         print("✅ Auto-Roles Cog loaded successfully")
     
+    async def cog_unload(self):
+        """كتابة الإحصائيات المتبقية"""
+        if self.autorole_system:
+            await self.autorole_system.stats.flush()
+    
     # ====================================
     # Reaction Roles Commands
     # ====================================
@@ -638,6 +650,49 @@ class AutoRolesCog(commands.Cog):
         
         await interaction.followup.send(embed=embed, ephemeral=True)
     
+    @levelrole_group.command(
+        name="sync",
+        description="مزامنة Level Roles لجميع الأعضاء حسب مستوياتهم"
+    )
+    @app_commands.checks.has_permissions(manage_roles=True)
+    async def lr_sync(self, interaction: discord.Interaction):
+        """مزامنة Level Roles لجميع الأعضاء"""
+        await interaction.response.defer(ephemeral=True)
+        
+        guild_id = interaction.guild.id
+        if guild_id in self._level_syncs:
+            await interaction.followup.send(
+                "⏳ المزامنة جارية بالفعل في هذا السيرفر",
+                ephemeral=True
+            )
+            return
+        
+        self._level_syncs.add(guild_id)
+        try:
+            summary = await self.autorole_system.resync_level_roles(interaction.guild)
+        except Exception as e:
+            await interaction.followup.send(
+                f"❌ حدث خطأ: {str(e)}",
+                ephemeral=True
+            )
+            return
+        finally:
+            self._level_syncs.discard(guild_id)
+        
+        embed = discord.Embed(
+            title="🔄 مزامنة Level Roles",
+            color=discord.Color.green()
+        )
+        embed.add_field(name="الأعضاء المفحوصون", value=str(summary["scanned"]), inline=True)
+        embed.add_field(name="الأعضاء المحدَّثون", value=str(summary["updated"]), inline=True)
+        embed.add_field(name="رتب مضافة / مزالة", value=f"{summary['added']} / {summary['removed']}", inline=True)
+        if summary["missing"] or summary["failed"]:
+            embed.set_footer(
+                text=f"غير موجودين في السيرفر: {summary['missing']} • فشل: {summary['failed']}"
+            )
+        
+        await interaction.followup.send(embed=embed, ephemeral=True)
+    
     # ====================================
     # Join Roles Commands
     # ====================================
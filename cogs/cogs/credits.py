@@ -34,10 +34,6 @@ class CreditsCog(commands.Cog, name="Credits"):
         self.bot = bot
         self.credits_system = CreditsSystem(bot)
     
-    async def cog_unload(self):
-        """Clean up when cog is unloaded."""
-        self.credits_system.cleanup_expired_cooldowns.cancel()
-    
     # ============================================================
     # CREDITS GROUP
     # ============================================================
@@ -7,13 +7,15 @@ Kingdom-77 Bot v4.0 - Phase 5.7
 
 import discord
 from discord import app_commands
-from discord.ext import commands, tasks
+from discord.ext import commands
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List
 import asyncio
+import time
 
-from giveaway.giveaway_system import GiveawaySystem
+from giveaway.giveaway_system import GiveawaySystem, DEADLINE_KIND
 from database.giveaway_schema import GiveawayDatabase
+from scheduling import get_scheduler, to_timestamp
 
 
 class TemplateCreateModal(discord.ui.Modal, title="إنشاء قالب قرعة 📋"):
@@ -416,31 +418,35 @@ class Giveaway(commands.Cog):
         self.giveaway_db = GiveawayDatabase(bot.db)
         self.giveaway_system = GiveawaySystem(self.giveaway_db, bot)
         
-        # Start background task
-        self.check_giveaways_task.start()
+        # إنهاء القرعات في موعدها (scheduling/deadlines.py)
+        self.scheduler = get_scheduler(bot)
+        self.scheduler.register(
+            DEADLINE_KIND,
+            self.on_giveaway_deadline,
+            loader=self.load_giveaway_deadlines
+        )
     
     def cog_unload(self):
-        self.check_giveaways_task.cancel()
+        self.scheduler.unregister(DEADLINE_KIND)
     
-    # ===== Background Task =====
-    @tasks.loop(seconds=30)
-    async def check_giveaways_task(self):
-        """فحص القرعات المنتهية"""
-        try:
-            active_giveaways = await self.giveaway_db.get_active_giveaways()
-            now = datetime.now(timezone.utc)
-            
-            for giveaway in active_giveaways:
-                if giveaway["end_time"] <= now:
-                    # انتهت القرعة
-                    await self.end_giveaway_automatically(giveaway)
-        
-        except Exception as e:
-            print(f"Error in check_giveaways_task: {e}")
+    # ===== Deadlines =====
+    async def load_giveaway_deadlines(self):
+        """مواعيد انتهاء القرعات النشطة"""
+        deadlines = await self.giveaway_db.get_active_deadlines()
+        return [(giveaway["giveaway_id"], giveaway["end_time"]) for giveaway in deadlines]
     
-    @check_giveaways_task.before_loop
-    async def before_check_giveaways(self):
-        await self.bot.wait_until_ready()
+    async def on_giveaway_deadline(self, giveaway_id: str):
+        """انتهى موعد القرعة"""
+        giveaway = await self.giveaway_db.get_giveaway(giveaway_id)
+        if not giveaway or giveaway["status"] != "active":
+            return
+        
+        # تم تمديد القرعة (مثلاً من لوحة التحكم)
+        if to_timestamp(giveaway["end_time"]) > time.time():
+            self.scheduler.schedule(DEADLINE_KIND, giveaway_id, giveaway["end_time"])
+            return
+        
+        await self.end_giveaway_automatically(giveaway)
     
     async def end_giveaway_automatically(self, giveaway: dict):
         """إنهاء القرعة تلقائياً"""
@@ -449,7 +455,11 @@ class Giveaway(commands.Cog):
             success, winners, error = await self.giveaway_system.end_giveaway(giveaway["giveaway_id"])
             
             if not success:
-                # لا يوجد مشاركون
+                # لا يوجد مشاركون - إغلاق القرعة حتى لا تُعالج مرة أخرى
+                await self.giveaway_db.update_giveaway(
+                    giveaway["giveaway_id"],
+                    {"status": "ended", "ended_at": datetime.now(timezone.utc)}
+                )
                 channel = self.bot.get_channel(int(giveaway["channel_id"]))
                 if channel and giveaway["message_id"]:
                     try:
@@ -784,6 +794,8 @@ class EntitiesChoiceView(discord.ui.View):
             await interaction.followup.send(f"❌ {error}", ephemeral=True)
             return
         
+        self.scheduler.cancel(DEADLINE_KIND, giveaway_id)
+        
         # تحديث الرسالة
         channel = self.bot.get_channel(int(giveaway["channel_id"]))
         if channel and giveaway["message_id"]:
@@ -875,6 +887,7 @@ class EntitiesChoiceView(discord.ui.View):
                 "cancelled_at": datetime.now(timezone.utc)
             }
         )
+        self.scheduler.cancel(DEADLINE_KIND, giveaway_id)
         
         # تحديث الرسالة
         channel = self.bot.get_channel(int(giveaway["channel_id"]))
@@ -33,6 +33,11 @@ class LevelingCog(commands.Cog):
         else:
             logger.warning("⚠️ MongoDB not available, leveling disabled")
     
+    async def cog_unload(self):
+        """Write the buffered dashboard metrics."""
+        if self.leveling:
+            await self.leveling.metrics_buffer.flush()
+    
     def make_embed(self, title: str, description: str, color: discord.Color) -> discord.Embed:
         """Create a standard embed."""
         embed = discord.Embed(title=title, description=description, color=color)
@@ -17,30 +17,50 @@ import discord
 from discord import option
 from discord.ext import commands, tasks
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, time, timezone
 
 class PremiumCog(commands.Cog):
     """Premium subscription management commands"""
     
     def __init__(self, bot):
         self.bot = bot
-        self.cleanup_task.start()
+        # Subscriptions expire at their exact time (premium/expiry.py)
+        self.bot.premium_system.start_expiry(bot)
+        self.usage_flush_task.start()
+        self.weekly_summary_task.start()
     
     def cog_unload(self):
-        self.cleanup_task.cancel()
+        if self.bot.premium_system.expiry:
+            self.bot.premium_system.expiry.stop()
+            self.bot.premium_system.expiry = None
+        self.usage_flush_task.cancel()
+        self.weekly_summary_task.cancel()
+        # Write out whatever usage is still buffered
+        self.bot.loop.create_task(self.bot.premium_system.flush_usage())
     
-    @tasks.loop(hours=24)
-    async def cleanup_task(self):
-        """Daily cleanup of expired subscriptions"""
+    @tasks.loop(minutes=1)
+    async def usage_flush_task(self):
+        """Flush buffered feature usage into daily rollups"""
         try:
-            count = await self.bot.premium_system.cleanup_expired()
-            if count > 0:
-                print(f"✅ Cleaned up {count} expired subscriptions")
+            await self.bot.premium_system.flush_usage()
         except Exception as e:
-            print(f"❌ Error in premium cleanup: {e}")
+            print(f"❌ Error flushing premium usage: {e}")
     
-    @cleanup_task.before_loop
-    async def before_cleanup(self):
+    @usage_flush_task.before_loop
+    async def before_usage_flush(self):
+        await self.bot.wait_until_ready()
+    
+    @tasks.loop(time=time(hour=6, tzinfo=timezone.utc))
+    async def weekly_summary_task(self):
+        """Queue last week's summary emails (a no-op once the week is done, resumes after restarts)"""
+        try:
+            import database.mongodb as mongodb_module
+            await self.bot.premium_system.run_weekly_summary(mongodb_module.db.db, bot=self.bot)
+        except Exception as e:
+            print(f"❌ Error running weekly summaries: {e}")
+    
+    @weekly_summary_task.before_loop
+    async def before_weekly_summary(self):
         await self.bot.wait_until_ready()
     
     # Premium Info Commands
@@ -52,8 +52,8 @@ class TicketCategoryModal(discord.ui.Modal, title="اختر فئة التذكر
         """عند إرسال النموذج"""
         await interaction.response.defer(ephemeral=True)
         
-        # التحقق من قدرة المستخدم على إنشاء تذكرة
-        can_create, message = await self.ticket_system.can_user_create_ticket(
+        # التحقق من قدرة المستخدم على إنشاء تذكرة وحجز مكانها
+        can_create, message = await self.ticket_system.reserve_ticket_slot(
             interaction.guild.id,
             interaction.user.id,
             bot=interaction.client
@@ -74,6 +74,10 @@ class TicketCategoryModal(discord.ui.Modal, title="اختر فئة التذكر
         )
         
         if not category:
+            await self.ticket_system.release_ticket_slot(
+                interaction.guild.id,
+                interaction.user.id
+            )
             await interaction.followup.send(
                 "❌ الفئة غير موجودة",
                 ephemeral=True
@@ -81,6 +85,7 @@ class TicketCategoryModal(discord.ui.Modal, title="اختر فئة التذكر
             return
         
         # إنشاء قناة التذكرة
+        ticket = None
         try:
             # الحصول على الكاتيجوري
             discord_category = None
@@ -93,8 +98,10 @@ class TicketCategoryModal(discord.ui.Modal, title="اختر فئة التذكر
                     config["ticket_category_id"]
                 )
             
-            # تنسيق اسم القناة
-            ticket_number = config.get("next_ticket_number", 1)
+            # حجز رقم التذكرة وتنسيق اسم القناة
+            ticket_number = await self.ticket_system.allocate_ticket_number(
+                interaction.guild.id
+            )
             channel_name = config.get("ticket_name_format", "ticket-{number}").format(
                 number=ticket_number
             )
@@ -146,7 +153,8 @@ class TicketCategoryModal(discord.ui.Modal, title="اختر فئة التذكر
                 guild_id=interaction.guild.id,
                 user_id=interaction.user.id,
                 channel_id=channel.id,
-                category=self.category_id
+                category=self.category_id,
+                ticket_number=ticket_number
             )
             
             # تحديث الموضوع
@@ -210,6 +218,11 @@ class TicketCategoryModal(discord.ui.Modal, title="اختر فئة التذكر
             )
             
         except Exception as e:
+            if ticket is None:
+                await self.ticket_system.release_ticket_slot(
+                    interaction.guild.id,
+                    interaction.user.id
+                )
             await interaction.followup.send(
                 f"❌ حدث خطأ أثناء إنشاء التذكرة: {str(e)}",
                 ephemeral=True
@@ -319,13 +332,10 @@ class TicketControlView(discord.ui.View):
         
         # حفظ النص
         if config.get("save_transcripts", True):
-            messages = await self.ticket_system.collect_messages_for_transcript(
-                interaction.channel
-            )
-            await self.ticket_system.save_transcript(
+            await self.ticket_system.archive_transcript(
                 interaction.guild.id,
                 ticket,
-                messages
+                interaction.channel
             )
         
         # رسالة الإغلاق
@@ -408,20 +418,15 @@ class TicketControlView(discord.ui.View):
             )
             return
         
-        # جمع الرسائل
-        messages = await self.ticket_system.collect_messages_for_transcript(
-            interaction.channel
-        )
-        
-        # حفظ النص
-        transcript = await self.ticket_system.save_transcript(
+        # حفظ النص (الرسائل تُكتب مباشرة على شكل أجزاء مضغوطة)
+        transcript = await self.ticket_system.archive_transcript(
             interaction.guild.id,
             ticket,
-            messages
+            interaction.channel
         )
         
         await interaction.followup.send(
-            f"✅ تم حفظ نص المحادثة ({len(messages)} رسالة)",
+            f"✅ تم حفظ نص المحادثة ({transcript['message_count']} رسالة)",
             ephemeral=True
         )
 
@@ -549,13 +554,10 @@ class TicketsCog(commands.Cog):
         
         # حفظ النص
         if config.get("save_transcripts", True):
-            messages = await self.ticket_system.collect_messages_for_transcript(
-                interaction.channel
-            )
-            await self.ticket_system.save_transcript(
+            await self.ticket_system.archive_transcript(
                 interaction.guild.id,
                 ticket,
-                messages
+                interaction.channel
             )
         
         # رسالة الإغلاق
@@ -824,16 +826,11 @@ class TicketsCog(commands.Cog):
             )
             return
         
-        # جمع الرسائل
-        messages = await self.ticket_system.collect_messages_for_transcript(
-            interaction.channel
-        )
-        
-        # حفظ النص
-        transcript = await self.ticket_system.save_transcript(
+        # حفظ النص (الرسائل تُكتب مباشرة على شكل أجزاء مضغوطة)
+        transcript = await self.ticket_system.archive_transcript(
             interaction.guild.id,
             ticket,
-            messages
+            interaction.channel
         )
         
         embed = discord.Embed(
@@ -841,7 +838,7 @@ class TicketsCog(commands.Cog):
             description=f"تم حفظ نص المحادثة بنجاح",
             color=discord.Color.green()
         )
-        embed.add_field(name="عدد الرسائل", value=str(len(messages)))
+        embed.add_field(name="عدد الرسائل", value=str(transcript['message_count']))
         embed.add_field(
             name="رقم التذكرة",
             value=f"#{ticket['ticket_number']}"
@@ -873,7 +870,7 @@ class TicketsCog(commands.Cog):
                 )
                 log_embed.add_field(
                     name="عدد الرسائل",
-                    value=str(len(messages)),
+                    value=str(transcript['message_count']),
                     inline=True
                 )
                 
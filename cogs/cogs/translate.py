@@ -13,10 +13,13 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
-from deep_translator import GoogleTranslator
-from langdetect import detect
 
 from database import get_db
+from startup.lazy import lazy_import
+
+# Imported on first translation (see startup/lazy.py)
+deep_translator = lazy_import("deep_translator")
+langdetect = lazy_import("langdetect")
 
 logger = logging.getLogger(__name__)
 
@@ -133,7 +136,7 @@ class TranslationLanguageView(discord.ui.View):
                 if cache_key in translation_cache:
                     translated = translation_cache[cache_key]
                 else:
-                    translated = GoogleTranslator(source=self.source_lang, target=target_lang).translate(self.message_content)
+                    translated = deep_translator.GoogleTranslator(source=self.source_lang, target=target_lang).translate(self.message_content)
                     if translated:
                         translation_cache[cache_key] = translated
                         
@@ -255,7 +258,7 @@ class TranslateCog(commands.Cog):
             
             # Detect message language
             try:
-                detected = detect(content)
+                detected = langdetect.detect(content)
             except Exception as e:
                 logger.debug(f"Language detection failed: {e}")
                 detected = 'auto'
@@ -281,7 +284,7 @@ class TranslateCog(commands.Cog):
                     if cache_key in translation_cache:
                         translated = translation_cache[cache_key]
                     else:
-                        translated = GoogleTranslator(source=detected, target=target_lang).translate(content)
+                        translated = deep_translator.GoogleTranslator(source=detected, target=target_lang).translate(content)
                         if translated:
                             translation_cache[cache_key] = translated
                             
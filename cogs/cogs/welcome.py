@@ -19,11 +19,6 @@ class WelcomeCommands(commands.Cog):
         self.bot = bot
         self.welcome_system = WelcomeSystem(bot.db)
     
-    @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        """Handle member join"""
-        await self.welcome_system.on_member_join(member)
-    
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
         """Handle member leave"""
@@ -10,12 +10,121 @@ from datetime import datetime
 from typing import Optional, Dict, Any, List, Tuple
 import json
 
+from templating import TemplateEngine, safe_eval, MathError
+
+
+def _random_number(argument: str):
+    # {random:1-100}
+    match = re.match(r'(\d+)-(\d+)', argument)
+    if not match:
+        return None
+    min_val, max_val = int(match.group(1)), int(match.group(2))
+    if min_val > max_val:
+        return None
+    return lambda scope: random.randint(min_val, max_val)
+
+
+def _choose(argument: str):
+    # {choose:option1|option2|option3}
+    choices = argument.split('|')
+    return lambda scope: random.choice(choices)
+
+
+def _math(argument: str) -> str:
+    # {math:2+2} is a constant: evaluated once when the template is compiled
+    try:
+        return str(safe_eval(argument))
+    except MathError:
+        return f"[Invalid Math: {argument}]"
+
+
+def _argument(scope: "_Scope", index: int) -> Optional[str]:
+    # {args[0]}, {args[1]}, etc.
+    if 0 <= index < len(scope.arg_list):
+        return scope.arg_list[index]
+    return None
+
+
+def _unknown(variable: str) -> Optional[str]:
+    # Malformed {random...}/{args[...]} forms are left as-is
+    if variable.lower().startswith(("random", "args[")):
+        return None
+    return f"[Unknown Variable: {variable}]"
+
+
+def _user_joined(scope: "_Scope") -> Optional[str]:
+    if isinstance(scope.ctx.author, discord.Member):
+        return discord.utils.format_dt(scope.ctx.author.joined_at, style='R')
+    return None
+
+
+def _channel_topic(scope: "_Scope") -> Optional[str]:
+    if hasattr(scope.ctx.channel, 'topic'):
+        return scope.ctx.channel.topic or "No topic"
+    return None
+
+
+class _Scope:
+    __slots__ = ("ctx", "args", "arg_list")
+
+    def __init__(self, ctx, args: Optional[str]):
+        self.ctx = ctx
+        self.args = args
+        self.arg_list = args.split() if args else []
+
+
+VARIABLES = TemplateEngine(
+    resolvers={
+        # User variables
+        "user": lambda s: s.ctx.author.mention,
+        "user.name": lambda s: s.ctx.author.name,
+        "user.id": lambda s: str(s.ctx.author.id),
+        "user.discriminator": lambda s: s.ctx.author.discriminator,
+        "user.avatar": lambda s: s.ctx.author.display_avatar.url,
+        "user.created": lambda s: discord.utils.format_dt(s.ctx.author.created_at, style='R'),
+        "user.joined": _user_joined,
+
+        # Server variables
+        "server": lambda s: s.ctx.guild.name,
+        "server.id": lambda s: str(s.ctx.guild.id),
+        "server.members": lambda s: str(s.ctx.guild.member_count),
+        "server.icon": lambda s: s.ctx.guild.icon.url if s.ctx.guild.icon else "",
+        "server.owner": lambda s: s.ctx.guild.owner.mention if s.ctx.guild.owner else "Unknown",
+        "server.created": lambda s: discord.utils.format_dt(s.ctx.guild.created_at, style='R'),
+        "server.boosts": lambda s: str(s.ctx.guild.premium_subscription_count),
+        "server.boost_level": lambda s: str(s.ctx.guild.premium_tier),
+
+        # Channel variables
+        "channel": lambda s: s.ctx.channel.mention,
+        "channel.name": lambda s: s.ctx.channel.name,
+        "channel.id": lambda s: str(s.ctx.channel.id),
+        "channel.topic": _channel_topic,
+
+        # Date/Time variables
+        "date": lambda s: datetime.utcnow().strftime("%Y-%m-%d"),
+        "time": lambda s: datetime.utcnow().strftime("%H:%M:%S UTC"),
+        "timestamp": lambda s: discord.utils.format_dt(datetime.utcnow(), style='f'),
+        "unix": lambda s: str(int(datetime.utcnow().timestamp())),
+
+        # Arguments
+        "args": lambda s: s.args or "",
+    },
+    functions={
+        "random": _random_number,
+        "math": _math,
+        "choose": _choose,
+    },
+    indexed={"args": _argument},
+    unknown=_unknown,
+    case_sensitive=False
+)
+
 
 class CommandParser:
     """Parser for custom commands with variables and embeds"""
     
     def __init__(self):
-        self.variable_pattern = re.compile(r'\{([^}]+)\}')
+        self.variables = VARIABLES
     
     # ==================== Variable Replacement ====================
     
@@ -25,124 +134,8 @@ class CommandParser:
         ctx: discord.ApplicationContext,
         args: Optional[str] = None
     ) -> str:
-        """Parse and replace all variables in content"""
-        if not content:
-            return content
-        
-        # Find all variables
-        variables = self.variable_pattern.findall(content)
-        
-        for var in variables:
-            value = await self._get_variable_value(var, ctx, args)
-            if value is not None:
-                content = content.replace(f"{{{var}}}", str(value))
-        
-        return content
-    
-    async def _get_variable_value(
-        self,
-        variable: str,
-        ctx: discord.ApplicationContext,
-        args: Optional[str]
-    ) -> Optional[str]:
-        """Get the value of a specific variable"""
-        var_lower = variable.lower()
-        
-        # User variables
-        if var_lower == "user":
-            return ctx.author.mention
-        elif var_lower == "user.name":
-            return ctx.author.name
-        elif var_lower == "user.id":
-            return str(ctx.author.id)
-        elif var_lower == "user.discriminator":
-            return ctx.author.discriminator
-        elif var_lower == "user.avatar":
-            return ctx.author.display_avatar.url
-        elif var_lower == "user.created":
-            return discord.utils.format_dt(ctx.author.created_at, style='R')
-        elif var_lower == "user.joined":
-            if isinstance(ctx.author, discord.Member):
-                return discord.utils.format_dt(ctx.author.joined_at, style='R')
-        
-        # Server variables
-        elif var_lower == "server":
-            return ctx.guild.name
-        elif var_lower == "server.id":
-            return str(ctx.guild.id)
-        elif var_lower == "server.members":
-            return str(ctx.guild.member_count)
-        elif var_lower == "server.icon":
-            return ctx.guild.icon.url if ctx.guild.icon else ""
-        elif var_lower == "server.owner":
-            return ctx.guild.owner.mention if ctx.guild.owner else "Unknown"
-        elif var_lower == "server.created":
-            return discord.utils.format_dt(ctx.guild.created_at, style='R')
-        elif var_lower == "server.boosts":
-            return str(ctx.guild.premium_subscription_count)
-        elif var_lower == "server.boost_level":
-            return str(ctx.guild.premium_tier)
-        
-        # Channel variables
-        elif var_lower == "channel":
-            return ctx.channel.mention
-        elif var_lower == "channel.name":
-            return ctx.channel.name
-        elif var_lower == "channel.id":
-            return str(ctx.channel.id)
-        elif var_lower == "channel.topic":
-            if hasattr(ctx.channel, 'topic'):
-                return ctx.channel.topic or "No topic"
-        
-        # Date/Time variables
-        elif var_lower == "date":
-            return datetime.utcnow().strftime("%Y-%m-%d")
-        elif var_lower == "time":
-            return datetime.utcnow().strftime("%H:%M:%S UTC")
-        elif var_lower == "timestamp":
-            return discord.utils.format_dt(datetime.utcnow(), style='f')
-        elif var_lower == "unix":
-            return str(int(datetime.utcnow().timestamp()))
-        
-        # Arguments
-        elif var_lower == "args":
-            return args or ""
-        elif var_lower.startswith("args["):
-            # {args[0]}, {args[1]}, etc.
-            match = re.match(r'args\[(\d+)\]', var_lower)
-            if match and args:
-                index = int(match.group(1))
-                arg_list = args.split()
-                if 0 <= index < len(arg_list):
-                    return arg_list[index]
-        
-        # Random variables
-        elif var_lower.startswith("random"):
-            # {random:1-100}
-            match = re.match(r'random:(\d+)-(\d+)', var_lower)
-            if match:
-                min_val = int(match.group(1))
-                max_val = int(match.group(2))
-                return str(random.randint(min_val, max_val))
-        
-        # Math variables
-        elif var_lower.startswith("math:"):
-            # {math:2+2}
-            expression = variable[5:]
-            try:
-                # Safe evaluation (only basic math)
-                result = eval(expression, {"__builtins__": {}}, {})
-                return str(result)
-            except:
-                return f"[Invalid Math: {expression}]"
-        
-        # Choice variables
-        elif var_lower.startswith("choose:"):
-            # {choose:option1|option2|option3}
-            choices = variable[7:].split('|')
-            return random.choice(choices)
-        
-        return f"[Unknown Variable: {variable}]"
+        """Parse and replace all variables in content (templates are compiled once and cached)"""
+        return self.variables.render(content, _Scope(ctx, args))
     
     def get_available_variables(self) -> Dict[str, str]:
         """Get list of all available variables with descriptions"""
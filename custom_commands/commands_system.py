@@ -4,13 +4,15 @@ Core system for executing custom commands and auto-responses
 """
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 import re
 
 from database.custom_commands_schema import CustomCommandsSchema
 from custom_commands.command_parser import CommandParser
+from custom_commands.registry import CommandRegistry, UsageBuffer
+from scheduling import cooldowns
 
 
 class CommandsSystem(commands.Cog):
@@ -21,12 +23,31 @@ class CommandsSystem(commands.Cog):
         self.schema = CustomCommandsSchema(db)
         self.parser = CommandParser()
         
-        # In-memory cooldown tracking
-        self.cooldowns: Dict[str, datetime] = {}
+        # Commands are served from memory; usage is written in batches
+        self.registry = CommandRegistry(self.schema.get_guild_commands)
+        self.usage = UsageBuffer(self.schema)
+        CustomCommandsSchema.add_change_listener(self.registry.invalidate)
+        coordinator = getattr(bot, "shard_coordinator", None)
+        if coordinator:
+            self.registry.on_invalidate = (
+                lambda guild_id: coordinator.publish_nowait("custom_commands", guild_id=guild_id)
+            )
     
     async def cog_load(self):
         """Setup indexes when cog loads"""
         await self.schema.setup_indexes()
+        self.usage_flush_task.start()
+    
+    def cog_unload(self):
+        CustomCommandsSchema.remove_change_listener(self.registry.invalidate)
+        self.usage_flush_task.cancel()
+        # Write out whatever usage is still buffered
+        self.bot.loop.create_task(self.usage.flush())
+    
+    @tasks.loop(seconds=30)
+    async def usage_flush_task(self):
+        """Flush buffered command usage (counters + logs)"""
+        await self.usage.flush()
     
     # ==================== Command Execution ====================
     
@@ -38,8 +59,8 @@ class CommandsSystem(commands.Cog):
     ) -> bool:
         """Execute a custom command"""
         try:
-            # Get command from database
-            command = await self.schema.get_command(ctx.guild.id, command_name)
+            # Get command from the in-memory registry
+            command = await self.registry.get_command(ctx.guild.id, command_name)
             
             if not command:
                 return False
@@ -74,18 +95,18 @@ class CommandsSystem(commands.Cog):
                 )
                 return True
             
-            # Check cooldown
-            cooldown_key = f"{ctx.guild.id}_{command['name']}_{ctx.author.id}"
-            is_ready, remaining = self.parser.check_cooldown(
-                self.cooldowns.get(cooldown_key),
+            # Check and start cooldown
+            remaining = await cooldowns.acquire(
+                "custom_commands",
+                f"{ctx.guild.id}:{command['name']}:{ctx.author.id}",
                 command.get("cooldown", 0)
             )
             
-            if not is_ready:
+            if remaining:
                 await ctx.respond(
                     embed=discord.Embed(
                         title="⏰ Command on Cooldown",
-                        description=f"Please wait {remaining} seconds before using this command again.",
+                        description=f"Please wait {int(remaining)} seconds before using this command again.",
                         color=discord.Color.orange()
                     ),
                     ephemeral=True
@@ -144,12 +165,8 @@ class CommandsSystem(commands.Cog):
                 else:
                     await ctx.respond(content)
             
-            # Update cooldown
-            self.cooldowns[cooldown_key] = datetime.utcnow()
-            
-            # Increment usage
-            await self.schema.increment_usage(ctx.guild.id, command["name"])
-            await self.schema.log_command_usage(
+            # Increment usage (buffered, see usage_flush_task)
+            self.usage.record(
                 ctx.guild.id,
                 command["name"],
                 ctx.author.id,
@@ -161,7 +178,7 @@ class CommandsSystem(commands.Cog):
             
         except Exception as e:
             print(f"Error executing command: {e}")
-            await self.schema.log_command_usage(
+            self.usage.record(
                 ctx.guild.id,
                 command_name,
                 ctx.author.id,
@@ -192,14 +209,12 @@ class CommandsSystem(commands.Cog):
         # Check each auto-response
         for ar in auto_responses:
             if await self._matches_trigger(message.content, ar):
-                # Check cooldown
-                cooldown_key = f"{message.guild.id}_{ar['trigger']}_{message.author.id}"
-                is_ready, _ = self.parser.check_cooldown(
-                    self.cooldowns.get(cooldown_key),
+                # Check and start cooldown
+                if await cooldowns.acquire(
+                    "auto_responses",
+                    f"{message.guild.id}:{ar['trigger']}:{message.author.id}",
                     ar.get("cooldown", 0)
-                )
-                
-                if not is_ready:
+                ):
                     continue
                 
                 # Delete trigger message if configured
@@ -228,9 +243,6 @@ class CommandsSystem(commands.Cog):
                 # Send response
                 await message.channel.send(response)
                 
-                # Update cooldown
-                self.cooldowns[cooldown_key] = datetime.utcnow()
-                
                 # Increment usage
                 await self.schema.increment_auto_response_usage(
                     message.guild.id,
@@ -407,25 +419,12 @@ class CommandsSystem(commands.Cog):
     
     async def get_guild_stats(self, guild_id: int, days: int = 7) -> Dict[str, Any]:
         """Get command statistics for a guild"""
+        await self.usage.flush()
         stats = await self.schema.get_command_stats(guild_id, days)
         command_count = await self.schema.get_command_count(guild_id)
         
         stats["total_commands"] = command_count
         return stats
-    
-    # ==================== Cooldown Cleanup ====================
-    
-    async def cleanup_cooldowns(self):
-        """Remove expired cooldowns from memory"""
-        now = datetime.utcnow()
-        expired = []
-        
-        for key, timestamp in self.cooldowns.items():
-            if (now - timestamp).total_seconds() > 3600:  # 1 hour
-                expired.append(key)
-        
-        for key in expired:
-            del self.cooldowns[key]
 
 
 def setup(bot):
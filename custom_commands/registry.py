@@ -0,0 +1,153 @@
+"""
+Kingdom-77 Bot - Custom Command Registry
+In-memory per-guild command tables and buffered usage tracking, so running
+a custom command needs no database round-trip.
+
+- ``CommandRegistry`` loads all commands of a guild once (name and alias
+  lookups become dictionary hits). Entries are dropped whenever a command
+  is written through ``CustomCommandsSchema`` in this process, on remote
+  invalidation events, and after ``refresh_seconds`` so changes made by
+  other processes (e.g. the dashboard) are picked up.
+- ``UsageBuffer`` aggregates ``use_count``/``last_used`` per command and
+  collects usage log documents; ``flush`` writes them with one bulk write
+  and one ``insert_many``.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+from database.counter_buffer import CounterBuffer
+from database.single_flight import SingleFlightCache
+
+logger = logging.getLogger(__name__)
+
+
+class CommandRegistry(SingleFlightCache):
+    """Per-guild custom command tables with write-through invalidation"""
+
+    def __init__(
+        self,
+        loader: Callable[[int], Awaitable[List[Dict[str, Any]]]],
+        refresh_seconds: int = 300
+    ):
+        """
+        Args:
+            loader: Coroutine returning every command of a guild
+            refresh_seconds: Max age of a guild table before it is re-read
+        """
+        super().__init__(refresh_seconds)
+        self.loader = loader
+
+    @staticmethod
+    def _build(commands: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        lookup = {}
+        # Names win over aliases (same order as CustomCommandsSchema.get_command)
+        for command in commands:
+            for alias in command.get("aliases") or []:
+                lookup.setdefault(alias.lower(), command)
+        for command in commands:
+            lookup[command["name"]] = command
+        return lookup
+
+    async def get_command(self, guild_id: int, name: str) -> Optional[Dict[str, Any]]:
+        """Get a command by name or alias"""
+        commands = await self.get_guild(guild_id)
+        return commands.get(name.lower())
+
+    async def get_guild(self, guild_id: int) -> Dict[str, Dict[str, Any]]:
+        """Name/alias -> command table of a guild, loaded on a miss"""
+        async def load():
+            return self._build(await self.loader(guild_id))
+
+        return await self.get_or_load(str(guild_id), load)
+
+    def invalidate(self, guild_id: Optional[int] = None, propagate: bool = True):
+        """Drop one guild's table, or everything when guild_id is None"""
+        super().invalidate(None if guild_id is None else str(guild_id), propagate)
+
+
+class UsageBuffer:
+    """Aggregated command usage counters and log documents, flushed in batches"""
+
+    def __init__(self, schema, max_pending: int = 500):
+        """
+        Args:
+            schema: CustomCommandsSchema used for flushing
+            max_pending: Buffered log documents that trigger an early flush
+        """
+        self.schema = schema
+        self.max_pending = max_pending
+        self.counters = CounterBuffer(
+            self._write_counts, maxima=("last_used",), label="custom command usage counts"
+        )
+        self._logs: List[Dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._logs)
+
+    def record(
+        self,
+        guild_id: int,
+        command_name: str,
+        user_id: int,
+        channel_id: int,
+        success: bool = True,
+        error_message: Optional[str] = None
+    ):
+        """Record one command use (no I/O)"""
+        now = datetime.utcnow()
+        if success:
+            self.counters.add((guild_id, command_name.lower()), {"uses": 1, "last_used": now})
+
+        self._logs.append({
+            "guild_id": guild_id,
+            "command_name": command_name,
+            "user_id": user_id,
+            "channel_id": channel_id,
+            "success": success,
+            "error_message": error_message,
+            "timestamp": now
+        })
+
+        if len(self._logs) >= self.max_pending:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Start a background flush unless one is already running"""
+        if self._flush_task and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+        except RuntimeError:
+            # No running loop; the periodic flush will pick it up
+            pass
+
+    async def _write_counts(self, counts) -> int:
+        return await self.schema.increment_usage_many({
+            key: (fields["uses"], fields["last_used"]) for key, fields in counts.items()
+        })
+
+    async def flush(self) -> int:
+        """Write buffered counters and logs. Returns log documents written."""
+        # Counters and logs are retried independently so nothing is counted twice
+        await self.counters.flush()
+
+        async with self._flush_lock:
+            logs, self._logs = self._logs, []
+            if not logs:
+                return 0
+
+            try:
+                await self.schema.log_command_usage_many(logs)
+            except Exception as e:
+                logger.error(f"Error flushing custom command usage logs: {e}")
+                self._logs = logs + self._logs
+                return 0
+
+            logger.debug(f"Flushed {len(logs)} custom command usage logs")
+            return len(logs)
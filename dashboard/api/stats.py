@@ -10,9 +10,12 @@ from ..models.guild import GuildStats
 from ..models.response import APIResponse
 from ..utils.auth import get_current_user
 from ..utils.database import get_database, get_redis
+from database.metrics_schema import MetricsSchema
+from database.instrumentation import query_stats
 
 router = APIRouter()
 
+
 @router.get("/{guild_id}/overview")
 async def get_server_overview(guild_id: str, current_user: User = Depends(get_current_user)):
     """Get server overview statistics"""
@@ -38,23 +41,16 @@ async def get_server_overview(guild_id: str, current_user: User = Depends(get_cu
             'leveling_users': 0
         }
         
-        # Count members with XP (leveling users)
-        stats['leveling_users'] = await db.user_levels.count_documents({
-            'guild_id': guild_id
-        })
+        metrics = MetricsSchema(db)
+        totals = await metrics.load_totals(guild_id)
+        counters = await metrics.get_counters(guild_id, days=30)
         
-        # Count active tickets
-        stats['active_tickets'] = await db.tickets.count_documents({
-            'guild_id': guild_id,
-            'status': 'open'
-        })
+        stats['leveling_users'] = totals.get('leveling_users', 0)
+        stats['active_tickets'] = totals.get('tickets_open', 0)
+        stats['total_messages'] = counters.get('messages', 0)
         
-        # Count moderation actions (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        stats['moderation_actions'] = await db.moderation_logs.count_documents({
-            'guild_id': guild_id,
-            'timestamp': {'$gte': thirty_days_ago}
-        })
+        # Moderation actions (last 30 days)
+        stats['moderation_actions'] = sum(counters.get('moderation_actions', {}).values())
         
         # Cache for 5 minutes
         import json
@@ -88,7 +84,8 @@ async def get_leveling_stats(guild_id: str, current_user: User = Depends(get_cur
             })
         
         # Get total stats
-        total_users = await db.user_levels.count_documents({'guild_id': guild_id})
+        totals = await MetricsSchema(db).load_totals(guild_id)
+        total_users = totals.get('leveling_users', 0)
         
         return {
             'total_users': total_users,
@@ -105,35 +102,31 @@ async def get_moderation_stats(guild_id: str, current_user: User = Depends(get_c
         db = await get_database()
         
         # Get stats by action type
-        pipeline = [
-            {'$match': {'guild_id': guild_id}},
-            {'$group': {
-                '_id': '$action',
-                'count': {'$sum': 1}
-            }}
-        ]
-        
-        action_counts = await db.moderation_logs.aggregate(pipeline).to_list(None)
+        totals = await MetricsSchema(db).load_totals(guild_id)
+        by_action = totals.get('moderation_actions', {})
         
         stats = {
-            'total': sum(item['count'] for item in action_counts),
-            'by_action': {item['_id']: item['count'] for item in action_counts}
+            'total': sum(by_action.values()),
+            'by_action': by_action
         }
         
-        # Get recent actions
-        recent = await db.moderation_logs.find(
-            {'guild_id': guild_id}
+        # Get recent actions (same collection the totals are seeded from)
+        recent = await db.mod_actions.find(
+            {'guild_id': str(guild_id)}
         ).sort('timestamp', -1).limit(10).to_list(10)
         
         stats['recent'] = [
             {
-                'action': log['action'],
-                'user_id': log['user_id'],
-                'moderator_id': log['moderator_id'],
-                'reason': log.get('reason'),
-                'timestamp': log['timestamp'].isoformat()
+                'action': action['action_type'],
+                'user_id': action['user_id'],
+                'moderator_id': action['moderator_id'],
+                'reason': action.get('reason'),
+                'timestamp': (
+                    action['timestamp'].isoformat()
+                    if isinstance(action['timestamp'], datetime) else action['timestamp']
+                )
             }
-            for log in recent
+            for action in recent
         ]
         
         return stats
@@ -148,19 +141,15 @@ async def get_ticket_stats(guild_id: str, current_user: User = Depends(get_curre
         db = await get_database()
         
         # Get stats by status
-        pipeline = [
-            {'$match': {'guild_id': guild_id}},
-            {'$group': {
-                '_id': '$status',
-                'count': {'$sum': 1}
-            }}
-        ]
-        
-        status_counts = await db.tickets.aggregate(pipeline).to_list(None)
+        totals = await MetricsSchema(db).load_totals(guild_id)
+        by_status = {
+            'open': totals.get('tickets_open', 0),
+            'closed': totals.get('tickets_closed', 0)
+        }
         
         stats = {
-            'total': sum(item['count'] for item in status_counts),
-            'by_status': {item['_id']: item['count'] for item in status_counts}
+            'total': sum(by_status.values()),
+            'by_status': by_status
         }
         
         # Get recent tickets
@@ -183,3 +172,76 @@ async def get_ticket_stats(guild_id: str, current_user: User = Depends(get_curre
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{guild_id}/activity")
+async def get_activity_stats(
+    guild_id: str,
+    days: int = 7,
+    granularity: str = "day",
+    current_user: User = Depends(get_current_user)
+):
+    """Get activity time series from the metrics rollup store"""
+    try:
+        if granularity not in ("hour", "day"):
+            raise HTTPException(status_code=400, detail="granularity must be 'hour' or 'day'")
+        
+        db = await get_database()
+        metrics = MetricsSchema(db)
+        since = datetime.utcnow() - timedelta(days=days)
+        buckets = await metrics.get_buckets(guild_id, since, granularity)
+        
+        return {
+            'granularity': granularity,
+            'buckets': [
+                {
+                    'bucket': bucket['bucket'].isoformat(),
+                    'counters': bucket.get('counters', {})
+                }
+                for bucket in buckets
+            ]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/system/queries")
+async def get_query_stats(
+    limit: int = 20,
+    current_user: User = Depends(get_current_user)
+):
+    """Get MongoDB query statistics of the dashboard and the bot"""
+    try:
+        db = await get_database()
+        bot_snapshot = await db.query_stats.find_one({'_id': 'bot'})
+        if bot_snapshot:
+            bot_snapshot.pop('_id', None)
+            bot_snapshot['operations'] = bot_snapshot.get('operations', [])[:limit]
+        
+        dashboard_snapshot = query_stats.snapshot()
+        dashboard_snapshot['operations'] = dashboard_snapshot['operations'][:limit]
+        
+        return {
+            'bot': bot_snapshot,
+            'dashboard': dashboard_snapshot
+        }
+        
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/system/joins")
+async def get_join_stats(
+    current_user: User = Depends(get_current_user)
+):
+    """Get member-join pipeline metrics of the bot (latency, surges, queue)"""
+    try:
+        db = await get_database()
+        snapshot = await db.query_stats.find_one({'_id': 'bot:joins'})
+        if snapshot:
+            snapshot.pop('_id', None)
+        return {'bot': snapshot}
+        
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -3,11 +3,18 @@ Tickets API Endpoints
 """
 
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from typing import List
 from ..models.user import User
 from ..models.response import APIResponse
 from ..utils.auth import get_current_user
 from ..utils.database import get_database
+from tickets.transcripts import (
+    CHUNKS_COLLECTION,
+    TRANSCRIPT_MEDIA_TYPES,
+    iter_transcript_messages,
+    render_transcript
+)
 
 router = APIRouter()
 
@@ -82,3 +89,41 @@ async def get_ticket(
         
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{guild_id}/tickets/{ticket_number}/transcript")
+async def export_ticket_transcript(
+    guild_id: str,
+    ticket_number: int,
+    format: str = "html",
+    current_user: User = Depends(get_current_user)
+):
+    """Download a saved ticket transcript (html, txt or json), streamed chunk by chunk"""
+    if format not in TRANSCRIPT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    try:
+        guild = int(guild_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid guild id")
+    
+    db = await get_database()
+    
+    # Transcripts are written by the bot with integer guild ids; latest one wins
+    transcript = await db.ticket_transcripts.find_one(
+        {'guild_id': guild, 'ticket_number': ticket_number},
+        sort=[('closed_at', -1)]
+    )
+    if not transcript:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    
+    body = render_transcript(
+        transcript,
+        iter_transcript_messages(db[CHUNKS_COLLECTION], transcript),
+        format
+    )
+    return StreamingResponse(
+        body,
+        media_type=TRANSCRIPT_MEDIA_TYPES[format],
+        headers={
+            'Content-Disposition': f'attachment; filename="ticket-{ticket_number}-transcript.{format}"'
+        }
+    )
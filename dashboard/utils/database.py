@@ -6,6 +6,7 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from redis.asyncio import Redis
 from typing import Optional
 from ..config import MONGODB_URI, MONGODB_DB, REDIS_URL
+from database.instrumentation import InstrumentedDatabase, instrumentation_enabled
 
 # Global connections
 _mongodb_client: Optional[AsyncIOMotorClient] = None
@@ -18,7 +19,8 @@ async def get_database():
     if _mongodb_client is None:
         _mongodb_client = AsyncIOMotorClient(MONGODB_URI)
     
-    return _mongodb_client[MONGODB_DB]
+    db = _mongodb_client[MONGODB_DB]
+    return InstrumentedDatabase(db) if instrumentation_enabled() else db
 
 async def get_redis():
     """Get Redis connection"""
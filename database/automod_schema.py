@@ -12,6 +12,8 @@ Collections:
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from database.metrics_schema import MetricsSchema, metric_key
+from database.indexes import ensure_indexes
 import logging
 
 logger = logging.getLogger('automod_schema')
@@ -26,28 +28,17 @@ class AutoModSchema:
         self.logs = db.automod_logs
         self.trust_scores = db.user_trust_scores
         self.settings = db.guild_automod_settings
+        self.metrics = MetricsSchema(db)
     
     async def ensure_indexes(self):
-        """Create necessary indexes for performance"""
+        """Create necessary indexes for performance (declared in database/indexes.py)"""
         try:
-            # AutoMod Rules indexes
-            await self.rules.create_index([("guild_id", 1), ("enabled", 1)])
-            await self.rules.create_index([("guild_id", 1), ("rule_type", 1)])
-            
-            # AutoMod Logs indexes
-            await self.logs.create_index([("guild_id", 1), ("timestamp", -1)])
-            await self.logs.create_index([("guild_id", 1), ("user_id", 1)])
-            await self.logs.create_index([("guild_id", 1), ("action", 1)])
-            await self.logs.create_index([("timestamp", -1)])
-            
-            # Trust Scores indexes
-            await self.trust_scores.create_index([("guild_id", 1), ("user_id", 1)], unique=True)
-            await self.trust_scores.create_index([("guild_id", 1), ("score", -1)])
-            await self.trust_scores.create_index([("last_updated", 1)])
-            
-            # Settings indexes
-            await self.settings.create_index("guild_id", unique=True)
-            
+            await ensure_indexes(self.db, collections=[
+                self.rules.name,
+                self.logs.name,
+                self.trust_scores.name,
+                self.settings.name
+            ])
             logger.info("AutoMod indexes created successfully")
         except Exception as e:
             logger.error(f"Error creating AutoMod indexes: {e}")
@@ -195,6 +186,15 @@ class AutoModSchema:
         
         result = await self.logs.insert_one(log)
         log["_id"] = result.inserted_id
+        
+        await self.metrics.increment(
+            log["guild_id"],
+            {
+                metric_key("automod_actions", log["action"]): 1,
+                metric_key("automod_rules", log["rule_type"]): 1
+            },
+            timestamp=log["timestamp"]
+        )
         return log
     
     async def get_user_logs(
@@ -261,27 +261,10 @@ class AutoModSchema:
         """Get AutoMod statistics"""
         since = datetime.utcnow() - timedelta(days=days)
         
-        # Total actions
-        total = await self.logs.count_documents({
-            "guild_id": guild_id,
-            "timestamp": {"$gte": since}
-        })
-        
-        # Actions by type
-        pipeline = [
-            {"$match": {"guild_id": guild_id, "timestamp": {"$gte": since}}},
-            {"$group": {"_id": "$action", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        actions_by_type = await self.logs.aggregate(pipeline).to_list(length=None)
-        
-        # Rules triggered
-        pipeline = [
-            {"$match": {"guild_id": guild_id, "timestamp": {"$gte": since}}},
-            {"$group": {"_id": "$rule_type", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        rules_triggered = await self.logs.aggregate(pipeline).to_list(length=None)
+        # Totals come from the pre-aggregated daily buckets
+        counters = await self.metrics.get_counters(guild_id, days=days)
+        actions_by_type = counters.get("automod_actions", {})
+        rules_triggered = counters.get("automod_rules", {})
         
         # Top violators
         pipeline = [
@@ -293,9 +276,9 @@ class AutoModSchema:
         top_violators = await self.logs.aggregate(pipeline).to_list(length=None)
         
         return {
-            "total_actions": total,
-            "actions_by_type": {item["_id"]: item["count"] for item in actions_by_type},
-            "rules_triggered": {item["_id"]: item["count"] for item in rules_triggered},
+            "total_actions": sum(actions_by_type.values()),
+            "actions_by_type": dict(sorted(actions_by_type.items(), key=lambda item: -item[1])),
+            "rules_triggered": dict(sorted(rules_triggered.items(), key=lambda item: -item[1])),
             "top_violators": [{"user_id": item["_id"], "count": item["count"]} for item in top_violators]
         }
     
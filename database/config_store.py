@@ -0,0 +1,219 @@
+"""
+Change-Tracked Config Store for Kingdom-77 Bot v3.0
+===================================================
+Helpers for the in-memory config maps kept by ``main.py`` (``channel_langs``,
+``allowed_roles``, ``role_languages``, ``role_permissions``, ``servers_data``,
+``bot_ratings``).
+
+- ``TrackedDict`` records which top-level keys were assigned or deleted, so a
+  save only has to persist those keys (one ``bulk_write`` instead of one
+  upsert per entry).
+- ``JsonJournal`` keeps the JSON backup as ``<file>`` (snapshot) plus
+  ``<file>.journal`` (one JSON line per changed key). The journal is folded
+  back into the snapshot every ``compact_every`` entries. Entries and
+  snapshots are serialized on the event loop (``prepare``) and only the file
+  I/O runs on the single ``journal_writer`` thread.
+- ``cluster_path`` gives every shard cluster its own snapshot and journal: a
+  cluster only holds its own guilds, so compacting a shared file would drop
+  the entries of the other clusters.
+
+Nested edits (``role_languages[guild_id][role_id] = lang``) are not seen by
+the dict itself; callers pass the changed top-level key to the save function
+or call ``mark_dirty``.
+"""
+
+import os
+import json
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# One writer thread for every journal: entries are serialized on the event
+# loop (which owns the dicts) and written in the order they were made
+journal_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="json-journal")
+
+
+class TrackedDict(dict):
+    """dict that remembers which top-level keys changed since the last save"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dirty: Set[str] = set()
+
+    def mark_dirty(self, *keys):
+        self.dirty.update(keys)
+
+    def take_dirty(self) -> Set[str]:
+        """Return the dirty keys and start tracking from scratch"""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.dirty.add(key)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.dirty.add(key)
+
+    def pop(self, key, *default):
+        if key in self:
+            self.dirty.add(key)
+        return super().pop(key, *default)
+
+    def popitem(self):
+        key, value = super().popitem()
+        self.dirty.add(key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self.dirty.add(key)
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs):
+        changes = dict(*args, **kwargs)
+        super().update(changes)
+        self.dirty.update(changes)
+
+    def clear(self):
+        self.dirty.update(self.keys())
+        super().clear()
+
+
+def collect_changes(data: Dict[str, Any], keys: Optional[Iterable[str]] = None) -> Set[str]:
+    """Keys to persist: explicitly passed keys plus the ones tracked by ``data``"""
+    changed = set(keys) if keys is not None else set()
+    if isinstance(data, TrackedDict):
+        changed |= data.take_dirty()
+    return changed
+
+
+def cluster_path(path: str, cluster_name: str) -> str:
+    """Per-cluster variant of a backup file (``data/servers.json`` -> ``data/servers.shards-0-3.json``)"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.{cluster_name}{ext}"
+
+
+class JsonJournal:
+    """Append-only JSON backup with periodic compaction into the snapshot file"""
+
+    def __init__(self, path: str, compact_every: int = 500):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.compact_every = compact_every
+        self.entries = self._count_entries()
+        self._write_lock = threading.Lock()
+
+    def _count_entries(self) -> int:
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                return sum(1 for _ in f)
+        except FileNotFoundError:
+            return 0
+
+    def replay(self, data: Dict[str, Any]) -> int:
+        """Apply journal entries on top of a loaded snapshot. Returns entries applied."""
+        applied = 0
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from a crash mid-write
+                        logger.warning(f"Skipping corrupt entry in {self.journal_path}")
+                        continue
+                    if entry.get('deleted'):
+                        dict.pop(data, entry['key'], None)
+                    else:
+                        dict.__setitem__(data, entry['key'], entry['value'])
+                    applied += 1
+        except FileNotFoundError:
+            pass
+        return applied
+
+    def prepare(self, data: Dict[str, Any], keys: Iterable[str]) -> Tuple[List[str], Optional[str]]:
+        """
+        Serialize the current value of ``keys`` (on the thread that owns ``data``)
+
+        Returns:
+            (journal lines, snapshot to compact into or None)
+        """
+        lines = []
+        for key in keys:
+            try:
+                if key in data:
+                    lines.append(json.dumps({'key': key, 'value': data[key]}, ensure_ascii=False))
+                else:
+                    lines.append(json.dumps({'key': key, 'deleted': True}))
+            except (TypeError, ValueError) as e:
+                logger.error(f"Error serializing {key} for {self.journal_path}: {e}")
+
+        snapshot = None
+        self.entries += len(lines)
+        if self.entries >= self.compact_every:
+            snapshot = self._serialize_snapshot(data)
+            if snapshot is not None:
+                self.entries = 0
+        return lines, snapshot
+
+    def _serialize_snapshot(self, data: Dict[str, Any]) -> Optional[str]:
+        try:
+            return json.dumps(dict(data), ensure_ascii=False, indent=2)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Error serializing snapshot {self.path}: {e}")
+            return None
+
+    def write(self, lines: List[str], snapshot: Optional[str] = None):
+        """
+        Append serialized lines, then replace the snapshot (file I/O only)
+
+        Writes are serialized per journal, so a compaction never truncates a
+        line appended after its snapshot was taken.
+        """
+        with self._write_lock:
+            if lines:
+                try:
+                    with open(self.journal_path, 'a', encoding='utf-8') as f:
+                        f.write('\n'.join(lines) + '\n')
+                except Exception as e:
+                    logger.error(f"Error appending to {self.journal_path}: {e}")
+            if snapshot is not None:
+                self._write_snapshot(snapshot)
+
+    def _write_snapshot(self, snapshot: str):
+        tmp = self.path + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(tmp, self.path)
+            # Only drop the journal once the snapshot containing it is in place
+            with open(self.journal_path, 'w', encoding='utf-8'):
+                pass
+            logger.info(f"Compacted {self.path}")
+        except Exception as e:
+            logger.error(f"Error compacting {self.path}: {e}")
+
+    def append(self, data: Dict[str, Any], keys: Iterable[str]):
+        """Journal the current value of ``keys`` (compacting when the journal is long)"""
+        self.write(*self.prepare(data, keys))
+
+    async def append_async(self, data: Dict[str, Any], keys: Iterable[str]):
+        """``append`` with the file I/O on the journal writer thread"""
+        lines, snapshot = self.prepare(data, keys)
+        if not lines and snapshot is None:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(journal_writer, self.write, lines, snapshot)
+
+    def compact(self, data: Dict[str, Any]):
+        """Write a fresh snapshot and truncate the journal"""
+        snapshot = self._serialize_snapshot(data)
+        if snapshot is not None:
+            self.entries = 0
+            self.write([], snapshot)
@@ -0,0 +1,94 @@
+"""
+Buffered Counters
+In-memory ``$inc`` counters written in batches, shared by the metrics
+buckets, auto-role statistics, join counters, premium usage rollups and
+custom command usage.
+
+``add`` merges increments per key (no I/O); ``flush`` hands everything
+buffered to the owner's ``write`` coroutine (typically one ``bulk_write`` of
+``$inc`` upserts). A failed write puts its counters back, merged with what
+was recorded meanwhile, so the next flush retries them without counting
+anything twice. Flushes happen ``delay`` seconds after the first buffered
+change when a delay is set; owners also flush periodically and on shutdown.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+Counters = Dict[Hashable, Dict[str, Any]]
+
+
+class CounterBuffer:
+    """key -> {field: amount} increments, flushed with one write"""
+
+    def __init__(
+        self,
+        write: Callable[[Counters], Awaitable[int]],
+        delay: Optional[float] = None,
+        maxima: Iterable[str] = (),
+        label: str = "counters"
+    ):
+        """
+        Args:
+            write: Coroutine writing ``{key: {field: amount}}``; returns rows written
+            delay: Seconds between the first buffered change and the flush (None = no timer)
+            maxima: Fields that keep their largest value instead of adding up (e.g. last_used)
+            label: Name used in error logs
+        """
+        self.write = write
+        self.delay = delay
+        self.maxima = frozenset(maxima)
+        self.label = label
+        self._counts: Counters = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of keys waiting for the next flush"""
+        return len(self._counts)
+
+    def add(self, key: Hashable, fields: Dict[str, Any]):
+        """Buffer increments of ``key`` (zero amounts are skipped)"""
+        self._merge(key, fields)
+        if self.delay is not None and (self._flush_task is None or self._flush_task.done()):
+            try:
+                self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+            except RuntimeError:
+                # No running loop; the periodic flush will pick it up
+                pass
+
+    def _merge(self, key: Hashable, fields: Dict[str, Any]):
+        pending = None
+        for field, value in fields.items():
+            if not value:
+                continue
+            if pending is None:
+                pending = self._counts.setdefault(key, {})
+            if field not in pending:
+                pending[field] = value
+            elif field in self.maxima:
+                pending[field] = max(pending[field], value)
+            else:
+                pending[field] += value
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.delay)
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write the buffered counters. Returns what ``write`` reports (0 on failure)."""
+        async with self._flush_lock:
+            counts, self._counts = self._counts, {}
+            if not counts:
+                return 0
+            try:
+                return await self.write(counts)
+            except Exception as e:
+                logger.error(f"Error flushing {self.label}: {e}")
+                for key, fields in counts.items():
+                    self._merge(key, fields)
+                return 0
@@ -5,14 +5,34 @@ Premium limits: 10 free commands, unlimited for premium users
 """
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Callable
 import discord
 
 
 class CustomCommandsSchema:
     """Database schema for Custom Commands System"""
     
+    # Called with the guild ID after any command write (shared by all instances,
+    # so caches such as CommandRegistry stay in sync with every writer)
+    _change_listeners: List[Callable[[int], None]] = []
+    
+    @classmethod
+    def add_change_listener(cls, listener: Callable[[int], None]):
+        """Register a callback run after commands of a guild change"""
+        if listener not in cls._change_listeners:
+            cls._change_listeners.append(listener)
+    
+    @classmethod
+    def remove_change_listener(cls, listener: Callable[[int], None]):
+        if listener in cls._change_listeners:
+            cls._change_listeners.remove(listener)
+    
+    def _commands_changed(self, guild_id: int):
+        for listener in self._change_listeners:
+            listener(guild_id)
+    
     def __init__(self, db):
         self.db = db
         self.commands = db["custom_commands"]
@@ -106,6 +126,7 @@ class CustomCommandsSchema:
             "updated_at": datetime.utcnow()
         }
         result = await self.commands.insert_one(command)
+        self._commands_changed(guild_id)
         return str(result.inserted_id)
     
     async def get_command(self, guild_id: int, name: str) -> Optional[Dict[str, Any]]:
@@ -141,6 +162,11 @@ class CustomCommandsSchema:
         cursor = self.commands.find(query).sort("name", 1).limit(limit)
         return await cursor.to_list(length=limit)
     
+    async def get_guild_commands(self, guild_id: int) -> List[Dict[str, Any]]:
+        """Get every command of a guild (CommandRegistry loader)"""
+        cursor = self.commands.find({"guild_id": guild_id})
+        return await cursor.to_list(length=None)
+    
     async def update_command(
         self,
         guild_id: int,
@@ -153,6 +179,7 @@ class CustomCommandsSchema:
             {"guild_id": guild_id, "name": name.lower()},
             {"$set": updates}
         )
+        self._commands_changed(guild_id)
         return result.modified_count > 0
     
     async def delete_command(self, guild_id: int, name: str) -> bool:
@@ -161,6 +188,7 @@ class CustomCommandsSchema:
             "guild_id": guild_id,
             "name": name.lower()
         })
+        self._commands_changed(guild_id)
         return result.deleted_count > 0
     
     async def increment_usage(self, guild_id: int, name: str) -> bool:
@@ -174,6 +202,25 @@ class CustomCommandsSchema:
         )
         return result.modified_count > 0
     
+    async def increment_usage_many(self, counts: Dict[Tuple[int, str], Tuple[int, datetime]]) -> int:
+        """
+        Apply buffered usage counters in one bulk write
+        
+        Args:
+            counts: {(guild_id, name): (uses, last_used)}
+        """
+        if not counts:
+            return 0
+        operations = [
+            UpdateOne(
+                {"guild_id": guild_id, "name": name},
+                {"$inc": {"use_count": uses}, "$max": {"last_used": last_used}}
+            )
+            for (guild_id, name), (uses, last_used) in counts.items()
+        ]
+        result = await self.commands.bulk_write(operations, ordered=False)
+        return result.modified_count
+    
     async def get_command_count(self, guild_id: int, creator_id: Optional[int] = None) -> int:
         """Get total command count for a guild or user"""
         query = {"guild_id": guild_id}
@@ -187,6 +234,7 @@ class CustomCommandsSchema:
             {"guild_id": guild_id, "name": name.lower()},
             {"$set": {"enabled": enabled, "updated_at": datetime.utcnow()}}
         )
+        self._commands_changed(guild_id)
         return result.modified_count > 0
     
     # ==================== Auto-Responses ====================
@@ -306,6 +354,13 @@ class CustomCommandsSchema:
         result = await self.command_usage.insert_one(usage)
         return str(result.inserted_id)
     
+    async def log_command_usage_many(self, usages: List[Dict[str, Any]]) -> int:
+        """Insert buffered usage logs (documents shaped like ``log_command_usage``)"""
+        if not usages:
+            return 0
+        result = await self.command_usage.insert_many(usages, ordered=False)
+        return len(result.inserted_ids)
+    
     async def get_command_stats(
         self,
         guild_id: int,
@@ -478,6 +533,7 @@ class CustomCommandsSchema:
             query["creator_id"] = creator_id
         
         result = await self.commands.delete_many(query)
+        self._commands_changed(guild_id)
         return result.deleted_count
     
     async def bulk_toggle_commands(
@@ -495,6 +551,7 @@ class CustomCommandsSchema:
             query,
             {"$set": {"enabled": enabled, "updated_at": datetime.utcnow()}}
         )
+        self._commands_changed(guild_id)
         return result.modified_count
     
     async def export_commands(self, guild_id: int) -> List[Dict[str, Any]]:
@@ -530,4 +587,5 @@ class CustomCommandsSchema:
                     await self.commands.insert_one(cmd_data)
                     imported += 1
         
+        self._commands_changed(guild_id)
         return imported
@@ -17,6 +17,8 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
 import logging
 
+from database.indexes import ensure_indexes
+
 logger = logging.getLogger(__name__)
 
 
@@ -33,29 +35,9 @@ class EconomyDatabase:
         self.gambling = self.db.gambling_stats
         
     async def create_indexes(self):
-        """Create database indexes for performance"""
+        """Create database indexes for performance (declared in database/indexes.py)"""
         try:
-            # Wallets indexes
-            await self.wallets.create_index([("guild_id", 1), ("user_id", 1)], unique=True)
-            await self.wallets.create_index([("guild_id", 1), ("cash", -1)])  # Leaderboard
-            
-            # Shop indexes
-            await self.shop.create_index([("guild_id", 1), ("item_id", 1)], unique=True)
-            await self.shop.create_index([("guild_id", 1), ("category", 1)])
-            
-            # Inventory indexes
-            await self.inventory.create_index([("guild_id", 1), ("user_id", 1), ("item_id", 1)])
-            
-            # Transactions indexes
-            await self.transactions.create_index([("guild_id", 1), ("user_id", 1), ("timestamp", -1)])
-            await self.transactions.create_index([("timestamp", 1)], expireAfterSeconds=7776000)  # 90 days
-            
-            # Rewards indexes
-            await self.rewards.create_index([("guild_id", 1), ("user_id", 1)], unique=True)
-            
-            # Gambling stats indexes
-            await self.gambling.create_index([("guild_id", 1), ("user_id", 1)], unique=True)
-            
+            await ensure_indexes(self.db, database="economy")
             logger.info("Economy database indexes created successfully")
         except Exception as e:
             logger.error(f"Error creating indexes: {e}")
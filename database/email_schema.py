@@ -4,12 +4,30 @@ Email Notifications Schema for Kingdom-77 Bot
 Handles email queue, tracking, and user preferences
 """
 
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 import logging
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from database.indexes import ensure_indexes
 
 logger = logging.getLogger(__name__)
 
+# Email type (or its prefix, e.g. "subscription_expired") -> preference flag
+PREFERENCE_KEYS = {
+    'subscription': 'subscription_emails',
+    'payment': 'payment_emails',
+    'trial': 'trial_emails',
+    'weekly_summary': 'weekly_summary',
+    'marketing': 'marketing_emails'
+}
+
+
+def preference_key(email_type: str) -> str:
+    """Preference flag that controls an email type"""
+    return PREFERENCE_KEYS.get(email_type) or PREFERENCE_KEYS.get(email_type.split('_')[0], 'enabled')
+
 
 class EmailSchema:
     """Schema for email notifications system"""
@@ -25,6 +43,10 @@ class EmailSchema:
         self.email_queue = db['email_queue']
         self.email_log = db['email_log']
         self.email_preferences = db['email_preferences']
+    
+    async def initialize(self):
+        """Create indexes (declared in database/indexes.py)"""
+        await ensure_indexes(self.db, database="email")
         
     # ==================== Email Queue ====================
     
@@ -36,7 +58,8 @@ class EmailSchema:
         email_type: str,
         priority: int = 5,
         scheduled_for: Optional[datetime] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[Dict[str, str]]] = None
     ) -> str:
         """
         Add email to queue
@@ -49,25 +72,22 @@ class EmailSchema:
             priority: Priority (1=highest, 10=lowest)
             scheduled_for: When to send (None = send now)
             metadata: Additional metadata
+            tags: Resend tags for tracking
             
         Returns:
             Email queue ID
         """
         try:
-            email_doc = {
-                'to_email': to_email,
-                'subject': subject,
-                'html_content': html_content,
-                'email_type': email_type,
-                'priority': priority,
-                'status': 'pending',
-                'scheduled_for': scheduled_for or datetime.utcnow(),
-                'attempts': 0,
-                'max_attempts': 3,
-                'metadata': metadata or {},
-                'created_at': datetime.utcnow(),
-                'updated_at': datetime.utcnow()
-            }
+            email_doc = self._queue_doc(
+                to_email=to_email,
+                subject=subject,
+                html_content=html_content,
+                email_type=email_type,
+                priority=priority,
+                scheduled_for=scheduled_for,
+                metadata=metadata,
+                tags=tags
+            )
             
             result = await self.email_queue.insert_one(email_doc)
             
@@ -79,6 +99,112 @@ class EmailSchema:
             logger.error(f"Error queuing email: {e}")
             return None
     
+    async def queue_emails(self, emails: List[Dict[str, Any]]) -> int:
+        """
+        Add many emails to the queue with one insert
+        
+        Emails carrying a ``dedupe_key`` that is already queued are skipped,
+        so a re-run batch job doesn't queue the same email twice.
+        
+        Args:
+            emails: Keyword arguments of ``queue_email`` (plus optional ``dedupe_key``)
+            
+        Returns:
+            Number of emails queued
+        """
+        if not emails:
+            return 0
+        
+        try:
+            result = await self.email_queue.insert_many(
+                [self._queue_doc(**email) for email in emails],
+                ordered=False
+            )
+            return len(result.inserted_ids)
+            
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            if any(error.get('code') != 11000 for error in errors):
+                logger.error(f"Error queuing emails: {errors[:3]}")
+            return e.details.get('nInserted', 0)
+            
+        except Exception as e:
+            logger.error(f"Error queuing emails: {e}")
+            return 0
+    
+    async def reserve_emails(self, emails: List[Dict[str, Any]], claim: str) -> List[Dict[str, Any]]:
+        """
+        Record emails that are sent directly (without the queue) as ``sending``
+        
+        Emails whose ``dedupe_key`` is already in the queue collection are
+        left out, so a re-run batch job never sends the same email twice.
+        Mark the returned documents with ``mark_email_sent`` / ``mark_email_failed``.
+        
+        Args:
+            emails: Keyword arguments of ``queue_email`` (plus optional ``dedupe_key``)
+            claim: Token of the sender
+            
+        Returns:
+            Queue documents (with ``_id``) of the emails to send now
+        """
+        if not emails:
+            return []
+        
+        now = datetime.utcnow()
+        docs = []
+        for email in emails:
+            doc = self._queue_doc(**email)
+            doc.update({'status': 'sending', 'claim': claim, 'claimed_at': now})
+            docs.append(doc)
+        
+        try:
+            await self.email_queue.insert_many(docs, ordered=False)
+            return docs
+            
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            if any(error.get('code') != 11000 for error in errors):
+                logger.error(f"Error reserving emails: {errors[:3]}")
+            rejected = {error.get('index') for error in errors}
+            return [doc for index, doc in enumerate(docs) if index not in rejected]
+            
+        except Exception as e:
+            logger.error(f"Error reserving emails: {e}")
+            return []
+    
+    @staticmethod
+    def _queue_doc(
+        to_email: str,
+        subject: str,
+        html_content: str,
+        email_type: str,
+        priority: int = 5,
+        scheduled_for: Optional[datetime] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        tags: Optional[List[Dict[str, str]]] = None,
+        dedupe_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        email_doc = {
+            'to_email': to_email,
+            'subject': subject,
+            'html_content': html_content,
+            'email_type': email_type,
+            'priority': priority,
+            'status': 'pending',
+            'scheduled_for': scheduled_for or now,
+            'attempts': 0,
+            'max_attempts': 3,
+            'metadata': metadata or {},
+            'tags': tags or [],
+            'created_at': now,
+            'updated_at': now
+        }
+        # Only set when given: the unique index on it is sparse
+        if dedupe_key:
+            email_doc['dedupe_key'] = dedupe_key
+        return email_doc
+    
     async def get_pending_emails(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
         Get pending emails ready to be sent
@@ -181,6 +307,160 @@ class EmailSchema:
             logger.error(f"Error marking email as failed: {e}")
             return False
     
+    async def claim_pending_emails(self, claim: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Claim due pending emails for one sender
+        
+        Claimed emails move to ``sending`` with the claim token, so concurrent
+        workers (or bot processes) never send the same email twice.
+        
+        Args:
+            claim: Unique token of the claiming worker
+            limit: Maximum number of emails to claim
+            
+        Returns:
+            List of claimed emails
+        """
+        try:
+            now = datetime.utcnow()
+            
+            candidates = await self.email_queue.find(
+                {
+                    'status': 'pending',
+                    'scheduled_for': {'$lte': now}
+                },
+                {'_id': 1}
+            ).sort([
+                ('priority', 1),
+                ('scheduled_for', 1)
+            ]).limit(limit).to_list(length=limit)
+            
+            if not candidates:
+                return []
+            
+            # The status filter makes the claim atomic per email
+            await self.email_queue.update_many(
+                {
+                    '_id': {'$in': [email['_id'] for email in candidates]},
+                    'status': 'pending'
+                },
+                {
+                    '$set': {
+                        'status': 'sending',
+                        'claim': claim,
+                        'claimed_at': now,
+                        'updated_at': now
+                    }
+                }
+            )
+            
+            return await self.email_queue.find({'claim': claim, 'status': 'sending'}).to_list(length=limit)
+            
+        except Exception as e:
+            logger.error(f"Error claiming pending emails: {e}")
+            return []
+    
+    async def release_stale_claims(self, older_than: timedelta) -> int:
+        """
+        Return emails stuck in ``sending`` (e.g. the bot crashed mid-send) to the queue
+        
+        Args:
+            older_than: Claims older than this are considered abandoned
+            
+        Returns:
+            Number of emails released
+        """
+        try:
+            result = await self.email_queue.update_many(
+                {
+                    'status': 'sending',
+                    'claimed_at': {'$lt': datetime.utcnow() - older_than}
+                },
+                {
+                    '$set': {'status': 'pending', 'updated_at': datetime.utcnow()},
+                    '$unset': {'claim': ''}
+                }
+            )
+            
+            if result.modified_count:
+                logger.warning(f"Released {result.modified_count} stale email claims")
+            
+            return result.modified_count
+            
+        except Exception as e:
+            logger.error(f"Error releasing stale email claims: {e}")
+            return 0
+    
+    async def record_results(
+        self,
+        sent: List[Tuple[Dict[str, Any], Optional[str]]],
+        retry: List[Tuple[Dict[str, Any], str, datetime]],
+        failed: List[Tuple[Dict[str, Any], str]]
+    ) -> bool:
+        """
+        Store the outcome of one send batch (one bulk write per collection)
+        
+        Args:
+            sent: (email, resend_id) pairs
+            retry: (email, error, retry_at) for emails to send again later
+            failed: (email, error) for emails that will not be retried
+            
+        Returns:
+            True if successful
+        """
+        try:
+            now = datetime.utcnow()
+            operations = []
+            log_docs = []
+            
+            for email, resend_id in sent:
+                operations.append(UpdateOne(
+                    {'_id': email['_id']},
+                    {
+                        '$set': {'status': 'sent', 'sent_at': now, 'resend_id': resend_id, 'updated_at': now},
+                        '$inc': {'attempts': 1},
+                        '$unset': {'claim': ''}
+                    }
+                ))
+                log_docs.append(self._log_doc(email, 'sent', resend_id=resend_id, sent_at=now))
+            
+            for email, error_message, retry_at in retry:
+                operations.append(UpdateOne(
+                    {'_id': email['_id']},
+                    {
+                        '$set': {
+                            'status': 'pending',
+                            'scheduled_for': retry_at,
+                            'last_error': error_message,
+                            'updated_at': now
+                        },
+                        '$inc': {'attempts': 1},
+                        '$unset': {'claim': ''}
+                    }
+                ))
+            
+            for email, error_message in failed:
+                operations.append(UpdateOne(
+                    {'_id': email['_id']},
+                    {
+                        '$set': {'status': 'failed', 'last_error': error_message, 'updated_at': now},
+                        '$inc': {'attempts': 1},
+                        '$unset': {'claim': ''}
+                    }
+                ))
+                log_docs.append(self._log_doc(email, 'failed', error_message=error_message, sent_at=now))
+            
+            if operations:
+                await self.email_queue.bulk_write(operations, ordered=False)
+            if log_docs:
+                await self.email_log.insert_many(log_docs, ordered=False)
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error recording email results: {e}")
+            return False
+    
     # ==================== Email Log ====================
     
     async def log_email(
@@ -228,6 +508,25 @@ class EmailSchema:
             logger.error(f"Error logging email: {e}")
             return False
     
+    @staticmethod
+    def _log_doc(
+        email: Dict[str, Any],
+        status: str,
+        resend_id: Optional[str] = None,
+        error_message: Optional[str] = None,
+        sent_at: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        return {
+            'to_email': email['to_email'],
+            'subject': email['subject'],
+            'email_type': email.get('email_type'),
+            'status': status,
+            'resend_id': resend_id,
+            'error_message': error_message,
+            'metadata': email.get('metadata') or {},
+            'sent_at': sent_at or datetime.utcnow()
+        }
+    
     async def get_email_history(
         self,
         user_email: str,
@@ -406,22 +705,39 @@ class EmailSchema:
                 return False
             
             # Check specific email type
-            type_mapping = {
-                'subscription': 'subscription_emails',
-                'payment': 'payment_emails',
-                'trial': 'trial_emails',
-                'weekly_summary': 'weekly_summary',
-                'marketing': 'marketing_emails'
-            }
-            
-            pref_key = type_mapping.get(email_type.split('_')[0], 'enabled')
-            
-            return prefs.get(pref_key, True)
+            return prefs.get(preference_key(email_type), True)
             
         except Exception as e:
             logger.error(f"Error checking if can send email: {e}")
             return True  # Default to allowing if error
     
+    async def filter_recipients(self, user_ids: List[str], email_type: str) -> List[str]:
+        """
+        Users (of ``user_ids``) who accept an email type, with one query
+        
+        Args:
+            user_ids: Discord user IDs
+            email_type: Type of email
+            
+        Returns:
+            The user IDs that may receive the email
+        """
+        try:
+            pref_key = preference_key(email_type)
+            opted_out = set()
+            async for prefs in self.email_preferences.find(
+                {'user_id': {'$in': list(user_ids)}},
+                {'user_id': 1, 'enabled': 1, pref_key: 1}
+            ):
+                if not prefs.get('enabled', True) or not prefs.get(pref_key, True):
+                    opted_out.add(prefs['user_id'])
+            
+            return [user_id for user_id in user_ids if user_id not in opted_out]
+            
+        except Exception as e:
+            logger.error(f"Error filtering email recipients: {e}")
+            return list(user_ids)  # Default to allowing if error
+    
     # ==================== Cleanup ====================
     
     async def cleanup_old_emails(self, days: int = 90) -> int:
@@ -14,6 +14,7 @@ Kingdom-77 Bot v4.0 - Phase 5.7
 from datetime import datetime, timezone
 from typing import Optional, Dict, List
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from database.indexes import ensure_indexes
 
 
 # ===== Giveaways Schema =====
@@ -531,23 +532,12 @@ class GiveawayDatabase:
         self.templates = db.giveaway_templates
     
     async def setup_indexes(self):
-        """إنشاء indexes"""
-        # Giveaways
-        await self.giveaways.create_index("giveaway_id", unique=True)
-        await self.giveaways.create_index("guild_id")
-        await self.giveaways.create_index([("guild_id", 1), ("status", 1)])
-        await self.giveaways.create_index("message_id")
-        await self.giveaways.create_index("end_time")
-        await self.giveaways.create_index([("status", 1), ("end_time", 1)])
-        
-        # Settings
-        await self.settings.create_index("guild_id", unique=True)
-        
-        # Templates
-        await self.templates.create_index("template_id", unique=True)
-        await self.templates.create_index("guild_id")
-        await self.templates.create_index([("guild_id", 1), ("created_by", 1)])
-        await self.templates.create_index([("guild_id", 1), ("is_favorite", 1)])
+        """إنشاء indexes (معرفة في database/indexes.py)"""
+        await ensure_indexes(self.db, collections=[
+            self.giveaways.name,
+            self.settings.name,
+            self.templates.name
+        ])
     
     # ===== Giveaways CRUD =====
     async def create_giveaway(self, giveaway_data: Dict) -> Dict:
@@ -592,6 +582,14 @@ class GiveawayDatabase:
         }).sort("end_time", 1)
         return await cursor.to_list(length=1000)
     
+    async def get_active_deadlines(self) -> List[Dict]:
+        """مواعيد انتهاء القرعات النشطة فقط (لجدول المواعيد)"""
+        cursor = self.giveaways.find(
+            {"status": "active", "end_time": {"$exists": True}},
+            {"_id": 0, "giveaway_id": 1, "end_time": 1}
+        )
+        return await cursor.to_list(length=None)
+    
     async def update_giveaway(self, giveaway_id: str, updates: Dict) -> bool:
         """تحديث قرعة"""
         result = await self.giveaways.update_one(
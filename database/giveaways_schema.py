@@ -458,6 +458,15 @@ class GiveawaysSchema:
         
         return count
     
+    async def get_active_deadlines(self) -> List[Dict[str, Any]]:
+        """End times of active giveaways (entity giveaways share the collection)"""
+        cursor = self.giveaways.find(
+            {"status": "active", "giveaway_id": {"$exists": False}},
+            {"_id": 0, "guild_id": 1, "message_id": 1, "end_time": 1}
+        )
+        
+        return await cursor.to_list(None)
+    
     async def get_ended_giveaways(self) -> List[Dict[str, Any]]:
         """Get giveaways that should be ended"""
         cursor = self.giveaways.find({
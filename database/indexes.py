@@ -0,0 +1,485 @@
+"""
+Index Registry for Kingdom-77 Bot v3.0
+======================================
+Single place that declares every index the bot relies on, together with the
+query shapes each index is meant to serve.
+
+- ``ensure_indexes(db)`` provisions the registry idempotently (already
+  existing keys are skipped, so it is cheap to call on every startup).
+- ``audit_indexes(db)`` runs ``explain`` for every declared query shape and
+  reports the ones whose winning plan is a COLLSCAN.
+
+Run the audit against a local mongod:
+
+    MONGODB_URI=mongodb://localhost:27017 python -m database.indexes --explain
+
+Registry entries belong to a logical database:
+- "bot"     -> main bot database (``MongoDB.db``)
+- "premium" -> ``PremiumSchema.db``
+- "economy" -> ``EconomyDatabase.db``
+- "email"   -> ``EmailSchema.db``
+"""
+
+import os
+import sys
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, Dict, List, Any, Iterable, Set, Tuple
+
+from pymongo import IndexModel
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+ASC = 1
+DESC = -1
+
+
+def _index(
+    collection: str,
+    keys,
+    queries: Optional[List[Dict[str, Any]]] = None,
+    database: str = "bot",
+    source: Optional[str] = None,
+    **options
+) -> Dict[str, Any]:
+    """Declare one index and the query shapes it serves"""
+    if isinstance(keys, str):
+        keys = [(keys, ASC)]
+    return {
+        "collection": collection,
+        "keys": list(keys),
+        "options": options,
+        "queries": queries or [],
+        "database": database,
+        "source": source
+    }
+
+
+def _q(filter: Dict[str, Any], sort: Optional[List] = None) -> Dict[str, Any]:
+    """Sample query shape used by the explain audit"""
+    return {"filter": filter, "sort": sort}
+
+
+_NOW = datetime(2025, 1, 1)
+
+
+INDEX_REGISTRY: List[Dict[str, Any]] = [
+    # ==================== Core (migration) ====================
+    _index("guilds", "guild_id", unique=True,
+           queries=[_q({"guild_id": "0"})], source="database/mongodb.py"),
+    _index("channels", "channel_id", unique=True,
+           queries=[_q({"channel_id": "0"})], source="database/mongodb.py"),
+    _index("users", [("user_id", ASC), ("guild_id", ASC)], unique=True,
+           queries=[_q({"user_id": "0", "guild_id": "0"})], source="database/mongodb.py"),
+    _index("ratings", "user_id", unique=True,
+           queries=[_q({"user_id": "0"})], source="database/mongodb.py"),
+
+    # ==================== Leveling ====================
+    _index("user_levels", [("guild_id", ASC), ("user_id", ASC)],
+           queries=[_q({"guild_id": 0, "user_id": 0})],
+           source="leveling/level_system.py"),
+    _index("user_levels", [("guild_id", ASC), ("xp", DESC)],
+           queries=[
+               _q({"guild_id": 0}, [("xp", DESC)]),
+               _q({"guild_id": 0, "xp": {"$gt": 100}})
+           ],
+           source="leveling/level_system.py"),
+    _index("guild_level_config", "guild_id",
+           queries=[_q({"guild_id": 0})], source="leveling/level_system.py"),
+
+    # ==================== Metrics ====================
+    _index("guild_metrics", [("guild_id", ASC), ("granularity", ASC), ("bucket", DESC)],
+           unique=True,
+           queries=[_q({"guild_id": "0", "granularity": "day", "bucket": {"$gte": _NOW}},
+                       [("bucket", ASC)])],
+           source="database/metrics_schema.py"),
+    _index("guild_metrics", "expire_at", expireAfterSeconds=0,
+           source="database/metrics_schema.py"),
+    _index("guild_metric_totals", "guild_id", unique=True,
+           queries=[_q({"guild_id": "0"})], source="database/metrics_schema.py"),
+
+    # ==================== Logging ====================
+    _index("server_logs_settings", "guild_id", unique=True,
+           queries=[_q({"guild_id": 0})], source="database/logging_schema.py"),
+    _index("message_logs", [("guild_id", ASC), ("timestamp", DESC)],
+           queries=[_q({"guild_id": 0}, [("timestamp", DESC)])],
+           source="database/logging_schema.py"),
+    _index("message_logs", [("guild_id", ASC), ("user_id", ASC)], source="database/logging_schema.py"),
+    _index("message_logs", [("guild_id", ASC), ("channel_id", ASC)], source="database/logging_schema.py"),
+    _index("message_logs", [("guild_id", ASC), ("log_type", ASC)], source="database/logging_schema.py"),
+    _index("member_logs", [("guild_id", ASC), ("timestamp", DESC)],
+           queries=[_q({"guild_id": 0}, [("timestamp", DESC)])],
+           source="database/logging_schema.py"),
+    _index("member_logs", [("guild_id", ASC), ("user_id", ASC)], source="database/logging_schema.py"),
+    _index("member_logs", [("guild_id", ASC), ("log_type", ASC)], source="database/logging_schema.py"),
+    _index("channel_logs", [("guild_id", ASC), ("timestamp", DESC)], source="database/logging_schema.py"),
+    _index("channel_logs", [("guild_id", ASC), ("channel_id", ASC)], source="database/logging_schema.py"),
+    _index("role_logs", [("guild_id", ASC), ("timestamp", DESC)], source="database/logging_schema.py"),
+    _index("role_logs", [("guild_id", ASC), ("role_id", ASC)], source="database/logging_schema.py"),
+    _index("voice_logs", [("guild_id", ASC), ("timestamp", DESC)], source="database/logging_schema.py"),
+    _index("voice_logs", [("guild_id", ASC), ("user_id", ASC)], source="database/logging_schema.py"),
+    _index("server_change_logs", [("guild_id", ASC), ("timestamp", DESC)], source="database/logging_schema.py"),
+    _index("message_cache", "message_id", unique=True,
+           queries=[_q({"message_id": 0})], source="database/logging_schema.py"),
+    _index("message_cache", "timestamp", expireAfterSeconds=86400,  # 24 ساعة
+           source="database/logging_schema.py"),
+
+    # ==================== AutoMod ====================
+    _index("automod_rules", [("guild_id", ASC), ("enabled", ASC)],
+           queries=[_q({"guild_id": 0, "enabled": True})], source="database/automod_schema.py"),
+    _index("automod_rules", [("guild_id", ASC), ("rule_type", ASC)], source="database/automod_schema.py"),
+    _index("automod_logs", [("guild_id", ASC), ("timestamp", DESC)],
+           queries=[_q({"guild_id": 0}, [("timestamp", DESC)])], source="database/automod_schema.py"),
+    _index("automod_logs", [("guild_id", ASC), ("user_id", ASC)], source="database/automod_schema.py"),
+    _index("automod_logs", [("guild_id", ASC), ("action", ASC)], source="database/automod_schema.py"),
+    _index("automod_logs", [("timestamp", DESC)], source="database/automod_schema.py"),
+    _index("user_trust_scores", [("guild_id", ASC), ("user_id", ASC)], unique=True,
+           queries=[_q({"guild_id": 0, "user_id": 0})], source="database/automod_schema.py"),
+    _index("user_trust_scores", [("guild_id", ASC), ("score", DESC)], source="database/automod_schema.py"),
+    _index("user_trust_scores", "last_updated", source="database/automod_schema.py"),
+    _index("guild_automod_settings", "guild_id", unique=True,
+           queries=[_q({"guild_id": 0})], source="database/automod_schema.py"),
+
+    # ==================== Giveaways ====================
+    # Reaction giveaways share the collection without a giveaway_id
+    _index("giveaways", "giveaway_id", unique=True,
+           partialFilterExpression={"giveaway_id": {"$exists": True}},
+           queries=[_q({"giveaway_id": "x"})], source="database/giveaway_schema.py"),
+    _index("giveaways", "guild_id", source="database/giveaway_schema.py"),
+    _index("giveaways", [("guild_id", ASC), ("status", ASC)],
+           queries=[_q({"guild_id": 0, "status": "active"})], source="database/giveaway_schema.py"),
+    _index("giveaways", "message_id",
+           queries=[_q({"message_id": 0})], source="database/giveaway_schema.py"),
+    _index("giveaways", "end_time", source="database/giveaway_schema.py"),
+    _index("giveaways", [("status", ASC), ("end_time", ASC)],
+           queries=[_q({"status": "active", "end_time": {"$lte": _NOW}})],
+           source="database/giveaway_schema.py"),
+    _index("giveaway_settings", "guild_id", unique=True,
+           queries=[_q({"guild_id": 0})], source="database/giveaway_schema.py"),
+    _index("giveaway_templates", "template_id", unique=True, source="database/giveaway_schema.py"),
+    _index("giveaway_templates", "guild_id", source="database/giveaway_schema.py"),
+    _index("giveaway_templates", [("guild_id", ASC), ("created_by", ASC)], source="database/giveaway_schema.py"),
+    _index("giveaway_templates", [("guild_id", ASC), ("is_favorite", ASC)], source="database/giveaway_schema.py"),
+
+    # ==================== Tickets ====================
+    _index("tickets", [("guild_id", ASC), ("channel_id", ASC)],
+           queries=[_q({"guild_id": 0, "channel_id": 0})], source="tickets/ticket_system.py"),
+    _index("tickets", [("guild_id", ASC), ("user_id", ASC), ("status", ASC)],
+           queries=[_q({"guild_id": 0, "user_id": 0, "status": {"$in": ["open", "in_progress"]}})],
+           source="tickets/ticket_system.py"),
+    _index("tickets", [("guild_id", ASC), ("ticket_number", DESC)],
+           queries=[_q({"guild_id": 0, "ticket_number": 1})], source="tickets/ticket_system.py"),
+    _index("tickets", [("guild_id", ASC), ("status", ASC)],
+           queries=[_q({"guild_id": 0, "status": {"$ne": "closed"}})], source="tickets/ticket_system.py"),
+    _index("ticket_categories", [("guild_id", ASC), ("category_id", ASC)],
+           queries=[_q({"guild_id": 0, "category_id": "x"})], source="tickets/ticket_system.py"),
+    _index("guild_ticket_config", "guild_id",
+           queries=[_q({"guild_id": 0})], source="tickets/ticket_system.py"),
+    _index("ticket_user_counters", [("guild_id", ASC), ("user_id", ASC)],
+           unique=True,
+           queries=[_q({"guild_id": 0, "user_id": 0})], source="tickets/counters.py"),
+    _index("ticket_transcripts", [("guild_id", ASC), ("ticket_number", ASC)],
+           source="tickets/ticket_system.py"),
+    _index("ticket_transcript_chunks", [("transcript_id", ASC), ("seq", ASC)],
+           unique=True,
+           queries=[_q({"transcript_id": "0"}, [("seq", ASC)])], source="tickets/transcripts.py"),
+
+    # ==================== Suggestions ====================
+    _index("suggestion_votes", [("guild_id", ASC), ("suggestion_id", ASC), ("user_id", ASC)],
+           unique=True,
+           queries=[_q({"guild_id": "0", "suggestion_id": 1, "user_id": "0"})],
+           source="database/suggestions_schema.py"),
+    _index("suggestion_votes", "suggestion_id", source="database/suggestions_schema.py"),
+
+    # ==================== Custom Commands ====================
+    _index("auto_responses", [("guild_id", ASC), ("trigger", ASC)],
+           queries=[_q({"guild_id": "0", "trigger": "x"})],
+           source="database/custom_commands_schema.py"),
+    _index("auto_responses", [("guild_id", ASC), ("enabled", ASC)],
+           queries=[_q({"guild_id": "0", "enabled": True}, [("trigger", ASC)])],
+           source="database/custom_commands_schema.py"),
+
+    # ==================== Social Integration ====================
+    # get_active_links_for_check() scans every active link across guilds
+    _index("social_links", [("is_active", ASC), ("platform", ASC)],
+           queries=[_q({"is_active": True})],
+           source="database/social_integration_schema.py"),
+
+    # ==================== Auto-Roles ====================
+    _index("reaction_roles", [("guild_id", ASC), ("message_id", ASC)],
+           queries=[_q({"guild_id": 0, "message_id": 0})], source="autoroles/autorole_system.py"),
+    _index("level_roles", [("guild_id", ASC), ("enabled", ASC), ("level", ASC)],
+           queries=[_q({"guild_id": 0, "enabled": True}, [("level", ASC)])],
+           source="autoroles/autorole_system.py"),
+    _index("join_roles", [("guild_id", ASC), ("enabled", ASC)],
+           queries=[_q({"guild_id": 0, "target_type": {"$in": ["all", "humans"]}, "enabled": True})],
+           source="autoroles/autorole_system.py"),
+    _index("guild_autoroles_config", "guild_id",
+           queries=[_q({"guild_id": 0})], source="autoroles/autorole_system.py"),
+
+    # ==================== Premium ====================
+    _index("premium_subscriptions", [("guild_id", ASC), ("status", ASC), ("expires_at", ASC)],
+           database="premium",
+           queries=[_q({"guild_id": "0", "status": "active", "expires_at": {"$gt": _NOW}})],
+           source="database/premium_schema.py"),
+    _index("premium_subscriptions", [("status", ASC), ("expires_at", ASC)],
+           database="premium",
+           queries=[_q({"status": "active", "expires_at": {"$lt": _NOW}})],
+           source="database/premium_schema.py"),
+    _index("premium_subscriptions", [("user_id", ASC), ("guild_id", ASC)],
+           database="premium", source="database/premium_schema.py"),
+    _index("premium_features", "feature_id", unique=True, database="premium",
+           source="database/premium_schema.py"),
+    _index("premium_features", "tier", database="premium",
+           queries=[_q({"tier": "basic", "enabled": True})], source="database/premium_schema.py"),
+    _index("payment_history", "user_id", database="premium", source="database/premium_schema.py"),
+    _index("payment_history", "stripe_payment_id", database="premium", source="database/premium_schema.py"),
+    _index("payment_history", "created_at", database="premium", source="database/premium_schema.py"),
+    _index("feature_usage", [("guild_id", ASC), ("feature_id", ASC)], database="premium",
+           source="database/premium_schema.py"),
+    # Sampled raw events; daily rollups in feature_usage_daily are the long-term record
+    _index("feature_usage", "timestamp", expireAfterSeconds=7776000, database="premium",  # 90 days
+           source="premium/usage_tracker.py"),
+    _index("feature_usage_daily", [("guild_id", ASC), ("day", ASC), ("feature_id", ASC)],
+           unique=True, database="premium",
+           queries=[_q({"guild_id": "0", "day": {"$gte": _NOW}})],
+           source="database/premium_schema.py"),
+
+    # ==================== Email ====================
+    _index("email_queue", [("status", ASC), ("priority", ASC), ("scheduled_for", ASC)], database="email",
+           queries=[_q({"status": "pending", "scheduled_for": {"$lte": _NOW}},
+                       [("priority", ASC), ("scheduled_for", ASC)])],
+           source="database/email_schema.py"),
+    _index("email_queue", [("claim", ASC), ("status", ASC)], database="email",
+           queries=[_q({"claim": "x", "status": "sending"})], source="database/email_schema.py"),
+    _index("email_queue", [("status", ASC), ("claimed_at", ASC)], database="email",
+           queries=[_q({"status": "sending", "claimed_at": {"$lt": _NOW}})],
+           source="database/email_schema.py"),
+    # Batch jobs (weekly summaries) queue each email at most once
+    _index("email_queue", "dedupe_key", unique=True, sparse=True, database="email",
+           source="email/weekly_summary.py"),
+    _index("email_log", [("to_email", ASC), ("sent_at", DESC)], database="email",
+           queries=[_q({"to_email": "x"}, [("sent_at", DESC)])], source="database/email_schema.py"),
+    _index("email_preferences", "user_id", database="email",
+           queries=[_q({"user_id": "0"}), _q({"user_id": {"$in": ["0", "1"]}})],
+           source="database/email_schema.py"),
+
+    # ==================== Economy ====================
+    _index("user_wallets", [("guild_id", ASC), ("user_id", ASC)], unique=True, database="economy",
+           queries=[_q({"guild_id": 0, "user_id": 0})], source="database/economy_schema.py"),
+    _index("user_wallets", [("guild_id", ASC), ("cash", DESC)], database="economy",  # Leaderboard
+           queries=[_q({"guild_id": 0}, [("cash", DESC)])], source="database/economy_schema.py"),
+    _index("shop_items", [("guild_id", ASC), ("item_id", ASC)], unique=True, database="economy",
+           source="database/economy_schema.py"),
+    _index("shop_items", [("guild_id", ASC), ("category", ASC)], database="economy",
+           source="database/economy_schema.py"),
+    _index("user_inventory", [("guild_id", ASC), ("user_id", ASC), ("item_id", ASC)], database="economy",
+           source="database/economy_schema.py"),
+    _index("transactions", [("guild_id", ASC), ("user_id", ASC), ("timestamp", DESC)], database="economy",
+           source="database/economy_schema.py"),
+    _index("transactions", "timestamp", expireAfterSeconds=7776000, database="economy",  # 90 days
+           source="database/economy_schema.py"),
+    _index("daily_rewards", [("guild_id", ASC), ("user_id", ASC)], unique=True, database="economy",
+           source="database/economy_schema.py"),
+    _index("gambling_stats", [("guild_id", ASC), ("user_id", ASC)], unique=True, database="economy",
+           source="database/economy_schema.py"),
+]
+
+
+def get_registry(
+    database: Optional[str] = "bot",
+    collections: Optional[Iterable[str]] = None
+) -> List[Dict[str, Any]]:
+    """Filter registry entries by logical database and/or collection names"""
+    wanted = set(collections) if collections is not None else None
+    return [
+        entry for entry in INDEX_REGISTRY
+        if (database is None or entry["database"] == database)
+        and (wanted is None or entry["collection"] in wanted)
+    ]
+
+
+def _key_signature(keys) -> tuple:
+    return tuple((field, int(direction)) for field, direction in keys)
+
+
+async def _set_ttl(db, collection: str, keys, ttl: int):
+    """Turn an existing index into a TTL index (or change its TTL) in place"""
+    try:
+        await db.command("collMod", collection, index={"keyPattern": dict(keys), "expireAfterSeconds": ttl})
+        logger.info(f"Set TTL of {collection} {dict(keys)} to {ttl}s")
+    except PyMongoError as e:
+        logger.error(f"Error setting TTL on {collection} {dict(keys)}: {e}")
+
+
+# (database name, collection) pairs whose registry indexes are known to exist
+_provisioned: Set[Tuple[Optional[str], str]] = set()
+
+
+async def ensure_indexes(
+    db,
+    database: Optional[str] = "bot",
+    collections: Optional[Iterable[str]] = None
+) -> Dict[str, int]:
+    """
+    Create missing registry indexes (idempotent).
+
+    Collections provisioned once in this process are skipped on later calls,
+    so the bot-wide pass at startup and the per-system ``setup_indexes`` calls
+    don't each re-read ``index_information``.
+
+    Args:
+        db: Motor database the entries live in
+        database: Logical database to provision (None = every entry)
+        collections: Restrict to these collection names
+
+    Returns:
+        {"created": n, "existing": n, "failed": n}
+    """
+    result = {"created": 0, "existing": 0, "failed": 0}
+
+    by_collection: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in get_registry(database, collections):
+        by_collection.setdefault(entry["collection"], []).append(entry)
+
+    db_name = getattr(db, "name", None)
+    for name, entries in by_collection.items():
+        if (db_name, name) in _provisioned:
+            result["existing"] += len(entries)
+            continue
+
+        collection = db[name]
+        try:
+            info = await collection.index_information()
+        except PyMongoError as e:
+            logger.error(f"Error reading indexes of {name}: {e}")
+            result["failed"] += len(entries)
+            continue
+
+        existing = {_key_signature(spec["key"]): spec for spec in info.values()}
+        models = []
+        for entry in entries:
+            spec = existing.get(_key_signature(entry["keys"]))
+            if spec is None:
+                models.append(IndexModel(entry["keys"], **entry["options"]))
+                continue
+            result["existing"] += 1
+            ttl = entry["options"].get("expireAfterSeconds")
+            if ttl is not None and spec.get("expireAfterSeconds") != ttl:
+                await _set_ttl(db, name, entry["keys"], ttl)
+
+        if not models:
+            _provisioned.add((db_name, name))
+            continue
+
+        try:
+            await collection.create_indexes(models)
+            result["created"] += len(models)
+            _provisioned.add((db_name, name))
+        except PyMongoError:
+            # Create one by one so a single conflict doesn't block the rest
+            failed = 0
+            for model in models:
+                try:
+                    await collection.create_indexes([model])
+                    result["created"] += 1
+                except PyMongoError as e:
+                    failed += 1
+                    logger.error(f"Error creating index {model.document['key']} on {name}: {e}")
+            result["failed"] += failed
+            if not failed:
+                _provisioned.add((db_name, name))
+
+    if result["created"] or result["failed"]:
+        logger.info(
+            f"Indexes ({database or 'all'}): {result['created']} created, "
+            f"{result['existing']} existing, {result['failed']} failed"
+        )
+    return result
+
+
+# ==================== Explain Audit ====================
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    """Flatten the stage names of a (winning) query plan"""
+    stages = [plan.get("stage")]
+    if "inputStage" in plan:
+        stages.extend(_plan_stages(plan["inputStage"]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    # SBE plans nest the classic plan under queryPlan
+    if "queryPlan" in plan:
+        stages.extend(_plan_stages(plan["queryPlan"]))
+    return [stage for stage in stages if stage]
+
+
+async def audit_indexes(
+    db,
+    database: Optional[str] = "bot",
+    collections: Optional[Iterable[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Explain every registered query shape.
+
+    Returns:
+        One report per query: collection, filter, sort, stages, collscan
+    """
+    reports = []
+    for entry in get_registry(database, collections):
+        for query in entry["queries"]:
+            command = {"find": entry["collection"], "filter": query["filter"]}
+            if query["sort"]:
+                command["sort"] = dict(query["sort"])
+            try:
+                explained = await db.command("explain", command, verbosity="queryPlanner")
+                winning = explained.get("queryPlanner", {}).get("winningPlan", {})
+                stages = _plan_stages(winning)
+                reports.append({
+                    "collection": entry["collection"],
+                    "filter": query["filter"],
+                    "sort": query["sort"],
+                    "stages": stages,
+                    "collscan": "COLLSCAN" in stages,
+                    "source": entry["source"]
+                })
+            except PyMongoError as e:
+                logger.error(f"Error explaining query on {entry['collection']}: {e}")
+    return reports
+
+
+async def _main(argv: List[str]) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    uri = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
+    client = AsyncIOMotorClient(uri, serverSelectionTimeoutMS=5000)
+    databases = {
+        "bot": client[os.getenv("MONGODB_DB_NAME", "kingdom77_bot")],
+        "premium": client[os.getenv("MONGODB_DB", "kingdom77")],
+        "economy": client["kingdom77"],
+        "email": client["db"]
+    }
+
+    failures = 0
+    for name, db in databases.items():
+        if "--create" in argv:
+            await ensure_indexes(db, database=name)
+        if "--explain" in argv:
+            for report in await audit_indexes(db, database=name):
+                status = "COLLSCAN" if report["collscan"] else "ok"
+                print(f"[{status:8}] {name}.{report['collection']} "
+                      f"{report['filter']} -> {' <- '.join(report['stages'])}")
+                failures += report["collscan"]
+
+    client.close()
+    if failures:
+        print(f"\n{failures} query shape(s) fall back to a collection scan")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    if not {"--create", "--explain"} & set(sys.argv[1:]):
+        print("Usage: python -m database.indexes [--create] [--explain]")
+        sys.exit(2)
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
@@ -0,0 +1,409 @@
+"""
+MongoDB Query Instrumentation for Kingdom-77 Bot v3.0
+=====================================================
+Thin wrapper around ``AsyncIOMotorDatabase`` that records, per collection and
+operation: a latency histogram, document counts and (sampled) payload sizes.
+Queries slower than ``MONGODB_SLOW_QUERY_MS`` are logged with the *shape* of
+their filter (values replaced by their type), never with the values.
+
+Callers keep using the database exactly like a Motor database:
+
+    db = InstrumentedDatabase(client["kingdom77_bot"])
+    await db.user_levels.find_one({"guild_id": 1, "user_id": 2})
+
+Environment:
+- MONGODB_INSTRUMENTATION=0       -> disable the wrapper
+- MONGODB_SLOW_QUERY_MS=100       -> slow query threshold
+- MONGODB_PAYLOAD_SAMPLE_RATE=0.1 -> fraction of operations whose payload is sized
+"""
+
+import os
+import time
+import random
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Optional, Dict, List, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Histogram upper bounds in milliseconds (last bucket is open-ended)
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Operations that return an awaitable
+ASYNC_OPERATIONS = frozenset({
+    "find_one", "insert_one", "insert_many", "update_one", "update_many",
+    "replace_one", "delete_one", "delete_many", "count_documents",
+    "estimated_document_count", "distinct", "bulk_write",
+    "find_one_and_update", "find_one_and_replace", "find_one_and_delete",
+    "create_index", "create_indexes", "index_information", "drop_index"
+})
+
+# Operations that return a cursor (the query runs while it is consumed)
+CURSOR_OPERATIONS = frozenset({"find", "aggregate", "list_indexes"})
+
+
+def instrumentation_enabled() -> bool:
+    """Whether new connections should be wrapped"""
+    return os.getenv("MONGODB_INSTRUMENTATION", "1").lower() not in ("0", "false", "no")
+
+
+def filter_shape(value: Any, depth: int = 0) -> Any:
+    """Replace the values of a filter with their type names, keeping the structure"""
+    if depth > 4:
+        return "..."
+    if isinstance(value, dict):
+        return {key: filter_shape(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return []
+        return [filter_shape(value[0], depth + 1)]
+    return type(value).__name__
+
+
+def _operation_filter(operation: str, args: tuple, kwargs: Dict[str, Any]) -> Optional[Any]:
+    """Extract the filter (or first $match) of an operation call"""
+    if operation == "aggregate":
+        pipeline = args[0] if args else kwargs.get("pipeline", [])
+        for stage in pipeline or []:
+            if "$match" in stage:
+                return stage["$match"]
+        return None
+    if operation == "distinct":
+        return args[1] if len(args) > 1 else kwargs.get("filter")
+    if operation in ("find", "find_one", "count_documents", "update_one", "update_many",
+                     "replace_one", "delete_one", "delete_many", "find_one_and_update",
+                     "find_one_and_replace", "find_one_and_delete"):
+        return args[0] if args else kwargs.get("filter")
+    return None
+
+
+def _result_docs(operation: str, args: tuple, result: Any) -> Tuple[int, List[Any]]:
+    """Number of documents touched by an operation and the ones worth sizing"""
+    if operation == "insert_one":
+        return 1, list(args[:1])
+    if operation == "insert_many":
+        docs = list(args[0]) if args else []
+        return len(docs), docs
+    if operation in ("find_one", "find_one_and_update", "find_one_and_replace", "find_one_and_delete"):
+        return (1, [result]) if result is not None else (0, [])
+    if isinstance(result, list):
+        return len(result), result
+    for attribute in ("modified_count", "deleted_count"):
+        count = getattr(result, attribute, None)
+        if count is not None:
+            upserted = 1 if getattr(result, "upserted_id", None) is not None else 0
+            return count + upserted, []
+    return 0, []
+
+
+def latency_bucket(elapsed_ms: float) -> int:
+    """Index of the histogram bucket of a latency"""
+    for index, bound in enumerate(LATENCY_BUCKETS_MS):
+        if elapsed_ms <= bound:
+            return index
+    return len(LATENCY_BUCKETS_MS)
+
+
+class OperationStats:
+    """Counters of one (collection, operation) pair"""
+
+    __slots__ = ("calls", "errors", "total_ms", "max_ms", "buckets", "docs",
+                 "payload_bytes", "payload_docs")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.docs = 0
+        self.payload_bytes = 0
+        self.payload_docs = 0
+
+    def observe(self, elapsed_ms: float):
+        """Count one call of ``elapsed_ms`` in the histogram"""
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        self.buckets[latency_bucket(elapsed_ms)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound (ms) of the bucket holding the given percentile"""
+        if not self.calls:
+            return 0.0
+        target = self.calls * fraction
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return min(float(LATENCY_BUCKETS_MS[index]), round(self.max_ms, 2))
+                return round(self.max_ms, 2)
+        return round(self.max_ms, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_ms": round(self.total_ms, 2),
+            "avg_ms": round(self.total_ms / self.calls, 2) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "histogram": dict(zip([*map(str, LATENCY_BUCKETS_MS), "inf"], self.buckets)),
+            "docs": self.docs,
+            "avg_doc_bytes": round(self.payload_bytes / self.payload_docs) if self.payload_docs else None
+        }
+
+
+class QueryStats:
+    """Process-wide registry of query statistics"""
+
+    def __init__(
+        self,
+        slow_query_ms: Optional[float] = None,
+        payload_sample_rate: Optional[float] = None,
+        max_slow_queries: int = 50
+    ):
+        if slow_query_ms is None:
+            slow_query_ms = float(os.getenv("MONGODB_SLOW_QUERY_MS", "100"))
+        if payload_sample_rate is None:
+            payload_sample_rate = float(os.getenv("MONGODB_PAYLOAD_SAMPLE_RATE", "0.1"))
+
+        self.slow_query_ms = slow_query_ms
+        self.payload_sample_rate = min(1.0, max(0.0, payload_sample_rate))
+        self.operations: Dict[Tuple[str, str], OperationStats] = {}
+        self.slow_queries = deque(maxlen=max_slow_queries)
+        self.started_at = datetime.utcnow()
+
+    def record(
+        self,
+        collection: str,
+        operation: str,
+        elapsed_ms: float,
+        docs: int = 0,
+        payload: Optional[List[Any]] = None,
+        query_filter: Optional[Any] = None,
+        error: bool = False
+    ):
+        """Record one completed operation"""
+        stats = self.operations.get((collection, operation))
+        if stats is None:
+            stats = self.operations[(collection, operation)] = OperationStats()
+
+        stats.observe(elapsed_ms)
+        stats.docs += docs
+        if error:
+            stats.errors += 1
+
+        if payload and self.payload_sample_rate > 0 and random.random() < self.payload_sample_rate:
+            size = self._payload_size(payload)
+            if size is not None:
+                stats.payload_bytes += size
+                stats.payload_docs += len(payload)
+
+        if elapsed_ms >= self.slow_query_ms:
+            shape = filter_shape(query_filter) if query_filter is not None else None
+            self.slow_queries.append({
+                "collection": collection,
+                "operation": operation,
+                "elapsed_ms": round(elapsed_ms, 2),
+                "filter": shape,
+                "timestamp": datetime.utcnow()
+            })
+            logger.warning(f"Slow query {collection}.{operation} {elapsed_ms:.1f}ms filter={shape}")
+
+    @staticmethod
+    def _payload_size(docs: List[Any]) -> Optional[int]:
+        try:
+            import bson
+            return sum(len(bson.encode(doc)) for doc in docs if isinstance(doc, dict))
+        except Exception:
+            return None
+
+    def top(self, limit: int = 10, key: str = "total_ms") -> List[Dict[str, Any]]:
+        """Most expensive (collection, operation) pairs"""
+        rows = [
+            {"collection": collection, "operation": operation, **stats.to_dict()}
+            for (collection, operation), stats in self.operations.items()
+        ]
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return rows[:limit]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All statistics as a JSON/BSON-friendly dict"""
+        return {
+            "started_at": self.started_at,
+            "slow_query_ms": self.slow_query_ms,
+            "total_calls": sum(stats.calls for stats in self.operations.values()),
+            "total_ms": round(sum(stats.total_ms for stats in self.operations.values()), 2),
+            "operations": self.top(limit=len(self.operations)),
+            "slow_queries": list(self.slow_queries)
+        }
+
+    def reset(self):
+        self.operations.clear()
+        self.slow_queries.clear()
+        self.started_at = datetime.utcnow()
+
+
+# Shared registry used by every instrumented database of this process
+query_stats = QueryStats()
+
+
+class InstrumentedCursor:
+    """Proxy for Motor cursors that times the consumption of the cursor"""
+
+    def __init__(self, cursor, collection: str, operation: str, query_filter, stats: QueryStats):
+        self._cursor = cursor
+        self._collection = collection
+        self._operation = operation
+        self._filter = query_filter
+        self._stats = stats
+
+    def __getattr__(self, name):
+        attribute = getattr(self._cursor, name)
+        if not callable(attribute):
+            return attribute
+
+        def chained(*args, **kwargs):
+            result = attribute(*args, **kwargs)
+            # Keep chaining (sort/limit/skip/...) on the proxy
+            return self if result is self._cursor else result
+
+        return chained
+
+    async def to_list(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            docs = await self._cursor.to_list(*args, **kwargs)
+        except Exception:
+            self._stats.record(self._collection, self._operation,
+                               (time.perf_counter() - start) * 1000,
+                               query_filter=self._filter, error=True)
+            raise
+        self._stats.record(self._collection, self._operation,
+                           (time.perf_counter() - start) * 1000,
+                           docs=len(docs), payload=docs, query_filter=self._filter)
+        return docs
+
+    async def __aiter__(self):
+        elapsed = 0.0
+        docs = 0
+        sample = []
+        iterator = self._cursor.__aiter__()
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    doc = await iterator.__anext__()
+                except StopAsyncIteration:
+                    elapsed += time.perf_counter() - start
+                    break
+                # Only time spent waiting on the server counts, not the consumer
+                elapsed += time.perf_counter() - start
+                docs += 1
+                if len(sample) < 20:
+                    sample.append(doc)
+                yield doc
+        finally:
+            self._stats.record(self._collection, self._operation, elapsed * 1000,
+                               docs=docs, payload=sample, query_filter=self._filter)
+
+
+class InstrumentedCollection:
+    """Proxy for ``AsyncIOMotorCollection`` that records every operation"""
+
+    def __init__(self, collection, stats: QueryStats = query_stats):
+        self._collection = collection
+        self._stats = stats
+
+    @property
+    def unwrapped(self):
+        return self._collection
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+
+        if name in ASYNC_OPERATIONS:
+            return self._timed(name, attribute)
+        if name in CURSOR_OPERATIONS:
+            def cursor_operation(*args, **kwargs):
+                return InstrumentedCursor(
+                    attribute(*args, **kwargs),
+                    self._collection.name,
+                    name,
+                    _operation_filter(name, args, kwargs),
+                    self._stats
+                )
+            return cursor_operation
+        if _is_motor_collection(attribute):
+            # Sub-collections (db.foo.bar)
+            return InstrumentedCollection(attribute, self._stats)
+        return attribute
+
+    def __getitem__(self, name):
+        return InstrumentedCollection(self._collection[name], self._stats)
+
+    def _timed(self, operation: str, method):
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = await method(*args, **kwargs)
+            except Exception:
+                self._stats.record(self._collection.name, operation,
+                                   (time.perf_counter() - start) * 1000,
+                                   query_filter=_operation_filter(operation, args, kwargs),
+                                   error=True)
+                raise
+            docs, payload = _result_docs(operation, args, result)
+            self._stats.record(self._collection.name, operation,
+                               (time.perf_counter() - start) * 1000,
+                               docs=docs, payload=payload,
+                               query_filter=_operation_filter(operation, args, kwargs))
+            return result
+        return timed
+
+
+class InstrumentedDatabase:
+    """Proxy for ``AsyncIOMotorDatabase`` whose collections are instrumented"""
+
+    def __init__(self, database, stats: QueryStats = query_stats):
+        self._database = database
+        self._stats = stats
+
+    @property
+    def unwrapped(self):
+        return self._database
+
+    @property
+    def stats(self) -> QueryStats:
+        return self._stats
+
+    def __getattr__(self, name):
+        attribute = getattr(self._database, name)
+        if _is_motor_collection(attribute):
+            return InstrumentedCollection(attribute, self._stats)
+        return attribute
+
+    def __getitem__(self, name):
+        return InstrumentedCollection(self._database[name], self._stats)
+
+    def get_collection(self, name, *args, **kwargs):
+        return InstrumentedCollection(self._database.get_collection(name, *args, **kwargs), self._stats)
+
+
+def _is_motor_collection(value) -> bool:
+    return type(value).__name__ == "AsyncIOMotorCollection"
+
+
+async def publish_snapshot(db, source: str, stats: QueryStats = query_stats):
+    """Store this process' statistics so another process (the dashboard) can read them"""
+    if isinstance(db, InstrumentedDatabase):
+        db = db.unwrapped
+    snapshot = stats.snapshot()
+    snapshot["updated_at"] = datetime.utcnow()
+    await db.query_stats.replace_one({"_id": source}, snapshot, upsert=True)
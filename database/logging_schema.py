@@ -18,6 +18,8 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any
 import discord
+from database.indexes import ensure_indexes
+from joins.snapshot import join_snapshots
 
 
 class LoggingSchema:
@@ -35,39 +37,17 @@ class LoggingSchema:
         self.message_cache = db.message_cache
     
     async def create_indexes(self):
-        """إنشاء الـ indexes للأداء الأفضل"""
-        # Settings indexes
-        await self.settings.create_index("guild_id", unique=True)
-        
-        # Message logs indexes
-        await self.message_logs.create_index([("guild_id", 1), ("timestamp", -1)])
-        await self.message_logs.create_index([("guild_id", 1), ("user_id", 1)])
-        await self.message_logs.create_index([("guild_id", 1), ("channel_id", 1)])
-        await self.message_logs.create_index([("guild_id", 1), ("log_type", 1)])
-        
-        # Member logs indexes
-        await self.member_logs.create_index([("guild_id", 1), ("timestamp", -1)])
-        await self.member_logs.create_index([("guild_id", 1), ("user_id", 1)])
-        await self.member_logs.create_index([("guild_id", 1), ("log_type", 1)])
-        
-        # Channel logs indexes
-        await self.channel_logs.create_index([("guild_id", 1), ("timestamp", -1)])
-        await self.channel_logs.create_index([("guild_id", 1), ("channel_id", 1)])
-        
-        # Role logs indexes
-        await self.role_logs.create_index([("guild_id", 1), ("timestamp", -1)])
-        await self.role_logs.create_index([("guild_id", 1), ("role_id", 1)])
-        
-        # Voice logs indexes
-        await self.voice_logs.create_index([("guild_id", 1), ("timestamp", -1)])
-        await self.voice_logs.create_index([("guild_id", 1), ("user_id", 1)])
-        
-        # Server logs indexes
-        await self.server_logs.create_index([("guild_id", 1), ("timestamp", -1)])
-        
-        # Message cache indexes
-        await self.message_cache.create_index([("message_id", 1)], unique=True)
-        await self.message_cache.create_index([("timestamp", 1)], expireAfterSeconds=86400)  # 24 ساعة
+        """إنشاء الـ indexes للأداء الأفضل (معرفة في database/indexes.py)"""
+        await ensure_indexes(self.db, collections=[
+            self.settings.name,
+            self.message_logs.name,
+            self.member_logs.name,
+            self.channel_logs.name,
+            self.role_logs.name,
+            self.voice_logs.name,
+            self.server_logs.name,
+            self.message_cache.name
+        ])
     
     # ==================== Server Logs Settings ====================
     
@@ -152,6 +132,7 @@ class LoggingSchema:
         }
         
         await self.settings.insert_one(settings)
+        join_snapshots.invalidate(guild_id)
         return settings
     
     async def update_server_settings(self, guild_id: int, updates: Dict) -> bool:
@@ -161,6 +142,7 @@ class LoggingSchema:
             {"guild_id": guild_id},
             {"$set": updates}
         )
+        join_snapshots.invalidate(guild_id)
         return result.modified_count > 0
     
     async def set_log_channel(self, guild_id: int, log_type: str, channel_id: Optional[int]) -> bool:
@@ -0,0 +1,330 @@
+"""
+Metrics Rollup Database Schema
+Pre-aggregated per-guild counters for dashboard statistics.
+
+Counters are incremented at event time into hourly and daily buckets, so
+statistics endpoints read a handful of bucket documents instead of scanning
+the raw event collections.
+
+Collections:
+- guild_metrics: Time-bucketed counters (granularity: hour/day)
+- guild_metric_totals: Running totals / gauges per guild (e.g. open tickets)
+
+Running totals are seeded from the raw collections on first read
+(``load_totals``). Gauges without a reliable event stream (``leveling_users``)
+are recounted when older than ``GAUGE_REFRESH`` instead of being incremented.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple
+from pymongo import UpdateOne
+from database.indexes import ensure_indexes
+from database.counter_buffer import CounterBuffer
+import logging
+
+logger = logging.getLogger('metrics_schema')
+
+# Bucket granularities
+HOUR = "hour"
+DAY = "day"
+
+# How long buckets are kept before the TTL index removes them
+BUCKET_RETENTION = {
+    HOUR: timedelta(days=14),
+    DAY: timedelta(days=400)
+}
+
+
+# Every total seeded by ``count_totals``; documents missing one are reseeded
+SEEDED_TOTALS = ("leveling_users", "tickets_open", "tickets_closed", "moderation_actions")
+
+# How often gauges (totals recounted instead of incremented) are refreshed
+GAUGE_REFRESH = timedelta(hours=1)
+
+
+def guild_id_filter(guild_id) -> Dict[str, Any]:
+    """Match a guild id stored as str (leveling, moderation) or int (tickets)"""
+    values: List[Any] = [str(guild_id)]
+    if str(guild_id).isdigit():
+        values.append(int(guild_id))
+    return {"$in": values}
+
+
+def bucket_start(timestamp: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its bucket"""
+    if granularity == HOUR:
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def metric_key(*parts) -> str:
+    """Build a dotted counter key, escaping characters MongoDB treats specially"""
+    return ".".join(str(part).replace(".", "_").replace("$", "_") for part in parts)
+
+
+def merge_counters(target: Dict[str, Any], source: Dict[str, Any]) -> Dict[str, Any]:
+    """Add (possibly nested) counter dicts from ``source`` into ``target``"""
+    for key, value in source.items():
+        if isinstance(value, dict):
+            merge_counters(target.setdefault(key, {}), value)
+        elif isinstance(value, (int, float)):
+            target[key] = target.get(key, 0) + value
+    return target
+
+
+class MetricsSchema:
+    """Metrics Rollup Store"""
+
+    def __init__(self, db):
+        self.db = db
+        self.buckets = db.guild_metrics
+        self.totals = db.guild_metric_totals
+
+    async def ensure_indexes(self):
+        """Create necessary indexes for performance (declared in database/indexes.py)"""
+        try:
+            await ensure_indexes(self.db, collections=[self.buckets.name, self.totals.name])
+        except Exception as e:
+            logger.error(f"Error creating metrics indexes: {e}")
+
+    # ==================== Writes ====================
+
+    async def increment(
+        self,
+        guild_id,
+        counters: Dict[str, int],
+        totals: Optional[Dict[str, int]] = None,
+        timestamp: Optional[datetime] = None
+    ) -> bool:
+        """
+        Increment counters for a guild at event time.
+
+        Args:
+            guild_id: Guild ID (normalized to str)
+            counters: Counters to add to the hourly and daily buckets.
+                Dotted keys (``moderation_actions.warn``) create nested counters.
+            totals: Running totals to adjust (may be negative, e.g. open tickets)
+            timestamp: Event time (defaults to now)
+        """
+        guild_id = str(guild_id)
+        timestamp = timestamp or datetime.utcnow()
+
+        operations = []
+        if counters:
+            for granularity in (HOUR, DAY):
+                operations.append(self.bucket_operation(
+                    guild_id, granularity, bucket_start(timestamp, granularity), counters
+                ))
+
+        try:
+            if operations:
+                await self.buckets.bulk_write(operations, ordered=False)
+            if totals:
+                await self.totals.update_one(
+                    {"guild_id": guild_id},
+                    {
+                        "$inc": {f"totals.{key}": value for key, value in totals.items()},
+                        "$set": {"updated_at": timestamp}
+                    },
+                    upsert=True
+                )
+            return True
+        except Exception as e:
+            logger.error(f"Error incrementing metrics for guild {guild_id}: {e}")
+            return False
+
+    @staticmethod
+    def bucket_operation(guild_id: str, granularity: str, bucket: datetime, counters: Dict[str, int]) -> UpdateOne:
+        """Upsert adding ``counters`` to one bucket document"""
+        return UpdateOne(
+            {"guild_id": guild_id, "granularity": granularity, "bucket": bucket},
+            {
+                "$inc": {f"counters.{key}": value for key, value in counters.items()},
+                "$setOnInsert": {"expire_at": bucket + BUCKET_RETENTION[granularity]}
+            },
+            upsert=True
+        )
+
+    async def set_totals(self, guild_id, totals: Dict[str, Any]) -> bool:
+        """
+        Overwrite running totals (used when seeding from the raw collections).
+
+        Only pass the complete result of ``count_totals``: the document is
+        marked seeded for every field in ``SEEDED_TOTALS``.
+        """
+        now = datetime.utcnow()
+        result = await self.totals.update_one(
+            {"guild_id": str(guild_id)},
+            {"$set": {
+                **{f"totals.{key}": value for key, value in totals.items()},
+                "seeded": True,
+                "gauges_at": now,
+                "updated_at": now
+            }},
+            upsert=True
+        )
+        return result.acknowledged
+
+    async def count_gauges(self, guild_id) -> Dict[str, int]:
+        """Totals recounted from the raw collections instead of incremented"""
+        return {
+            "leveling_users": await self.db.user_levels.count_documents({"guild_id": guild_id_filter(guild_id)})
+        }
+
+    async def count_totals(self, guild_id) -> Dict[str, Any]:
+        """Every total in ``SEEDED_TOTALS``, counted from the raw collections"""
+        guild_filter = guild_id_filter(guild_id)
+        # Same collection and key as the increments of ModerationSystem.log_action
+        action_counts = await self.db.mod_actions.aggregate([
+            {"$match": {"guild_id": guild_filter}},
+            {"$group": {"_id": "$action_type", "count": {"$sum": 1}}}
+        ]).to_list(None)
+
+        return {
+            **await self.count_gauges(guild_id),
+            "tickets_open": await self.db.tickets.count_documents({
+                "guild_id": guild_filter,
+                "status": {"$ne": "closed"}
+            }),
+            "tickets_closed": await self.db.tickets.count_documents({
+                "guild_id": guild_filter,
+                "status": "closed"
+            }),
+            "moderation_actions": {
+                metric_key(item["_id"]): item["count"] for item in action_counts if item["_id"]
+            }
+        }
+
+    async def load_totals(self, guild_id) -> Dict[str, Any]:
+        """
+        Running totals of a guild, seeded from the raw collections on first use.
+
+        Documents seeded before a total existed are reseeded, and gauges are
+        recounted once they are older than ``GAUGE_REFRESH``.
+        """
+        doc = await self.totals.find_one(
+            {"guild_id": str(guild_id)},
+            {"_id": 0, "totals": 1, "seeded": 1, "gauges_at": 1}
+        )
+        totals = (doc or {}).get("totals", {})
+        if not doc or not doc.get("seeded") or any(key not in totals for key in SEEDED_TOTALS):
+            totals = await self.count_totals(guild_id)
+            await self.set_totals(guild_id, totals)
+            return totals
+
+        gauges_at = doc.get("gauges_at")
+        if gauges_at is None or datetime.utcnow() - gauges_at > GAUGE_REFRESH:
+            gauges = await self.count_gauges(guild_id)
+            await self.totals.update_one(
+                {"guild_id": str(guild_id)},
+                {"$set": {
+                    **{f"totals.{key}": value for key, value in gauges.items()},
+                    "gauges_at": datetime.utcnow()
+                }}
+            )
+            totals.update(gauges)
+        return totals
+
+    # ==================== Reads ====================
+
+    async def get_buckets(
+        self,
+        guild_id,
+        since: datetime,
+        granularity: str = DAY
+    ) -> List[Dict[str, Any]]:
+        """Get bucket documents for a guild since a point in time (oldest first)"""
+        cursor = self.buckets.find(
+            {
+                "guild_id": str(guild_id),
+                "granularity": granularity,
+                "bucket": {"$gte": bucket_start(since, granularity)}
+            },
+            {"_id": 0, "bucket": 1, "counters": 1}
+        ).sort("bucket", 1)
+        return await cursor.to_list(length=None)
+
+    async def get_counters(
+        self,
+        guild_id,
+        days: int = 30,
+        granularity: str = DAY
+    ) -> Dict[str, Any]:
+        """Sum all counters of a guild over the last N days"""
+        since = datetime.utcnow() - timedelta(days=days)
+        summed: Dict[str, Any] = {}
+        for bucket in await self.get_buckets(guild_id, since, granularity):
+            merge_counters(summed, bucket.get("counters", {}))
+        return summed
+
+    async def get_series(
+        self,
+        guild_id,
+        counter: str,
+        days: int = 7,
+        granularity: str = DAY
+    ) -> List[Dict[str, Any]]:
+        """Get a time series for a single (possibly dotted) counter"""
+        since = datetime.utcnow() - timedelta(days=days)
+        series = []
+        for bucket in await self.get_buckets(guild_id, since, granularity):
+            value: Any = bucket.get("counters", {})
+            for part in counter.split("."):
+                value = value.get(part, 0) if isinstance(value, dict) else 0
+            series.append({"bucket": bucket["bucket"], "value": value})
+        return series
+
+    async def get_totals(self, guild_id) -> Optional[Dict[str, Any]]:
+        """
+        Get running totals for a guild.
+
+        Returns None until every total in ``SEEDED_TOTALS`` was seeded from
+        the raw collections; increments recorded before that are partial.
+        Use ``load_totals`` to seed on demand.
+        """
+        doc = await self.totals.find_one(
+            {"guild_id": str(guild_id)},
+            {"_id": 0, "totals": 1, "seeded": 1}
+        )
+        if not doc or not doc.get("seeded"):
+            return None
+        totals = doc.get("totals", {})
+        if any(key not in totals for key in SEEDED_TOTALS):
+            return None
+        return totals
+
+
+class MetricsBuffer:
+    """Bucket counters of hot paths (e.g. XP per message) written in batches"""
+
+    def __init__(self, metrics: MetricsSchema, delay: float = 10.0):
+        """
+        Args:
+            metrics: Rollup store the buffered counters are written to
+            delay: Seconds between the first buffered event and the flush
+        """
+        self.metrics = metrics
+        self.counters = CounterBuffer(self._write, delay=delay, label="buffered metrics")
+
+    @property
+    def pending(self) -> int:
+        """Number of bucket documents waiting for the next flush"""
+        return self.counters.pending
+
+    def record(self, guild_id, counters: Dict[str, int], timestamp: Optional[datetime] = None):
+        """Add counters to the hourly and daily buckets (no I/O); a flush follows within ``delay`` seconds"""
+        timestamp = timestamp or datetime.utcnow()
+        for granularity in (HOUR, DAY):
+            self.counters.add((str(guild_id), granularity, bucket_start(timestamp, granularity)), counters)
+
+    async def _write(self, counts) -> int:
+        operations = [
+            self.metrics.bucket_operation(guild_id, granularity, bucket, counters)
+            for (guild_id, granularity, bucket), counters in counts.items()
+        ]
+        await self.metrics.buckets.bulk_write(operations, ordered=False)
+        return len(operations)
+
+    async def flush(self) -> int:
+        """Write the buffered counters. Returns the number of buckets updated."""
+        return await self.counters.flush()
@@ -16,6 +16,7 @@ from typing import Dict, Any
 sys.path.append(str(Path(__file__).parent.parent))
 
 from database.mongodb import MongoDB
+from database.indexes import ensure_indexes
 
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 logger = logging.getLogger(__name__)
@@ -194,18 +195,7 @@ class DataMigration:
         logger.info("\n🔍 Creating database indexes...")
         
         try:
-            # Guilds collection indexes
-            await self.db.db.guilds.create_index("guild_id", unique=True)
-            
-            # Channels collection indexes
-            await self.db.db.channels.create_index("channel_id", unique=True)
-            
-            # Users collection indexes
-            await self.db.db.users.create_index([("user_id", 1), ("guild_id", 1)], unique=True)
-            
-            # Ratings collection indexes
-            await self.db.db.ratings.create_index("user_id", unique=True)
-            
+            await ensure_indexes(self.db.db, collections=["guilds", "channels", "users", "ratings"])
             logger.info("✅ Indexes created successfully")
             
         except Exception as e:
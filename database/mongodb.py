@@ -10,6 +10,8 @@ from typing import Optional, Dict, List, Any
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 
+from .instrumentation import InstrumentedDatabase, instrumentation_enabled
+
 logger = logging.getLogger(__name__)
 
 
@@ -39,6 +41,9 @@ class MongoDB:
             # Get database name from environment or use default
             db_name = os.getenv('MONGODB_DB_NAME', 'kingdom77_bot')
             self.db = self.client[db_name]
+            if instrumentation_enabled():
+                # Per-collection latency/size statistics (see /debug)
+                self.db = InstrumentedDatabase(self.db)
             
             logger.info("✅ Successfully connected to MongoDB")
             return True
@@ -6,12 +6,15 @@ Collections:
 - premium_subscriptions: User/Guild subscriptions
 - premium_features: Available premium features
 - payment_history: Payment transactions
-- feature_usage: Feature usage tracking
+- feature_usage: Feature usage tracking (raw, sampled events)
+- feature_usage_daily: Daily feature usage rollups per guild
 """
 
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from database.indexes import ensure_indexes
 import os
 
 # MongoDB connection
@@ -27,28 +30,12 @@ class PremiumSchema:
         self.features = self.db.premium_features
         self.payments = self.db.payment_history
         self.usage = self.db.feature_usage
+        self.usage_daily = self.db.feature_usage_daily
     
     async def initialize(self):
         """Initialize collections and indexes"""
-        # Subscriptions indexes
-        await self.subscriptions.create_index("user_id")
-        await self.subscriptions.create_index("guild_id")
-        await self.subscriptions.create_index("status")
-        await self.subscriptions.create_index("expires_at")
-        await self.subscriptions.create_index([("user_id", 1), ("guild_id", 1)])
-        
-        # Features indexes
-        await self.features.create_index("feature_id", unique=True)
-        await self.features.create_index("tier")
-        
-        # Payments indexes
-        await self.payments.create_index("user_id")
-        await self.payments.create_index("stripe_payment_id")
-        await self.payments.create_index("created_at")
-        
-        # Usage indexes
-        await self.usage.create_index([("guild_id", 1), ("feature_id", 1)])
-        await self.usage.create_index("timestamp")
+        # Indexes are declared in database/indexes.py
+        await ensure_indexes(self.db, database="premium")
         
         # Initialize default features
         await self.initialize_default_features()
@@ -178,7 +165,8 @@ class PremiumSchema:
         guild_id: str,
         tier: str,
         duration_days: int,
-        stripe_subscription_id: Optional[str] = None
+        stripe_subscription_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Create a new premium subscription"""
         now = datetime.utcnow()
@@ -194,7 +182,7 @@ class PremiumSchema:
             "stripe_subscription_id": stripe_subscription_id,
             "auto_renew": True if stripe_subscription_id else False,
             "features": await self.get_tier_features(tier),
-            "metadata": {}
+            "metadata": metadata or {}
         }
         
         result = await self.subscriptions.insert_one(subscription)
@@ -235,12 +223,12 @@ class PremiumSchema:
         self,
         subscription_id: str,
         duration_days: int
-    ) -> bool:
-        """Renew subscription"""
+    ) -> Optional[str]:
+        """Renew subscription. Returns the guild ID when it was renewed."""
         from bson import ObjectId
         subscription = await self.subscriptions.find_one({"_id": ObjectId(subscription_id)})
         if not subscription:
-            return False
+            return None
         
         new_expires_at = subscription["expires_at"] + timedelta(days=duration_days)
         result = await self.subscriptions.update_one(
@@ -253,12 +241,12 @@ class PremiumSchema:
                 }
             }
         )
-        return result.modified_count > 0
+        return subscription["guild_id"] if result.modified_count > 0 else None
     
-    async def cancel_subscription(self, subscription_id: str) -> bool:
-        """Cancel subscription"""
+    async def cancel_subscription(self, subscription_id: str) -> Optional[str]:
+        """Cancel subscription. Returns the guild ID when it was cancelled."""
         from bson import ObjectId
-        result = await self.subscriptions.update_one(
+        subscription = await self.subscriptions.find_one_and_update(
             {"_id": ObjectId(subscription_id)},
             {
                 "$set": {
@@ -266,9 +254,10 @@ class PremiumSchema:
                     "auto_renew": False,
                     "cancelled_at": datetime.utcnow()
                 }
-            }
+            },
+            projection={"guild_id": 1}
         )
-        return result.modified_count > 0
+        return subscription["guild_id"] if subscription else None
     
     # Feature Operations
     
@@ -391,50 +380,100 @@ class PremiumSchema:
         
         await self.usage.insert_one(usage)
     
+    async def increment_usage_rollups(
+        self,
+        counts: Dict[tuple, int]
+    ) -> int:
+        """Apply buffered usage counts keyed by (guild_id, feature_id, day)"""
+        if not counts:
+            return 0
+        
+        operations = [
+            UpdateOne(
+                {"guild_id": guild_id, "feature_id": feature_id, "day": day},
+                {"$inc": {"count": count}},
+                upsert=True
+            )
+            for (guild_id, feature_id, day), count in counts.items()
+        ]
+        await self.usage_daily.bulk_write(operations, ordered=False)
+        return len(operations)
+    
+    async def insert_usage_events(self, events: List[Dict[str, Any]]):
+        """Insert sampled raw usage events"""
+        if events:
+            await self.usage.insert_many(events, ordered=False)
+    
     async def get_feature_usage_stats(
         self,
         guild_id: str,
         days: int = 30
     ) -> Dict[str, int]:
-        """Get feature usage statistics"""
+        """Get feature usage statistics from the daily rollups"""
         start_date = datetime.utcnow() - timedelta(days=days)
+        start_day = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
         
-        pipeline = [
-            {
-                "$match": {
-                    "guild_id": guild_id,
-                    "timestamp": {"$gte": start_date}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$feature_id",
-                    "count": {"$sum": 1}
-                }
-            }
-        ]
+        cursor = self.usage_daily.find(
+            {"guild_id": guild_id, "day": {"$gte": start_day}},
+            {"_id": 0, "feature_id": 1, "count": 1}
+        )
         
-        results = await self.usage.aggregate(pipeline).to_list(None)
-        return {item["_id"]: item["count"] for item in results}
+        stats: Dict[str, int] = {}
+        async for row in cursor:
+            stats[row["feature_id"]] = stats.get(row["feature_id"], 0) + row["count"]
+        return stats
     
     # Cleanup Operations
     
     async def cleanup_expired_subscriptions(self):
         """Mark expired subscriptions as inactive"""
+        now = datetime.utcnow()
         result = await self.subscriptions.update_many(
             {
                 "status": "active",
-                "expires_at": {"$lt": datetime.utcnow()}
+                "expires_at": {"$lt": now}
             },
             {
                 "$set": {
                     "status": "expired",
-                    "updated_at": datetime.utcnow()
+                    "expired_at": now,
+                    "updated_at": now
                 }
             }
         )
         return result.modified_count
     
+    async def get_expiring_subscriptions(self, until: datetime) -> List[Dict[str, Any]]:
+        """IDs and expiry of active subscriptions expiring before ``until`` (overdue included)"""
+        cursor = self.subscriptions.find(
+            {"status": "active", "expires_at": {"$lte": until}},
+            {"_id": 1, "expires_at": 1}
+        )
+        return await cursor.to_list(length=None)
+    
+    async def expire_subscriptions(self, subscription_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Expire the given subscriptions in one write.
+        
+        Subscriptions renewed since they were scheduled don't match the filter.
+        Returns the subscriptions this call expired.
+        """
+        from bson import ObjectId
+        ids = [ObjectId(subscription_id) for subscription_id in subscription_ids]
+        now = datetime.utcnow()
+        result = await self.subscriptions.update_many(
+            {"_id": {"$in": ids}, "status": "active", "expires_at": {"$lte": now}},
+            {"$set": {"status": "expired", "expired_at": now, "updated_at": now}}
+        )
+        if not result.modified_count:
+            return []
+        
+        cursor = self.subscriptions.find(
+            {"_id": {"$in": ids}, "status": "expired", "expired_at": now},
+            {"user_id": 1, "guild_id": 1, "tier": 1, "expires_at": 1, "metadata": 1}
+        )
+        return await cursor.to_list(length=None)
+    
     # Statistics
     
     async def get_subscription_stats(self) -> Dict[str, Any]:
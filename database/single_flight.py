@@ -0,0 +1,110 @@
+"""
+Single-Flight Read Cache
+In-memory cache of per-guild data read from the database, shared by the
+premium entitlements, level-role ladders, join snapshots and custom command
+tables.
+
+- A miss loads the value once: concurrent misses for the same key wait on
+  the load already in flight instead of issuing their own queries.
+- Values are served until ``expires_at`` (``refresh_seconds`` after the load
+  by default), so changes made by other processes are picked up.
+- ``invalidate`` drops one key or everything. Loads that were in flight
+  during an invalidation are returned to their callers but not cached.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlightCache:
+    """key -> value loaded on a miss, with collapsed concurrent loads"""
+
+    def __init__(self, refresh_seconds: float = 300):
+        """
+        Args:
+            refresh_seconds: Max age of a value before it is re-read
+        """
+        self.refresh_seconds = refresh_seconds
+        self._entries: Dict[Hashable, Tuple[Any, datetime]] = {}
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        # Bumped on every invalidation; loads that raced a write aren't cached
+        self._generation = 0
+        # Called with the key (or None) on invalidation, e.g. to notify other shards
+        self.on_invalidate: Optional[Callable[[Optional[Hashable]], None]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def expires_at(self, value: Any, now: datetime) -> datetime:
+        """When a value loaded at ``now`` stops being served"""
+        return now + timedelta(seconds=self.refresh_seconds)
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return a still-valid value without loading it"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, valid_until = entry
+        if valid_until <= datetime.utcnow():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        The cached value of ``key``, loaded with ``load()`` on a miss
+
+        ``load`` must not return None (None means "not cached").
+        """
+        value = self.peek(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+
+        # Collapse concurrent misses for the same key into one load
+        pending = self._pending.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        generation = self._generation
+        try:
+            value = await load()
+            if generation == self._generation:
+                self._entries[key] = (value, self.expires_at(value, datetime.utcnow()))
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else is waiting
+            future.exception()
+            raise
+        finally:
+            self._pending.pop(key, None)
+
+    def invalidate(self, key: Optional[Hashable] = None, propagate: bool = True):
+        """Drop one key's value, or everything when key is None"""
+        self._generation += 1
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+        if propagate and self.on_invalidate is not None:
+            self.on_invalidate(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
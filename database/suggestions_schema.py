@@ -10,9 +10,19 @@ Collections:
 """
 
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterable
 from enum import Enum
 
+# Seconds a guild's settings are served from memory (dashboard edits come from another process)
+SETTINGS_CACHE_SECONDS = 60
+
+# Vote type -> counter field on the suggestion document
+VOTE_COUNTERS = {
+    "upvote": "upvotes",
+    "downvote": "downvotes",
+    "neutral": "neutral_votes"
+}
+
 
 class SuggestionStatus(str, Enum):
     """حالات الاقتراح"""
@@ -33,6 +43,7 @@ class SuggestionsSchema:
         self.votes = db.suggestion_votes
         self.comments = db.suggestion_comments
         self.settings = db.suggestion_settings
+        self._settings_cache: Dict[str, Dict[str, Any]] = {}
     
     async def setup_indexes(self):
         """إنشاء الـ indexes للأداء الأفضل"""
@@ -242,57 +253,58 @@ class SuggestionsSchema:
         guild_id: int,
         suggestion_id: int,
         user_id: int,
-        vote_type: str  # upvote, downvote, neutral
+        vote_type: str,  # upvote, downvote, neutral
+        closed_statuses: Optional[Iterable[str]] = None
     ) -> Dict[str, Any]:
-        """إضافة أو تحديث صوت"""
+        """
+        إضافة أو تحديث صوت
+        
+        عملية upsert واحدة تعيد الصوت السابق، ثم $inc واحد للعدادات يعيد
+        الاقتراح المحدث (suggestion في النتيجة)
         
-        # التحقق من وجود صوت سابق
-        existing_vote = await self.votes.find_one({
+        Args:
+            closed_statuses: حالات لا يُقبل فيها التصويت؛ يُلغى الصوت إذا كان
+                الاقتراح غير موجود أو في إحدى هذه الحالات (changed = False)
+        """
+        vote_query = {
             "guild_id": str(guild_id),
             "suggestion_id": suggestion_id,
             "user_id": str(user_id)
-        })
+        }
+        now = datetime.utcnow()
         
-        if existing_vote:
-            old_vote_type = existing_vote["vote_type"]
-            
-            # تحديث الصوت
-            await self.votes.update_one(
-                {
-                    "guild_id": str(guild_id),
-                    "suggestion_id": suggestion_id,
-                    "user_id": str(user_id)
-                },
-                {
-                    "$set": {
-                        "vote_type": vote_type,
-                        "updated_at": datetime.utcnow()
-                    }
-                }
-            )
-            
-            # تحديث العدادات في الاقتراح
-            await self._update_vote_counters(guild_id, suggestion_id, old_vote_type, vote_type)
-            
-            return {"changed": True, "old_vote": old_vote_type, "new_vote": vote_type}
+        # الصوت السابق (None إذا كان صوتاً جديداً)
+        previous = await self.votes.find_one_and_update(
+            vote_query,
+            {
+                "$set": {"vote_type": vote_type, "updated_at": now},
+                "$setOnInsert": {"created_at": now}
+            },
+            projection={"vote_type": 1},
+            upsert=True
+        )
+        old_vote_type = previous["vote_type"] if previous else None
         
+        if old_vote_type == vote_type:
+            # نفس الصوت: لا تغيير في العدادات
+            suggestion = await self.get_suggestion(guild_id, suggestion_id)
+            if suggestion and suggestion["status"] not in (closed_statuses or ()):
+                return {"changed": True, "old_vote": old_vote_type, "new_vote": vote_type, "suggestion": suggestion}
         else:
-            # إضافة صوت جديد
-            vote = {
-                "guild_id": str(guild_id),
-                "suggestion_id": suggestion_id,
-                "user_id": str(user_id),
-                "vote_type": vote_type,
-                "created_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }
-            
-            await self.votes.insert_one(vote)
-            
-            # تحديث العدادات
-            await self._update_vote_counters(guild_id, suggestion_id, None, vote_type)
-            
-            return {"changed": True, "old_vote": None, "new_vote": vote_type}
+            # تحديث العدادات في الاقتراح
+            suggestion = await self._update_vote_counters(
+                guild_id, suggestion_id, old_vote_type, vote_type, closed_statuses
+            )
+            if suggestion is not None:
+                return {"changed": True, "old_vote": old_vote_type, "new_vote": vote_type, "suggestion": suggestion}
+        
+        # الاقتراح غير موجود أو مغلق: إرجاع الصوت كما كان
+        if previous is None:
+            await self.votes.delete_one(vote_query)
+        elif old_vote_type != vote_type:
+            await self.votes.update_one(vote_query, {"$set": {"vote_type": old_vote_type}})
+        
+        return {"changed": False, "old_vote": old_vote_type, "new_vote": vote_type, "suggestion": None}
     
     async def remove_vote(
         self,
@@ -302,8 +314,8 @@ class SuggestionsSchema:
     ) -> bool:
         """إزالة صوت"""
         
-        # الحصول على الصوت الحالي
-        vote = await self.votes.find_one({
+        # حذف الصوت والحصول عليه في عملية واحدة
+        vote = await self.votes.find_one_and_delete({
             "guild_id": str(guild_id),
             "suggestion_id": suggestion_id,
             "user_id": str(user_id)
@@ -312,19 +324,9 @@ class SuggestionsSchema:
         if not vote:
             return False
         
-        # حذف الصوت
-        result = await self.votes.delete_one({
-            "guild_id": str(guild_id),
-            "suggestion_id": suggestion_id,
-            "user_id": str(user_id)
-        })
-        
-        if result.deleted_count > 0:
-            # تحديث العدادات
-            await self._update_vote_counters(guild_id, suggestion_id, vote["vote_type"], None)
-            return True
-        
-        return False
+        # تحديث العدادات
+        await self._update_vote_counters(guild_id, suggestion_id, vote["vote_type"], None)
+        return True
     
     async def get_user_vote(
         self,
@@ -346,39 +348,39 @@ class SuggestionsSchema:
         guild_id: int,
         suggestion_id: int,
         old_vote: Optional[str],
-        new_vote: Optional[str]
-    ):
-        """تحديث عدادات الأصوات"""
+        new_vote: Optional[str],
+        closed_statuses: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        تحديث عدادات الأصوات
+        
+        Returns:
+            الاقتراح بعد التحديث (None إذا لم يوجد أو كانت حالته مغلقة)
+        """
         
         update_data = {}
         
         # إزالة الصوت القديم
-        if old_vote == "upvote":
-            update_data["upvotes"] = -1
-        elif old_vote == "downvote":
-            update_data["downvotes"] = -1
-        elif old_vote == "neutral":
-            update_data["neutral_votes"] = -1
+        if old_vote in VOTE_COUNTERS:
+            update_data[VOTE_COUNTERS[old_vote]] = -1
         
         # إضافة الصوت الجديد
-        if new_vote == "upvote":
-            update_data["upvotes"] = update_data.get("upvotes", 0) + 1
-        elif new_vote == "downvote":
-            update_data["downvotes"] = update_data.get("downvotes", 0) + 1
-        elif new_vote == "neutral":
-            update_data["neutral_votes"] = update_data.get("neutral_votes", 0) + 1
+        if new_vote in VOTE_COUNTERS:
+            field = VOTE_COUNTERS[new_vote]
+            update_data[field] = update_data.get(field, 0) + 1
+        
+        query = {
+            "guild_id": str(guild_id),
+            "suggestion_id": suggestion_id
+        }
+        if closed_statuses:
+            query["status"] = {"$nin": list(closed_statuses)}
         
+        update = {"$set": {"updated_at": datetime.utcnow()}}
         if update_data:
-            await self.suggestions.update_one(
-                {
-                    "guild_id": str(guild_id),
-                    "suggestion_id": suggestion_id
-                },
-                {
-                    "$inc": update_data,
-                    "$set": {"updated_at": datetime.utcnow()}
-                }
-            )
+            update["$inc"] = update_data
+        
+        return await self.suggestions.find_one_and_update(query, update, return_document=True)
     
     # ============= Comments System =============
     
@@ -438,7 +440,11 @@ class SuggestionsSchema:
     # ============= Settings Management =============
     
     async def get_settings(self, guild_id: int) -> Dict[str, Any]:
-        """الحصول على إعدادات النظام"""
+        """الحصول على إعدادات النظام (محفوظة في الذاكرة لمدة SETTINGS_CACHE_SECONDS)"""
+        cached = self._settings_cache.get(str(guild_id))
+        if cached is not None and cached["valid_until"] > datetime.utcnow():
+            return cached["settings"]
+        
         settings = await self.settings.find_one({"guild_id": str(guild_id)})
         
         if not settings:
@@ -480,6 +486,10 @@ class SuggestionsSchema:
             
             await self.settings.insert_one(settings)
         
+        self._settings_cache[str(guild_id)] = {
+            "settings": settings,
+            "valid_until": datetime.utcnow() + timedelta(seconds=SETTINGS_CACHE_SECONDS)
+        }
         return settings
     
     async def update_settings(
@@ -489,6 +499,7 @@ class SuggestionsSchema:
     ) -> bool:
         """تحديث الإعدادات"""
         settings_data["updated_at"] = datetime.utcnow()
+        self._settings_cache.pop(str(guild_id), None)
         
         result = await self.settings.update_one(
             {"guild_id": str(guild_id)},
@@ -6,7 +6,8 @@ Kingdom-77 Bot v3.0
 1. tickets - تخزين بيانات التذاكر
 2. ticket_categories - فئات التذاكر المختلفة
 3. guild_ticket_config - إعدادات نظام التذاكر للسيرفر
-4. ticket_transcripts - نصوص المحادثات المحفوظة
+4. ticket_transcripts - نصوص المحادثات المحفوظة (بيانات وصفية)
+5. ticket_transcript_chunks - رسائل النصوص مضغوطة على شكل أجزاء
 
 الميزات:
 - إنشاء تذاكر دعم خاصة
@@ -211,18 +212,30 @@ def create_ticket_transcript_document(
     ticket_number: int,
     user_id: int,
     category: str,
-    messages: List[Dict[str, Any]]
+    message_count: int,
+    participants: List[int],
+    started_at: Optional[datetime] = None,
+    chunk_count: int = 0,
+    raw_bytes: int = 0,
+    compressed_bytes: int = 0
 ) -> Dict[str, Any]:
     """
     إنشاء نص محادثة محفوظ للتذكرة
     
+    الرسائل نفسها محفوظة في ticket_transcript_chunks (أجزاء مضغوطة)
+    
     Args:
         guild_id: معرف السيرفر
         ticket_id: معرف التذكرة
         ticket_number: رقم التذكرة
         user_id: معرف المستخدم
         category: فئة التذكرة
-        messages: قائمة الرسائل
+        message_count: عدد الرسائل
+        participants: المشاركون في المحادثة
+        started_at: وقت أول رسالة
+        chunk_count: عدد الأجزاء المحفوظة
+        raw_bytes: حجم الرسائل قبل الضغط
+        compressed_bytes: حجم الرسائل بعد الضغط
     
     Returns:
         مستند MongoDB لنص المحادثة
@@ -233,12 +246,15 @@ def create_ticket_transcript_document(
         "ticket_number": ticket_number,
         "user_id": user_id,
         "category": category,
-        "messages": messages,  # [{author_id, author_name, content, timestamp, attachments}]
-        "message_count": len(messages),
-        "participants": list(set(msg["author_id"] for msg in messages)),
-        "created_at": messages[0]["timestamp"] if messages else datetime.utcnow(),
+        "message_count": message_count,
+        "participants": participants,
+        "created_at": started_at or datetime.utcnow(),
         "closed_at": datetime.utcnow(),
         "duration_hours": 0.0,
+        "storage": "chunks",
+        "chunk_count": chunk_count,
+        "raw_bytes": raw_bytes,
+        "compressed_bytes": compressed_bytes,
         "file_url": None,  # رابط ملف HTML/TXT
         "format": "json"
     }
@@ -14,6 +14,8 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any, TYPE_CHECKING
 import discord
 
+from joins.snapshot import join_snapshots
+
 if TYPE_CHECKING:
     from motor.motor_asyncio import AsyncIOMotorDatabase
 
@@ -169,6 +171,7 @@ class WelcomeSchema:
         }
         
         await self.settings.insert_one(settings)
+        join_snapshots.invalidate(guild_id)
         return settings
     
     async def update_settings(self, guild_id: int, updates: Dict) -> bool:
@@ -178,6 +181,7 @@ class WelcomeSchema:
             {"guild_id": guild_id},
             {"$set": updates}
         )
+        join_snapshots.invalidate(guild_id)
         return result.modified_count > 0
     
     async def enable_welcome(self, guild_id: int, enabled: bool) -> bool:
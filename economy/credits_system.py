@@ -13,7 +13,7 @@ Date: 2024
 """
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 import random
@@ -33,6 +33,10 @@ from database.credits_schema import (
     DAILY_CLAIM_COOLDOWN_HOURS,
     PREMIUM_COSTS
 )
+from scheduling import cooldowns
+
+# Daily claim cooldowns live in the shared cooldown store (expire on their own)
+DAILY_CLAIM_FEATURE = "credits_daily"
 
 
 class CreditsSystem:
@@ -49,14 +53,6 @@ class CreditsSystem:
     
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.daily_claim_cooldowns = {}  # Cache for cooldowns
-        
-        # Start background tasks
-        self.cleanup_expired_cooldowns.start()
-    
-    def cog_unload(self):
-        """Clean up when cog is unloaded."""
-        self.cleanup_expired_cooldowns.cancel()
     
     # ============================================================
     # BALANCE MANAGEMENT
@@ -203,21 +199,20 @@ class CreditsSystem:
         Returns:
             True if user can claim
         """
-        # Check cache first
-        if user_id in self.daily_claim_cooldowns:
-            cooldown_end = self.daily_claim_cooldowns[user_id]
-            if datetime.utcnow() < cooldown_end:
-                return False
+        # Check the cooldown store first
+        if await cooldowns.remaining(DAILY_CLAIM_FEATURE, user_id) is not None:
+            return False
         
         # Check database
         user = await UserCredits.get_user(user_id)
         if not user or not user.get('last_daily_claim'):
             return True
         
-        last_claim = user['last_daily_claim']
-        hours_since = (datetime.utcnow() - last_claim).total_seconds() / 3600
-        
-        return hours_since >= DAILY_CLAIM_COOLDOWN_HOURS
+        cooldown_end = user['last_daily_claim'] + timedelta(hours=DAILY_CLAIM_COOLDOWN_HOURS)
+        if datetime.utcnow() < cooldown_end:
+            await cooldowns.set(DAILY_CLAIM_FEATURE, user_id, until=cooldown_end)
+            return False
+        return True
     
     async def get_next_claim_time(self, user_id: int) -> Optional[datetime]:
         """
@@ -281,8 +276,8 @@ class CreditsSystem:
             }
         )
         
-        # Update cooldown cache
-        self.daily_claim_cooldowns[user_id] = datetime.utcnow() + timedelta(hours=DAILY_CLAIM_COOLDOWN_HOURS)
+        # Update cooldown store
+        await cooldowns.set(DAILY_CLAIM_FEATURE, user_id, seconds=DAILY_CLAIM_COOLDOWN_HOURS * 3600)
         
         # Get updated user
         updated_user = await UserCredits.get_user(user_id)
@@ -692,27 +687,6 @@ class CreditsSystem:
             'message': 'Failed to complete purchase'
         }
     
-    # ============================================================
-    # BACKGROUND TASKS
-    # ============================================================
-    
-    @tasks.loop(hours=1)
-    async def cleanup_expired_cooldowns(self):
-        """Clean up expired cooldown cache entries."""
-        now = datetime.utcnow()
-        expired = [
-            user_id for user_id, cooldown_end in self.daily_claim_cooldowns.items()
-            if now >= cooldown_end
-        ]
-        
-        for user_id in expired:
-            del self.daily_claim_cooldowns[user_id]
-    
-    @cleanup_expired_cooldowns.before_loop
-    async def before_cleanup(self):
-        """Wait for bot to be ready before starting task."""
-        await self.bot.wait_until_ready()
-    
     # ============================================================
     # EMBED HELPERS
     # ============================================================
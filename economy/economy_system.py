@@ -11,6 +11,8 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Tuple, Any
 import logging
 
+from scheduling import cooldowns
+
 logger = logging.getLogger(__name__)
 
 
@@ -202,17 +204,13 @@ class EconomySystem:
         Work to earn money
         Returns: (success, message, amount, emoji)
         """
-        # Check cooldown
-        wallet = await self.db.get_wallet(guild_id, user_id)
-        if wallet.get("last_work"):
-            now = datetime.utcnow()
-            last_work = wallet["last_work"]
-            cooldown_end = last_work + timedelta(seconds=self.default_settings["work_cooldown"])
-            
-            if now < cooldown_end:
-                remaining = cooldown_end - now
-                minutes = int(remaining.total_seconds() / 60)
-                return False, f"يجب الانتظار {minutes} دقيقة قبل العمل مرة أخرى!", 0, "⏳"
+        # Check cooldown, then claim it atomically so concurrent calls pay out once
+        remaining = await self.get_work_cooldown(guild_id, user_id)
+        if not remaining:
+            remaining = await self._claim_cooldown(guild_id, user_id, "economy_work", "work_cooldown")
+        if remaining:
+            minutes = int(remaining.total_seconds() / 60)
+            return False, f"يجب الانتظار {minutes} دقيقة قبل العمل مرة أخرى!", 0, "⏳"
         
         # Random work
         job_name, job_desc, emoji = random.choice(self.work_jobs)
@@ -238,18 +236,43 @@ class EconomySystem:
     
     async def get_work_cooldown(self, guild_id: int, user_id: int) -> Optional[timedelta]:
         """Get remaining work cooldown"""
-        wallet = await self.db.get_wallet(guild_id, user_id)
+        return await self._wallet_cooldown(guild_id, user_id, "economy_work", "last_work", "work_cooldown")
+    
+    async def _claim_cooldown(
+        self,
+        guild_id: int,
+        user_id: int,
+        feature: str,
+        setting: str
+    ) -> Optional[timedelta]:
+        """Start a wallet action's cooldown (SET NX PX); remaining time if another call won"""
+        remaining = await cooldowns.acquire(feature, f"{guild_id}:{user_id}", self.default_settings[setting])
+        return timedelta(seconds=remaining) if remaining is not None else None
+    
+    async def _wallet_cooldown(
+        self,
+        guild_id: int,
+        user_id: int,
+        feature: str,
+        field: str,
+        setting: str
+    ) -> Optional[timedelta]:
+        """Remaining cooldown of a wallet action (cooldown store first, wallet on a miss)"""
+        key = f"{guild_id}:{user_id}"
+        remaining = await cooldowns.remaining(feature, key)
+        if remaining is not None:
+            return timedelta(seconds=remaining)
         
-        if not wallet.get("last_work"):
+        wallet = await self.db.get_wallet(guild_id, user_id)
+        if not wallet.get(field):
             return None
         
         now = datetime.utcnow()
-        last_work = wallet["last_work"]
-        cooldown_end = last_work + timedelta(seconds=self.default_settings["work_cooldown"])
-        
+        cooldown_end = wallet[field] + timedelta(seconds=self.default_settings[setting])
         if now >= cooldown_end:
             return None
         
+        await cooldowns.set(feature, key, until=cooldown_end)
         return cooldown_end - now
     
     # ==================== CRIME SYSTEM ====================
@@ -259,17 +282,13 @@ class EconomySystem:
         Commit a crime
         Returns: (success, message, amount, emoji)
         """
-        # Check cooldown
-        wallet = await self.db.get_wallet(guild_id, user_id)
-        if wallet.get("last_crime"):
-            now = datetime.utcnow()
-            last_crime = wallet["last_crime"]
-            cooldown_end = last_crime + timedelta(seconds=self.default_settings["crime_cooldown"])
-            
-            if now < cooldown_end:
-                remaining = cooldown_end - now
-                minutes = int(remaining.total_seconds() / 60)
-                return False, f"يجب الانتظار {minutes} دقيقة قبل ارتكاب جريمة أخرى!", 0, "⏳"
+        # Check cooldown, then claim it atomically so concurrent calls pay out once
+        remaining = await self.get_crime_cooldown(guild_id, user_id)
+        if not remaining:
+            remaining = await self._claim_cooldown(guild_id, user_id, "economy_crime", "crime_cooldown")
+        if remaining:
+            minutes = int(remaining.total_seconds() / 60)
+            return False, f"يجب الانتظار {minutes} دقيقة قبل ارتكاب جريمة أخرى!", 0, "⏳"
         
         # Check if success
         success = random.random() < self.default_settings["crime_success_rate"]
@@ -314,19 +333,7 @@ class EconomySystem:
     
     async def get_crime_cooldown(self, guild_id: int, user_id: int) -> Optional[timedelta]:
         """Get remaining crime cooldown"""
-        wallet = await self.db.get_wallet(guild_id, user_id)
-        
-        if not wallet.get("last_crime"):
-            return None
-        
-        now = datetime.utcnow()
-        last_crime = wallet["last_crime"]
-        cooldown_end = last_crime + timedelta(seconds=self.default_settings["crime_cooldown"])
-        
-        if now >= cooldown_end:
-            return None
-        
-        return cooldown_end - now
+        return await self._wallet_cooldown(guild_id, user_id, "economy_crime", "last_crime", "crime_cooldown")
     
     # ==================== GAMBLING ====================
     
@@ -0,0 +1,228 @@
+"""
+Email Queue for Kingdom-77 Bot
+===============================
+Outbound email queue persisted in MongoDB (``email_queue`` collection).
+
+- ``enqueue`` stores the rendered email and wakes the workers, so callers
+  never wait on the email API.
+- A small pool of workers claims due emails in batches (see
+  ``EmailSchema.claim_pending_emails``) and sends each batch with one Resend
+  batch request. A batch rejected for its content falls back to single sends
+  (a few at a time) so one bad address doesn't fail the rest; a rate limit or
+  server error requeues the whole batch with backoff instead.
+- Results are written back in one bulk write per batch: sent, retried with
+  exponential backoff (rate limits, server errors) or failed.
+- Emails are only ever removed from ``pending`` by a claim, so a crash loses
+  nothing: claims older than ``stale_after`` go back to the queue.
+"""
+
+import os
+import uuid
+import socket
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+
+from .transport import EmailSendError, MAX_BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+RETRY_BACKOFF = timedelta(minutes=1)
+
+# Concurrent single sends when a rejected batch is split up
+SINGLE_SEND_CONCURRENCY = 4
+
+
+class EmailQueue:
+    """Persistent outbound queue with batched, concurrent delivery"""
+
+    def __init__(
+        self,
+        email_schema,
+        transport,
+        from_email: str,
+        reply_to: Optional[str] = None,
+        workers: int = 4,
+        batch_size: int = MAX_BATCH_SIZE,
+        poll_interval: float = 60,
+        stale_after: timedelta = timedelta(minutes=10)
+    ):
+        """
+        Args:
+            email_schema: EmailSchema (queue + log collections)
+            transport: ResendTransport (or anything with send/send_batch)
+            from_email: Sender address
+            reply_to: Reply-to address
+            workers: Concurrent senders
+            batch_size: Emails per claim / batch request
+            poll_interval: Seconds between queue checks when idle
+                (retries and scheduled emails become due without a wake-up)
+            stale_after: Age after which a ``sending`` claim is abandoned
+        """
+        self.schema = email_schema
+        self.transport = transport
+        self.from_email = from_email
+        self.reply_to = reply_to
+        self.workers = workers
+        self.batch_size = min(batch_size, MAX_BATCH_SIZE)
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self._claim_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self):
+        if self.running:
+            return
+        self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._recover_stale_claims()))
+        logger.info(f"📧 Email queue started ({self.workers} workers)")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.transport.close()
+
+    async def enqueue(
+        self,
+        to_email: str,
+        subject: str,
+        html_content: str,
+        email_type: str,
+        text_content: Optional[str] = None,
+        tags: Optional[List[Dict[str, str]]] = None,
+        priority: int = 5,
+        scheduled_for: Optional[datetime] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Optional[str]:
+        """Persist an email for delivery. Returns the queue ID (None if it couldn't be stored)."""
+        if text_content:
+            metadata = dict(metadata or {}, text_content=text_content)
+        email_id = await self.schema.queue_email(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            email_type=email_type,
+            priority=priority,
+            scheduled_for=scheduled_for,
+            metadata=metadata,
+            tags=tags
+        )
+        if email_id and scheduled_for is None:
+            self._wake.set()
+        return email_id
+
+    async def enqueue_many(self, emails: List[Dict[str, Any]]) -> int:
+        """
+        Persist many emails with one insert (``EmailSchema.queue_emails``).
+        Returns how many were queued; already queued ``dedupe_key``s are skipped.
+        """
+        queued = await self.schema.queue_emails(emails)
+        if queued:
+            self._wake.set()
+        return queued
+
+    # ==================== Workers ====================
+
+    async def _worker(self, index: int):
+        while True:
+            try:
+                claim = f"{self._claim_prefix}:{index}:{uuid.uuid4().hex}"
+                emails = await self.schema.claim_pending_emails(claim, limit=self.batch_size)
+                if emails:
+                    await self.deliver(emails)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in email queue worker {index}: {e}")
+
+            # Idle: sleep until something is enqueued or the next poll
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def _recover_stale_claims(self):
+        while True:
+            try:
+                if await self.schema.release_stale_claims(self.stale_after):
+                    self._wake.set()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error recovering stale email claims: {e}")
+            await asyncio.sleep(self.stale_after.total_seconds())
+
+    def _message(self, email: Dict[str, Any]) -> Dict[str, Any]:
+        message = {
+            "from": self.from_email,
+            "to": [email["to_email"]],
+            "subject": email["subject"],
+            "html": email["html_content"]
+        }
+        if self.reply_to:
+            message["reply_to"] = self.reply_to
+        text_content = (email.get("metadata") or {}).get("text_content")
+        if text_content:
+            message["text"] = text_content
+        if email.get("tags"):
+            message["tags"] = email["tags"]
+        return message
+
+    async def deliver(self, emails: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Send claimed emails and record the results. Returns counts per outcome."""
+        sent, retry, failed = [], [], []
+
+        try:
+            ids = await self.transport.send_batch([self._message(email) for email in emails])
+            sent = list(zip(emails, ids))
+        except EmailSendError as e:
+            if len(emails) == 1 or e.retryable:
+                # Rate limit / outage: splitting the batch would only add requests
+                if len(emails) > 1:
+                    logger.warning(f"Batch of {len(emails)} emails deferred ({e})")
+                for email in emails:
+                    self._classify_failure(email, e, retry, failed)
+            else:
+                logger.warning(f"Batch of {len(emails)} emails rejected ({e}), sending individually")
+                slots = asyncio.Semaphore(SINGLE_SEND_CONCURRENCY)
+
+                async def send_one(email):
+                    async with slots:
+                        return await self.transport.send(self._message(email))
+
+                results = await asyncio.gather(
+                    *(send_one(email) for email in emails),
+                    return_exceptions=True
+                )
+                for email, result in zip(emails, results):
+                    if isinstance(result, BaseException):
+                        self._classify_failure(email, result, retry, failed)
+                    else:
+                        sent.append((email, result))
+
+        await self.schema.record_results(sent, retry, failed)
+
+        if failed:
+            logger.error(f"📧 {len(failed)} email(s) failed permanently")
+        logger.info(f"📧 Email batch: {len(sent)} sent, {len(retry)} retrying, {len(failed)} failed")
+        return {"sent": len(sent), "retry": len(retry), "failed": len(failed)}
+
+    @staticmethod
+    def _classify_failure(email: Dict[str, Any], error: BaseException, retry: list, failed: list):
+        attempts = email.get("attempts", 0) + 1
+        retryable = getattr(error, "retryable", True)
+        if retryable and attempts < email.get("max_attempts", 3):
+            retry_at = datetime.utcnow() + RETRY_BACKOFF * (2 ** (attempts - 1))
+            retry.append((email, str(error), retry_at))
+        else:
+            failed.append((email, str(error)))
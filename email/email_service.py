@@ -5,22 +5,64 @@ Handles all email notifications using Resend with multi-language support
 """
 
 import os
+import html
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
-import resend
-from email_templates_i18n import get_email_template, get_supported_languages
+from .email_templates_i18n import get_email_template, get_supported_languages
+from .transport import ResendTransport, EmailSendError
 
 logger = logging.getLogger(__name__)
 
-# Initialize Resend
-resend.api_key = os.getenv("RESEND_API_KEY")
-
 # Email configuration
 FROM_EMAIL = os.getenv("FROM_EMAIL", "Kingdom-77 <notifications@kingdom77.com>")
 REPLY_TO_EMAIL = os.getenv("REPLY_TO_EMAIL", "support@kingdom77.com")
 DASHBOARD_URL = os.getenv("DASHBOARD_URL", "https://kingdom77.com")
 
+# Shared layout for the localized templates. Literal braces are doubled:
+# a compiled layout is a ``str.format`` template for the per-email variables.
+EMAIL_LAYOUT = """
+        <!DOCTYPE html>
+        <html dir="[direction]">
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; direction: [direction]; }}
+                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; text-align: [text_align]; }}
+                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
+                .content {{ background: #f9f9f9; padding: 30px; }}
+                .button {{ display: inline-block; background: #667eea; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
+                .footer {{ background: #333; color: #fff; padding: 20px; text-align: center; border-radius: 0 0 10px 10px; font-size: 12px; }}
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="header">
+                    <h1>[title]</h1>
+                </div>
+                <div class="content">
+                    <p>[greeting]</p>
+                    <p>[message]</p>
+                    [features_html]
+                    <div style="text-align: center;">
+                        <a href="{dashboard_url}" class="button">[cta]</a>
+                    </div>
+                </div>
+                <div class="footer">
+                    <p>[footer]</p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+
+class _TemplateVariables(dict):
+    """Missing template variables render as empty strings"""
+
+    def __missing__(self, key):
+        return ""
+
 
 class EmailService:
     """Service for sending transactional emails with multi-language support"""
@@ -31,6 +73,17 @@ class EmailService:
         self.reply_to = REPLY_TO_EMAIL
         self.dashboard_url = DASHBOARD_URL
         self.supported_languages = get_supported_languages()
+        self.transport = ResendTransport()
+        
+        # Persistent queue (email/email_queue.py); direct sends until attached
+        self.queue = None
+        
+        # (template_type, language) -> (subject, compiled layout)
+        self._compiled: Dict[Tuple[str, str], Tuple[str, str]] = {}
+    
+    def attach_queue(self, queue):
+        """Deliver emails through ``queue`` instead of sending inline"""
+        self.queue = queue
     
     def detect_user_language(self, user_id: str = None, guild_id: str = None) -> str:
         """
@@ -54,21 +107,42 @@ class EmailService:
         subject: str,
         html_content: str,
         text_content: Optional[str] = None,
-        tags: Optional[List[Dict[str, str]]] = None
+        tags: Optional[List[Dict[str, str]]] = None,
+        priority: int = 5
     ) -> bool:
         """
         Send an email using Resend
         
+        With a queue attached the email is persisted and sent by the queue
+        workers; otherwise it is sent right away.
+        
         Args:
             to_email: Recipient email address
             subject: Email subject
             html_content: HTML email content
             text_content: Plain text fallback (optional)
             tags: Email tags for tracking (optional)
+            priority: Queue priority (1=highest, 10=lowest)
             
         Returns:
-            True if email sent successfully
+            True if email was queued or sent successfully
         """
+        if self.queue is not None:
+            email_type = next(
+                (tag["value"] for tag in tags or [] if tag.get("name") == "category"),
+                "general"
+            )
+            email_id = await self.queue.enqueue(
+                to_email=to_email,
+                subject=subject,
+                html_content=html_content,
+                email_type=email_type,
+                text_content=text_content,
+                tags=tags,
+                priority=priority
+            )
+            return email_id is not None
+        
         try:
             params = {
                 "from": self.from_email,
@@ -84,89 +158,76 @@ class EmailService:
             if tags:
                 params["tags"] = tags
             
-            response = resend.Emails.send(params)
+            resend_id = await self.transport.send(params)
             
-            logger.info(f"Email sent to {to_email}: {subject} (ID: {response.get('id')})")
+            logger.info(f"Email sent to {to_email}: {subject} (ID: {resend_id})")
             return True
             
-        except Exception as e:
+        except EmailSendError as e:
             logger.error(f"Failed to send email to {to_email}: {e}")
             return False
     
-    def build_email_html(
+    def _compile_template(self, template_type: str, language: str) -> Tuple[str, str]:
+        """Layout with the localized strings filled in, cached per (template, language)"""
+        key = (template_type, language)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            return compiled
+        
+        template = get_email_template(language, template_type)
+        direction = "rtl" if language == "ar" else "ltr"
+        text_align = "right" if language == "ar" else "left"
+        
+        # Feature lists are plain text, so their braces are escaped
+        features_html = ""
+        if "features" in template:
+            features_html = f"<ul style='text-align: {text_align};'>" + "".join(
+                f"<li style='margin: 10px 0;'>{feature.replace('{', '{{').replace('}', '}}')}</li>"
+                for feature in template["features"]
+            ) + "</ul>"
+        
+        # Localized strings keep their {placeholders} for the per-email format
+        sections = {
+            "direction": direction,
+            "text_align": text_align,
+            "title": template.get("title", ""),
+            "greeting": template.get("greeting", ""),
+            "message": template.get("message", ""),
+            "features_html": features_html,
+            "cta": template.get("cta", ""),
+            "footer": template.get("footer", "")
+        }
+        layout = EMAIL_LAYOUT
+        for name, value in sections.items():
+            layout = layout.replace(f"[{name}]", value)
+        
+        compiled = (template.get("subject", ""), layout)
+        self._compiled[key] = compiled
+        return compiled
+    
+    def render_template(
         self,
-        template: Dict[str, Any],
+        template_type: str,
         variables: Dict[str, Any],
         language: str = "en"
-    ) -> str:
+    ) -> Tuple[str, str]:
         """
-        Build HTML email content from template
+        Render a localized template
         
         Args:
-            template: Email template dictionary
-            variables: Variables to fill in template
+            template_type: Template name in email_templates_i18n
+            variables: Variables to fill in template (HTML-escaped)
             language: Language code
             
         Returns:
-            HTML email content
+            (subject, HTML email content)
         """
-        # Direction for RTL languages (Arabic)
-        direction = "rtl" if language == "ar" else "ltr"
-        text_align = "right" if language == "ar" else "left"
-        
-        # Format template strings with variables
-        subject = template.get("subject", "").format(**variables)
-        greeting = template.get("greeting", "").format(**variables)
-        title = template.get("title", "").format(**variables)
-        message = template.get("message", "").format(**variables)
-        cta = template.get("cta", "").format(**variables)
-        footer = template.get("footer", "").format(**variables)
-        
-        # Build features list if exists
-        features_html = ""
-        if "features" in template:
-            features_html = "<ul style='text-align: {text_align};'>"
-            for feature in template["features"]:
-                features_html += f"<li style='margin: 10px 0;'>{feature}</li>"
-            features_html += "</ul>"
-        
-        # Build HTML
-        html = f"""
-        <!DOCTYPE html>
-        <html dir="{direction}">
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; direction: {direction}; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; text-align: {text_align}; }}
-                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
-                .content {{ background: #f9f9f9; padding: 30px; }}
-                .button {{ display: inline-block; background: #667eea; color: white; padding: 12px 30px; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
-                .footer {{ background: #333; color: #fff; padding: 20px; text-align: center; border-radius: 0 0 10px 10px; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>{title}</h1>
-                </div>
-                <div class="content">
-                    <p>{greeting}</p>
-                    <p>{message}</p>
-                    {features_html}
-                    <div style="text-align: center;">
-                        <a href="{variables.get('dashboard_url', '#')}" class="button">{cta}</a>
-                    </div>
-                </div>
-                <div class="footer">
-                    <p>{footer}</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html
+        subject, layout = self._compile_template(template_type, language)
+        values = _TemplateVariables(
+            (name, html.escape(str(value))) for name, value in variables.items()
+        )
+        values.setdefault("dashboard_url", "#")
+        return subject.format_map(_TemplateVariables(variables)), layout.format_map(values)
     
     # ==================== Subscription Emails (Multi-Language) ====================
     
@@ -203,9 +264,6 @@ class EmailService:
         if not language:
             language = self.detect_user_language(user_id)
         
-        # Get template
-        template = get_email_template(language, "subscription_confirmation")
-        
         # Variables for template
         variables = {
             "user_name": user_name,
@@ -217,14 +275,9 @@ class EmailService:
             "dashboard_url": self.dashboard_url
         }
         
-        # Build email
-        subject = template.get("subject", "✅ Welcome to Kingdom-77 Premium!")
-        html_content = self.build_email_html(template, variables, language)
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        # Build email (layout compiled once per template and language)
+        subject, html_content = self.render_template("subscription_confirmation", variables, language)
+        subject = subject or "✅ Welcome to Kingdom-77 Premium!"
         
         return await self.send_email(
             to_email=to_email,
@@ -233,6 +286,46 @@ class EmailService:
             tags=[{"name": "category", "value": "subscription_confirmation"}]
         )
     
+    async def send_subscription_expired(
+        self,
+        to_email: str,
+        user_name: str,
+        guild_name: str,
+        user_id: str = None,
+        language: str = None
+    ) -> bool:
+        """
+        Send subscription expired email in user's language
+        
+        Args:
+            to_email: Recipient email
+            user_name: User's name
+            guild_name: Server name
+            user_id: Discord user ID (for language detection)
+            language: Override language (optional)
+        
+        Returns:
+            True if email sent successfully
+        """
+        if not language:
+            language = self.detect_user_language(user_id)
+        
+        variables = {
+            "user_name": user_name,
+            "guild_name": guild_name,
+            "dashboard_url": f"{self.dashboard_url}/premium"
+        }
+        
+        subject, html_content = self.render_template("subscription_expired", variables, language)
+        subject = subject or "⏰ Kingdom-77 Premium Expired"
+        
+        return await self.send_email(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            tags=[{"name": "category", "value": "subscription_expired"}]
+        )
+    
     async def send_renewal_reminder(
         self,
         to_email: str,
@@ -632,6 +725,23 @@ class EmailService:
     ) -> bool:
         """Send weekly server summary"""
         
+        subject, html_content = self.build_weekly_summary(user_name, guild_name, stats)
+        
+        return await self.send_email(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            tags=[{"name": "category", "value": "weekly_summary"}]
+        )
+    
+    def build_weekly_summary(
+        self,
+        user_name: str,
+        guild_name: str,
+        stats: Dict[str, Any]
+    ) -> Tuple[str, str]:
+        """Render the weekly summary email. Returns (subject, HTML)."""
+        
         subject = f"📊 Weekly Summary for {guild_name}"
         
         html_content = f"""
@@ -680,6 +790,14 @@ class EmailService:
                             <div class="stat-number">{stats.get('tickets', 0)}</div>
                             <div class="stat-label">Tickets Created</div>
                         </div>
+                        <div class="stat-card">
+                            <div class="stat-number">{stats.get('moderation_actions', 0)}</div>
+                            <div class="stat-label">Moderation Actions</div>
+                        </div>
+                        <div class="stat-card">
+                            <div class="stat-number">{stats.get('coins_exchanged', 0):,}</div>
+                            <div class="stat-label">Coins Exchanged</div>
+                        </div>
                     </div>
                     
                     <h3>🏆 Top Members:</h3>
@@ -705,12 +823,7 @@ class EmailService:
         </html>
         """
         
-        return await self.send_email(
-            to_email=to_email,
-            subject=subject,
-            html_content=html_content,
-            tags=[{"name": "category", "value": "weekly_summary"}]
-        )
+        return subject, html_content
 
 
 # Global email service instance
@@ -1,7 +1,9 @@
 """
 Email Scheduler for Kingdom-77 Bot
 ===================================
-Handles scheduled email notifications like renewal reminders and trial endings
+Handles scheduled email notifications like renewal reminders and trial endings.
+Delivery itself goes through the outbound queue (email/email_queue.py);
+weekly summaries are a batch job (email/weekly_summary.py).
 """
 
 import asyncio
@@ -37,7 +39,6 @@ class EmailScheduler:
         # Start background tasks
         asyncio.create_task(self._renewal_reminders_task())
         asyncio.create_task(self._trial_ending_task())
-        asyncio.create_task(self._process_email_queue())
         
     async def stop(self):
         """Stop the email scheduler"""
@@ -221,125 +222,3 @@ class EmailScheduler:
                     
         except Exception as e:
             logger.error(f"Error in _send_trial_ending_reminders: {e}")
-    
-    # ==================== Email Queue Processor ====================
-    
-    async def _process_email_queue(self):
-        """Background task to process email queue"""
-        while self.running:
-            try:
-                from database.email_schema import EmailSchema
-                email_schema = EmailSchema(self.db)
-                
-                # Get pending emails
-                pending_emails = await email_schema.get_pending_emails(limit=50)
-                
-                if pending_emails:
-                    logger.info(f"Processing {len(pending_emails)} pending emails")
-                
-                for email in pending_emails:
-                    try:
-                        # Send email
-                        success = await self.email_service.send_email(
-                            to_email=email['to_email'],
-                            subject=email['subject'],
-                            html_content=email['html_content']
-                        )
-                        
-                        if success:
-                            # Mark as sent
-                            await email_schema.mark_email_sent(
-                                email_id=str(email['_id']),
-                                resend_id=None  # Would get from Resend response
-                            )
-                            
-                            # Log email
-                            await email_schema.log_email(
-                                to_email=email['to_email'],
-                                subject=email['subject'],
-                                email_type=email['email_type'],
-                                status='sent',
-                                metadata=email.get('metadata', {})
-                            )
-                        else:
-                            # Mark as failed
-                            await email_schema.mark_email_failed(
-                                email_id=str(email['_id']),
-                                error_message="Failed to send email",
-                                retry=True
-                            )
-                            
-                    except Exception as e:
-                        logger.error(f"Error processing email {email.get('_id')}: {e}")
-                        
-                        # Mark as failed
-                        await email_schema.mark_email_failed(
-                            email_id=str(email['_id']),
-                            error_message=str(e),
-                            retry=True
-                        )
-                
-            except Exception as e:
-                logger.error(f"Error in email queue processor: {e}")
-            
-            # Process queue every 5 minutes
-            await asyncio.sleep(5 * 60)
-    
-    # ==================== Weekly Summary ====================
-    
-    async def send_weekly_summary(
-        self,
-        user_id: str,
-        guild_id: str,
-        user_email: str,
-        user_name: str,
-        guild_name: str
-    ) -> bool:
-        """
-        Send weekly summary email to user
-        
-        This should be called by a weekly cron job or scheduled task
-        """
-        try:
-            from database.email_schema import EmailSchema
-            email_schema = EmailSchema(self.db)
-            
-            # Check email preferences
-            can_send = await email_schema.can_send_email(user_id, 'weekly_summary')
-            
-            if not can_send:
-                return False
-            
-            # Gather stats for the week
-            # TODO: Implement actual stats gathering from database
-            stats = {
-                'guild_id': guild_id,
-                'new_members': 15,  # Placeholder
-                'messages': 1234,  # Placeholder
-                'level_ups': 23,  # Placeholder
-                'tickets': 8,  # Placeholder
-                'top_members': [  # Placeholder
-                    'User1#1234',
-                    'User2#5678',
-                    'User3#9012',
-                    'User4#3456',
-                    'User5#7890'
-                ]
-            }
-            
-            # Send email
-            success = await self.email_service.send_weekly_summary(
-                to_email=user_email,
-                user_name=user_name,
-                guild_name=guild_name,
-                stats=stats
-            )
-            
-            if success:
-                logger.info(f"Sent weekly summary to {user_email} for guild {guild_id}")
-            
-            return success
-            
-        except Exception as e:
-            logger.error(f"Error sending weekly summary: {e}")
-            return False
@@ -0,0 +1,94 @@
+"""
+Resend HTTP Transport for Kingdom-77 Bot
+=========================================
+Async client for the Resend REST API (single and batch sends).
+
+The ``resend`` SDK is synchronous and blocked the event loop for every
+email; this talks to the same endpoints through aiohttp. ``RESEND_API_URL``
+points it at another server (e.g. a local stub in tests).
+"""
+
+import os
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+RESEND_API_URL = os.getenv("RESEND_API_URL", "https://api.resend.com")
+
+# Resend accepts at most 100 emails per batch request
+MAX_BATCH_SIZE = 100
+
+
+class EmailSendError(Exception):
+    """A send the API rejected (``retryable`` for rate limits/server errors)"""
+
+    def __init__(self, message: str, status: Optional[int] = None, retryable: bool = True):
+        super().__init__(message)
+        self.status = status
+        self.retryable = retryable
+
+
+class ResendTransport:
+    """Sends email payloads (Resend format) over one shared HTTP session"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        timeout: float = 15
+    ):
+        self.api_key = api_key if api_key is not None else os.getenv("RESEND_API_KEY")
+        self.base_url = (base_url or RESEND_API_URL).rstrip("/")
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            async with self._lock:
+                if self._session is None or self._session.closed:
+                    self._session = aiohttp.ClientSession(
+                        timeout=self.timeout,
+                        headers={"Authorization": f"Bearer {self.api_key}"}
+                    )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _post(self, path: str, payload: Any) -> Any:
+        session = await self._get_session()
+        try:
+            async with session.post(f"{self.base_url}{path}", json=payload) as response:
+                body = await response.json(content_type=None)
+                if response.status >= 400:
+                    message = body.get("message") if isinstance(body, dict) else str(body)
+                    raise EmailSendError(
+                        f"Resend {response.status}: {message}",
+                        status=response.status,
+                        retryable=response.status == 429 or response.status >= 500
+                    )
+                return body
+        except aiohttp.ClientError as e:
+            raise EmailSendError(f"Resend request failed: {e}") from e
+        except asyncio.TimeoutError as e:
+            raise EmailSendError("Resend request timed out") from e
+
+    async def send(self, message: Dict[str, Any]) -> Optional[str]:
+        """Send one email. Returns the Resend message ID."""
+        body = await self._post("/emails", message)
+        return body.get("id") if isinstance(body, dict) else None
+
+    async def send_batch(self, messages: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Send up to ``MAX_BATCH_SIZE`` emails in one request. Returns their IDs in order."""
+        if len(messages) == 1:
+            return [await self.send(messages[0])]
+        body = await self._post("/emails/batch", messages)
+        data = body.get("data", []) if isinstance(body, dict) else body
+        ids = [item.get("id") for item in data or []]
+        return ids + [None] * (len(messages) - len(ids))
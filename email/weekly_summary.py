@@ -0,0 +1,310 @@
+"""
+Weekly Summary Job for Kingdom-77 Bot
+======================================
+Builds the weekly summary email of every premium guild in one batch run.
+
+Guilds with an active subscription and a contact address are streamed in
+guild ID order and handled in chunks. Each chunk's stats come from one
+``$group`` aggregation per source instead of a set of queries per guild:
+
+- ``guild_metrics`` (daily buckets): messages, level ups, tickets, moderation
+- ``member_logs``: members who joined
+- ``user_levels``: top members by XP (``$topN``, MongoDB 5.2+)
+- ``transactions`` (economy): coins exchanged
+
+Rendered emails go into the outbound queue (email/email_queue.py) with a
+per-week dedupe key (also recorded when sending without a queue), and the
+last processed guild is checkpointed after every chunk: an interrupted run
+resumes after that guild and never queues the same summary twice.
+"""
+
+import html
+import uuid
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List
+
+from database.metrics_schema import DAY, merge_counters
+
+logger = logging.getLogger(__name__)
+
+JOB_NAME = "weekly_summary"
+CHUNK_SIZE = 200
+TOP_MEMBERS = 5
+EMAIL_PRIORITY = 8  # After transactional emails
+
+
+def last_week_start(now: Optional[datetime] = None) -> datetime:
+    """Monday 00:00 UTC of the last complete week"""
+    now = now or datetime.utcnow()
+    monday = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    return monday - timedelta(days=7)
+
+
+def _guild_id_values(guild_ids: List[str]) -> List[Any]:
+    """Guild IDs as stored by the different systems (str or int)"""
+    values: List[Any] = list(guild_ids)
+    values.extend(int(guild_id) for guild_id in guild_ids if guild_id.isdigit())
+    return values
+
+
+class WeeklySummaryJob:
+    """Resumable batch job: weekly stats -> summary emails in the queue"""
+
+    def __init__(
+        self,
+        bot_db,
+        premium_schema,
+        economy_db,
+        email_schema,
+        email_service,
+        bot=None,
+        chunk_size: int = CHUNK_SIZE
+    ):
+        """
+        Args:
+            bot_db: Main bot database (metrics, member logs, levels)
+            premium_schema: PremiumSchema (subscriptions = recipients)
+            economy_db: Economy database (transactions)
+            email_schema: EmailSchema (preferences, queue, checkpoints)
+            email_service: EmailService (rendering + queue)
+            bot: Bot used to resolve member names (optional)
+            chunk_size: Guilds per aggregation round
+        """
+        self.bot_db = bot_db
+        self.premium_schema = premium_schema
+        self.economy_db = economy_db
+        self.email_schema = email_schema
+        self.email_service = email_service
+        self.bot = bot
+        self.chunk_size = chunk_size
+        self.checkpoints = email_schema.db["job_checkpoints"]
+
+    async def run(self, week_start: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Queue the summaries of one week (default: the last complete week)
+
+        Returns:
+            Checkpoint document ({guilds, queued, last_guild_id, completed_at})
+        """
+        week_start = week_start or last_week_start()
+        week_end = week_start + timedelta(days=7)
+        checkpoint_id = f"{JOB_NAME}:{week_start:%Y-%m-%d}"
+
+        checkpoint = await self.checkpoints.find_one({"_id": checkpoint_id}) or {}
+        if checkpoint.get("completed_at"):
+            return checkpoint
+        if checkpoint.get("last_guild_id"):
+            logger.info(f"📊 Resuming weekly summaries after guild {checkpoint['last_guild_id']}")
+
+        started = datetime.utcnow()
+        chunk: List[Dict[str, Any]] = []
+        async for guild in self._recipients(checkpoint.get("last_guild_id")):
+            chunk.append(guild)
+            if len(chunk) >= self.chunk_size:
+                await self._process_chunk(checkpoint_id, chunk, week_start, week_end)
+                chunk = []
+        if chunk:
+            await self._process_chunk(checkpoint_id, chunk, week_start, week_end)
+
+        checkpoint = await self.checkpoints.find_one_and_update(
+            {"_id": checkpoint_id},
+            {
+                "$set": {"completed_at": datetime.utcnow(), "updated_at": datetime.utcnow()},
+                "$setOnInsert": {"week_start": week_start, "guilds": 0, "queued": 0}
+            },
+            upsert=True,
+            return_document=True
+        )
+        elapsed = (datetime.utcnow() - started).total_seconds()
+        logger.info(
+            f"📊 Weekly summaries for {week_start:%Y-%m-%d}: {checkpoint.get('queued', 0)} emails "
+            f"for {checkpoint.get('guilds', 0)} guilds ({elapsed:.1f}s this run)"
+        )
+        return checkpoint
+
+    # ==================== Recipients ====================
+
+    def _recipients(self, after_guild_id: Optional[str]):
+        """Premium guilds (ordered by ID) with the contacts of their subscriptions"""
+        match: Dict[str, Any] = {
+            "status": "active",
+            "expires_at": {"$gt": datetime.utcnow()},
+            "metadata.user_email": {"$exists": True, "$ne": None}
+        }
+        if after_guild_id:
+            match["guild_id"] = {"$gt": after_guild_id}
+
+        return self.premium_schema.subscriptions.aggregate([
+            {"$match": match},
+            {"$group": {
+                "_id": "$guild_id",
+                "recipients": {"$addToSet": {
+                    "user_id": "$user_id",
+                    "email": "$metadata.user_email",
+                    "user_name": "$metadata.user_name",
+                    "guild_name": "$metadata.guild_name"
+                }}
+            }},
+            {"$sort": {"_id": 1}}
+        ], allowDiskUse=True)
+
+    # ==================== Stats ====================
+
+    async def _process_chunk(
+        self,
+        checkpoint_id: str,
+        guilds: List[Dict[str, Any]],
+        week_start: datetime,
+        week_end: datetime
+    ):
+        guild_ids = [str(guild["_id"]) for guild in guilds]
+        stats = await self.collect_stats(guild_ids, week_start, week_end)
+
+        user_ids = list({recipient["user_id"] for guild in guilds for recipient in guild["recipients"]})
+        allowed = set(await self.email_schema.filter_recipients(user_ids, "weekly_summary"))
+
+        emails = []
+        for guild in guilds:
+            guild_id = str(guild["_id"])
+            for recipient in guild["recipients"]:
+                if recipient["user_id"] not in allowed:
+                    continue
+                subject, html_content = self.email_service.build_weekly_summary(
+                    user_name=recipient.get("user_name") or "User",
+                    guild_name=recipient.get("guild_name") or "Your Server",
+                    stats=stats[guild_id]
+                )
+                emails.append({
+                    "to_email": recipient["email"],
+                    "subject": subject,
+                    "html_content": html_content,
+                    "email_type": "weekly_summary",
+                    "priority": EMAIL_PRIORITY,
+                    "tags": [{"name": "category", "value": "weekly_summary"}],
+                    "metadata": {"guild_id": guild_id, "user_id": recipient["user_id"]},
+                    "dedupe_key": f"{checkpoint_id}:{guild_id}:{recipient['user_id']}"
+                })
+
+        queued = await self._enqueue(emails)
+
+        await self.checkpoints.update_one(
+            {"_id": checkpoint_id},
+            {
+                "$set": {"last_guild_id": guild_ids[-1], "updated_at": datetime.utcnow()},
+                "$inc": {"guilds": len(guild_ids), "queued": queued},
+                "$setOnInsert": {"week_start": week_start}
+            },
+            upsert=True
+        )
+
+    async def _enqueue(self, emails: List[Dict[str, Any]]) -> int:
+        if self.email_service.queue is not None:
+            return await self.email_service.queue.enqueue_many(emails)
+
+        # No queue attached: send directly. The emails are still recorded in
+        # the queue collection first, so their dedupe keys stop a re-run.
+        claim = f"{JOB_NAME}:{uuid.uuid4().hex}"
+        sent = 0
+        for email in await self.email_schema.reserve_emails(emails, claim):
+            if await self.email_service.send_email(
+                to_email=email["to_email"],
+                subject=email["subject"],
+                html_content=email["html_content"],
+                tags=email["tags"]
+            ):
+                await self.email_schema.mark_email_sent(email["_id"])
+                sent += 1
+            else:
+                await self.email_schema.mark_email_failed(email["_id"], "Direct send failed", retry=False)
+        return sent
+
+    async def collect_stats(
+        self,
+        guild_ids: List[str],
+        week_start: datetime,
+        week_end: datetime
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Weekly stats of many guilds (one aggregation per source)
+
+        Returns:
+            {guild_id: stats} with the keys used by ``build_weekly_summary``
+        """
+        id_values = _guild_id_values(guild_ids)
+        metrics, joins, top, economy = await asyncio.gather(
+            self._aggregate(self.bot_db.guild_metrics, [
+                {"$match": {
+                    "guild_id": {"$in": guild_ids},
+                    "granularity": DAY,
+                    "bucket": {"$gte": week_start, "$lt": week_end}
+                }},
+                {"$group": {
+                    "_id": "$guild_id",
+                    "messages": {"$sum": "$counters.messages"},
+                    "level_ups": {"$sum": "$counters.level_ups"},
+                    "tickets": {"$sum": "$counters.tickets_created"},
+                    "moderation": {"$push": "$counters.moderation_actions"}
+                }}
+            ]),
+            self._aggregate(self.bot_db.member_logs, [
+                {"$match": {
+                    "guild_id": {"$in": id_values},
+                    "log_type": "member_join",
+                    "timestamp": {"$gte": week_start, "$lt": week_end}
+                }},
+                {"$group": {"_id": {"$toString": "$guild_id"}, "count": {"$sum": 1}}}
+            ]),
+            self._aggregate(self.bot_db.user_levels, [
+                {"$match": {"guild_id": {"$in": id_values}}},
+                {"$group": {
+                    "_id": {"$toString": "$guild_id"},
+                    "top": {"$topN": {
+                        "n": TOP_MEMBERS,
+                        "sortBy": {"xp": -1},
+                        "output": {"user_id": "$user_id", "level": "$level"}
+                    }}
+                }}
+            ]),
+            self._aggregate(self.economy_db.transactions, [
+                {"$match": {
+                    "guild_id": {"$in": id_values},
+                    "timestamp": {"$gte": week_start, "$lt": week_end}
+                }},
+                {"$group": {"_id": {"$toString": "$guild_id"}, "coins": {"$sum": {"$abs": "$amount"}}}}
+            ])
+        )
+
+        stats = {}
+        for guild_id in guild_ids:
+            guild_metrics = metrics.get(guild_id, {})
+            moderation: Dict[str, int] = {}
+            for counters in guild_metrics.get("moderation", []):
+                merge_counters(moderation, counters)
+            stats[guild_id] = {
+                "guild_id": guild_id,
+                "new_members": joins.get(guild_id, {}).get("count", 0),
+                "messages": guild_metrics.get("messages", 0),
+                "level_ups": guild_metrics.get("level_ups", 0),
+                "tickets": guild_metrics.get("tickets", 0),
+                "moderation_actions": sum(moderation.values()),
+                "coins_exchanged": economy.get(guild_id, {}).get("coins", 0),
+                "top_members": [self._member_label(member) for member in top.get(guild_id, {}).get("top", [])]
+            }
+        return stats
+
+    @staticmethod
+    async def _aggregate(collection, pipeline: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        try:
+            return {doc["_id"]: doc async for doc in collection.aggregate(pipeline, allowDiskUse=True)}
+        except Exception as e:
+            logger.error(f"Error aggregating weekly stats from {collection.name}: {e}")
+            return {}
+
+    def _member_label(self, member: Dict[str, Any]) -> str:
+        user = None
+        if self.bot is not None and str(member.get("user_id", "")).isdigit():
+            user = self.bot.get_user(int(member["user_id"]))
+        name = user.display_name if user else f"User {member.get('user_id')}"
+        return f"{html.escape(name)} (Level {member.get('level', 0)})"
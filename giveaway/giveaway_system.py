@@ -18,6 +18,10 @@ import random
 from datetime import datetime, timedelta, timezone
 from typing import Optional, List, Dict, Tuple
 from database.giveaway_schema import GiveawayDatabase
+from scheduling import get_scheduler
+
+# نوع المهمة في جدول المواعيد (scheduling/deadlines.py)
+DEADLINE_KIND = "giveaway"
 
 
 class GiveawaySystem:
@@ -177,7 +181,12 @@ class GiveawaySystem:
             }
         }
         
-        return await self.db.create_giveaway(giveaway_data)
+        giveaway = await self.db.create_giveaway(giveaway_data)
+        
+        # إبلاغ جدول المواعيد مباشرة بدل انتظار الفحص الدوري
+        get_scheduler(self.bot).schedule(DEADLINE_KIND, giveaway_id, end_time)
+        
+        return giveaway
     
     # ===== Entities Calculation =====
     def calculate_user_entities(
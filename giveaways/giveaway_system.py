@@ -8,10 +8,14 @@ from discord import Member, Guild, TextChannel, Message
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Tuple
 import random
-import asyncio
+import time
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from database.giveaways_schema import GiveawaysSchema
+from scheduling import get_scheduler, to_timestamp
+
+# Job kind in the shared deadline scheduler
+DEADLINE_KIND = "reaction_giveaway"
 
 
 class GiveawaySystem:
@@ -21,34 +25,41 @@ class GiveawaySystem:
         self.db = db
         self.bot = bot
         self.schema = GiveawaysSchema(db)
-        self._task = None
+        self.scheduler = None
     
     def start_auto_end_task(self):
-        """Start background task to auto-end giveaways"""
-        if self._task is None or self._task.done():
-            self._task = asyncio.create_task(self._auto_end_loop())
+        """Register with the shared deadline scheduler (scheduling/deadlines.py)"""
+        self.scheduler = get_scheduler(self.bot)
+        self.scheduler.register(
+            DEADLINE_KIND,
+            self._on_deadline,
+            loader=self._load_deadlines
+        )
     
-    async def _auto_end_loop(self):
-        """Background loop to check and end giveaways"""
-        while True:
-            try:
-                await asyncio.sleep(60)  # Check every minute
-                
-                # Get giveaways that need to end
-                giveaways = await self.schema.get_ended_giveaways()
-                
-                for giveaway in giveaways:
-                    try:
-                        await self.end_giveaway(
-                            giveaway["guild_id"],
-                            giveaway["message_id"],
-                            auto_end=True
-                        )
-                    except Exception as e:
-                        print(f"Error auto-ending giveaway: {e}")
-                        
-            except Exception as e:
-                print(f"Error in auto-end loop: {e}")
+    async def _load_deadlines(self):
+        """Pending end times (stored as naive local time by create_giveaway)"""
+        giveaways = await self.schema.get_active_deadlines()
+        return [
+            ((giveaway["guild_id"], giveaway["message_id"]), to_timestamp(giveaway["end_time"], naive_is_utc=False))
+            for giveaway in giveaways
+        ]
+    
+    async def _on_deadline(self, key):
+        """End a giveaway once its end time is reached"""
+        guild_id, message_id = key
+        giveaway = await self.schema.get_giveaway(guild_id, message_id)
+        if not giveaway or giveaway["status"] != "active":
+            return
+        
+        # Extended since it was scheduled
+        end_time = to_timestamp(giveaway["end_time"], naive_is_utc=False)
+        if end_time > time.time():
+            self.scheduler.schedule(DEADLINE_KIND, key, end_time)
+            return
+        
+        result = await self.end_giveaway(guild_id, message_id, auto_end=True)
+        if not result.get("success") and result.get("error") not in ("Giveaway not found", "Giveaway already ended"):
+            raise RuntimeError(result.get("error"))
     
     async def create_giveaway(
         self,
@@ -94,6 +105,12 @@ class GiveawaySystem:
                 requirements
             )
             
+            # Wake the scheduler now instead of waiting for the next resync
+            if self.scheduler:
+                self.scheduler.schedule(
+                    DEADLINE_KIND, (guild.id, message.id), end_time, naive_is_utc=False
+                )
+            
             return {
                 "success": True,
                 "message_id": message.id,
@@ -668,6 +685,8 @@ class GiveawaySystem:
             
             # Mark as cancelled
             await self.schema.cancel_giveaway(guild_id, message_id)
+            if self.scheduler:
+                self.scheduler.cancel(DEADLINE_KIND, (guild_id, message_id))
             
             # Update message
             guild = self.bot.get_guild(guild_id)
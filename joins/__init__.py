@@ -0,0 +1,16 @@
+"""
+Joins Package
+Member-join pipeline shared by auto-roles, welcome and join logging: the
+per-guild join-rate window, cached config snapshots and surge batching
+"""
+
+from .window import JoinRateWindow, join_rate
+from .snapshot import JoinSnapshot, JoinSnapshotCache, join_snapshots
+from .pipeline import JoinPipeline, JoinMetrics, get_join_pipeline, publish_join_metrics
+
+__all__ = [
+    "JoinRateWindow", "join_rate",
+    "JoinSnapshot", "JoinSnapshotCache", "join_snapshots",
+    "JoinPipeline", "JoinMetrics", "get_join_pipeline", "publish_join_metrics"
+]
+__version__ = "4.0.0"
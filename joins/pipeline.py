@@ -0,0 +1,442 @@
+"""
+Join Pipeline
+One handler for ``on_member_join`` that feeds auto-roles, welcome and join
+logging from a shared snapshot.
+
+Normal joins are handled inline:
+
+1. ``join_snapshots`` gives the guild's settings (memory, no query)
+2. ``join_rate`` counts the join (memory, replaces the anti-raid query)
+3. join roles and welcome auto roles are granted with one role request
+4. the welcome message / captcha is sent and the join is logged
+5. the ``join_history`` / ``member_logs`` rows are buffered and written with
+   ``insert_many`` every ``WRITE_FLUSH_SECONDS``
+
+When a guild's join rate reaches its surge threshold (its anti-raid
+threshold, or ``DEFAULT_SURGE_THRESHOLD``) joins are queued instead. A worker
+per guild drains the queue every ``SURGE_BATCH_INTERVAL`` seconds: role
+requests are paced to ``SURGE_EDITS_PER_SECOND``, a batch gets one welcome
+message and one log embed per channel, DMs and cards are skipped, and with
+anti-raid on the welcome is suppressed as before. The guild leaves surge mode
+once its rate falls below half the threshold.
+
+Join latency (event -> done, including queue wait) is kept as a histogram in
+``JoinMetrics`` and published next to the query statistics.
+"""
+
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import discord
+from pymongo import UpdateOne
+
+from database.counter_buffer import CounterBuffer
+from database.instrumentation import InstrumentedDatabase, OperationStats
+from .window import JoinRateWindow, join_rate
+from .snapshot import JoinSnapshot, JoinSnapshotCache, join_snapshots
+
+logger = logging.getLogger(__name__)
+
+# Joins per window that switch a guild without anti-raid to batched handling
+DEFAULT_SURGE_THRESHOLD = 20
+SURGE_BATCH_SIZE = 50
+SURGE_BATCH_INTERVAL = 2.0
+SURGE_EDITS_PER_SECOND = 5.0
+WRITE_FLUSH_SECONDS = 2.0
+# Accounts younger than this are flagged in join logs
+NEW_ACCOUNT_DAYS = 7
+
+
+class JoinMetrics:
+    """Join counters and latency histograms"""
+
+    def __init__(self):
+        self.latency = OperationStats()
+        self.queue_wait = OperationStats()
+        self.joins = 0
+        self.inline = 0
+        self.queued = 0
+        self.batches = 0
+        self.role_requests = 0
+        self.skipped = 0
+        self.errors = 0
+        self.started_at = datetime.utcnow()
+
+    def record_join(self, started: float, waited: Optional[float] = None):
+        """Count a handled join (``perf_counter`` of the event, seconds spent queued)"""
+        self.latency.observe((time.perf_counter() - started) * 1000)
+        if waited is not None:
+            self.queue_wait.observe(waited * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "joins": self.joins,
+            "inline": self.inline,
+            "queued": self.queued,
+            "batches": self.batches,
+            "role_requests": self.role_requests,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "latency": self.latency.to_dict(),
+            "queue_wait": self.queue_wait.to_dict()
+        }
+
+
+def account_age_days(member: discord.Member) -> int:
+    return (datetime.utcnow() - member.created_at.replace(tzinfo=None)).days
+
+
+class JoinPipeline:
+    """Member-join handling of one bot process"""
+
+    def __init__(
+        self,
+        bot,
+        db,
+        window: JoinRateWindow = join_rate,
+        snapshots: JoinSnapshotCache = join_snapshots
+    ):
+        # Imported here: both systems import joins.snapshot for invalidation
+        from autoroles.autorole_system import AutoRoleSystem
+        from welcome.welcome_system import WelcomeSystem
+
+        self.bot = bot
+        self.db = db
+        self.window = window
+        self.snapshots = snapshots
+        self.autoroles = AutoRoleSystem(db)
+        self.welcome = WelcomeSystem(db)
+        self.metrics = JoinMetrics()
+
+        self._surging: Set[int] = set()
+        self._queues: Dict[int, List[Tuple[discord.Member, float]]] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._next_edit = 0.0
+
+        # collection -> buffered rows; guild_id -> counters per settings collection
+        self._rows: Dict[str, List[Dict[str, Any]]] = {"join_history": [], "member_logs": []}
+        self._counters: Dict[str, CounterBuffer] = {
+            collection: CounterBuffer(
+                lambda counts, collection=collection: self._write_counters(collection, counts),
+                label=f"{collection} join counters"
+            )
+            for collection in ("welcome_settings", "server_logs_settings")
+        }
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    # ==================== Entry point ====================
+
+    async def handle(self, member: discord.Member):
+        """Handle one ``on_member_join``"""
+        started = time.perf_counter()
+        guild_id = member.guild.id
+        self.metrics.joins += 1
+
+        joins = self.window.record(guild_id)
+        snapshot = await self.snapshots.get(self.db, guild_id)
+        if snapshot.idle:
+            self.metrics.skipped += 1
+            return
+
+        if self._update_surge(guild_id, joins, snapshot):
+            self.metrics.queued += 1
+            self._queues.setdefault(guild_id, []).append((member, started))
+            worker = self._workers.get(guild_id)
+            if worker is None or worker.done():
+                self._workers[guild_id] = asyncio.create_task(self._drain(guild_id))
+            return
+
+        self.metrics.inline += 1
+        try:
+            await self._process(member, snapshot, joins)
+        except Exception as e:
+            self.metrics.errors += 1
+            logger.error(f"Error handling join of {member.id} in {guild_id}: {e}")
+        self.metrics.record_join(started)
+
+    def surge_threshold(self, snapshot: JoinSnapshot) -> int:
+        return snapshot.anti_raid_threshold or DEFAULT_SURGE_THRESHOLD
+
+    def _update_surge(self, guild_id: int, joins: int, snapshot: JoinSnapshot) -> bool:
+        """Enter surge mode at the threshold, leave it below half of it"""
+        threshold = self.surge_threshold(snapshot)
+        if guild_id in self._surging:
+            if joins < max(1, threshold // 2):
+                self._surging.discard(guild_id)
+                logger.info(f"Join surge over in guild {guild_id}")
+        elif joins >= threshold:
+            self._surging.add(guild_id)
+            logger.warning(f"Join surge in guild {guild_id}: {joins} joins/{self.window.window_seconds:.0f}s")
+        return guild_id in self._surging
+
+    def is_surging(self, guild_id: int) -> bool:
+        return guild_id in self._surging
+
+    # ==================== Inline path ====================
+
+    async def _process(self, member: discord.Member, snapshot: JoinSnapshot, joins: int):
+        raid = self.welcome._check_anti_raid(snapshot.welcome, joins)
+        join_roles = snapshot.join_roles_for(member.bot)
+        if not raid:
+            join_roles = join_roles + snapshot.welcome_roles()
+
+        granted = await self.autoroles.assign_join_roles(member, join_roles)
+        if granted:
+            self.metrics.role_requests += 1
+
+        welcome_sent = False
+        if snapshot.welcome_enabled and not raid:
+            welcome_sent = await self.welcome.welcome_member(member, snapshot.welcome)
+        self._record_rows(member, snapshot, welcome_sent, bool(granted))
+
+        channel = self._log_channel(member.guild, snapshot)
+        if channel:
+            try:
+                await channel.send(embed=self._join_embed(member))
+            except Exception as e:
+                logger.error(f"Failed to send member join log: {e}")
+
+    # ==================== Surge path ====================
+
+    async def _drain(self, guild_id: int):
+        """Process a guild's queued joins in batches until the queue is empty"""
+        while self._queues.get(guild_id):
+            await asyncio.sleep(SURGE_BATCH_INTERVAL)
+            queue = self._queues[guild_id]
+            batch, self._queues[guild_id] = queue[:SURGE_BATCH_SIZE], queue[SURGE_BATCH_SIZE:]
+            try:
+                await self._process_batch(guild_id, batch)
+            except Exception as e:
+                self.metrics.errors += len(batch)
+                logger.error(f"Error handling join batch in {guild_id}: {e}")
+        self._queues.pop(guild_id, None)
+        self._workers.pop(guild_id, None)
+
+    async def _process_batch(self, guild_id: int, batch: List[Tuple[discord.Member, float]]):
+        self.metrics.batches += 1
+        picked = time.perf_counter()
+        snapshot = await self.snapshots.get(self.db, guild_id)
+        # A surge with anti-raid on is a raid: no welcome, no welcome roles
+        raid = snapshot.anti_raid_threshold is not None
+
+        members = []
+        for member, started in batch:
+            # Kicked/banned (or left) while queued
+            if member.guild.get_member(member.id) is None:
+                self.metrics.skipped += 1
+                continue
+            members.append((member, started))
+
+        granted = {}
+        for member, _ in members:
+            join_roles = snapshot.join_roles_for(member.bot)
+            if not raid:
+                join_roles = join_roles + snapshot.welcome_roles()
+            if not join_roles:
+                continue
+            await self._pace()
+            granted[member.id] = await self.autoroles.assign_join_roles(member, join_roles)
+            if granted[member.id]:
+                self.metrics.role_requests += 1
+
+        welcome_sent = False
+        if members and snapshot.welcome_enabled and not raid:
+            welcome_sent = await self.welcome.welcome_members([member for member, _ in members], snapshot.welcome)
+
+        for member, _ in members:
+            self._record_rows(member, snapshot, welcome_sent, bool(granted.get(member.id)))
+
+        channel = self._log_channel(members[0][0].guild, snapshot) if members else None
+        if channel:
+            try:
+                await channel.send(embed=self._surge_embed([member for member, _ in members]))
+            except Exception as e:
+                logger.error(f"Failed to send member join log: {e}")
+
+        for member, started in members:
+            self.metrics.record_join(started, picked - started)
+
+    async def _pace(self):
+        """Space role requests SURGE_EDITS_PER_SECOND apart"""
+        loop = asyncio.get_running_loop()
+        delay = self._next_edit - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self._next_edit = max(loop.time(), self._next_edit) + 1 / SURGE_EDITS_PER_SECOND
+
+    # ==================== Join logs ====================
+
+    def _log_channel(self, guild: discord.Guild, snapshot: JoinSnapshot):
+        channel_id = snapshot.log_channel_id
+        return guild.get_channel(channel_id) if channel_id else None
+
+    def _join_embed(self, member: discord.Member) -> discord.Embed:
+        age = account_age_days(member)
+        embed = discord.Embed(
+            title="📥 Member Joined",
+            description=f"{member.mention} joined the server",
+            color=discord.Color.green(),
+            timestamp=datetime.utcnow()
+        )
+        embed.set_thumbnail(url=member.display_avatar.url)
+        embed.add_field(name="Username", value=str(member), inline=True)
+        embed.add_field(name="ID", value=f"`{member.id}`", inline=True)
+        embed.add_field(name="Account Age", value=f"{age} days", inline=True)
+        embed.add_field(name="Created At", value=f"<t:{int(member.created_at.timestamp())}:F>", inline=False)
+        embed.add_field(name="Member Count", value=str(member.guild.member_count), inline=True)
+        if age < NEW_ACCOUNT_DAYS:
+            embed.add_field(name="⚠️ Warning", value="This account is less than 7 days old", inline=False)
+        embed.set_footer(text=f"User ID: {member.id}")
+        return embed
+
+    def _surge_embed(self, members: List[discord.Member]) -> discord.Embed:
+        new_accounts = sum(1 for member in members if account_age_days(member) < NEW_ACCOUNT_DAYS)
+        mentions = " ".join(member.mention for member in members)
+        embed = discord.Embed(
+            title=f"📥 {len(members)} Members Joined",
+            description=mentions[:4000],
+            color=discord.Color.orange(),
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(name="New Accounts (<7 days)", value=str(new_accounts), inline=True)
+        embed.add_field(
+            name="Join Rate",
+            value=f"{self.window.count(members[0].guild.id)} / {self.window.window_seconds:.0f}s",
+            inline=True
+        )
+        embed.add_field(name="Member Count", value=str(members[0].guild.member_count), inline=True)
+        embed.set_footer(text="Join surge - joins are logged in batches")
+        return embed
+
+    # ==================== Buffered writes ====================
+
+    def _record_rows(self, member: discord.Member, snapshot: JoinSnapshot, welcome_sent: bool, roles_given: bool):
+        """Buffer the join_history / member_logs rows of a join (no I/O)"""
+        guild_id = member.guild.id
+        now = datetime.utcnow()
+        age = account_age_days(member)
+        base = {
+            "guild_id": guild_id,
+            "user_id": member.id,
+            "username": member.name,
+            "discriminator": member.discriminator,
+            "avatar_url": str(member.display_avatar.url),
+            "account_age_days": age,
+            "is_bot": member.bot,
+            "timestamp": now
+        }
+
+        if snapshot.welcome_enabled:
+            captcha = snapshot.captcha_enabled
+            self._rows["join_history"].append({
+                **base,
+                "welcome_sent": welcome_sent,
+                "captcha_required": captcha,
+                "captcha_verified": False if captcha else None,
+                "auto_roles_given": roles_given
+            })
+            if welcome_sent:
+                self._count("welcome_settings", guild_id, "stats.total_welcomes")
+
+        if snapshot.logs_joins:
+            self._rows["member_logs"].append({**base, "log_type": "member_join"})
+            self._count("server_logs_settings", guild_id, "stats.total_logs")
+            self._count("server_logs_settings", guild_id, "stats.logs_today")
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    def _count(self, collection: str, guild_id: int, field: str):
+        self._counters[collection].add(guild_id, {field: 1})
+
+    async def _write_counters(self, collection: str, counts) -> int:
+        now = datetime.utcnow()
+        last_field = "stats.last_welcome" if collection == "welcome_settings" else "stats.last_log"
+        operations = [
+            UpdateOne({"guild_id": guild_id}, {"$inc": fields, "$set": {last_field: now}})
+            for guild_id, fields in counts.items()
+        ]
+        await self.db[collection].bulk_write(operations, ordered=False)
+        return len(operations)
+
+    @property
+    def pending_rows(self) -> int:
+        return sum(len(rows) for rows in self._rows.values())
+
+    async def _flush_later(self):
+        await asyncio.sleep(WRITE_FLUSH_SECONDS)
+        await self.flush()
+
+    async def flush(self) -> int:
+        """Write the buffered rows and counters. Returns the number of rows written."""
+        async with self._flush_lock:
+            rows = self._rows
+            self._rows = {collection: [] for collection in rows}
+
+            written = 0
+            for collection, docs in rows.items():
+                if not docs:
+                    continue
+                try:
+                    await self.db[collection].insert_many(docs, ordered=False)
+                    written += len(docs)
+                except Exception as e:
+                    logger.error(f"Error writing {len(docs)} {collection} rows: {e}")
+
+            for counters in self._counters.values():
+                await counters.flush()
+            return written
+
+    async def stop(self, timeout: Optional[float] = None):
+        """
+        Finish queued joins and write everything that is buffered
+
+        Args:
+            timeout: Seconds to wait for the surge queues (the rows and
+                counters buffered so far are written either way)
+        """
+        workers = [task for task in self._workers.values() if not task.done()]
+        if workers:
+            _, pending = await asyncio.wait(workers, timeout=timeout)
+            if pending:
+                logger.warning(f"Join pipeline stopped with {len(pending)} guild queues unfinished")
+                for task in pending:
+                    task.cancel()
+        await self.flush()
+
+    # ==================== Metrics ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.metrics.snapshot(),
+            "surging_guilds": sorted(self._surging),
+            "queued_now": sum(len(queue) for queue in self._queues.values()),
+            "pending_rows": self.pending_rows,
+            "busiest_guilds": [
+                {"guild_id": guild_id, "joins": joins} for guild_id, joins in self.window.busiest()
+            ],
+            "snapshots": self.snapshots.get_stats()
+        }
+
+
+def get_join_pipeline(bot, db) -> JoinPipeline:
+    """The bot's join pipeline (created on first use)"""
+    pipeline = getattr(bot, "join_pipeline", None)
+    if pipeline is None:
+        pipeline = JoinPipeline(bot, db)
+        bot.join_pipeline = pipeline
+    return pipeline
+
+
+async def publish_join_metrics(db, pipeline: JoinPipeline, source: str = "bot:joins"):
+    """Store the join metrics next to the query statistics (read by the dashboard)"""
+    if isinstance(db, InstrumentedDatabase):
+        db = db.unwrapped
+    snapshot = pipeline.get_stats()
+    snapshot["updated_at"] = datetime.utcnow()
+    await db.query_stats.replace_one({"_id": source}, snapshot, upsert=True)
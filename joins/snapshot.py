@@ -0,0 +1,116 @@
+"""
+Join Config Snapshots
+Everything a member join needs from the database, read once per guild.
+
+A join used to read the welcome settings (twice with anti-raid), the
+auto-roles config, the join roles and the logging settings. A
+``JoinSnapshot`` holds all four, loaded with one concurrent round of
+queries and reused by every join of the guild for ``refresh_seconds``.
+Writes through the welcome/logging schemas and ``AutoRoleSystem`` drop the
+guild's snapshot; the expiry picks up dashboard edits.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from database.single_flight import SingleFlightCache
+
+SNAPSHOT_SECONDS = 30
+
+
+class JoinSnapshot:
+    """Join-related settings of one guild"""
+
+    __slots__ = ("guild_id", "welcome", "autoroles", "join_roles", "logging")
+
+    def __init__(
+        self,
+        guild_id: int,
+        welcome: Optional[Dict[str, Any]] = None,
+        autoroles: Optional[Dict[str, Any]] = None,
+        join_roles: Optional[List[Dict[str, Any]]] = None,
+        logging: Optional[Dict[str, Any]] = None
+    ):
+        self.guild_id = guild_id
+        self.welcome = welcome or {}
+        self.autoroles = autoroles or {}
+        self.join_roles = join_roles or []
+        self.logging = logging or {}
+
+    @property
+    def welcome_enabled(self) -> bool:
+        return bool(self.welcome.get("enabled", False))
+
+    @property
+    def captcha_enabled(self) -> bool:
+        return self.welcome_enabled and bool(self.welcome.get("captcha_enabled", False))
+
+    @property
+    def anti_raid_threshold(self) -> Optional[int]:
+        """Joins per window that count as a raid (None when anti-raid is off)"""
+        if not self.welcome_enabled or not self.welcome.get("anti_raid_enabled", False):
+            return None
+        return self.welcome.get("anti_raid_threshold", 10)
+
+    @property
+    def logs_joins(self) -> bool:
+        """Whether member joins are logged (settings of the logging system)"""
+        return bool(self.logging.get("enabled")) and bool(
+            self.logging.get("log_types", {}).get("member_join", False)
+        )
+
+    @property
+    def log_channel_id(self) -> Optional[int]:
+        if not self.logs_joins:
+            return None
+        return self.logging.get("channels", {}).get("member_logs")
+
+    def join_roles_for(self, is_bot: bool) -> List[Dict[str, Any]]:
+        """Join roles of a new member (same filter as ``get_join_roles_for_target_query``)"""
+        if not self.autoroles.get("join_roles_enabled", True):
+            return []
+        target = "bots" if is_bot else "humans"
+        return [jr for jr in self.join_roles if jr.get("target_type", "all") in ("all", target)]
+
+    def welcome_roles(self) -> List[Dict[str, Any]]:
+        """The welcome system's auto roles, shaped like join roles"""
+        if not self.welcome_enabled or self.captcha_enabled:
+            return []
+        if not self.welcome.get("auto_role_enabled", False):
+            return []
+        delay = self.welcome.get("auto_role_delay", 0)
+        return [{"role_id": role_id, "delay_seconds": delay} for role_id in self.welcome.get("auto_roles", [])]
+
+    @property
+    def idle(self) -> bool:
+        """Nothing to do on join in this guild"""
+        return not (self.welcome_enabled or self.join_roles or self.logs_joins)
+
+
+class JoinSnapshotCache(SingleFlightCache):
+    """guild_id -> JoinSnapshot, loaded on a miss"""
+
+    def __init__(self, refresh_seconds: int = SNAPSHOT_SECONDS):
+        """
+        Args:
+            refresh_seconds: Max age of a snapshot before it is re-read
+        """
+        super().__init__(refresh_seconds)
+
+    async def get(self, db, guild_id: int) -> JoinSnapshot:
+        """The snapshot of a guild (the misses of a join burst share one round of queries)"""
+        return await self.get_or_load(guild_id, lambda: self._load(db, guild_id))
+
+    @staticmethod
+    async def _load(db, guild_id: int) -> JoinSnapshot:
+        welcome, autoroles, join_roles, logging = await asyncio.gather(
+            db.welcome_settings.find_one({"guild_id": guild_id}),
+            db.guild_autoroles_config.find_one({"guild_id": guild_id}),
+            db.join_roles.find({"guild_id": guild_id, "enabled": True}).to_list(length=None),
+            db.server_logs_settings.find_one({"guild_id": guild_id})
+        )
+        return JoinSnapshot(guild_id, welcome, autoroles, join_roles, logging)
+
+
+# Shared by every join of the process
+join_snapshots = JoinSnapshotCache()
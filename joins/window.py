@@ -0,0 +1,75 @@
+"""
+Join-Rate Window
+Per-guild sliding window of recent joins, kept in memory.
+
+Replaces the ``join_history`` query that anti-raid ran on every join: the
+window answers "how many members joined this guild in the last N seconds"
+with a deque trim. Each shard process only sees the joins of its own guilds,
+which is exactly the set it has to protect.
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+JOIN_WINDOW_SECONDS = 60
+
+
+class JoinRateWindow:
+    """guild_id -> timestamps of the joins in the last ``window_seconds``"""
+
+    def __init__(self, window_seconds: float = JOIN_WINDOW_SECONDS, max_joins: int = 1000):
+        """
+        Args:
+            window_seconds: Length of the window
+            max_joins: Timestamps kept per guild (counts saturate there)
+        """
+        self.window_seconds = window_seconds
+        self.max_joins = max_joins
+        self._joins: Dict[int, Deque[float]] = {}
+
+    def record(self, guild_id: int, now: Optional[float] = None) -> int:
+        """Count a join; returns the joins in the window including this one"""
+        now = time.monotonic() if now is None else now
+        joins = self._joins.get(guild_id)
+        if joins is None:
+            joins = self._joins[guild_id] = deque(maxlen=self.max_joins)
+        joins.append(now)
+        self._trim(joins, now)
+        return len(joins)
+
+    def count(self, guild_id: int, now: Optional[float] = None) -> int:
+        """Joins of a guild in the window"""
+        joins = self._joins.get(guild_id)
+        if joins is None:
+            return 0
+        self._trim(joins, time.monotonic() if now is None else now)
+        if not joins:
+            del self._joins[guild_id]
+            return 0
+        return len(joins)
+
+    def _trim(self, joins: Deque[float], now: float):
+        cutoff = now - self.window_seconds
+        while joins and joins[0] <= cutoff:
+            joins.popleft()
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Forget guilds without joins in the window. Returns how many were dropped."""
+        now = time.monotonic() if now is None else now
+        idle = [guild_id for guild_id in list(self._joins) if not self.count(guild_id, now)]
+        return len(idle)
+
+    def busiest(self, limit: int = 5) -> List[Tuple[int, int]]:
+        """(guild_id, joins in the window) of the busiest guilds"""
+        self.prune()
+        rows = [(guild_id, len(joins)) for guild_id, joins in self._joins.items()]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows[:limit]
+
+    def __len__(self) -> int:
+        return len(self._joins)
+
+
+# Shared by the join pipeline and the welcome system
+join_rate = JoinRateWindow()
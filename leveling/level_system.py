@@ -11,6 +11,7 @@ import random
 from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime, timedelta
 import discord
+from database.metrics_schema import MetricsSchema, MetricsBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,9 @@ class LevelingSystem:
             db: MongoDB database instance
         """
         self.db = db
+        self.metrics = MetricsSchema(db)
+        # Per-message counters are batched; leveling_users is a recounted gauge
+        self.metrics_buffer = MetricsBuffer(self.metrics)
         
     # ========================================================================
     # XP CALCULATION
@@ -161,7 +165,6 @@ class LevelingSystem:
         """
         try:
             user_data = await self.get_user_level(guild_id, user_id)
-            
             old_level = user_data.get("level", 0)
             old_xp = user_data.get("xp", 0)
             
@@ -197,6 +200,12 @@ class LevelingSystem:
             # Check if leveled up
             leveled_up = new_level > old_level
             
+            # Update dashboard rollups (buffered, flushed in batches)
+            self.metrics_buffer.record(
+                guild_id,
+                {"messages": 1, "xp_gained": final_xp, "level_ups": 1 if leveled_up else 0}
+            )
+            
             logger.debug(f"Added {final_xp} XP to {user_id} in {guild_id}. Level: {old_level} -> {new_level}")
             
             return leveled_up, new_level if leveled_up else None, user_data
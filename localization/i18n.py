@@ -7,6 +7,13 @@ This module provides multi-language support for the bot, including:
 - Language preferences storage
 - Support for 5 languages: EN, AR, ES, FR, DE
 
+Locale files are compiled once at load time into one flat catalog per
+language: dotted key -> (template, format fields), with the English entries
+already merged in as fallback. ``translate`` is a single dict lookup, and
+strings without placeholders are returned without formatting. The compiled
+catalogs are cached next to the locale files (``.catalog.pickle``) and reused
+while the JSON files are unchanged.
+
 Supported Languages:
 - en: English (Default)
 - ar: Arabic (العربية)
@@ -17,12 +24,51 @@ Supported Languages:
 
 import json
 import os
-from typing import Optional, Dict, Any
+import sys
+import pickle
+from string import Formatter
+from typing import Optional, Dict, Any, Tuple, FrozenSet
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump when the compiled entry layout changes (invalidates the pickle cache)
+CATALOG_VERSION = 1
+CATALOG_CACHE = ".catalog.pickle"
+
+# Compiled entry: (template, format field names); fields is None when the
+# template has no placeholders and is returned as-is
+CatalogEntry = Tuple[str, Optional[FrozenSet[str]]]
+
+
+def _compile_template(template: str) -> CatalogEntry:
+    """Pre-parse the format fields of a translation"""
+    if "{" not in template and "}" not in template:
+        return template, None
+    try:
+        fields = frozenset(
+            field_name.split(".")[0].split("[")[0]
+            for _, field_name, _, _ in Formatter().parse(template)
+            if field_name is not None
+        )
+    except ValueError:
+        # Malformed braces: never formatted
+        return template, None
+    return template, fields
+
+
+def _flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, str]:
+    """Nested translation dict -> {"dotted.key": string}"""
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, str):
+            flat[path] = value
+    return flat
+
 
 class I18nManager:
     """Manages internationalization for the bot"""
@@ -37,28 +83,37 @@ class I18nManager:
     
     DEFAULT_LANGUAGE = 'en'
     
-    def __init__(self, locales_dir: str = "localization/locales"):
+    def __init__(self, locales_dir: str = "localization/locales", use_cache: bool = True):
         """
         Initialize the i18n manager
         
         Args:
             locales_dir: Directory containing language JSON files
+            use_cache: Read/write the compiled catalog cache
         """
         self.locales_dir = Path(locales_dir)
+        self.use_cache = use_cache
         self.translations: Dict[str, Dict[str, Any]] = {}
         self.user_languages: Dict[str, str] = {}  # user_id -> language_code
         self.guild_languages: Dict[str, str] = {}  # guild_id -> language_code
         
+        # lang_code -> {dotted key: entry}, English fallback merged in
+        self.catalogs: Dict[str, Dict[str, CatalogEntry]] = {}
+        
         # Load all translations
         self._load_translations()
     
     def _load_translations(self):
-        """Load all translation files"""
+        """Load all translation files and compile the catalogs"""
         try:
             if not self.locales_dir.exists():
                 logger.warning(f"Locales directory not found: {self.locales_dir}")
                 return
             
+            signature = self._source_signature()
+            if self.use_cache and self._load_cache(signature):
+                return
+            
             for lang_code in self.SUPPORTED_LANGUAGES.keys():
                 lang_file = self.locales_dir / f"{lang_code}.json"
                 
@@ -68,13 +123,86 @@ class I18nManager:
                     logger.info(f"Loaded translations for {lang_code}")
                 else:
                     logger.warning(f"Translation file not found: {lang_file}")
+            
+            self._compile_catalogs()
+            if self.use_cache:
+                self._save_cache(signature)
         
         except Exception as e:
             logger.error(f"Error loading translations: {e}")
     
+    def _compile_catalogs(self):
+        """Flatten every language and resolve the English fallback ahead of time"""
+        compiled = {
+            lang_code: {
+                sys.intern(key): _compile_template(value)
+                for key, value in _flatten(data).items()
+            }
+            for lang_code, data in self.translations.items()
+        }
+        fallback = compiled.get(self.DEFAULT_LANGUAGE, {})
+        self.catalogs = {
+            lang_code: catalog if lang_code == self.DEFAULT_LANGUAGE else {**fallback, **catalog}
+            for lang_code, catalog in compiled.items()
+        }
+    
+    # ==================== Catalog Cache ====================
+    
+    def _source_signature(self) -> Tuple:
+        """Identifies the locale files the cache was built from"""
+        files = []
+        for lang_code in self.SUPPORTED_LANGUAGES:
+            lang_file = self.locales_dir / f"{lang_code}.json"
+            if lang_file.exists():
+                stat = lang_file.stat()
+                files.append((lang_code, stat.st_mtime_ns, stat.st_size))
+        return (CATALOG_VERSION, self.DEFAULT_LANGUAGE, tuple(files))
+    
+    def _load_cache(self, signature: Tuple) -> bool:
+        cache_file = self.locales_dir / CATALOG_CACHE
+        try:
+            with open(cache_file, 'rb') as f:
+                cached = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable translation cache: {e}")
+            return False
+        
+        if cached.get("signature") != signature:
+            return False
+        
+        self.translations = cached["translations"]
+        self.catalogs = {
+            lang_code: {sys.intern(key): entry for key, entry in catalog.items()}
+            for lang_code, catalog in cached["catalogs"].items()
+        }
+        logger.info(f"Loaded compiled translations for {', '.join(self.catalogs)} from cache")
+        return True
+    
+    def _save_cache(self, signature: Tuple):
+        cache_file = self.locales_dir / CATALOG_CACHE
+        temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(temp_file, 'wb') as f:
+                pickle.dump(
+                    {"signature": signature, "translations": self.translations, "catalogs": self.catalogs},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            # Read-only deployments just compile on every start
+            logger.debug(f"Could not write translation cache: {e}")
+            try:
+                temp_file.unlink()
+            except OSError:
+                pass
+    
     def reload_translations(self):
         """Reload all translation files"""
         self.translations.clear()
+        self.catalogs = {}
         self._load_translations()
         logger.info("Translations reloaded")
     
@@ -167,34 +295,34 @@ class I18nManager:
         """
         # Determine language
         if lang_code is None:
-            if user_id:
-                lang_code = self.get_user_language(user_id, guild_id)
-            else:
-                lang_code = self.DEFAULT_LANGUAGE
-        
-        # Get translation
-        translation = self._get_nested_value(
-            self.translations.get(lang_code, {}),
-            key
-        )
+            lang_code = (
+                self.user_languages.get(user_id)
+                or self.guild_languages.get(guild_id)
+                or self.DEFAULT_LANGUAGE
+            ) if user_id else self.DEFAULT_LANGUAGE
         
-        # Fallback to English if translation not found
-        if translation is None and lang_code != self.DEFAULT_LANGUAGE:
-            translation = self._get_nested_value(
-                self.translations.get(self.DEFAULT_LANGUAGE, {}),
-                key
-            )
+        # One lookup: the catalogs already contain the English fallback
+        catalog = self.catalogs.get(lang_code) or self.catalogs.get(self.DEFAULT_LANGUAGE, {})
+        entry = catalog.get(key)
         
-        # Fallback to key if still not found
-        if translation is None:
+        # Fallback to key if not found
+        if entry is None:
             logger.warning(f"Translation not found: {key} ({lang_code})")
             return key
         
+        translation, fields = entry
+        if fields is None:
+            return translation
+        
         # Format with variables
+        missing = fields.difference(kwargs)
+        if missing:
+            logger.error(f"Missing variable in translation: {', '.join(sorted(missing))}")
+            return translation
         try:
-            return translation.format(**kwargs)
-        except KeyError as e:
-            logger.error(f"Missing variable in translation: {e}")
+            return translation.format_map(kwargs)
+        except (KeyError, IndexError, ValueError) as e:
+            logger.error(f"Error formatting translation {key}: {e}")
             return translation
     
     def _get_nested_value(self, data: Dict[str, Any], key: str) -> Optional[str]:
@@ -16,13 +16,12 @@ Features:
 
 import os
 import json
+import time
 import logging
-from typing import Dict
+from typing import Dict, List, Optional
 from datetime import datetime
 
 from dotenv import load_dotenv
-from langdetect import detect, LangDetectException
-from deep_translator import GoogleTranslator
 import discord
 import asyncio
 from discord import app_commands
@@ -30,6 +29,20 @@ from discord.ext import commands, tasks
 
 # Import MongoDB database module
 from database import db, init_database, close_database
+from database.config_store import TrackedDict, JsonJournal, collect_changes, cluster_path
+from sharding.config import ShardConfig, create_bot, shard_latencies
+from startup.orchestrator import StartupOrchestrator
+from startup.lazy import lazy_import, preload
+from pymongo import UpdateOne, DeleteOne
+from leveling.level_system import get_leveling_system
+from autoroles import AutoRoleSystem
+from templating import render_level_up
+from scheduling import cooldowns
+from joins import get_join_pipeline, publish_join_metrics
+
+# Heavy and only needed once a message is translated (see startup/lazy.py)
+deep_translator = lazy_import("deep_translator")
+langdetect = lazy_import("langdetect")
 
 # Import Redis cache module
 from cache import cache, init_cache, close_cache
@@ -134,6 +147,27 @@ ROLE_PERMISSIONS_FILE = os.path.join(DATA_DIR, 'role_permissions.json')
 SERVERS_FILE = os.path.join(DATA_DIR, 'servers.json')
 TRANSLATION_STATS_FILE = os.path.join(DATA_DIR, 'translation_stats.json')
 
+# Single Bot, AutoShardedBot or one cluster of shards (see sharding/config.py)
+SHARD_CONFIG = ShardConfig.from_env()
+
+# A cluster only holds its own guilds: it keeps its own snapshot + journal so
+# compaction never overwrites the entries written by the other clusters
+if SHARD_CONFIG.partitioned:
+    CHANNELS_FILE = cluster_path(CHANNELS_FILE, SHARD_CONFIG.cluster_name)
+    RATINGS_FILE = cluster_path(RATINGS_FILE, SHARD_CONFIG.cluster_name)
+    ROLES_FILE = cluster_path(ROLES_FILE, SHARD_CONFIG.cluster_name)
+    ROLE_LANGUAGES_FILE = cluster_path(ROLE_LANGUAGES_FILE, SHARD_CONFIG.cluster_name)
+    ROLE_PERMISSIONS_FILE = cluster_path(ROLE_PERMISSIONS_FILE, SHARD_CONFIG.cluster_name)
+    SERVERS_FILE = cluster_path(SERVERS_FILE, SHARD_CONFIG.cluster_name)
+
+# JSON backups are snapshot + append-only journal (see database/config_store.py)
+CHANNELS_JOURNAL = JsonJournal(CHANNELS_FILE)
+RATINGS_JOURNAL = JsonJournal(RATINGS_FILE)
+ROLES_JOURNAL = JsonJournal(ROLES_FILE)
+ROLE_LANGUAGES_JOURNAL = JsonJournal(ROLE_LANGUAGES_FILE)
+ROLE_PERMISSIONS_JOURNAL = JsonJournal(ROLE_PERMISSIONS_FILE)
+SERVERS_JOURNAL = JsonJournal(SERVERS_FILE)
+
 # Bot stats file (local only)
 if os.path.dirname(__file__):
     BASE_DIR = os.path.dirname(__file__)
@@ -315,7 +349,7 @@ def get_translation_message(lang_code: str, key: str) -> str:
         if english_message:
             try:
                 # Use GoogleTranslator to translate the message to the target language
-                translated = GoogleTranslator(source='en', target=lang_code).translate(english_message)
+                translated = deep_translator.GoogleTranslator(source='en', target=lang_code).translate(english_message)
                 return translated
             except Exception as e:
                 logger.warning(f"Failed to auto-translate message '{key}' to '{lang_code}': {e}")
@@ -330,6 +364,14 @@ def get_translation_message(lang_code: str, key: str) -> str:
 # DATA LOADING FUNCTIONS
 # ============================================================================
 
+def _with_journal(data: dict, journal: JsonJournal) -> TrackedDict:
+    """Apply the backup journal on top of a loaded JSON snapshot."""
+    applied = journal.replay(data)
+    if applied:
+        logger.info(f"Replayed {applied} journal entries from {journal.journal_path}")
+    return TrackedDict(data)
+
+
 def load_channels() -> Dict[str, dict]:
     """Load channel language configurations from file.
     Format: {
@@ -367,13 +409,13 @@ def load_channels() -> Dict[str, dict]:
                 else:
                     logger.warning(f"Unknown format for channel {channel_id}, skipping")
             logger.info(f"Loaded {len(converted_data)} channel configurations from {CHANNELS_FILE}")
-            return converted_data
+            return _with_journal(converted_data, CHANNELS_JOURNAL)
     except FileNotFoundError:
         logger.info(f"No channels.json found at {CHANNELS_FILE}, starting fresh")
-        return {}
+        return _with_journal({}, CHANNELS_JOURNAL)
     except Exception as e:
         logger.error(f"Error loading channels from {CHANNELS_FILE}: {e}")
-        return {}
+        return TrackedDict()
 
 
 def load_ratings() -> Dict[str, dict]:
@@ -382,13 +424,13 @@ def load_ratings() -> Dict[str, dict]:
         with open(RATINGS_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
             logger.info(f"Loaded {len(data)} ratings from {RATINGS_FILE}")
-            return data
+            return _with_journal(data, RATINGS_JOURNAL)
     except FileNotFoundError:
         logger.info(f"No ratings.json found at {RATINGS_FILE}, starting fresh")
-        return {}
+        return _with_journal({}, RATINGS_JOURNAL)
     except Exception as e:
         logger.error(f"Error loading ratings from {RATINGS_FILE}: {e}")
-        return {}
+        return TrackedDict()
 
 
 def load_allowed_roles() -> Dict[str, list]:
@@ -397,13 +439,13 @@ def load_allowed_roles() -> Dict[str, list]:
         with open(ROLES_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
             logger.info(f"Loaded allowed roles for {len(data)} guilds from {ROLES_FILE}")
-            return data
+            return _with_journal(data, ROLES_JOURNAL)
     except FileNotFoundError:
         logger.info(f"No allowed_roles.json found at {ROLES_FILE}, starting fresh")
-        return {}
+        return _with_journal({}, ROLES_JOURNAL)
     except Exception as e:
         logger.error(f"Error loading allowed roles from {ROLES_FILE}: {e}")
-        return {}
+        return TrackedDict()
 
 
 def load_role_languages() -> Dict[str, Dict[str, str]]:
@@ -414,13 +456,13 @@ def load_role_languages() -> Dict[str, Dict[str, str]]:
         with open(ROLE_LANGUAGES_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
             logger.info(f"Loaded role languages for {len(data)} guilds from {ROLE_LANGUAGES_FILE}")
-            return data
+            return _with_journal(data, ROLE_LANGUAGES_JOURNAL)
     except FileNotFoundError:
         logger.info(f"No role_languages.json found at {ROLE_LANGUAGES_FILE}, starting fresh")
-        return {}
+        return _with_journal({}, ROLE_LANGUAGES_JOURNAL)
     except Exception as e:
         logger.error(f"Error loading role languages from {ROLE_LANGUAGES_FILE}: {e}")
-        return {}
+        return TrackedDict()
 
 
 def load_role_permissions() -> Dict[str, Dict[str, list]]:
@@ -431,13 +473,13 @@ def load_role_permissions() -> Dict[str, Dict[str, list]]:
         with open(ROLE_PERMISSIONS_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
             logger.info(f"Loaded role permissions for {len(data)} guilds from {ROLE_PERMISSIONS_FILE}")
-            return data
+            return _with_journal(data, ROLE_PERMISSIONS_JOURNAL)
     except FileNotFoundError:
         logger.info(f"No role_permissions.json found at {ROLE_PERMISSIONS_FILE}, starting fresh")
-        return {}
+        return _with_journal({}, ROLE_PERMISSIONS_JOURNAL)
     except Exception as e:
         logger.error(f"Error loading role permissions from {ROLE_PERMISSIONS_FILE}: {e}")
-        return {}
+        return TrackedDict()
 
 
 def load_servers() -> Dict[str, dict]:
@@ -448,294 +490,350 @@ def load_servers() -> Dict[str, dict]:
         with open(SERVERS_FILE, 'r', encoding='utf-8') as f:
             data = json.load(f)
             logger.info(f"Loaded {len(data)} server records from {SERVERS_FILE}")
-            return data
+            return _with_journal(data, SERVERS_JOURNAL)
     except FileNotFoundError:
         logger.info(f"No servers.json found at {SERVERS_FILE}, starting fresh")
-        return {}
+        return _with_journal({}, SERVERS_JOURNAL)
     except Exception as e:
         logger.error(f"Error loading servers from {SERVERS_FILE}: {e}")
-        return {}
+        return TrackedDict()
 
 
 # ============================================================================
 # DATA SAVING FUNCTIONS (ASYNC)
 # ============================================================================
 
-async def save_channels(data: Dict[str, dict]):
-    """Save channel configurations to MongoDB and JSON (backup)."""
+async def _persist_config_changes(data: dict, keys, journal: JsonJournal, collection: str, build_op, label: str) -> set:
+    """Persist only the changed keys of a config map.
+    
+    Changed keys go to MongoDB in one bulk_write and are appended to the
+    JSON backup journal. Returns the keys that were persisted.
+    """
+    changed = collect_changes(data, keys)
+    if not changed:
+        return changed
+    
     # Try MongoDB first
     try:
         import database.mongodb as mongodb_module
         if mongodb_module.db and mongodb_module.db.client:
-            for channel_id, settings in data.items():
-                await save_channel_to_mongodb(channel_id, settings)
-            logger.info(f"✅ Saved {len(data)} channel configurations to MongoDB")
+            ops = [op for op in (build_op(key, data.get(key)) for key in changed) if op is not None]
+            if ops:
+                await mongodb_module.db.db[collection].bulk_write(ops, ordered=False)
+            logger.info(f"✅ Saved {len(changed)} changed {label} to MongoDB")
     except Exception as e:
-        logger.error(f"Error saving channels to MongoDB: {e}")
-    
-    # Also save to JSON as backup
-    loop = asyncio.get_running_loop()
-    def _write(d):
-        tmp = CHANNELS_FILE + '.tmp'
-        try:
-            with open(tmp, 'w', encoding='utf-8') as f:
-                json.dump(d, f, ensure_ascii=False, indent=2)
-            os.replace(tmp, CHANNELS_FILE)
-            logger.info(f"Saved {len(d)} channel configurations to {CHANNELS_FILE} (backup)")
-        except Exception as e:
-            logger.error(f"Error saving to {CHANNELS_FILE}: {e}")
-
-    await loop.run_in_executor(None, _write, data)
+        logger.error(f"Error saving {label} to MongoDB: {e}")
+        # Keep them dirty so the next save retries
+        if isinstance(data, TrackedDict):
+            data.mark_dirty(*changed)
+    
+    # Also journal to JSON as backup
+    await journal.append_async(data, changed)
+    return changed
+
+
+def _guild_roles_op(field: str):
+    """Build the bulk op for one guild entry of a roles.* map."""
+    def build(guild_id: str, value):
+        if value is None:
+            return UpdateOne({"guild_id": guild_id}, {"$unset": {f"roles.{field}": ""}})
+        return UpdateOne(
+            {"guild_id": guild_id},
+            {"$set": {"guild_id": guild_id, f"roles.{field}": value}},
+            upsert=True
+        )
+    return build
 
 
-async def save_ratings(data: Dict[str, dict]):
-    """Save user ratings to MongoDB and JSON (backup)."""
-    # Try MongoDB first
-    try:
-        import database.mongodb as mongodb_module
-        if mongodb_module.db and mongodb_module.db.client:
-            for user_id, rating_data in data.items():
-                await save_rating_to_mongodb(user_id, rating_data)
-            logger.info(f"✅ Saved {len(data)} ratings to MongoDB")
-    except Exception as e:
-        logger.error(f"Error saving ratings to MongoDB: {e}")
+async def save_channels(data: Dict[str, dict], keys=None):
+    """Save changed channel configurations to MongoDB and JSON (backup).
     
-    # Also save to JSON as backup
-    loop = asyncio.get_running_loop()
-    def _write(d):
-        tmp = RATINGS_FILE + '.tmp'
-        try:
-            with open(tmp, 'w', encoding='utf-8') as f:
-                json.dump(d, f, ensure_ascii=False, indent=2)
-            os.replace(tmp, RATINGS_FILE)
-            logger.info(f"Saved {len(d)} ratings to {RATINGS_FILE} (backup)")
-        except Exception as e:
-            logger.error(f"Error saving to {RATINGS_FILE}: {e}")
-
-    await loop.run_in_executor(None, _write, data)
+    Args:
+        data: channel_langs map
+        keys: Channel IDs changed in place (top-level assignments/deletes are tracked)
+    """
+    def build(channel_id, settings):
+        if settings is None:
+            return DeleteOne({"channel_id": channel_id})
+        return UpdateOne(
+            {"channel_id": channel_id},
+            {
+                "$set": {
+                    "channel_id": channel_id,
+                    "primary": settings.get('primary'),
+                    "secondary": settings.get('secondary'),
+                    "blacklisted_languages": settings.get('blacklisted_languages', []),
+                    "translation_quality": settings.get('translation_quality', 'fast')
+                }
+            },
+            upsert=True
+        )
+    
+    changed = await _persist_config_changes(data, keys, CHANNELS_JOURNAL, "channels", build, "channel configurations")
+    for channel_id in changed:
+        await invalidate_channel_cache(channel_id)
 
 
-async def save_allowed_roles(data: Dict[str, list]):
-    """Save allowed roles to MongoDB and JSON (backup)."""
-    # Try MongoDB first
-    try:
-        import database.mongodb as mongodb_module
-        if mongodb_module.db and mongodb_module.db.client:
-            for guild_id, roles in data.items():
-                await save_guild_to_mongodb(guild_id, {
-                    "guild_id": guild_id,
-                    "roles.allowed_roles": roles
-                })
-            logger.info(f"✅ Saved allowed roles for {len(data)} guilds to MongoDB")
-    except Exception as e:
-        logger.error(f"Error saving allowed roles to MongoDB: {e}")
+async def save_ratings(data: Dict[str, dict], keys=None):
+    """Save changed user ratings to MongoDB and JSON (backup)."""
+    def build(user_id, rating_data):
+        if rating_data is None:
+            return DeleteOne({"user_id": user_id})
+        return UpdateOne(
+            {"user_id": user_id},
+            {
+                "$set": {
+                    "user_id": user_id,
+                    "rating": rating_data.get('rating'),
+                    "comment": rating_data.get('comment', ''),
+                    "timestamp": rating_data.get('timestamp')
+                }
+            },
+            upsert=True
+        )
     
-    # Also save to JSON as backup
-    loop = asyncio.get_running_loop()
-    def _write(d):
-        tmp = ROLES_FILE + '.tmp'
-        try:
-            with open(tmp, 'w', encoding='utf-8') as f:
-                json.dump(d, f, ensure_ascii=False, indent=2)
-            os.replace(tmp, ROLES_FILE)
-            logger.info(f"Saved allowed roles for {len(d)} guilds to {ROLES_FILE} (backup)")
-        except Exception as e:
-            logger.error(f"Error saving to {ROLES_FILE}: {e}")
-
-    await loop.run_in_executor(None, _write, data)
+    await _persist_config_changes(data, keys, RATINGS_JOURNAL, "ratings", build, "ratings")
 
 
-async def save_role_languages(data: Dict[str, Dict[str, str]]):
-    """Save role language mappings to MongoDB and JSON (backup)."""
-    # Try MongoDB first
-    try:
-        import database.mongodb as mongodb_module
-        if mongodb_module.db and mongodb_module.db.client:
-            for guild_id, role_langs in data.items():
-                await save_guild_to_mongodb(guild_id, {
-                    "guild_id": guild_id,
-                    "roles.role_languages": role_langs
-                })
-            logger.info(f"✅ Saved role languages for {len(data)} guilds to MongoDB")
-    except Exception as e:
-        logger.error(f"Error saving role languages to MongoDB: {e}")
-    
-    # Also save to JSON as backup
-    loop = asyncio.get_running_loop()
-    def _write(d):
-        tmp = ROLE_LANGUAGES_FILE + '.tmp'
-        try:
-            with open(tmp, 'w', encoding='utf-8') as f:
-                json.dump(d, f, ensure_ascii=False, indent=2)
-            os.replace(tmp, ROLE_LANGUAGES_FILE)
-            logger.info(f"Saved role languages for {len(d)} guilds to {ROLE_LANGUAGES_FILE} (backup)")
-        except Exception as e:
-            logger.error(f"Error saving to {ROLE_LANGUAGES_FILE}: {e}")
+async def save_allowed_roles(data: Dict[str, list], keys=None):
+    """Save changed allowed roles to MongoDB and JSON (backup)."""
+    await _persist_config_changes(
+        data, keys, ROLES_JOURNAL, "guilds", _guild_roles_op("allowed_roles"), "allowed roles"
+    )
 
-    await loop.run_in_executor(None, _write, data)
 
+async def save_role_languages(data: Dict[str, Dict[str, str]], keys=None):
+    """Save changed role language mappings to MongoDB and JSON (backup)."""
+    await _persist_config_changes(
+        data, keys, ROLE_LANGUAGES_JOURNAL, "guilds", _guild_roles_op("role_languages"), "role languages"
+    )
 
-async def save_role_permissions(data: Dict[str, Dict[str, list]]):
-    """Save role permissions to MongoDB and JSON (backup)."""
-    # Try MongoDB first
-    try:
-        import database.mongodb as mongodb_module
-        if mongodb_module.db and mongodb_module.db.client:
-            for guild_id, role_perms in data.items():
-                await save_guild_to_mongodb(guild_id, {
-                    "guild_id": guild_id,
-                    "roles.role_permissions": role_perms
-                })
-            logger.info(f"✅ Saved role permissions for {len(data)} guilds to MongoDB")
-    except Exception as e:
-        logger.error(f"Error saving role permissions to MongoDB: {e}")
-    
-    # Also save to JSON as backup
-    loop = asyncio.get_running_loop()
-    def _write(d):
-        tmp = ROLE_PERMISSIONS_FILE + '.tmp'
-        try:
-            with open(tmp, 'w', encoding='utf-8') as f:
-                json.dump(d, f, ensure_ascii=False, indent=2)
-            os.replace(tmp, ROLE_PERMISSIONS_FILE)
-            logger.info(f"Saved role permissions for {len(d)} guilds to {ROLE_PERMISSIONS_FILE} (backup)")
-        except Exception as e:
-            logger.error(f"Error saving to {ROLE_PERMISSIONS_FILE}: {e}")
 
-    await loop.run_in_executor(None, _write, data)
+async def save_role_permissions(data: Dict[str, Dict[str, list]], keys=None):
+    """Save changed role permissions to MongoDB and JSON (backup)."""
+    await _persist_config_changes(
+        data, keys, ROLE_PERMISSIONS_JOURNAL, "guilds", _guild_roles_op("role_permissions"), "role permissions"
+    )
 
 
-async def save_servers(data: Dict[str, dict]):
-    """Save server information to MongoDB and JSON (backup)."""
-    # Try MongoDB first
-    try:
-        import database.mongodb as mongodb_module
-        if mongodb_module.db and mongodb_module.db.client:
-            for guild_id, server_info in data.items():
-                await save_guild_to_mongodb(guild_id, {
+async def save_servers(data: Dict[str, dict], keys=None):
+    """Save changed server information to MongoDB and JSON (backup)."""
+    def build(guild_id, server_info):
+        if server_info is None:
+            return None
+        return UpdateOne(
+            {"guild_id": guild_id},
+            {
+                "$set": {
                     "guild_id": guild_id,
                     "name": server_info.get('name'),
                     "joined_at": server_info.get('joined_at'),
                     "active": server_info.get('active', True),
                     "left_at": server_info.get('left_at')
-                })
-            logger.info(f"✅ Saved {len(data)} server records to MongoDB")
-    except Exception as e:
-        logger.error(f"Error saving servers to MongoDB: {e}")
+                }
+            },
+            upsert=True
+        )
     
-    # Also save to JSON as backup
-    loop = asyncio.get_running_loop()
-    def _write(d):
-        tmp = SERVERS_FILE + '.tmp'
-        try:
-            with open(tmp, 'w', encoding='utf-8') as f:
-                json.dump(d, f, ensure_ascii=False, indent=2)
-            os.replace(tmp, SERVERS_FILE)
-            logger.info(f"Saved {len(d)} server records to {SERVERS_FILE} (backup)")
-        except Exception as e:
-            logger.error(f"Error saving to {SERVERS_FILE}: {e}")
-            try:
-                with open(SERVERS_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(d, f, ensure_ascii=False, indent=2)
-                logger.info(f"Fallback: Saved server records directly to {SERVERS_FILE}")
-            except Exception as e2:
-                logger.error(f"Fallback save also failed: {e2}")
-
-    await loop.run_in_executor(None, _write, data)
+    await _persist_config_changes(data, keys, SERVERS_JOURNAL, "guilds", build, "server records")
 
 
 # ============================================================================
 # MONGODB HELPER FUNCTIONS (v3.0)
 # ============================================================================
 
+# Deferred (non-hot) data: ratings and server records stream in after startup
+LOAD_BATCH_SIZE = 1000
+_deferred_load_task: Optional[asyncio.Task] = None
+
+CHANNEL_PROJECTION = {'_id': 0, 'channel_id': 1, 'primary': 1, 'secondary': 1,
+                      'blacklisted_languages': 1, 'translation_quality': 1}
+GUILD_ROLES_PROJECTION = {'_id': 0, 'guild_id': 1, 'roles': 1}
+SERVER_PROJECTION = {'_id': 0, 'guild_id': 1, 'name': 1, 'joined_at': 1, 'active': 1, 'left_at': 1}
+RATING_PROJECTION = {'_id': 0, 'user_id': 1, 'rating': 1, 'comment': 1, 'timestamp': 1}
+
+
+def _channel_entry(ch: dict) -> dict:
+    return {
+        'primary': ch.get('primary'),
+        'secondary': ch.get('secondary'),
+        'blacklisted_languages': ch.get('blacklisted_languages', []),
+        'translation_quality': ch.get('translation_quality', 'fast')
+    }
+
+
+def _server_entry(guild: dict) -> dict:
+    return {
+        'name': guild.get('name', ''),
+        'joined_at': guild.get('joined_at'),
+        'active': guild.get('active', True),
+        'left_at': guild.get('left_at')
+    }
+
+
+def _rating_entry(rating: dict) -> dict:
+    return {
+        'rating': rating.get('rating'),
+        'comment': rating.get('comment', ''),
+        'timestamp': rating.get('timestamp')
+    }
+
+
+async def _stream_collection(collection, query: dict, projection: dict, handle, label: str) -> int:
+    """Iterate a collection in batches, handing each document to ``handle``.
+    
+    Yields to the event loop between batches and logs the load time.
+    """
+    start = time.perf_counter()
+    count = 0
+    async for doc in collection.find(query, projection).batch_size(LOAD_BATCH_SIZE):
+        handle(doc)
+        count += 1
+        if count % LOAD_BATCH_SIZE == 0:
+            await asyncio.sleep(0)
+    logger.info(f"✅ Loaded {count} {label} from MongoDB in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return count
+
+
 async def load_data_from_mongodb():
-    """Load all data from MongoDB into global variables."""
+    """Load hot data from MongoDB into global variables.
+    
+    Channel languages and role maps are needed to serve messages and are
+    streamed now. Ratings and server records are loaded in the background
+    (see ensure_deferred_data / load_server_records / load_rating_record).
+    """
     global channel_langs, bot_ratings, allowed_roles, role_languages, role_permissions, servers_data
+    global _deferred_load_task
     
     try:
         import database.mongodb as mongodb_module
         if not mongodb_module.db or not mongodb_module.db.client:
             logger.warning("MongoDB not connected, using empty data")
-            channel_langs = {}
-            bot_ratings = {}
-            allowed_roles = {}
-            role_languages = {}
-            role_permissions = {}
-            servers_data = {}
+            channel_langs = TrackedDict()
+            bot_ratings = TrackedDict()
+            allowed_roles = TrackedDict()
+            role_languages = TrackedDict()
+            role_permissions = TrackedDict()
+            servers_data = TrackedDict()
             return
         
+        database = mongodb_module.db.db
+        
         # Load channels from MongoDB
-        channels_from_db = await mongodb_module.db.db.channels.find().to_list(length=None)
-        channel_langs = {}
-        for ch in channels_from_db:
+        channel_langs = TrackedDict()
+        
+        def add_channel(ch):
             channel_id = ch.get('channel_id')
             if channel_id:
-                channel_langs[channel_id] = {
-                    'primary': ch.get('primary'),
-                    'secondary': ch.get('secondary'),
-                    'blacklisted_languages': ch.get('blacklisted_languages', []),
-                    'translation_quality': ch.get('translation_quality', 'fast')
-                }
-        
-        logger.info(f"✅ Loaded {len(channel_langs)} channels from MongoDB")
-        
-        # Load ratings from MongoDB
-        ratings_from_db = await mongodb_module.db.db.ratings.find().to_list(length=None)
-        bot_ratings = {}
-        for rating in ratings_from_db:
-            user_id = rating.get('user_id')
-            if user_id:
-                bot_ratings[user_id] = {
-                    'rating': rating.get('rating'),
-                    'comment': rating.get('comment', ''),
-                    'timestamp': rating.get('timestamp')
-                }
+                dict.__setitem__(channel_langs, channel_id, _channel_entry(ch))
         
-        logger.info(f"✅ Loaded {len(bot_ratings)} ratings from MongoDB")
+        await _stream_collection(database.channels, {}, CHANNEL_PROJECTION, add_channel, "channels")
         
-        # Load guilds (for roles and settings)
-        guilds_from_db = await mongodb_module.db.db.guilds.find().to_list(length=None)
-        allowed_roles = {}
-        role_languages = {}
-        role_permissions = {}
-        servers_data = {}
+        # Load guild role maps (only guilds that have any)
+        allowed_roles = TrackedDict()
+        role_languages = TrackedDict()
+        role_permissions = TrackedDict()
         
-        for guild in guilds_from_db:
+        def add_guild_roles(guild):
             guild_id = guild.get('guild_id')
-            if not guild_id:
-                continue
+            roles = guild.get('roles') or {}
+            # Guilds served by other shard processes stay out of memory
+            if not guild_id or not SHARD_CONFIG.owns_guild(guild_id):
+                return
             
             # Allowed roles
-            if 'roles' in guild and 'allowed_roles' in guild['roles']:
-                allowed_roles[guild_id] = guild['roles']['allowed_roles']
+            if 'allowed_roles' in roles:
+                dict.__setitem__(allowed_roles, guild_id, roles['allowed_roles'])
             
             # Role languages
-            if 'roles' in guild and 'role_languages' in guild['roles']:
-                role_languages[guild_id] = guild['roles']['role_languages']
+            if 'role_languages' in roles:
+                dict.__setitem__(role_languages, guild_id, roles['role_languages'])
             
             # Role permissions
-            if 'roles' in guild and 'role_permissions' in guild['roles']:
-                role_permissions[guild_id] = guild['roles']['role_permissions']
-            
-            # Server data
-            servers_data[guild_id] = {
-                'name': guild.get('name', ''),
-                'joined_at': guild.get('joined_at'),
-                'active': guild.get('active', True),
-                'left_at': guild.get('left_at')
-            }
+            if 'role_permissions' in roles:
+                dict.__setitem__(role_permissions, guild_id, roles['role_permissions'])
         
-        logger.info(f"✅ Loaded data for {len(guilds_from_db)} guilds from MongoDB")
+        await _stream_collection(
+            database.guilds, {'roles': {'$exists': True}}, GUILD_ROLES_PROJECTION,
+            add_guild_roles, "guild role settings"
+        )
+        
+        # Ratings and server records stream in the background
+        bot_ratings = TrackedDict()
+        servers_data = TrackedDict()
+        _deferred_load_task = asyncio.create_task(_load_deferred_data(database))
         
     except Exception as e:
         logger.error(f"❌ Error loading data from MongoDB: {e}")
         # Fallback to empty data
-        channel_langs = {}
-        bot_ratings = {}
-        allowed_roles = {}
-        role_languages = {}
-        role_permissions = {}
-        servers_data = {}
+        channel_langs = TrackedDict()
+        bot_ratings = TrackedDict()
+        allowed_roles = TrackedDict()
+        role_languages = TrackedDict()
+        role_permissions = TrackedDict()
+        servers_data = TrackedDict()
+
+
+async def _load_deferred_data(database):
+    """Stream ratings and server records into their maps.
+    
+    Entries already loaded on demand (or changed since) are kept as they are.
+    """
+    def add_rating(rating):
+        user_id = rating.get('user_id')
+        if user_id and user_id not in bot_ratings:
+            dict.__setitem__(bot_ratings, user_id, _rating_entry(rating))
+    
+    def add_server(guild):
+        guild_id = guild.get('guild_id')
+        if guild_id and guild_id not in servers_data and SHARD_CONFIG.owns_guild(guild_id):
+            dict.__setitem__(servers_data, guild_id, _server_entry(guild))
+    
+    try:
+        await _stream_collection(database.ratings, {}, RATING_PROJECTION, add_rating, "ratings")
+        await _stream_collection(database.guilds, {}, SERVER_PROJECTION, add_server, "server records")
+        update_bot_stats()
+    except Exception as e:
+        logger.error(f"❌ Error loading ratings/servers from MongoDB: {e}")
+
+
+def _deferred_loading() -> bool:
+    """True while ratings/server records are still streaming in."""
+    return _deferred_load_task is not None and not _deferred_load_task.done()
+
+
+async def ensure_deferred_data():
+    """Wait until ratings and server records are fully loaded (for aggregates)."""
+    if _deferred_loading():
+        await asyncio.shield(_deferred_load_task)
+
+
+async def load_server_records(guild_ids: List[str]):
+    """Load the server records of specific guilds ahead of the background load."""
+    missing = [guild_id for guild_id in guild_ids if guild_id not in servers_data]
+    if not missing or not _deferred_loading():
+        return
+    try:
+        import database.mongodb as mongodb_module
+        cursor = mongodb_module.db.db.guilds.find({'guild_id': {'$in': missing}}, SERVER_PROJECTION)
+        async for guild in cursor:
+            if guild['guild_id'] not in servers_data:
+                dict.__setitem__(servers_data, guild['guild_id'], _server_entry(guild))
+    except Exception as e:
+        logger.error(f"Error loading server records: {e}")
+
+
+async def load_rating_record(user_id: str):
+    """Load one user's rating ahead of the background load."""
+    if user_id in bot_ratings or not _deferred_loading():
+        return
+    try:
+        import database.mongodb as mongodb_module
+        rating = await mongodb_module.db.db.ratings.find_one({'user_id': user_id}, RATING_PROJECTION)
+        if rating and user_id not in bot_ratings:
+            dict.__setitem__(bot_ratings, user_id, _rating_entry(rating))
+    except Exception as e:
+        logger.error(f"Error loading rating for {user_id}: {e}")
 
 
 # ============================================================================
@@ -1056,6 +1154,7 @@ async def cleanup_old_server_data():
         if 'servers_data' not in globals():
             logger.warning("Cannot cleanup: servers_data not loaded")
             return
+        await ensure_deferred_data()
         
         current_time = datetime.utcnow()
         cleanup_threshold = timedelta(days=7)
@@ -1169,7 +1268,11 @@ async def cleanup_old_server_data():
 intents = discord.Intents.default()
 intents.message_content = True
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+# Single Bot, AutoShardedBot or one cluster of shards (SHARD_CONFIG above)
+bot = create_bot(SHARD_CONFIG, command_prefix='!', intents=intents)
+
+# Cross-shard coordination (Redis), only when other processes run other shards
+bot.shard_coordinator = None
 
 # Add config attribute for premium system
 bot.config = {
@@ -1178,7 +1281,7 @@ bot.config = {
     'STRIPE_WEBHOOK_SECRET': os.getenv('STRIPE_WEBHOOK_SECRET')
 }
 
-# Premium System (will be initialized in on_ready)
+# Premium System (will be initialized in setup_hook)
 bot.premium_system = None
 
 # Global state
@@ -1222,6 +1325,21 @@ async def before_daily_cleanup():
     logger.info("Daily cleanup task initialized")
 
 
+@tasks.loop(minutes=5)
+async def publish_query_stats_task():
+    """Publish MongoDB query statistics so the dashboard can display them."""
+    import database.mongodb as mongodb_module
+    if not mongodb_module.db or not mongodb_module.db.client:
+        return
+    try:
+        from database.instrumentation import publish_snapshot
+        await publish_snapshot(mongodb_module.db.db, "bot")
+        if getattr(bot, "join_pipeline", None):
+            await publish_join_metrics(mongodb_module.db.db, bot.join_pipeline)
+    except Exception as e:
+        logger.error(f"Error publishing query stats: {e}")
+
+
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
@@ -1285,7 +1403,7 @@ async def smart_translate(text: str, source_lang: str, target_lang: str, quality
         
         # Fast mode: Google Translator (current system)
         if quality_mode == 'fast':
-            translated = GoogleTranslator(source=source_lang, target=target_lang).translate(text)
+            translated = deep_translator.GoogleTranslator(source=source_lang, target=target_lang).translate(text)
             return (translated, 'fast')
         
         # Quality mode: Try to use better translator
@@ -1293,12 +1411,12 @@ async def smart_translate(text: str, source_lang: str, target_lang: str, quality
         elif quality_mode == 'quality':
             # TODO: Add DeepL API integration in future
             # For now, use Google with note that it's fast mode
-            translated = GoogleTranslator(source=source_lang, target=target_lang).translate(text)
+            translated = deep_translator.GoogleTranslator(source=source_lang, target=target_lang).translate(text)
             return (translated, 'fast')  # Return 'fast' since we're using Google
         
         else:
             # Fallback to fast
-            translated = GoogleTranslator(source=source_lang, target=target_lang).translate(text)
+            translated = deep_translator.GoogleTranslator(source=source_lang, target=target_lang).translate(text)
             return (translated, 'fast')
     
     except Exception as e:
@@ -1358,176 +1476,280 @@ def has_specific_permission(member: discord.Member, guild_id: str, permission: s
 
 
 # ============================================================================
-# BOT EVENTS
+# SHARD COORDINATION
 # ============================================================================
 
-@bot.event
-async def on_ready():
-    """Called when the bot is ready and connected to Discord."""
-    from datetime import datetime
+async def start_shard_coordinator(redis_client):
+    """Start Redis coordination with the other shard processes."""
+    from sharding.coordinator import ShardCoordinator
     
-    logger.info(f"Logged in as {bot.user}")
-    logger.info(f"Bot is in {len(bot.guilds)} server(s)")
-    logger.info(f"🔑 BOT_OWNER_ID configured as: {BOT_OWNER_ID}")
+    coordinator = ShardCoordinator(redis_client, SHARD_CONFIG)
+    
+    async def on_rating(payload):
+        dict.__setitem__(bot_ratings, payload['user_id'], payload['rating'])
     
-    # Initialize Redis cache (optional - improves performance)
-    redis_connected = False
-    redis_url = os.getenv('REDIS_URL') or os.getenv('REDIS_URI')
-    if redis_url:
+    async def on_premium(payload):
+        if bot.premium_system:
+            bot.premium_system.entitlements.invalidate(payload.get('guild_id'), propagate=False)
+    
+    async def on_custom_commands(payload):
+        commands_system = bot.get_cog("CommandsSystem")
+        if commands_system:
+            commands_system.registry.invalidate(payload.get('guild_id'), propagate=False)
+    
+    async def on_priority_guild(payload):
+        guild_id = int(payload['guild_id'])
+        if payload.get('enabled') and guild_id not in priority_guilds:
+            priority_guilds.append(guild_id)
+        elif not payload.get('enabled') and guild_id in priority_guilds:
+            priority_guilds.remove(guild_id)
+    
+    coordinator.on("rating", on_rating)
+    coordinator.on("premium", on_premium)
+    coordinator.on("priority_guild", on_priority_guild)
+    coordinator.on("custom_commands", on_custom_commands)
+    await coordinator.start(bot)
+    bot.shard_coordinator = coordinator
+
+
+# ============================================================================
+# STARTUP
+# ============================================================================
+
+# Cogs loaded by the critical startup path (their slash commands must exist
+# before the command sync in on_ready)
+CORE_EXTENSIONS = {
+    "moderation": ("cogs.cogs.moderation", "Moderation"),
+    "leveling": ("cogs.cogs.leveling", "Leveling"),
+    "tickets": ("cogs.cogs.tickets", "Tickets"),
+    "autoroles": ("cogs.cogs.autoroles", "Auto-Roles"),
+    "translate": ("cogs.cogs.translate", "Translation"),
+}
+
+# How long on_ready waits for deferred steps before syncing commands
+DEFERRED_STARTUP_TIMEOUT = 60
+
+
+@tasks.loop(minutes=5)
+async def check_social_media_task():
+    """Check all social media links for new content"""
+    try:
+        await bot.social_system.check_all_links(bot)
+    except Exception as e:
+        logger.error(f"Error in social media check task: {e}")
+
+
+@check_social_media_task.before_loop
+async def before_social_check():
+    await bot.wait_until_ready()
+
+
+def _load_json_data():
+    """Load every config map from the JSON backups (v2.8 compatibility)."""
+    global channel_langs, bot_ratings, allowed_roles, role_languages, role_permissions, servers_data
+    channel_langs = load_channels()
+    bot_ratings = load_ratings()
+    allowed_roles = load_allowed_roles()
+    role_languages = load_role_languages()
+    role_permissions = load_role_permissions()
+    servers_data = load_servers()
+
+
+def build_startup(orchestrator: StartupOrchestrator):
+    """Register the startup steps (see startup/orchestrator.py)."""
+    import database.mongodb as mongodb_module
+    
+    async def init_redis():
+        # Optional - improves performance
+        redis_url = os.getenv('REDIS_URL') or os.getenv('REDIS_URI')
+        if not redis_url:
+            logger.info("ℹ️ Redis not configured - skipping cache initialization")
+            return
         try:
             await init_cache(redis_url)
-            redis_connected = True
             logger.info("✅ Redis cache initialized successfully")
         except Exception as e:
             logger.error(f"❌ Failed to initialize Redis: {e}")
             logger.warning("⚠️ Bot will continue without caching")
-    else:
-        logger.info("ℹ️ Redis not configured - skipping cache initialization")
-    
-    # Initialize MongoDB connection
-    mongodb_connected = False
-    try:
-        await init_database()
-        mongodb_connected = True
-        logger.info("✅ MongoDB connection initialized successfully")
-    except Exception as e:
-        logger.error(f"❌ Failed to initialize MongoDB: {e}")
-        logger.warning("⚠️ Bot will fallback to JSON files")
+            return False
     
-    # Load Moderation and Leveling Cogs if MongoDB is available
-    if mongodb_connected:
-        try:
-            await bot.load_extension("cogs.cogs.moderation")
-            logger.info("✅ Moderation cog loaded successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to load moderation cog: {e}")
-        
-        try:
-            await bot.load_extension("cogs.cogs.leveling")
-            logger.info("✅ Leveling cog loaded successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to load leveling cog: {e}")
-        
-        try:
-            await bot.load_extension("cogs.cogs.tickets")
-            logger.info("✅ Tickets cog loaded successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to load tickets cog: {e}")
-        
-        try:
-            await bot.load_extension("cogs.cogs.autoroles")
-            logger.info("✅ Auto-Roles cog loaded successfully")
-        except Exception as e:
-            logger.error(f"❌ Failed to load autoroles cog: {e}")
-        
+    async def init_shard_coordinator():
+        # Cross-shard coordination for global data (priority guilds, ratings, premium)
+        import cache.redis as redis_module
+        if not redis_module.cache:
+            logger.warning("⚠️ Sharded across processes without Redis - global data won't sync between shards")
+            return False
+        await start_shard_coordinator(redis_module.cache.client)
+        # Cooldowns must hold across processes too
+        cooldowns.use_redis(redis_module.cache.client)
+    
+    async def init_mongodb():
+        mongodb_uri = os.getenv('MONGODB_URI')
+        if not mongodb_uri:
+            logger.warning("⚠️ MONGODB_URI not configured - Bot will fallback to JSON files")
+            return False
         try:
-            await bot.load_extension("cogs.cogs.translate")
-            logger.info("✅ Translation cog loaded successfully")
+            if not await init_database(mongodb_uri):
+                raise ConnectionError("connection test failed")
+            logger.info("✅ MongoDB connection initialized successfully")
         except Exception as e:
-            logger.error(f"❌ Failed to load translation cog: {e}")
-        
-        # Initialize Premium System
-        try:
-            from premium.premium_system import PremiumSystem
-            bot.premium_system = PremiumSystem(db.client)
-            await bot.premium_system.initialize()
-            logger.info("✅ Premium System initialized successfully")
-            
-            # Load Premium cog
+            logger.error(f"❌ Failed to initialize MongoDB: {e}")
+            logger.warning("⚠️ Bot will fallback to JSON files")
+            return False
+    
+    async def create_indexes():
+        # Every registered index, once per process (see database/indexes.py)
+        from database.indexes import ensure_indexes
+        await ensure_indexes(mongodb_module.db.db)
+    
+    async def load_data():
+        if mongodb_module.db and mongodb_module.db.client:
             try:
-                await bot.load_extension("cogs.cogs.premium")
-                logger.info("✅ Premium cog loaded successfully")
+                await load_data_from_mongodb()
+                logger.info("✅ All data loaded from MongoDB")
+                return
             except Exception as e:
-                logger.error(f"❌ Failed to load premium cog: {e}")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Premium System: {e}")
+                logger.error(f"❌ Error loading from MongoDB, falling back to JSON: {e}")
+        await asyncio.get_event_loop().run_in_executor(None, _load_json_data)
+        logger.info("✅ All data loaded from JSON files")
+    
+    def extension_step(extension: str, label: str):
+        async def load():
+            await bot.load_extension(extension)
+            logger.info(f"✅ {label} cog loaded successfully")
+        return load
+    
+    async def init_premium():
+        from premium.premium_system import PremiumSystem
+        bot.premium_system = PremiumSystem(mongodb_module.db.client)
+        await bot.premium_system.initialize()
+        if bot.shard_coordinator:
+            coordinator = bot.shard_coordinator
+            bot.premium_system.entitlements.on_invalidate = (
+                lambda guild_id: coordinator.publish_nowait("premium", guild_id=guild_id)
+            )
+        logger.info("✅ Premium System initialized successfully")
+    
+    async def init_automessages():
+        from automessages.automessage_system import AutoMessageSystem
+        bot.automessage_system = AutoMessageSystem(mongodb_module.db.db)
+        logger.info("✅ Auto-Messages System initialized successfully")
+    
+    async def init_social():
+        from integrations.social_integration import SocialIntegrationSystem
         
-        # Initialize Auto-Messages System
-        try:
-            from automessages.automessage_system import AutoMessageSystem
-            bot.automessage_system = AutoMessageSystem(db.client)
-            logger.info("✅ Auto-Messages System initialized successfully")
-            
-            # Load Auto-Messages cog
-            try:
-                await bot.load_extension("cogs.cogs.automessages")
-                logger.info("✅ Auto-Messages cog loaded successfully")
-            except Exception as e:
-                logger.error(f"❌ Failed to load automessages cog: {e}")
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Auto-Messages System: {e}")
+        # Prepare API config for platforms
+        config = {
+            "twitch_client_id": os.getenv("TWITCH_CLIENT_ID"),
+            "twitch_client_secret": os.getenv("TWITCH_CLIENT_SECRET"),
+            "twitter_bearer_token": os.getenv("TWITTER_BEARER_TOKEN")
+        }
         
-        # Initialize Social Integration System
-        try:
-            from integrations.social_integration import SocialIntegrationSystem
-            
-            # Prepare API config for platforms
-            config = {
-                "twitch_client_id": os.getenv("TWITCH_CLIENT_ID"),
-                "twitch_client_secret": os.getenv("TWITCH_CLIENT_SECRET"),
-                "twitter_bearer_token": os.getenv("TWITTER_BEARER_TOKEN")
-            }
-            
-            bot.social_system = SocialIntegrationSystem(db.client, config)
-            await bot.social_system.initialize()
-            logger.info("✅ Social Integration System initialized successfully")
-            
-            # Load Social cog
-            try:
-                await bot.load_extension("cogs.cogs.social")
-                logger.info("✅ Social Integration cog loaded successfully")
-            except Exception as e:
-                logger.error(f"❌ Failed to load social cog: {e}")
-            
-            # Start background task for checking social links (every 5 minutes)
-            @tasks.loop(minutes=5)
-            async def check_social_media_task():
-                """Check all social media links for new content"""
-                try:
-                    await bot.social_system.check_all_links(bot)
-                except Exception as e:
-                    logger.error(f"Error in social media check task: {e}")
-            
-            @check_social_media_task.before_loop
-            async def before_social_check():
-                await bot.wait_until_ready()
-            
+        bot.social_system = SocialIntegrationSystem(mongodb_module.db.client, config)
+        await bot.social_system.initialize()
+        logger.info("✅ Social Integration System initialized successfully")
+    
+    async def start_social_task():
+        if not check_social_media_task.is_running():
             check_social_media_task.start()
             logger.info("✅ Social media background task started (5 min interval)")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to initialize Social Integration System: {e}")
     
-    # Load data from MongoDB or JSON files
-    global channel_langs, bot_ratings, allowed_roles, role_languages, role_permissions, servers_data
+    orchestrator.add("redis", init_redis)
+    orchestrator.add("mongodb", init_mongodb)
+    if SHARD_CONFIG.partitioned:
+        orchestrator.add("shard_coordinator", init_shard_coordinator, depends_on=["redis"])
+    orchestrator.add("indexes", create_indexes, depends_on=["mongodb"])
+    orchestrator.add("data", load_data, after=["mongodb"])
     
-    if mongodb_connected:
-        # Load from MongoDB (v3.0)
+    for name, (extension, label) in CORE_EXTENSIONS.items():
+        orchestrator.add(f"cog:{name}", extension_step(extension, label), depends_on=["mongodb"])
+    
+    # The entitlement hook needs the coordinator when there is one
+    orchestrator.add(
+        "premium", init_premium, depends_on=["mongodb"],
+        after=["shard_coordinator"] if SHARD_CONFIG.partitioned else ()
+    )
+    orchestrator.add("cog:premium", extension_step("cogs.cogs.premium", "Premium"), depends_on=["premium"])
+    orchestrator.add("automessages", init_automessages, depends_on=["mongodb"])
+    orchestrator.add(
+        "cog:automessages", extension_step("cogs.cogs.automessages", "Auto-Messages"), depends_on=["automessages"]
+    )
+    
+    # Rarely used: initialized in the background once the bot is connecting
+    orchestrator.add("social", init_social, depends_on=["mongodb"], deferred=True)
+    orchestrator.add(
+        "cog:social", extension_step("cogs.cogs.social", "Social Integration"), depends_on=["social"], deferred=True
+    )
+    orchestrator.add("social_task", start_social_task, depends_on=["social"], deferred=True)
+    
+    async def warm_imports():
+        # Keep the first translation from paying the import on the event loop
+        await asyncio.get_event_loop().run_in_executor(None, preload, deep_translator, langdetect)
+    
+    orchestrator.add("warm_imports", warm_imports, deferred=True)
+
+
+bot.startup = StartupOrchestrator()
+build_startup(bot.startup)
+
+
+# ============================================================================
+# BOT EVENTS
+# ============================================================================
+
+_close_bot = bot.close
+
+
+async def close_bot():
+    """Flush in-memory buffers while the gateway and event loop are still up."""
+    pipeline = getattr(bot, "join_pipeline", None)
+    if pipeline is not None:
         try:
-            await load_data_from_mongodb()
-            logger.info("✅ All data loaded from MongoDB")
+            # Queued surge joins still need the HTTP session for their roles
+            await pipeline.stop(timeout=30)
         except Exception as e:
-            logger.error(f"❌ Error loading from MongoDB, falling back to JSON: {e}")
-            loop = asyncio.get_event_loop()
-            channel_langs = await loop.run_in_executor(None, load_channels)
-            bot_ratings = await loop.run_in_executor(None, load_ratings)
-            allowed_roles = await loop.run_in_executor(None, load_allowed_roles)
-            role_languages = await loop.run_in_executor(None, load_role_languages)
-            role_permissions = await loop.run_in_executor(None, load_role_permissions)
-            servers_data = await loop.run_in_executor(None, load_servers)
-    else:
-        # Fallback to JSON files (v2.8 compatibility)
-        loop = asyncio.get_event_loop()
-        channel_langs = await loop.run_in_executor(None, load_channels)
-        bot_ratings = await loop.run_in_executor(None, load_ratings)
-        allowed_roles = await loop.run_in_executor(None, load_allowed_roles)
-        role_languages = await loop.run_in_executor(None, load_role_languages)
-        role_permissions = await loop.run_in_executor(None, load_role_permissions)
-        servers_data = await loop.run_in_executor(None, load_servers)
-        logger.info("✅ All data loaded from JSON files")
+            logger.error(f"❌ Error stopping join pipeline: {e}")
+    await _close_bot()
+
+bot.close = close_bot
+
+
+@bot.event
+async def setup_hook():
+    """Run once before connecting to the gateway (not on reconnects)."""
+    await bot.startup.run()
+    bot.startup.start_deferred()
+    
+    # Background tasks wait for on_ready themselves
+    if not daily_cleanup_task.is_running():
+        daily_cleanup_task.start()
+        logger.info("✅ Daily cleanup task started")
+    
+    if not publish_query_stats_task.is_running():
+        publish_query_stats_task.start()
+
+
+@bot.event
+async def on_ready():
+    """Called when the bot is connected to Discord (again after every reconnect)."""
+    from datetime import datetime
+    
+    logger.info(f"Logged in as {bot.user}")
+    logger.info(f"Bot is in {len(bot.guilds)} server(s)")
+    
+    # Everything below needs the guild list and only runs on the first ready
+    if getattr(bot, "ready_once", False):
+        logger.info("🔁 Reconnected to the gateway - startup already done")
+        return
+    bot.ready_once = True
+    ready_started = time.perf_counter()
+    
+    logger.info(f"🔑 BOT_OWNER_ID configured as: {BOT_OWNER_ID}")
     
     # Update server tracking for current guilds
     try:
+        await load_server_records([str(guild.id) for guild in bot.guilds])
+        changed_servers = []
         for guild in bot.guilds:
             guild_id = str(guild.id)
             if guild_id not in servers_data:
@@ -1538,12 +1760,13 @@ async def on_ready():
                     'active': True,
                     'left_at': None
                 }
-            else:
+            elif not servers_data[guild_id].get('active') or servers_data[guild_id].get('name') != guild.name:
                 # Update existing server to active
                 servers_data[guild_id]['active'] = True
                 servers_data[guild_id]['name'] = guild.name  # Update name in case it changed
+                changed_servers.append(guild_id)
         
-        await save_servers(servers_data)
+        await save_servers(servers_data, changed_servers)
         update_bot_stats()
         logger.info(f"✅ Server tracking updated: {len([s for s in servers_data.values() if s.get('active')])} active servers")
     except Exception as e:
@@ -1556,14 +1779,11 @@ async def on_ready():
     except Exception as e:
         logger.error(f"Error during initial cleanup: {e}")
     
-    # Start daily cleanup task
-    if not daily_cleanup_task.is_running():
-        daily_cleanup_task.start()
-        logger.info("✅ Daily cleanup task started")
-    
     # Load priority guilds
     try:
         load_priority_guilds()
+        if bot.shard_coordinator:
+            priority_guilds[:] = await bot.shard_coordinator.sync_priority_guilds(priority_guilds)
         if priority_guilds:
             logger.info(f"✅ Loaded {len(priority_guilds)} priority guilds")
     except Exception as e:
@@ -1580,6 +1800,8 @@ async def on_ready():
         
         if auto_added_count > 0:
             save_priority_guilds()
+            if bot.shard_coordinator:
+                await bot.shard_coordinator.sync_priority_guilds(priority_guilds)
             logger.info(f"✅ Auto-added {auto_added_count} existing guild(s) to priority list")
     except Exception as e:
         logger.error(f"Error checking existing guilds: {e}")
@@ -1594,6 +1816,10 @@ async def on_ready():
     except Exception as e:
         logger.debug(f"Could not list app commands: {e}")
     
+    # Deferred cogs register slash commands too
+    if not await bot.startup.wait_deferred(timeout=DEFERRED_STARTUP_TIMEOUT):
+        logger.warning("⚠️ Deferred startup steps still running - their commands sync on next start")
+    
     # Sync slash commands to priority guilds first (fast sync)
     if priority_guilds:
         try:
@@ -1631,6 +1857,8 @@ async def on_ready():
         logger.info(f"Loaded cogs: {loaded}")
     except Exception as e:
         logger.debug(f"Could not list loaded cogs: {e}")
+    
+    logger.info(f"⏱️ Ready phase took {(time.perf_counter() - ready_started) * 1000:.0f} ms")
 
 
 @bot.tree.error
@@ -1676,6 +1904,8 @@ async def on_guild_join(guild: discord.Guild):
         if guild.owner_id == BOT_OWNER_ID and guild.id not in priority_guilds:
             priority_guilds.append(guild.id)
             save_priority_guilds()
+            if bot.shard_coordinator:
+                await bot.shard_coordinator.set_priority_guild(guild.id, True)
             logger.info(f"👑 Auto-added guild {guild.name} to priority guilds (owner match)")
             
             # Sync commands immediately for this priority guild
@@ -1708,6 +1938,7 @@ async def on_guild_remove(guild: discord.Guild):
         }
         
         # Mark server as inactive
+        await load_server_records([guild_id])
         if guild_id in servers_data:
             servers_data[guild_id]['active'] = False
             servers_data[guild_id]['left_at'] = datetime.utcnow().isoformat()
@@ -1719,7 +1950,7 @@ async def on_guild_remove(guild: discord.Guild):
                 'left_at': datetime.utcnow().isoformat()
             }
         
-        await save_servers(servers_data)
+        await save_servers(servers_data, [guild_id])
         
         # 1. Clean up channel language settings
         channels_to_remove = [ch_id for ch_id in list(channel_langs.keys()) 
@@ -1765,6 +1996,8 @@ async def on_guild_remove(guild: discord.Guild):
         if guild.id in priority_guilds:
             priority_guilds.remove(guild.id)
             save_priority_guilds()
+            if bot.shard_coordinator:
+                await bot.shard_coordinator.set_priority_guild(guild.id, False)
             logger.info(f"👑 Removed guild {guild.name} from priority guilds")
         
         # Log cleanup summary
@@ -1800,7 +2033,6 @@ async def on_message(message: discord.Message):
         # Handle XP for leveling system (Nova style)
         if message.guild and not message.author.bot:
             try:
-                from leveling.level_system import get_leveling_system
                 if db and db.client:
                     leveling = get_leveling_system(db.db)
                     config = await leveling.get_guild_config(str(message.guild.id))
@@ -1841,7 +2073,6 @@ async def on_message(message: discord.Message):
                                     # Assign level roles if leveled up
                                     if leveled_up:
                                         try:
-                                            from autoroles import AutoRoleSystem
                                             autorole_system = AutoRoleSystem(db.db)
                                             await autorole_system.assign_level_roles(
                                                 message.guild.id,
@@ -1858,8 +2089,7 @@ async def on_message(message: discord.Message):
                                             "level_up_message",
                                             "🎉 {user} leveled up to **Level {level}**!"
                                         )
-                                        level_up_msg = level_up_msg.replace("{user}", member.mention)
-                                        level_up_msg = level_up_msg.replace("{level}", str(new_level))
+                                        level_up_msg = render_level_up(level_up_msg, member.mention, member.name, new_level)
                                         
                                         # Send in same channel or custom channel
                                         level_up_channel_id = config.get("level_up_channel")
@@ -1897,8 +2127,8 @@ async def on_message(message: discord.Message):
             return
 
         try:
-            detected = detect(content)
-        except LangDetectException:
+            detected = langdetect.detect(content)
+        except langdetect.LangDetectException:
             logger.debug("Could not detect language")
             return
         except Exception as e:
@@ -2031,7 +2261,6 @@ async def on_raw_reaction_add(payload: discord.RawReactionActionEvent):
         if not db or not db.client:
             return
         
-        from autoroles import AutoRoleSystem
         autorole_system = AutoRoleSystem(db.db)
         
         # Handle reaction
@@ -2056,7 +2285,6 @@ async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
         if not db or not db.client:
             return
         
-        from autoroles import AutoRoleSystem
         autorole_system = AutoRoleSystem(db.db)
         
         # Handle reaction
@@ -2071,21 +2299,13 @@ async def on_raw_reaction_remove(payload: discord.RawReactionActionEvent):
 
 @bot.event
 async def on_member_join(member: discord.Member):
-    """Handle member join for Join Roles"""
+    """Handle member join: join roles, welcome, join logs and anti-raid (see joins/pipeline.py)"""
     try:
         # Check if MongoDB is connected
         if not db or not db.client:
             return
         
-        from autoroles import AutoRoleSystem
-        autorole_system = AutoRoleSystem(db.db)
-        
-        # Assign join roles
-        roles = await autorole_system.assign_join_roles(member)
-        
-        if roles:
-            roles_names = [r.name for r in roles]
-            logger.info(f"✅ Join Roles: Gave {', '.join(roles_names)} to {member.name}")
+        await get_join_pipeline(bot, db.db).handle(member)
         
     except Exception as e:
         logger.error(f"❌ Error in on_member_join: {e}", exc_info=True)
@@ -2514,8 +2734,8 @@ class RolePermissionView(discord.ui.View):
         
         role_permissions[self.guild_id][self.role_id] = permissions
         
-        await save_allowed_roles(allowed_roles)
-        await save_role_permissions(role_permissions)
+        await save_allowed_roles(allowed_roles, [self.guild_id])
+        await save_role_permissions(role_permissions, [self.guild_id])
         
         # Create detailed embed
         perm_list = []
@@ -2573,6 +2793,7 @@ class RatingView(discord.ui.View):
     async def _handle_rating(self, interaction: discord.Interaction, stars: int):
         """Handle rating submission."""
         user_id = str(interaction.user.id)
+        await load_rating_record(user_id)
         was_update = user_id in bot_ratings
         
         bot_ratings[user_id] = {
@@ -2582,6 +2803,8 @@ class RatingView(discord.ui.View):
         }
         
         await save_ratings(bot_ratings)
+        if bot.shard_coordinator:
+            await bot.shard_coordinator.publish("rating", user_id=user_id, rating=bot_ratings[user_id])
         update_bot_stats()  # Update stats file when rating changes
         
         star_text = "⭐" * stars
@@ -2642,7 +2865,7 @@ class TranslationLanguageView(discord.ui.View):
                 if cache_key in translation_cache:
                     translated = translation_cache[cache_key]
                 else:
-                    translated = GoogleTranslator(source=self.source_lang, target=target_lang).translate(self.message_content)
+                    translated = deep_translator.GoogleTranslator(source=self.source_lang, target=target_lang).translate(self.message_content)
                     if translated:
                         translation_cache[cache_key] = translated
                         
@@ -3415,7 +3638,7 @@ async def translate_message_context(interaction: discord.Interaction, message: d
         
         # Detect message language
         try:
-            detected = detect(content)
+            detected = langdetect.detect(content)
         except Exception as e:
             logger.debug(f"Language detection failed: {e}")
             detected = 'auto'
@@ -3441,7 +3664,7 @@ async def translate_message_context(interaction: discord.Interaction, message: d
                 if cache_key in translation_cache:
                     translated = translation_cache[cache_key]
                 else:
-                    translated = GoogleTranslator(source=detected, target=target_lang).translate(content)
+                    translated = deep_translator.GoogleTranslator(source=detected, target=target_lang).translate(content)
                     if translated:
                         translation_cache[cache_key] = translated
                         
@@ -4019,6 +4242,8 @@ async def botstats(interaction: discord.Interaction):
         return
     
     try:
+        await ensure_deferred_data()
+        
         # Calculate statistics
         total_servers = len(servers_data)
         active_servers = sum(1 for s in servers_data.values() if s.get('active', False))
@@ -4087,6 +4312,34 @@ async def botstats(interaction: discord.Interaction):
         bot_info += f"**Version:** Kingdom-77 v{VERSION}"
         emb.add_field(name='🤖 Bot Info', value=bot_info, inline=True)
         
+        # Running cooldowns per feature (shared cooldown store)
+        cooldown_stats = cooldowns.get_stats()
+        if cooldown_stats['features']:
+            cooldown_lines = [
+                f"`{feature}` {stats['active']:,} active • {stats['memory_bytes'] / 1024:.1f} KB"
+                for feature, stats in sorted(cooldown_stats['features'].items())
+            ]
+            emb.add_field(
+                name=f"⏳ Cooldowns ({cooldown_stats['backend']})",
+                value='\n'.join(cooldown_lines[:10]),
+                inline=False
+            )
+        
+        # Per-shard latency / guild count (all processes when coordinated)
+        if SHARD_CONFIG.enabled:
+            if bot.shard_coordinator:
+                shards = await bot.shard_coordinator.get_shard_report()
+            else:
+                shards = shard_latencies(bot)
+            shard_lines = []
+            for shard in shards[:20]:
+                latency = f"{shard['latency_ms']} ms" if shard.get('latency_ms') is not None else "—"
+                stale = " ⚠️" if shard.get('stale') else ""
+                shard_lines.append(f"`#{shard['shard_id']}` {latency} • {shard['guilds']:,} servers{stale}")
+            if len(shards) > 20:
+                shard_lines.append(f"... and {len(shards) - 20} more")
+            emb.add_field(name=f'🧩 Shards ({len(shards)})', value='\n'.join(shard_lines) or '—', inline=False)
+        
         emb.set_footer(text=f"Bot ID: {bot.user.id} • Use /rate to rate the bot!")
         
         await interaction.response.send_message(embed=emb, ephemeral=True)
@@ -4240,6 +4493,18 @@ async def debug_info(interaction: discord.Interaction):
         else:
             info.append("No channels configured in this server.")
         
+        # MongoDB query statistics (database/instrumentation.py)
+        from database.instrumentation import query_stats
+        top_queries = query_stats.top(limit=5)
+        if top_queries:
+            info.append("")
+            info.append(f"**Slowest MongoDB operations** (slow > {query_stats.slow_query_ms:.0f}ms: {len(query_stats.slow_queries)}):")
+            for row in top_queries:
+                info.append(
+                    f"• `{row['collection']}.{row['operation']}` {row['calls']} calls, "
+                    f"avg {row['avg_ms']}ms, p95 {row['p95_ms']}ms, {row['docs']} docs"
+                )
+        
         emb = make_embed(title='Debug Information', description='\n'.join(info))
         await interaction.response.send_message(embed=emb, ephemeral=True)
         
@@ -4605,7 +4870,7 @@ async def channel_quality(interaction: discord.Interaction, mode: app_commands.C
         
         # Update quality mode
         channel_langs[channel_id]['translation_quality'] = mode.value
-        await save_channels(channel_langs)
+        await save_channels(channel_langs, [channel_id])
         
         # Mode descriptions
         mode_info = {
@@ -4686,6 +4951,7 @@ async def ratings(interaction: discord.Interaction):
         await interaction.response.send_message(embed=emb, ephemeral=True)
         return
     
+    await ensure_deferred_data()
     if not bot_ratings:
         emb = make_embed(
             title='Bot Ratings 📊',
@@ -4940,7 +5206,7 @@ async def role_remove(interaction: discord.Interaction, role: str):
         
         # Remove role
         allowed_roles[guild_id].remove(role_id)
-        await save_allowed_roles(allowed_roles)
+        await save_allowed_roles(allowed_roles, [guild_id])
         
         emb = make_embed(
             title='Role Removed ✅',
@@ -5024,7 +5290,7 @@ async def role_setlang(interaction: discord.Interaction, role: discord.Role, lan
         old_lang = role_languages[guild_id].get(role_id)
         
         role_languages[guild_id][role_id] = language
-        await save_role_languages(role_languages)
+        await save_role_languages(role_languages, [guild_id])
         
         lang_name = SUPPORTED.get(language, language)
         flag_emoji = {
@@ -5111,7 +5377,7 @@ async def role_removelang(interaction: discord.Interaction, role: discord.Role):
         if not role_languages[guild_id]:
             del role_languages[guild_id]
         
-        await save_role_languages(role_languages)
+        await save_role_languages(role_languages, [guild_id])
         
         emb = make_embed(
             title='Role Language Removed ✅',
@@ -5154,14 +5420,17 @@ if __name__ == '__main__':
         exit(1)
     
     # Start keep-alive server for Render Web Service (required for free plan)
-    try:
-        from keep_alive import keep_alive
-        keep_alive()
-        logger.info("✅ Keep-alive server started on port 8080")
-    except ImportError:
-        logger.warning("⚠️ Keep-alive not enabled - Install flask: pip install flask")
-    except Exception as e:
-        logger.debug(f"Keep-alive error: {e}")
+    if os.getenv('KEEP_ALIVE_DISABLED'):
+        logger.info("Keep-alive server disabled for this shard cluster")
+    else:
+        try:
+            from keep_alive import keep_alive
+            keep_alive()
+            logger.info("✅ Keep-alive server started on port 8080")
+        except ImportError:
+            logger.warning("⚠️ Keep-alive not enabled - Install flask: pip install flask")
+        except Exception as e:
+            logger.debug(f"Keep-alive error: {e}")
     
     try:
         bot.run(TOKEN)
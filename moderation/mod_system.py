@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 import uuid
 import discord
 from discord import Member, User, Guild
+from database.metrics_schema import MetricsSchema, metric_key
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,7 @@ class ModerationSystem:
             db: MongoDB database instance
         """
         self.db = db
+        self.metrics = MetricsSchema(db)
         
     # ========================================================================
     # WARNINGS SYSTEM
@@ -228,6 +230,12 @@ class ModerationSystem:
                 action["expires_at"] = None
             
             await self.db.mod_actions.insert_one(action)
+            await self.metrics.increment(
+                guild_id,
+                {metric_key("moderation_actions", action_type): 1},
+                totals={metric_key("moderation_actions", action_type): 1},
+                timestamp=timestamp
+            )
             logger.info(f"Action {action_id} logged: {action_type} on user {user_id} in guild {guild_id}")
             
             return action
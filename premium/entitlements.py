@@ -0,0 +1,104 @@
+"""
+Premium Entitlement Cache
+Keeps each guild's tier, features and limits in memory so premium checks
+(is_premium, has_feature, XP boost, limits) are dictionary lookups.
+
+Entries expire exactly at the subscription's ``expires_at``. They are also
+re-read after ``refresh_seconds`` so changes made by other processes (e.g.
+the dashboard) are picked up, and invalidated explicitly whenever this
+process changes a subscription (checkout webhooks, trials, gifts, ...).
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, Callable, Awaitable
+
+from database.single_flight import SingleFlightCache
+
+logger = logging.getLogger(__name__)
+
+# Limits for guilds without a subscription
+FREE_TIER_LIMITS = {
+    "max_custom_commands": 5,
+    "max_autoroles": 10,
+    "max_tickets": 50
+}
+
+
+def build_entitlement(
+    subscription: Optional[Dict[str, Any]],
+    now: datetime,
+    refresh_seconds: int,
+    negative_seconds: int
+) -> Dict[str, Any]:
+    """Build a cache entry from a subscription document (or None)"""
+    from database.premium_schema import PREMIUM_TIERS
+
+    if not subscription:
+        return {
+            "tier": None,
+            "features": frozenset(),
+            "limits": FREE_TIER_LIMITS,
+            "expires_at": None,
+            "valid_until": now + timedelta(seconds=negative_seconds)
+        }
+
+    tier = subscription.get("tier")
+    expires_at = subscription.get("expires_at")
+    valid_until = now + timedelta(seconds=refresh_seconds)
+    if isinstance(expires_at, datetime) and expires_at < valid_until:
+        valid_until = expires_at
+
+    return {
+        "tier": tier,
+        "features": frozenset(subscription.get("features", [])),
+        "limits": PREMIUM_TIERS.get(tier, {}).get("limits", {}),
+        "expires_at": expires_at,
+        "valid_until": valid_until
+    }
+
+
+class EntitlementCache(SingleFlightCache):
+    """In-memory per-guild premium entitlements with expiry-aware invalidation"""
+
+    def __init__(
+        self,
+        loader: Callable[[str], Awaitable[Optional[Dict[str, Any]]]],
+        refresh_seconds: int = 600,
+        negative_seconds: int = 300
+    ):
+        """
+        Args:
+            loader: Coroutine returning the active subscription of a guild
+            refresh_seconds: Max age of an entry before it is re-read
+            negative_seconds: Max age of a "no subscription" entry
+        """
+        super().__init__(refresh_seconds)
+        self.loader = loader
+        self.negative_seconds = negative_seconds
+
+    def expires_at(self, entry: Dict[str, Any], now: datetime) -> datetime:
+        # Built in: the subscription's expires_at, capped by refresh_seconds
+        return entry["valid_until"]
+
+    async def get(self, guild_id: str) -> Dict[str, Any]:
+        """Get the entitlements of a guild, loading them on a miss"""
+        guild_id = str(guild_id)
+        return await self.get_or_load(guild_id, lambda: self._load(guild_id))
+
+    async def _load(self, guild_id: str) -> Dict[str, Any]:
+        subscription = await self.loader(guild_id)
+        return build_entitlement(
+            subscription,
+            datetime.utcnow(),
+            self.refresh_seconds,
+            self.negative_seconds
+        )
+
+    def invalidate(self, guild_id: Optional[str] = None, propagate: bool = True):
+        """Drop one guild's entry, or everything when guild_id is None"""
+        super().invalidate(None if guild_id is None else str(guild_id), propagate)
+        if guild_id is None:
+            logger.debug("Invalidated all premium entitlements")
+        else:
+            logger.debug(f"Invalidated premium entitlements for guild {guild_id}")
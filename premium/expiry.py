@@ -0,0 +1,92 @@
+"""
+Premium Subscription Expiry
+Expires subscriptions at their exact ``expires_at`` instead of in a daily sweep.
+
+Subscriptions expiring within ``LOAD_HORIZON`` are kept as deadlines in the
+shared scheduler (scheduling/deadlines.py); its periodic reload brings later
+ones in and catches anything overdue (e.g. after downtime). Everything due at
+the same moment is expired with one ``update_many``, then the side effects
+run for the subscriptions that actually expired (renewed ones are skipped by
+the update filter):
+
+- entitlement cache invalidation for the guild
+- ``premium_expired`` bot event (``on_premium_expired`` listeners, e.g. to
+  remove premium-only roles)
+- "Premium expired" email when the subscription carries a contact address
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+
+from scheduling import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_KIND = "premium_expiry"
+BATCH_SIZE = 100
+LOAD_HORIZON = timedelta(hours=24)
+
+
+class SubscriptionExpiry:
+    """Deadline-driven, batched subscription expiry"""
+
+    def __init__(self, premium_system, bot):
+        """
+        Args:
+            premium_system: PremiumSystem (schema, entitlements, email)
+            bot: Bot whose deadline scheduler is used
+        """
+        self.premium = premium_system
+        self.schema = premium_system.schema
+        self.bot = bot
+        self.scheduler = get_scheduler(bot)
+        self.scheduler.register(
+            EXPIRY_KIND,
+            self._expire_batch,
+            loader=self._load_deadlines,
+            batch_size=BATCH_SIZE
+        )
+
+    def stop(self):
+        self.scheduler.unregister(EXPIRY_KIND)
+
+    async def _load_deadlines(self):
+        subscriptions = await self.schema.get_expiring_subscriptions(datetime.utcnow() + LOAD_HORIZON)
+        return [(str(subscription["_id"]), subscription["expires_at"]) for subscription in subscriptions]
+
+    def schedule(self, subscription: Dict[str, Any]):
+        """Track a new subscription right away if it ends before the next reload"""
+        expires_at = subscription.get("expires_at")
+        if isinstance(expires_at, datetime) and expires_at <= datetime.utcnow() + LOAD_HORIZON:
+            self.scheduler.schedule(EXPIRY_KIND, str(subscription["_id"]), expires_at)
+
+    async def _expire_batch(self, subscription_ids: List[str]):
+        expired = await self.schema.expire_subscriptions(subscription_ids)
+        if not expired:
+            return
+
+        for subscription in expired:
+            self.premium.entitlements.invalidate(subscription["guild_id"])
+            self.bot.dispatch("premium_expired", subscription)
+
+        await asyncio.gather(*(self._notify(subscription) for subscription in expired))
+        logger.info(f"⏰ Expired {len(expired)} premium subscription(s)")
+
+    async def _notify(self, subscription: Dict[str, Any]):
+        metadata = subscription.get("metadata") or {}
+        user_email = metadata.get("user_email")
+        if not user_email:
+            return
+        try:
+            if not await self.premium.email_schema.can_send_email(subscription["user_id"], "subscription"):
+                return
+            await self.premium.email_service.send_subscription_expired(
+                to_email=user_email,
+                user_name=metadata.get("user_name", "User"),
+                guild_name=metadata.get("guild_name", "Your Server"),
+                user_id=subscription["user_id"]
+            )
+        except Exception as e:
+            logger.error(f"Failed to send subscription expired email: {e}")
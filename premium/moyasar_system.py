@@ -348,6 +348,11 @@ class MoyasarProvider:
         
         logger.info(f"Handling Moyasar webhook: {event_type}")
         
+        # Any payment event may change entitlements of the guild
+        guild_id = data.get("metadata", {}).get("guild_id")
+        if premium_system and guild_id:
+            premium_system.entitlements.invalidate(guild_id)
+        
         # Payment succeeded
         if event_type == "payment_paid":
             return await self._handle_payment_success(data, premium_system)
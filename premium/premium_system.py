@@ -19,12 +19,23 @@ class PremiumSystem:
         from database.premium_schema import PremiumSchema
         from database.email_schema import EmailSchema
         from email.email_service import email_service
+        from premium.entitlements import EntitlementCache
+        from premium.usage_tracker import UsageTracker
         
         self.schema = PremiumSchema(mongodb_client)
         self.email_schema = EmailSchema(mongodb_client.db)
         self.email_service = email_service
         self.mongodb_client = mongodb_client
         
+        # In-memory entitlements (tier/features/limits) per guild
+        self.entitlements = EntitlementCache(self.schema.get_guild_subscription)
+        
+        # Buffered feature usage (flushed as daily rollups)
+        self.usage_tracker = UsageTracker(self.schema)
+        
+        # Exact-time expiry, started by the premium cog (needs the bot)
+        self.expiry = None
+        
         # Payment provider configuration
         self.payment_provider_name = os.getenv("PAYMENT_PROVIDER", "stripe").lower()
         self.payment_provider = None
@@ -70,6 +81,22 @@ class PremiumSystem:
     async def initialize(self):
         """Initialize premium system"""
         await self.schema.initialize()
+        await self.email_schema.initialize()
+        self.start_email_queue()
+    
+    def start_email_queue(self):
+        """Send emails through the persistent outbound queue (see email/email_queue.py)"""
+        from email.email_queue import EmailQueue
+        
+        if self.email_service.queue is None:
+            self.email_service.attach_queue(EmailQueue(
+                self.email_schema,
+                self.email_service.transport,
+                from_email=self.email_service.from_email,
+                reply_to=self.email_service.reply_to,
+                workers=int(os.getenv("EMAIL_QUEUE_WORKERS", "4"))
+            ))
+        self.email_service.queue.start()
     
     # Subscription Management
     
@@ -90,8 +117,12 @@ class PremiumSystem:
             user_id=user_id,
             guild_id=guild_id,
             tier=tier,
-            duration_days=duration_days
+            duration_days=duration_days,
+            metadata=self._contact_metadata(user_email, user_name, guild_name)
         )
+        self.entitlements.invalidate(guild_id)
+        if self.expiry:
+            self.expiry.schedule(subscription)
         
         # Send subscription confirmation email
         if user_email and user_name and guild_name:
@@ -145,17 +176,25 @@ class PremiumSystem:
     
     async def is_premium(self, guild_id: str) -> bool:
         """Check if guild has active premium subscription"""
-        subscription = await self.schema.get_guild_subscription(guild_id)
-        return subscription is not None
+        entitlement = await self.entitlements.get(str(guild_id))
+        return entitlement["tier"] is not None
+    
+    async def check_premium(self, guild_id) -> bool:
+        """Alias of is_premium accepting int guild IDs"""
+        return await self.is_premium(str(guild_id))
     
     async def get_tier(self, guild_id: str) -> Optional[str]:
         """Get subscription tier for guild"""
-        subscription = await self.schema.get_guild_subscription(guild_id)
-        return subscription["tier"] if subscription else None
+        entitlement = await self.entitlements.get(str(guild_id))
+        return entitlement["tier"]
     
     async def cancel_subscription(self, subscription_id: str) -> bool:
         """Cancel a subscription"""
-        return await self.schema.cancel_subscription(subscription_id)
+        guild_id = await self.schema.cancel_subscription(subscription_id)
+        if guild_id is None:
+            return False
+        self.entitlements.invalidate(guild_id)
+        return True
     
     async def renew_subscription(
         self,
@@ -163,20 +202,23 @@ class PremiumSystem:
         duration_days: int = 30
     ) -> bool:
         """Renew a subscription"""
-        return await self.schema.renew_subscription(subscription_id, duration_days)
+        guild_id = await self.schema.renew_subscription(subscription_id, duration_days)
+        if guild_id is None:
+            return False
+        self.entitlements.invalidate(guild_id)
+        return True
     
     # Feature Access Control
     
     async def has_feature(self, guild_id: str, feature_id: str) -> bool:
         """Check if guild has access to a premium feature"""
-        return await self.schema.has_feature(guild_id, feature_id)
+        entitlement = await self.entitlements.get(str(guild_id))
+        return feature_id in entitlement["features"]
     
     async def get_guild_features(self, guild_id: str) -> List[str]:
         """Get all features available to a guild"""
-        subscription = await self.schema.get_guild_subscription(guild_id)
-        if not subscription:
-            return []
-        return subscription.get("features", [])
+        entitlement = await self.entitlements.get(str(guild_id))
+        return list(entitlement["features"])
     
     async def get_tier_features(self, tier: str) -> List[str]:
         """Get all features for a tier"""
@@ -195,16 +237,21 @@ class PremiumSystem:
         user_id: Optional[str] = None,
         metadata: Optional[Dict] = None
     ):
-        """Track feature usage"""
-        await self.schema.track_feature_usage(
+        """Track feature usage (buffered, flushed by flush_usage)"""
+        self.usage_tracker.record(
             guild_id=guild_id,
             feature_id=feature_id,
             user_id=user_id,
             metadata=metadata
         )
     
+    async def flush_usage(self) -> int:
+        """Flush buffered feature usage to the daily rollups"""
+        return await self.usage_tracker.flush()
+    
     async def get_usage_stats(self, guild_id: str, days: int = 30) -> Dict[str, int]:
         """Get feature usage statistics"""
+        await self.usage_tracker.flush()
         return await self.schema.get_feature_usage_stats(guild_id, days)
     
     # Stripe Integration
@@ -409,6 +456,10 @@ class PremiumSystem:
             if subscription_id:
                 await self.cancel_subscription(subscription_id)
         
+        # Any payment event may change entitlements of the guild
+        guild_id = data.get("metadata", {}).get("guild_id")
+        self.entitlements.invalidate(guild_id)
+        
         return True
     
     # XP Boost System
@@ -428,21 +479,8 @@ class PremiumSystem:
     
     async def get_limit(self, guild_id: str, limit_name: str) -> int:
         """Get limit for a specific feature"""
-        from database.premium_schema import PREMIUM_TIERS
-        
-        tier = await self.get_tier(guild_id)
-        if not tier:
-            # Free tier limits
-            limits = {
-                "max_custom_commands": 5,
-                "max_autoroles": 10,
-                "max_tickets": 50
-            }
-            return limits.get(limit_name, 0)
-        
-        tier_info = PREMIUM_TIERS.get(tier, {})
-        limits = tier_info.get("limits", {})
-        return limits.get(limit_name, 0)
+        entitlement = await self.entitlements.get(str(guild_id))
+        return entitlement["limits"].get(limit_name, 0)
     
     async def check_limit(
         self,
@@ -463,9 +501,47 @@ class PremiumSystem:
         return await self.schema.get_subscription_stats()
     
     async def cleanup_expired(self) -> int:
-        """Cleanup expired subscriptions"""
+        """Cleanup expired subscriptions (sweep without side effects)"""
+        # Cached entries already expire at their subscription's expires_at
         return await self.schema.cleanup_expired_subscriptions()
     
+    async def run_weekly_summary(self, bot_db, bot=None) -> Dict[str, Any]:
+        """Queue last week's summary emails for all premium guilds (see email/weekly_summary.py)"""
+        from email.weekly_summary import WeeklySummaryJob
+        
+        job = WeeklySummaryJob(
+            bot_db=bot_db,
+            premium_schema=self.schema,
+            economy_db=self.mongodb_client["kingdom77"],
+            email_schema=self.email_schema,
+            email_service=self.email_service,
+            bot=bot
+        )
+        return await job.run()
+    
+    def start_expiry(self, bot):
+        """Expire subscriptions at their exact time (see premium/expiry.py)"""
+        if self.expiry is None:
+            from premium.expiry import SubscriptionExpiry
+            self.expiry = SubscriptionExpiry(self, bot)
+        return self.expiry
+    
+    @staticmethod
+    def _contact_metadata(
+        user_email: Optional[str],
+        user_name: Optional[str],
+        guild_name: Optional[str]
+    ) -> Dict[str, Any]:
+        """Contact details kept on the subscription for expiry/renewal emails"""
+        metadata = {}
+        if user_email:
+            metadata["user_email"] = user_email
+        if user_name:
+            metadata["user_name"] = user_name
+        if guild_name:
+            metadata["guild_name"] = guild_name
+        return metadata
+    
     # Trial System
     
     async def start_trial(
@@ -492,14 +568,18 @@ class PremiumSystem:
             user_id=user_id,
             guild_id=guild_id,
             tier=tier,
-            duration_days=trial_days
+            duration_days=trial_days,
+            metadata=self._contact_metadata(user_email, user_name, guild_name)
         )
+        if self.expiry:
+            self.expiry.schedule(subscription)
         
         # Mark as trial
         await self.schema.subscriptions.update_one(
             {"_id": subscription["_id"]},
             {"$set": {"metadata.is_trial": True}}
         )
+        self.entitlements.invalidate(guild_id)
         
         # Send trial started email
         if user_email and user_name and guild_name:
@@ -548,6 +628,7 @@ class PremiumSystem:
                 "metadata.gifted_by": gifter_user_id
             }}
         )
+        self.entitlements.invalidate(recipient_guild_id)
         
         return subscription
     
@@ -0,0 +1,117 @@
+"""
+Premium Feature Usage Tracker
+Buffers feature usage in memory and flushes it as daily rollups.
+
+``record`` only bumps an in-memory counter keyed by (guild, feature, day),
+so tracking adds no database round-trip to the command path. ``flush``
+turns the buffer into ``$inc`` upserts on ``feature_usage_daily``.
+
+Raw per-event documents in ``feature_usage`` are optional and sampled:
+- PREMIUM_USAGE_SAMPLE_RATE=0   -> rollups only (default)
+- PREMIUM_USAGE_SAMPLE_RATE=0.1 -> keep ~10% of raw events
+- PREMIUM_USAGE_SAMPLE_RATE=1   -> keep every raw event
+
+Raw events expire after 90 days through a TTL index (database/indexes.py).
+"""
+
+import os
+import asyncio
+import logging
+import random
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+
+from database.counter_buffer import CounterBuffer
+
+logger = logging.getLogger(__name__)
+
+
+class UsageTracker:
+    """In-memory usage counter buffer with batched rollup flushes"""
+
+    def __init__(
+        self,
+        schema,
+        sample_rate: Optional[float] = None,
+        max_pending: int = 1000
+    ):
+        """
+        Args:
+            schema: PremiumSchema used for flushing
+            sample_rate: Fraction of raw events to keep (0-1)
+            max_pending: Buffered keys/events that trigger an early flush
+        """
+        if sample_rate is None:
+            sample_rate = float(os.getenv("PREMIUM_USAGE_SAMPLE_RATE", "0"))
+
+        self.schema = schema
+        self.sample_rate = min(1.0, max(0.0, sample_rate))
+        self.max_pending = max_pending
+        self.counters = CounterBuffer(self._write_rollups, label="feature usage rollups")
+        self._events: List[Dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered rollup keys and raw events"""
+        return self.counters.pending + len(self._events)
+
+    def record(
+        self,
+        guild_id: str,
+        feature_id: str,
+        user_id: Optional[str] = None,
+        metadata: Optional[Dict] = None
+    ):
+        """Record one feature use (no I/O)"""
+        now = datetime.utcnow()
+        day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        self.counters.add((str(guild_id), feature_id, day), {"count": 1})
+
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            self._events.append({
+                "guild_id": str(guild_id),
+                "feature_id": feature_id,
+                "user_id": user_id,
+                "timestamp": now,
+                "sample_rate": self.sample_rate,
+                "metadata": metadata or {}
+            })
+
+        if self.pending >= self.max_pending:
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Start a background flush unless one is already running"""
+        if self._flush_task and not self._flush_task.done():
+            return
+        try:
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+        except RuntimeError:
+            # No running loop; the periodic flush will pick it up
+            pass
+
+    async def _write_rollups(self, counts) -> int:
+        return await self.schema.increment_usage_rollups(
+            {key: fields["count"] for key, fields in counts.items()}
+        )
+
+    async def flush(self) -> int:
+        """Write buffered counts and sampled events. Returns rollup rows written."""
+        # Counts and events are retried on their own, so a failed event insert
+        # never requeues counts that were already written
+        written = await self.counters.flush()
+
+        async with self._flush_lock:
+            events, self._events = self._events, []
+            if events:
+                try:
+                    await self.schema.insert_usage_events(events)
+                except Exception as e:
+                    logger.error(f"Error flushing feature usage events: {e}")
+                    self._events = events + self._events
+                    events = []
+
+            logger.debug(f"Flushed {written} usage rollups and {len(events)} raw events")
+            return written
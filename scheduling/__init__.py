@@ -0,0 +1,11 @@
+"""
+Scheduling Package
+Shared deadline scheduler for time-based jobs (giveaway ends, expiries, ...)
+and the expiring cooldown store
+"""
+
+from .deadlines import DeadlineScheduler, get_scheduler, to_timestamp
+from .cooldowns import CooldownStore, cooldowns
+
+__all__ = ["DeadlineScheduler", "get_scheduler", "to_timestamp", "CooldownStore", "cooldowns"]
+__version__ = "4.0.0"
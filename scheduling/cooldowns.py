@@ -0,0 +1,196 @@
+"""
+Cooldown Store
+One expiring key store for every per-user cooldown (custom commands,
+auto-messages, economy work/crime, daily credits, ...).
+
+Cooldowns are grouped by *feature*; each feature maps a key (e.g.
+``"guild:user"``) to the epoch second its cooldown ends. ``acquire`` is the
+check-and-set used on the command path:
+
+    remaining = await cooldowns.acquire("work", f"{guild_id}:{user_id}", 3600)
+    if remaining:
+        ...  # still on cooldown for ``remaining`` seconds
+
+Expired entries are evicted automatically: every end time also goes into a
+min-heap, and each operation pops what has passed. Nothing needs a periodic
+cleanup and memory only holds cooldowns that are still running.
+
+With ``use_redis`` (multi-process deployments) the cooldowns are shared
+through Redis keys with a TTL (``SET NX PX`` for acquire). The local store
+stays in front of Redis as a cache of known running cooldowns, so blocked
+users cost no round-trip. Redis errors fall back to the local store.
+"""
+
+import sys
+import time
+import heapq
+import logging
+from typing import Optional, Dict, Any, List, Tuple
+
+from .deadlines import Deadline, to_timestamp
+
+logger = logging.getLogger(__name__)
+
+REDIS_PREFIX = "k77:cooldown"
+
+
+class CooldownStore:
+    """Per-feature cooldowns with heap-based expiry and optional Redis backing"""
+
+    def __init__(self, redis_client=None, prefix: str = REDIS_PREFIX):
+        """
+        Args:
+            redis_client: redis.asyncio client shared by all processes (optional)
+            prefix: Redis key prefix
+        """
+        self.redis = redis_client
+        self.prefix = prefix
+        # feature -> key -> end (epoch seconds)
+        self._entries: Dict[str, Dict[str, float]] = {}
+        self._heap: List[Tuple[float, str, str]] = []
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def use_redis(self, redis_client):
+        """Share cooldowns with the other processes through Redis"""
+        self.redis = redis_client
+
+    # ==================== Local store ====================
+
+    def _count(self, feature: str, counter: str):
+        counters = self._counters.get(feature)
+        if counters is None:
+            counters = self._counters[feature] = {"checks": 0, "blocked": 0, "evicted": 0}
+        counters[counter] += 1
+
+    def _evict(self, now: float):
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            end, feature, key = heapq.heappop(heap)
+            entries = self._entries.get(feature)
+            # Entries that were reset or moved have a different end (stale heap entry)
+            if entries is not None and entries.get(key) == end:
+                del entries[key]
+                self._count(feature, "evicted")
+
+    def _set_local(self, feature: str, key: str, end: float):
+        entries = self._entries.get(feature)
+        if entries is None:
+            entries = self._entries[feature] = {}
+        entries[key] = end
+        heapq.heappush(self._heap, (end, feature, key))
+
+    def peek(self, feature: str, key: Any) -> Optional[float]:
+        """Remaining seconds known to this process (no I/O)"""
+        now = time.time()
+        self._evict(now)
+        end = self._entries.get(feature, {}).get(str(key))
+        return end - now if end is not None and end > now else None
+
+    # ==================== Cooldowns ====================
+
+    async def acquire(self, feature: str, key: Any, seconds: float) -> Optional[float]:
+        """
+        Start a cooldown unless one is running.
+
+        Returns:
+            None when the cooldown was started, else the remaining seconds
+        """
+        if seconds <= 0:
+            return None
+        key = str(key)
+        self._count(feature, "checks")
+
+        remaining = self.peek(feature, key)
+        if remaining is not None:
+            self._count(feature, "blocked")
+            return remaining
+
+        now = time.time()
+        if self.redis is not None:
+            try:
+                name = f"{self.prefix}:{feature}:{key}"
+                if not await self.redis.set(name, "1", px=max(1, int(seconds * 1000)), nx=True):
+                    ttl = await self.redis.pttl(name)
+                    if ttl > 0:
+                        # Started by another process: remember it locally
+                        self._set_local(feature, key, now + ttl / 1000)
+                        self._count(feature, "blocked")
+                        return ttl / 1000
+            except Exception as e:
+                logger.error(f"Cooldown store Redis error ({feature}): {e}")
+
+        self._set_local(feature, key, now + seconds)
+        return None
+
+    async def remaining(self, feature: str, key: Any) -> Optional[float]:
+        """Remaining seconds of a cooldown (None when not on cooldown)"""
+        key = str(key)
+        remaining = self.peek(feature, key)
+        if remaining is not None or self.redis is None:
+            return remaining
+        try:
+            ttl = await self.redis.pttl(f"{self.prefix}:{feature}:{key}")
+        except Exception as e:
+            logger.error(f"Cooldown store Redis error ({feature}): {e}")
+            return None
+        if ttl <= 0:
+            return None
+        self._set_local(feature, key, time.time() + ttl / 1000)
+        return ttl / 1000
+
+    async def set(
+        self,
+        feature: str,
+        key: Any,
+        seconds: Optional[float] = None,
+        until: Optional[Deadline] = None
+    ):
+        """Start (or move) a cooldown ending in ``seconds`` or at ``until``"""
+        key = str(key)
+        now = time.time()
+        end = to_timestamp(until) if until is not None else now + (seconds or 0)
+        if end <= now:
+            await self.reset(feature, key)
+            return
+        self._evict(now)
+        self._set_local(feature, key, end)
+        if self.redis is not None:
+            try:
+                await self.redis.set(f"{self.prefix}:{feature}:{key}", "1", px=max(1, int((end - now) * 1000)))
+            except Exception as e:
+                logger.error(f"Cooldown store Redis error ({feature}): {e}")
+
+    async def reset(self, feature: str, key: Any):
+        """End a cooldown now"""
+        key = str(key)
+        self._entries.get(feature, {}).pop(key, None)
+        if self.redis is not None:
+            try:
+                await self.redis.delete(f"{self.prefix}:{feature}:{key}")
+            except Exception as e:
+                logger.error(f"Cooldown store Redis error ({feature}): {e}")
+
+    # ==================== Metrics ====================
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Running cooldowns, approximate memory and counters per feature"""
+        self._evict(time.time())
+        float_size = sys.getsizeof(0.0)
+        features = {}
+        for feature in set(self._entries) | set(self._counters):
+            entries = self._entries.get(feature, {})
+            features[feature] = {
+                "active": len(entries),
+                "memory_bytes": sys.getsizeof(entries) + sum(sys.getsizeof(key) + float_size for key in entries),
+                **self._counters.get(feature, {"checks": 0, "blocked": 0, "evicted": 0})
+            }
+        return {
+            "backend": "redis" if self.redis is not None else "memory",
+            "heap_entries": len(self._heap),
+            "heap_bytes": sys.getsizeof(self._heap),
+            "features": features
+        }
+
+
+# Shared by every system of the process
+cooldowns = CooldownStore()
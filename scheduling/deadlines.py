@@ -0,0 +1,289 @@
+"""
+Deadline Scheduler
+One long-lived task that fires jobs exactly at their deadline.
+
+Systems register a job *kind* with a handler (called with the job key when
+the deadline passes) and a loader (returns the pending ``(key, when)`` pairs
+from the database). Deadlines sit in a min-heap; the runner sleeps until the
+earliest one instead of polling the collections on a fixed interval.
+
+    scheduler = get_scheduler(bot)
+    scheduler.register("giveaway", end_giveaway, loader=load_active_giveaways)
+    scheduler.schedule("giveaway", giveaway_id, giveaway["end_time"])
+
+Kinds registered with ``batch_size`` get a list of keys: every job of that
+kind that is due at the same wake-up is handed over together (in chunks of
+``batch_size``), so expiries can be applied with one bulk write.
+
+``schedule`` is the in-process notification for new or changed deadlines:
+it wakes the runner when the new deadline is earlier than the one it sleeps
+on. The database stays the source of truth - loaders rebuild the heap on
+start and every ``resync_interval`` seconds, which also picks up deadlines
+created by other processes (dashboard, other shard clusters).
+
+A job whose handler fails ``MAX_ATTEMPTS`` times is given up: reloads skip
+it until ``schedule`` is called for it again (the deadline was changed in
+process) or the bot restarts.
+"""
+
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Callable, Awaitable, Iterable, Tuple, List, Set, Union
+
+logger = logging.getLogger(__name__)
+
+Deadline = Union[datetime, float, int]
+Handler = Callable[[Any], Awaitable[Any]]
+Loader = Callable[[], Awaitable[Iterable[Tuple[Any, Deadline]]]]
+
+# Failed handlers are retried this many times, RETRY_DELAY seconds apart
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 30
+
+
+def to_timestamp(when: Deadline, naive_is_utc: bool = True) -> float:
+    """
+    Epoch seconds for a deadline.
+
+    MongoDB returns naive datetimes in UTC, so naive values are read as UTC
+    unless ``naive_is_utc`` is False (values created with ``datetime.now()``).
+    """
+    if isinstance(when, datetime):
+        if when.tzinfo is None and naive_is_utc:
+            when = when.replace(tzinfo=timezone.utc)
+        return when.timestamp()
+    return float(when)
+
+
+class DeadlineScheduler:
+    """Min-heap of deadlines served by a single task"""
+
+    def __init__(self, bot=None, resync_interval: float = 600):
+        """
+        Args:
+            bot: Waited on (``wait_until_ready``) before the first job fires
+            resync_interval: Seconds between loader runs (0 = only on start)
+        """
+        self.bot = bot
+        self.resync_interval = resync_interval
+        self._handlers: Dict[str, Handler] = {}
+        self._loaders: Dict[str, Loader] = {}
+        self._batch_sizes: Dict[str, int] = {}
+        self._heap: List[Tuple[float, int, str, Any]] = []
+        # (kind, key) -> deadline currently valid; heap entries not matching are stale
+        self._deadlines: Dict[Tuple[str, Any], float] = {}
+        self._attempts: Dict[Tuple[str, Any], int] = {}
+        # Jobs that failed MAX_ATTEMPTS times; skipped by reload()
+        self._given_up: Set[Tuple[str, Any]] = set()
+        self._running: Dict[Tuple[str, Any], asyncio.Task] = {}
+        self._counter = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"fired": 0, "failed": 0, "loaded": 0}
+
+    # ==================== Registration ====================
+
+    def register(
+        self,
+        kind: str,
+        handler: Handler,
+        loader: Optional[Loader] = None,
+        batch_size: Optional[int] = None
+    ):
+        """
+        Register (or replace, e.g. on cog reload) the handler of a job kind.
+
+        Args:
+            kind: Job kind name
+            handler: Coroutine called with the job key (or a list of keys)
+            loader: Coroutine returning the pending ``(key, when)`` pairs
+            batch_size: Call ``handler`` with lists of up to this many keys
+        """
+        self._handlers[kind] = handler
+        if batch_size:
+            self._batch_sizes[kind] = batch_size
+        else:
+            self._batch_sizes.pop(kind, None)
+        if loader is not None:
+            self._loaders[kind] = loader
+            if self._task is not None:
+                asyncio.create_task(self.reload(kind))
+
+    def unregister(self, kind: str):
+        """Drop a job kind and its pending deadlines"""
+        self._handlers.pop(kind, None)
+        self._loaders.pop(kind, None)
+        self._batch_sizes.pop(kind, None)
+        for job in [job for job in self._deadlines if job[0] == kind]:
+            del self._deadlines[job]
+        self._given_up = {job for job in self._given_up if job[0] != kind}
+
+    # ==================== Deadlines ====================
+
+    def schedule(self, kind: str, key: Any, when: Deadline, naive_is_utc: bool = True):
+        """Add or move a deadline (wakes the runner if it is the new earliest)"""
+        self._given_up.discard((kind, key))
+        self._push(kind, key, to_timestamp(when, naive_is_utc))
+
+    def _push(self, kind: str, key: Any, deadline: float):
+        job = (kind, key)
+        if self._deadlines.get(job) == deadline:
+            return
+        earliest = self._heap[0][0] if self._heap else None
+        self._deadlines[job] = deadline
+        heapq.heappush(self._heap, (deadline, next(self._counter), kind, key))
+        if earliest is None or deadline < earliest:
+            self._wakeup.set()
+
+    def cancel(self, kind: str, key: Any):
+        """Forget a deadline (the heap entry is discarded lazily)"""
+        self._deadlines.pop((kind, key), None)
+        self._attempts.pop((kind, key), None)
+        self._given_up.discard((kind, key))
+
+    def next_deadline(self) -> Optional[float]:
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pending(self, kind: Optional[str] = None) -> int:
+        return sum(1 for job in self._deadlines if kind is None or job[0] == kind)
+
+    def _discard_stale(self):
+        while self._heap:
+            deadline, _, kind, key = self._heap[0]
+            if self._deadlines.get((kind, key)) == deadline:
+                return
+            heapq.heappop(self._heap)
+
+    # ==================== Loading ====================
+
+    async def reload(self, kind: Optional[str] = None):
+        """Schedule every pending deadline returned by the loaders"""
+        kinds = [kind] if kind else list(self._loaders)
+        for name in kinds:
+            loader = self._loaders.get(name)
+            if loader is None:
+                continue
+            try:
+                count = 0
+                for key, when in await loader():
+                    job = (name, key)
+                    if job not in self._running and job not in self._given_up:
+                        self._push(name, key, to_timestamp(when))
+                        count += 1
+                self.stats["loaded"] += count
+                logger.debug(f"Deadline scheduler loaded {count} {name} jobs")
+            except Exception as e:
+                logger.error(f"Error loading {name} deadlines: {e}")
+
+    # ==================== Runner ====================
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("✅ Deadline scheduler started")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        if self.bot is not None:
+            await self.bot.wait_until_ready()
+        await self.reload()
+        next_resync = time.time() + self.resync_interval if self.resync_interval else None
+
+        while True:
+            try:
+                now = time.time()
+                if next_resync is not None and now >= next_resync:
+                    await self.reload()
+                    next_resync = now + self.resync_interval
+
+                self._fire_due(now)
+
+                deadline = self.next_deadline()
+                timeout = None if deadline is None else max(0.0, deadline - time.time())
+                if next_resync is not None:
+                    until_resync = max(0.0, next_resync - time.time())
+                    timeout = until_resync if timeout is None else min(timeout, until_resync)
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Deadline scheduler error: {e}")
+                await asyncio.sleep(1)
+
+    def _fire_due(self, now: float):
+        batches: Dict[str, List[Any]] = {}
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            _, _, kind, key = heapq.heappop(self._heap)
+            del self._deadlines[(kind, key)]
+
+            handler = self._handlers.get(kind)
+            if handler is None:
+                logger.warning(f"No handler registered for {kind} deadline {key}")
+            elif kind in self._batch_sizes:
+                batches.setdefault(kind, []).append(key)
+            else:
+                # A slow job (Discord API calls) must not delay the others
+                self._start(kind, [key], handler, key)
+
+        for kind, keys in batches.items():
+            size = self._batch_sizes[kind]
+            for index in range(0, len(keys), size):
+                chunk = keys[index:index + size]
+                self._start(kind, chunk, self._handlers[kind], chunk)
+
+    def _start(self, kind: str, keys: List[Any], handler: Handler, argument: Any):
+        task = asyncio.create_task(self._execute(kind, keys, handler, argument))
+        for key in keys:
+            self._running[(kind, key)] = task
+
+    async def _execute(self, kind: str, keys: List[Any], handler: Handler, argument: Any):
+        try:
+            await handler(argument)
+            self.stats["fired"] += len(keys)
+            for key in keys:
+                self._attempts.pop((kind, key), None)
+        except Exception as e:
+            self.stats["failed"] += len(keys)
+            label = keys[0] if len(keys) == 1 else f"batch of {len(keys)}"
+            for key in keys:
+                job = (kind, key)
+                attempts = self._attempts.get(job, 0) + 1
+                if attempts < MAX_ATTEMPTS:
+                    self._attempts[job] = attempts
+                    if job not in self._deadlines:
+                        self._push(kind, key, time.time() + RETRY_DELAY)
+                else:
+                    self._attempts.pop(job, None)
+                    self._given_up.add(job)
+                    logger.error(f"Giving up on {kind} deadline {key} after {attempts} attempts")
+            logger.error(f"Error running {kind} deadline {label} (retry in {RETRY_DELAY}s): {e}")
+        finally:
+            for key in keys:
+                self._running.pop((kind, key), None)
+
+
+def get_scheduler(bot) -> DeadlineScheduler:
+    """The bot's shared scheduler (created and started on first use)"""
+    scheduler = getattr(bot, "deadline_scheduler", None)
+    if scheduler is None:
+        scheduler = DeadlineScheduler(bot)
+        bot.deadline_scheduler = scheduler
+    scheduler.start()
+    return scheduler
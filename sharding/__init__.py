@@ -0,0 +1,6 @@
+"""
+Sharding Package
+Sharded deployment mode and cross-process coordination
+"""
+
+__version__ = "4.0.0"
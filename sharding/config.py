@@ -0,0 +1,109 @@
+"""
+Shard Configuration
+Reads the deployment mode from the environment and builds the bot.
+
+- (nothing set)            -> single ``commands.Bot``, one gateway connection
+- BOT_SHARDED=1            -> ``AutoShardedBot``, Discord picks the shard count
+- SHARD_COUNT=8            -> ``AutoShardedBot`` with 8 shards in this process
+- SHARD_COUNT=8 SHARD_IDS=0,1,2,3
+                           -> this process runs shards 0-3 only (a "cluster");
+                              guild-keyed state is partitioned to those shards
+                              and global data is coordinated through Redis
+
+``python -m sharding.launcher`` starts one process per cluster.
+"""
+
+import os
+from typing import Optional, List
+
+from discord.ext import commands
+
+
+def _parse_shard_ids(value: Optional[str]) -> Optional[List[int]]:
+    if not value:
+        return None
+    return [int(part) for part in value.replace(" ", "").split(",") if part]
+
+
+class ShardConfig:
+    """Sharding settings of this process"""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        shard_count: Optional[int] = None,
+        shard_ids: Optional[List[int]] = None
+    ):
+        self.enabled = enabled or shard_count is not None or shard_ids is not None
+        self.shard_count = shard_count
+        self.shard_ids = shard_ids
+
+    @classmethod
+    def from_env(cls) -> "ShardConfig":
+        shard_count = os.getenv("SHARD_COUNT")
+        return cls(
+            enabled=os.getenv("BOT_SHARDED", "").lower() in ("1", "true", "yes"),
+            shard_count=int(shard_count) if shard_count else None,
+            shard_ids=_parse_shard_ids(os.getenv("SHARD_IDS"))
+        )
+
+    @property
+    def partitioned(self) -> bool:
+        """True when other processes run the remaining shards"""
+        return bool(self.shard_ids) and bool(self.shard_count) and len(self.shard_ids) < self.shard_count
+
+    @property
+    def cluster_name(self) -> str:
+        if not self.shard_ids:
+            return "main"
+        return f"shards-{self.shard_ids[0]}-{self.shard_ids[-1]}"
+
+    def shard_for_guild(self, guild_id) -> int:
+        """Shard that receives the events of a guild (Discord's formula)"""
+        if not self.shard_count:
+            return 0
+        return (int(guild_id) >> 22) % self.shard_count
+
+    def owns_guild(self, guild_id) -> bool:
+        """Whether this process serves the guild (always True unless partitioned)"""
+        if not self.partitioned:
+            return True
+        try:
+            return self.shard_for_guild(guild_id) in self.shard_ids
+        except (TypeError, ValueError):
+            return True
+
+
+def create_bot(config: ShardConfig, **kwargs) -> commands.Bot:
+    """Build a ``commands.Bot`` or ``AutoShardedBot`` for the configuration"""
+    if not config.enabled:
+        return commands.Bot(**kwargs)
+
+    if config.shard_count is not None:
+        kwargs["shard_count"] = config.shard_count
+    if config.shard_ids is not None:
+        kwargs["shard_ids"] = config.shard_ids
+    return commands.AutoShardedBot(**kwargs)
+
+
+def shard_latencies(bot: commands.Bot) -> List[dict]:
+    """Latency and guild count of every shard run by this process"""
+    if not isinstance(bot, commands.AutoShardedBot):
+        return [{
+            "shard_id": 0,
+            "latency_ms": round(bot.latency * 1000),
+            "guilds": len(bot.guilds)
+        }]
+
+    guild_counts = {}
+    for guild in bot.guilds:
+        guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+
+    return [
+        {
+            "shard_id": shard_id,
+            "latency_ms": round(latency * 1000) if latency == latency else None,  # NaN before first heartbeat
+            "guilds": guild_counts.get(shard_id, 0)
+        }
+        for shard_id, latency in sorted(bot.latencies)
+    ]
@@ -0,0 +1,168 @@
+"""
+Cross-Shard Coordinator
+Keeps global data consistent between shard processes through Redis.
+
+- Events (rating changed, premium entitlements changed, priority guild
+  added/removed) are published on one pub/sub channel; every other process
+  applies them to its in-memory state through registered handlers.
+- Each process writes a heartbeat per shard (latency, guild count) into a
+  Redis hash so ``/botstats`` can report on all shards, not only local ones.
+- Priority guilds are kept in a Redis set shared by all processes.
+"""
+
+import os
+import json
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, Callable, Awaitable, List
+
+from .config import ShardConfig, shard_latencies
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "k77:shard_events"
+HEARTBEATS_KEY = "k77:shard_heartbeats"
+PRIORITY_GUILDS_KEY = "k77:priority_guilds"
+
+# Heartbeats older than this are reported as stale
+HEARTBEAT_INTERVAL = 30
+HEARTBEAT_STALE_AFTER = 90
+
+
+class ShardCoordinator:
+    """Redis pub/sub and heartbeats shared by all shard processes"""
+
+    def __init__(self, redis_client, config: ShardConfig):
+        """
+        Args:
+            redis_client: redis.asyncio client (``RedisCache.client``)
+            config: Shard configuration of this process
+        """
+        self.redis = redis_client
+        self.config = config
+        self.origin = f"{config.cluster_name}:{os.getpid()}"
+        self._handlers: Dict[str, List[Callable[[Dict[str, Any]], Awaitable[None]]]] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._pubsub = None
+
+    def on(self, event_type: str, handler: Callable[[Dict[str, Any]], Awaitable[None]]):
+        """Register a coroutine called with the payload of remote events"""
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    async def start(self, bot):
+        """Subscribe to events and start heartbeats"""
+        self._pubsub = self.redis.pubsub()
+        await self._pubsub.subscribe(EVENTS_CHANNEL)
+        self._tasks.append(asyncio.create_task(self._listen()))
+        self._tasks.append(asyncio.create_task(self._heartbeat_loop(bot)))
+        logger.info(f"✅ Shard coordinator started ({self.origin})")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(EVENTS_CHANNEL)
+                await self._pubsub.close()
+            except Exception:
+                pass
+
+    # ==================== Events ====================
+
+    async def publish(self, event_type: str, **payload):
+        """Broadcast an event to the other shard processes"""
+        message = json.dumps({"type": event_type, "origin": self.origin, "payload": payload}, default=str)
+        try:
+            await self.redis.publish(EVENTS_CHANNEL, message)
+        except Exception as e:
+            logger.error(f"Error publishing shard event {event_type}: {e}")
+
+    def publish_nowait(self, event_type: str, **payload):
+        """Fire-and-forget ``publish`` for synchronous callers"""
+        try:
+            asyncio.get_running_loop().create_task(self.publish(event_type, **payload))
+        except RuntimeError:
+            pass
+
+    async def _listen(self):
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None:
+                    continue
+                event = json.loads(message["data"])
+                if event.get("origin") == self.origin:
+                    continue
+                for handler in self._handlers.get(event.get("type"), []):
+                    try:
+                        await handler(event.get("payload", {}))
+                    except Exception as e:
+                        logger.error(f"Error handling shard event {event.get('type')}: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Shard event listener error: {e}")
+                await asyncio.sleep(5)
+
+    # ==================== Heartbeats ====================
+
+    async def _heartbeat_loop(self, bot):
+        await bot.wait_until_ready()
+        while True:
+            await self.send_heartbeat(bot)
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    async def send_heartbeat(self, bot):
+        now = datetime.utcnow().isoformat()
+        mapping = {
+            str(shard["shard_id"]): json.dumps({**shard, "cluster": self.origin, "updated_at": now})
+            for shard in shard_latencies(bot)
+        }
+        try:
+            await self.redis.hset(HEARTBEATS_KEY, mapping=mapping)
+        except Exception as e:
+            logger.error(f"Error sending shard heartbeat: {e}")
+
+    async def get_shard_report(self) -> List[Dict[str, Any]]:
+        """Latest heartbeat of every shard, flagged ``stale`` when outdated"""
+        try:
+            raw = await self.redis.hgetall(HEARTBEATS_KEY)
+        except Exception as e:
+            logger.error(f"Error reading shard heartbeats: {e}")
+            return []
+
+        report = []
+        now = datetime.utcnow()
+        for value in raw.values():
+            shard = json.loads(value)
+            updated_at = datetime.fromisoformat(shard["updated_at"])
+            shard["stale"] = (now - updated_at).total_seconds() > HEARTBEAT_STALE_AFTER
+            report.append(shard)
+        report.sort(key=lambda shard: shard["shard_id"])
+        return report
+
+    # ==================== Priority Guilds ====================
+
+    async def sync_priority_guilds(self, local_ids: List[int]) -> List[int]:
+        """Merge local priority guilds into the shared set and return the union"""
+        try:
+            if local_ids:
+                await self.redis.sadd(PRIORITY_GUILDS_KEY, *[str(guild_id) for guild_id in local_ids])
+            members = await self.redis.smembers(PRIORITY_GUILDS_KEY)
+            return sorted(int(member) for member in members)
+        except Exception as e:
+            logger.error(f"Error syncing priority guilds: {e}")
+            return list(local_ids)
+
+    async def set_priority_guild(self, guild_id: int, enabled: bool):
+        """Add/remove a priority guild for every process"""
+        try:
+            if enabled:
+                await self.redis.sadd(PRIORITY_GUILDS_KEY, str(guild_id))
+            else:
+                await self.redis.srem(PRIORITY_GUILDS_KEY, str(guild_id))
+        except Exception as e:
+            logger.error(f"Error updating priority guild {guild_id}: {e}")
+        await self.publish("priority_guild", guild_id=guild_id, enabled=enabled)
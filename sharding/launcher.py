@@ -0,0 +1,77 @@
+"""
+Shard Launcher
+Runs the bot as several processes ("clusters"), each owning a slice of shards.
+
+    SHARD_COUNT=8 SHARD_CLUSTERS=2 python -m sharding.launcher
+
+starts two ``main.py`` processes with SHARD_IDS=0,1,2,3 and SHARD_IDS=4,5,6,7.
+A process that exits is restarted after a short delay.
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+import subprocess
+from typing import List, Dict
+
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+logger = logging.getLogger(__name__)
+
+RESTART_DELAY = 5
+
+
+def split_shards(shard_count: int, clusters: int) -> List[List[int]]:
+    """Spread shard ids over clusters as evenly as possible"""
+    clusters = max(1, min(clusters, shard_count))
+    return [list(range(shard_count))[index::clusters] for index in range(clusters)]
+
+
+def main() -> int:
+    shard_count = int(os.getenv("SHARD_COUNT", "0"))
+    clusters = int(os.getenv("SHARD_CLUSTERS", "1"))
+    if shard_count <= 0:
+        logger.error("SHARD_COUNT must be set to a positive number")
+        return 2
+
+    main_script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+    plans = [sorted(ids) for ids in split_shards(shard_count, clusters)]
+    processes: Dict[int, subprocess.Popen] = {}
+    stopping = False
+
+    def spawn(index: int):
+        env = dict(os.environ, SHARD_COUNT=str(shard_count), SHARD_IDS=",".join(map(str, plans[index])))
+        # Only one process may bind the keep-alive port
+        if index > 0:
+            env["KEEP_ALIVE_DISABLED"] = "1"
+        processes[index] = subprocess.Popen([sys.executable, main_script], env=env)
+        logger.info(f"Started cluster {index} (shards {plans[index]}) pid={processes[index].pid}")
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in processes.values():
+            process.terminate()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for index in range(len(plans)):
+        spawn(index)
+
+    while not stopping:
+        time.sleep(1)
+        for index, process in list(processes.items()):
+            if process.poll() is not None and not stopping:
+                logger.warning(f"Cluster {index} exited with {process.returncode}, restarting in {RESTART_DELAY}s")
+                time.sleep(RESTART_DELAY)
+                spawn(index)
+
+    for process in processes.values():
+        process.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
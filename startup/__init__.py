@@ -0,0 +1,6 @@
+"""
+Startup Package
+Run-once bot startup with dependency-ordered, concurrent initialization
+"""
+
+__version__ = "4.0.0"
@@ -0,0 +1,83 @@
+"""
+Lazy Imports
+Defers heavy optional dependencies until they are first used.
+
+    deep_translator = lazy_import("deep_translator")
+    ...
+    deep_translator.GoogleTranslator(source="auto", target="en")  # imported here
+
+``deep_translator`` (requests + BeautifulSoup), ``langdetect`` (language
+profiles) and Pillow add a noticeable share of the bot's import time but are
+only needed when a message is actually translated or a card is rendered.
+A missing package raises ``ImportError`` on first use instead of at startup.
+"""
+
+import sys
+import time
+import logging
+import importlib
+import threading
+from types import ModuleType
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Module name -> import time in ms, for modules loaded through a lazy proxy
+load_times: Dict[str, float] = {}
+
+
+class LazyModule(ModuleType):
+    """Module proxy that imports the real module on first attribute access"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        target = self.__dict__["_lazy_target"]
+        if target is not None:
+            return target
+
+        # Translation runs in executor threads too
+        with self.__dict__["_lazy_lock"]:
+            target = self.__dict__["_lazy_target"]
+            if target is None:
+                started = time.perf_counter()
+                target = importlib.import_module(self.__name__)
+                load_times[self.__name__] = (time.perf_counter() - started) * 1000
+                logger.debug(f"Lazy-imported {self.__name__} in {load_times[self.__name__]:.1f} ms")
+                self.__dict__["_lazy_target"] = target
+        return target
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_lazy_target"] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Proxy for ``name``, or the module itself when it is already imported"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def preload(*modules: ModuleType):
+    """Import lazy modules now (e.g. in a worker thread once the bot is up)"""
+    for module in modules:
+        if isinstance(module, LazyModule):
+            try:
+                module._load()
+            except ImportError as e:
+                logger.warning(f"Optional module {module.__name__} unavailable: {e}")
@@ -0,0 +1,243 @@
+"""
+Startup Orchestrator
+Runs the bot's initialization steps once, concurrently where possible.
+
+Each step names the steps it depends on. A step starts as soon as all of its
+dependencies finished, so independent subsystems (Redis and MongoDB, the cogs
+and the Premium/Social systems, ...) initialize side by side instead of one
+after another. A step whose dependency failed is skipped; ``after`` only
+orders steps (the step runs whatever the outcome, e.g. a JSON fallback).
+
+Steps registered with ``deferred=True`` are not awaited by ``run``; they start
+in the background once the critical steps are done (see ``run_deferred``).
+
+    orchestrator = StartupOrchestrator()
+    orchestrator.add("mongodb", init_mongodb)
+    orchestrator.add("indexes", create_indexes, depends_on=["mongodb"])
+    orchestrator.add("social", init_social, depends_on=["mongodb"], deferred=True)
+    await orchestrator.run()
+    orchestrator.start_deferred()
+"""
+
+import time
+import asyncio
+import logging
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Step states
+PENDING = "pending"
+OK = "ok"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class StartupStep:
+    """One named initialization step"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+        after: Iterable[str] = (),
+        deferred: bool = False,
+        required: bool = False
+    ):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+        self.after = list(after)
+        self.deferred = deferred
+        self.required = required
+        self.state = PENDING
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.duration_ms: Optional[float] = None
+
+
+class StartupOrchestrator:
+    """Dependency-ordered concurrent startup with a timing breakdown"""
+
+    def __init__(self):
+        self.steps: Dict[str, StartupStep] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._deferred_task: Optional[asyncio.Task] = None
+        self._origin: Optional[float] = None
+        self.total_ms: Optional[float] = None
+        self.completed = False
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        depends_on: Iterable[str] = (),
+        after: Iterable[str] = (),
+        deferred: bool = False,
+        required: bool = False
+    ):
+        """
+        Register a step.
+
+        Args:
+            name: Unique step name (used in ``depends_on`` and the report)
+            func: Coroutine function run without arguments. Returning ``False``
+                  marks the step as failed without an exception.
+            depends_on: Steps that must succeed first
+            after: Steps that must finish first (success not required)
+            deferred: Start in the background after the critical steps
+            required: Raise from ``run`` when this step fails
+        """
+        if name in self.steps:
+            raise ValueError(f"Startup step '{name}' registered twice")
+        self.steps[name] = StartupStep(name, func, depends_on, after, deferred, required)
+
+    def step(
+        self,
+        name: str,
+        depends_on: Iterable[str] = (),
+        after: Iterable[str] = (),
+        deferred: bool = False,
+        required: bool = False
+    ):
+        """Decorator form of ``add``"""
+        def decorator(func):
+            self.add(name, func, depends_on, after, deferred, required)
+            return func
+        return decorator
+
+    def _validate(self):
+        for step in self.steps.values():
+            for dependency in step.depends_on + step.after:
+                if dependency not in self.steps:
+                    raise ValueError(f"Startup step '{step.name}' depends on unknown step '{dependency}'")
+                if self.steps[dependency].deferred and not step.deferred:
+                    raise ValueError(f"Critical step '{step.name}' can't depend on deferred step '{dependency}'")
+
+        # Depth-first cycle check
+        visiting, done = set(), set()
+
+        def visit(name: str, path: List[str]):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Startup dependency cycle: {' -> '.join(path + [name])}")
+            visiting.add(name)
+            for dependency in self.steps[name].depends_on + self.steps[name].after:
+                visit(dependency, path + [name])
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.steps:
+            visit(name, [])
+
+    # ==================== Running ====================
+
+    async def _run_step(self, step: StartupStep):
+        for dependency in step.after:
+            await self._tasks[dependency]
+        for dependency in step.depends_on:
+            await self._tasks[dependency]
+            if self.steps[dependency].state != OK:
+                step.state = SKIPPED
+                step.error = f"dependency '{dependency}' {self.steps[dependency].state}"
+                logger.warning(f"⏭️ Startup step {step.name} skipped ({step.error})")
+                return
+
+        step.started_at = time.perf_counter()
+        try:
+            result = await step.func()
+            step.state = FAILED if result is False else OK
+        except Exception as e:
+            step.state = FAILED
+            step.error = str(e)
+            logger.error(f"❌ Startup step {step.name} failed: {e}")
+        step.duration_ms = (time.perf_counter() - step.started_at) * 1000
+
+    def _schedule(self, deferred: bool):
+        for step in self.steps.values():
+            if step.deferred == deferred and step.name not in self._tasks:
+                self._tasks[step.name] = asyncio.create_task(self._run_step(step))
+        return [self._tasks[name] for name, step in self.steps.items() if step.deferred == deferred]
+
+    async def run(self):
+        """Run every critical (non-deferred) step. Runs only once."""
+        if self.completed or self._origin is not None:
+            return
+        self._validate()
+        self._origin = time.perf_counter()
+
+        await asyncio.gather(*self._schedule(deferred=False))
+        self.total_ms = (time.perf_counter() - self._origin) * 1000
+        self.completed = True
+        self.log_report()
+
+        missing = [
+            step.name for step in self.steps.values()
+            if step.required and not step.deferred and step.state != OK
+        ]
+        if missing:
+            raise RuntimeError(f"Required startup steps failed: {', '.join(missing)}")
+
+    def start_deferred(self) -> Optional[asyncio.Task]:
+        """Start the deferred steps in the background"""
+        if self._deferred_task is None and any(step.deferred for step in self.steps.values()):
+            self._deferred_task = asyncio.create_task(self.run_deferred())
+        return self._deferred_task
+
+    async def run_deferred(self):
+        """Run the deferred steps (after ``run``)"""
+        tasks = self._schedule(deferred=True)
+        if tasks:
+            await asyncio.gather(*tasks)
+            self.log_report(deferred=True)
+
+    async def wait_deferred(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the deferred steps. Returns False on timeout."""
+        task = self._deferred_task
+        if task is None:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def state(self, name: str) -> Optional[str]:
+        step = self.steps.get(name)
+        return step.state if step else None
+
+    # ==================== Report ====================
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Timing breakdown ordered by start offset"""
+        rows = []
+        for step in self.steps.values():
+            rows.append({
+                "step": step.name,
+                "state": step.state,
+                "deferred": step.deferred,
+                "depends_on": step.depends_on + step.after,
+                "start_ms": round((step.started_at - self._origin) * 1000, 1)
+                if step.started_at is not None and self._origin is not None else None,
+                "duration_ms": round(step.duration_ms, 1) if step.duration_ms is not None else None,
+                "error": step.error
+            })
+        rows.sort(key=lambda row: (row["start_ms"] is None, row["start_ms"] or 0))
+        return rows
+
+    def log_report(self, deferred: bool = False):
+        title = "Deferred startup" if deferred else "Startup"
+        lines = [f"⏱️ {title} timing breakdown" + (f" ({self.total_ms:.0f} ms total)" if not deferred else "")]
+        for row in self.report():
+            if row["deferred"] != deferred:
+                continue
+            if row["duration_ms"] is None:
+                lines.append(f"   {row['step']:<20} {row['state']:<8} ({row['error']})")
+            else:
+                lines.append(
+                    f"   {row['step']:<20} {row['state']:<8} "
+                    f"+{row['start_ms']:>8.1f} ms  {row['duration_ms']:>8.1f} ms"
+                )
+        logger.info("\n".join(lines))
@@ -11,12 +11,25 @@ Features:
 - Notifications
 """
 
+import time
+import logging
 import discord
 from discord import Embed, Color
 from datetime import datetime, timedelta
 from typing import Optional, Dict, List, Any, Tuple
 
 from database.suggestions_schema import SuggestionsSchema, SuggestionStatus
+from scheduling import get_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Deadline scheduler kind of the debounced suggestion message refresh
+EMBED_REFRESH_KIND = "suggestion_embed"
+# Minimum seconds between two vote-driven edits of the same suggestion message
+EMBED_REFRESH_SECONDS = 5
+
+# Suggestions that no longer accept votes
+CLOSED_STATUSES = ("denied", "duplicate")
 
 
 class SuggestionsSystem:
@@ -29,10 +42,17 @@ class SuggestionsSystem:
         
         # Cooldown tracking (in-memory)
         self.cooldowns: Dict[str, datetime] = {}
+        
+        # (guild_id, suggestion_id) -> latest suggestion waiting for a message edit
+        self._pending_embeds: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self._last_embed_edit: Dict[Tuple[int, int], float] = {}
+        self.scheduler = None
     
     async def initialize(self):
         """تهيئة النظام"""
         await self.schema.setup_indexes()
+        self.scheduler = get_scheduler(self.bot)
+        self.scheduler.register(EMBED_REFRESH_KIND, self._on_embed_refresh)
     
     # ============= Suggestion Creation =============
     
@@ -242,32 +262,95 @@ class SuggestionsSystem:
     ) -> Tuple[bool, str]:
         """التصويت على اقتراح"""
         
-        # التحقق من الإعدادات
+        # التحقق من الإعدادات (من الذاكرة)
         settings = await self.schema.get_settings(guild_id)
         if not settings["allow_voting"]:
             return False, "❌ التصويت معطل في هذا السيرفر"
         
-        # التحقق من وجود الاقتراح
-        suggestion = await self.schema.get_suggestion(guild_id, suggestion_id)
-        if not suggestion:
-            return False, "❌ الاقتراح غير موجود"
+        # إضافة/تحديث الصوت (يتحقق من وجود الاقتراح وحالته في نفس العملية)
+        result = await self.schema.add_vote(
+            guild_id, suggestion_id, user_id, vote_type,
+            closed_statuses=CLOSED_STATUSES
+        )
         
-        # لا يمكن التصويت على الاقتراحات المنتهية
-        if suggestion["status"] in ["denied", "duplicate"]:
-            return False, "❌ لا يمكن التصويت على اقتراح مرفوض أو مكرر"
+        if not result["changed"]:
+            suggestion = await self.schema.get_suggestion(guild_id, suggestion_id)
+            if not suggestion:
+                return False, "❌ الاقتراح غير موجود"
+            # لا يمكن التصويت على الاقتراحات المنتهية
+            if suggestion["status"] in CLOSED_STATUSES:
+                return False, "❌ لا يمكن التصويت على اقتراح مرفوض أو مكرر"
+            return False, "❌ حدث خطأ أثناء التصويت"
         
-        # إضافة/تحديث الصوت
-        result = await self.schema.add_vote(guild_id, suggestion_id, user_id, vote_type)
+        if result["old_vote"] != result["new_vote"] and settings["show_vote_count"]:
+            self.schedule_embed_refresh(result["suggestion"])
         
         vote_emoji = settings["voting_emojis"].get(vote_type, "✅")
         
-        if result["changed"]:
-            if result["old_vote"]:
-                return True, f"{vote_emoji} تم تحديث صوتك"
-            else:
-                return True, f"{vote_emoji} تم تسجيل صوتك"
-        
-        return False, "❌ حدث خطأ أثناء التصويت"
+        if result["old_vote"]:
+            return True, f"{vote_emoji} تم تحديث صوتك"
+        return True, f"{vote_emoji} تم تسجيل صوتك"
+    
+    def schedule_embed_refresh(self, suggestion: Dict[str, Any]):
+        """
+        Refresh the vote counts of a suggestion message, at most once every
+        EMBED_REFRESH_SECONDS: votes in between only replace the pending
+        snapshot, and the edit shows the latest one.
+        """
+        if not suggestion.get("message_id") or self.scheduler is None:
+            return
+        key = (int(suggestion["guild_id"]), suggestion["suggestion_id"])
+        already_pending = key in self._pending_embeds
+        self._pending_embeds[key] = suggestion
+        if not already_pending:
+            when = max(time.time(), self._last_embed_edit.pop(key, 0) + EMBED_REFRESH_SECONDS)
+            self.scheduler.schedule(EMBED_REFRESH_KIND, key, when)
+    
+    def cancel_embed_refresh(self, guild_id: int, suggestion_id: int):
+        """Drop a pending vote refresh (the message is being edited directly)"""
+        key = (guild_id, suggestion_id)
+        self._pending_embeds.pop(key, None)
+        if self.scheduler is not None:
+            self.scheduler.cancel(EMBED_REFRESH_KIND, key)
+    
+    async def _on_embed_refresh(self, key: Tuple[int, int]):
+        suggestion = self._pending_embeds.pop(key, None)
+        if suggestion is None:
+            return
+        self._last_embed_edit[key] = time.time()
+        try:
+            settings = await self.schema.get_settings(key[0])
+            await self._edit_suggestion_message(suggestion, settings)
+        except Exception as e:
+            logger.warning(f"Could not refresh suggestion #{key[1]} message: {e}")
+    
+    async def _edit_suggestion_message(
+        self,
+        suggestion: Dict[str, Any],
+        settings: Dict[str, Any]
+    ) -> bool:
+        """تحديث embed رسالة الاقتراح"""
+        if not suggestion.get("message_id") or not suggestion.get("channel_id"):
+            return False
+        
+        guild = self.bot.get_guild(int(suggestion["guild_id"]))
+        channel = guild.get_channel(int(suggestion["channel_id"])) if guild else None
+        if not channel:
+            return False
+        
+        user = guild.get_member(int(suggestion["user_id"]))
+        if not user:
+            return False
+        
+        embed = self._create_suggestion_embed(
+            suggestion,
+            user,
+            settings,
+            suggestion["anonymous"]
+        )
+        # رسالة جزئية: التعديل بدون جلب الرسالة أولاً
+        await channel.get_partial_message(int(suggestion["message_id"])).edit(embed=embed)
+        return True
     
     # ============= Staff Management =============
     
@@ -329,27 +412,12 @@ class SuggestionsSystem:
             except:
                 pass
         
-        # تحديث رسالة الاقتراح
+        # تحديث رسالة الاقتراح (يشمل آخر الأصوات، فلا حاجة لتحديث مؤجل)
         if suggestion.get("message_id") and suggestion.get("channel_id"):
+            self.cancel_embed_refresh(guild_id, suggestion_id)
             try:
-                guild = self.bot.get_guild(guild_id)
-                channel = guild.get_channel(int(suggestion["channel_id"]))
-                
-                if channel:
-                    message = await channel.fetch_message(int(suggestion["message_id"]))
-                    
-                    # تحديث الـ embed
-                    updated_suggestion = await self.schema.get_suggestion(guild_id, suggestion_id)
-                    user = guild.get_member(int(suggestion["user_id"]))
-                    
-                    if user:
-                        embed = self._create_suggestion_embed(
-                            updated_suggestion,
-                            user,
-                            settings,
-                            suggestion["anonymous"]
-                        )
-                        await message.edit(embed=embed)
+                updated_suggestion = await self.schema.get_suggestion(guild_id, suggestion_id)
+                await self._edit_suggestion_message(updated_suggestion, settings)
             except:
                 pass
         
@@ -0,0 +1,14 @@
+"""
+Templating Package
+Compiled ``{variable}`` templates shared by custom commands, welcome,
+leveling and branding messages
+"""
+
+from .compiler import TemplateEngine, CompiledTemplate
+from .safe_math import safe_eval, MathError
+from .messages import render_level_up, render_welcome_message
+
+__all__ = [
+    "TemplateEngine", "CompiledTemplate", "safe_eval", "MathError",
+    "render_level_up", "render_welcome_message",
+]
@@ -0,0 +1,166 @@
+"""
+Template Compiler
+Shared ``{variable}`` engine for custom commands, welcome, leveling and
+branding messages.
+
+A template is parsed once into a tuple of instructions (literal text or a
+bound resolver) and cached; rendering walks that tuple:
+
+    engine = TemplateEngine(
+        resolvers={"user": lambda scope: scope.member.mention},
+        functions={"math": math_function},
+    )
+    engine.render("Hi {user}! 2+2={math:2+2}", scope)
+
+- ``resolvers``: ``{name}`` -> ``resolver(scope)``, looked up in a dict
+- ``functions``: ``{name:argument}`` -> ``function(argument)`` called once at
+  compile time. It returns either a constant (rendered as-is, e.g. a math
+  result) or a callable ``(scope) -> value`` (e.g. a random pick).
+- ``indexed``: ``{name[n]}`` -> ``resolver(scope, n)``
+
+A resolver returning None leaves the ``{variable}`` text in place; names the
+engine doesn't know render through ``unknown`` (default: left as-is).
+Substituted values are never scanned again, so user input can't inject
+variables.
+"""
+
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+# Same variable syntax as the original parsers: anything between braces
+VARIABLE_PATTERN = re.compile(r"\{([^{}]+)\}")
+INDEXED_PATTERN = re.compile(r"^([\w.]+)\[(\d+)\]$")
+
+Resolver = Callable[[Any], Any]
+# Literal text, or (resolver(scope), raw variable text)
+Instruction = Union[str, Tuple[Resolver, str]]
+
+
+class CompiledTemplate:
+    """A parsed template: literal strings and (resolver, raw) pairs"""
+
+    __slots__ = ("source", "instructions", "static_text")
+
+    def __init__(self, source: str, instructions: Tuple[Instruction, ...]):
+        self.source = source
+        self.instructions = instructions
+        # Templates without variables render to a constant
+        self.static_text = (
+            "".join(instructions)
+            if all(isinstance(instruction, str) for instruction in instructions)
+            else None
+        )
+
+    def render(self, scope: Any) -> str:
+        if self.static_text is not None:
+            return self.static_text
+        parts = []
+        append = parts.append
+        for instruction in self.instructions:
+            if instruction.__class__ is str:
+                append(instruction)
+                continue
+            resolver, raw = instruction
+            value = resolver(scope)
+            append(raw if value is None else str(value))
+        return "".join(parts)
+
+
+class TemplateEngine:
+    """Compiles and caches templates for one set of variables"""
+
+    def __init__(
+        self,
+        resolvers: Dict[str, Resolver],
+        functions: Optional[Dict[str, Callable[[str], Any]]] = None,
+        indexed: Optional[Dict[str, Callable[[Any, int], Any]]] = None,
+        unknown: Optional[Callable[[str], Optional[str]]] = None,
+        case_sensitive: bool = True,
+        cache_size: int = 2048
+    ):
+        """
+        Args:
+            resolvers: Variable name -> resolver(scope)
+            functions: Function name -> factory(argument) for ``{name:argument}``
+            indexed: Variable name -> resolver(scope, index) for ``{name[n]}``
+            unknown: Text for unknown variables (None = keep ``{variable}``)
+            case_sensitive: Match names exactly (False = case-insensitive)
+            cache_size: Compiled templates kept (least recently used evicted)
+        """
+        self.case_sensitive = case_sensitive
+        fold = (lambda name: name) if case_sensitive else str.lower
+        self._fold = fold
+        self.resolvers = {fold(name): resolver for name, resolver in resolvers.items()}
+        self.functions = {fold(name): factory for name, factory in (functions or {}).items()}
+        self.indexed = {fold(name): resolver for name, resolver in (indexed or {}).items()}
+        self.unknown = unknown
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, CompiledTemplate]" = OrderedDict()
+
+    def compile(self, template: str) -> CompiledTemplate:
+        """Parse a template (cached)"""
+        compiled = self._cache.get(template)
+        if compiled is not None:
+            self._cache.move_to_end(template)
+            return compiled
+
+        instructions = []
+        position = 0
+        for match in VARIABLE_PATTERN.finditer(template):
+            if match.start() > position:
+                instructions.append(template[position:match.start()])
+            instructions.append(self._compile_variable(match.group(1), match.group(0)))
+            position = match.end()
+        if position < len(template):
+            instructions.append(template[position:])
+
+        # Merge adjacent literals (constant function results included)
+        merged = []
+        for instruction in instructions:
+            if merged and isinstance(instruction, str) and isinstance(merged[-1], str):
+                merged[-1] += instruction
+            else:
+                merged.append(instruction)
+
+        compiled = CompiledTemplate(template, tuple(merged))
+        self._cache[template] = compiled
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return compiled
+
+    def render(self, template: Optional[str], scope: Any) -> Optional[str]:
+        """Render a template (``None`` and ``""`` are returned unchanged)"""
+        if not template:
+            return template
+        return self.compile(template).render(scope)
+
+    def _compile_variable(self, variable: str, raw: str) -> Instruction:
+        name = self._fold(variable)
+
+        resolver = self.resolvers.get(name)
+        if resolver is not None:
+            return (resolver, raw)
+
+        if ":" in variable:
+            function_name, argument = variable.split(":", 1)
+            factory = self.functions.get(self._fold(function_name))
+            if factory is not None:
+                result = factory(argument)
+                if callable(result):
+                    return (result, raw)
+                return raw if result is None else str(result)
+
+        if self.indexed:
+            match = INDEXED_PATTERN.match(name)
+            if match and match.group(1) in self.indexed:
+                resolver, index = self.indexed[match.group(1)], int(match.group(2))
+                return (lambda scope: resolver(scope, index), raw)
+
+        if self.unknown is not None:
+            text = self.unknown(variable)
+            return raw if text is None else text
+        return raw
+
+    def clear_cache(self):
+        self._cache.clear()
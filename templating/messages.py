@@ -0,0 +1,34 @@
+"""
+Message Templates
+Engines for the level-up and branding welcome messages. Both take plain
+values as the scope, so previews render with placeholder data.
+"""
+
+from typing import Any
+
+from .compiler import TemplateEngine
+
+# Scope: (user mention, user name, level)
+LEVEL_UP_VARIABLES = TemplateEngine(resolvers={
+    "user": lambda scope: scope[0],
+    "username": lambda scope: scope[1],
+    "level": lambda scope: scope[2],
+})
+
+# Scope: (guild name, user mention, user name, member count)
+WELCOME_MESSAGE_VARIABLES = TemplateEngine(resolvers={
+    "guild_name": lambda scope: scope[0],
+    "user": lambda scope: scope[1],
+    "username": lambda scope: scope[2],
+    "member_count": lambda scope: scope[3],
+})
+
+
+def render_level_up(template: str, user_mention: str, username: str, level: Any) -> str:
+    """Render a level-up message ({user}, {username}, {level})"""
+    return LEVEL_UP_VARIABLES.render(template, (user_mention, username, level))
+
+
+def render_welcome_message(template: str, guild_name: str, user_mention: str, username: str, member_count: Any) -> str:
+    """Render a branding welcome message ({guild_name}, {user}, {username}, {member_count})"""
+    return WELCOME_MESSAGE_VARIABLES.render(template, (guild_name, user_mention, username, member_count))
@@ -0,0 +1,87 @@
+"""
+Safe Arithmetic
+Evaluates the ``{math:...}`` expressions of user templates without ``eval``.
+
+Only number literals, + - * / // % ** and parentheses are accepted, and the
+size of the expression, the exponents and the intermediate results are
+bounded, so a template can't run arbitrary code or stall the bot with
+``9**9**9``.
+"""
+
+import ast
+import math
+import operator
+from typing import Union
+
+Number = Union[int, float]
+
+MAX_EXPRESSION_LENGTH = 200
+MAX_NODES = 64
+MAX_EXPONENT = 64
+MAX_MAGNITUDE = 10 ** 18
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
+
+class MathError(ValueError):
+    """Expression is not allowed or can't be evaluated"""
+
+
+def _check(value: Number) -> Number:
+    if isinstance(value, float) and not math.isfinite(value):
+        raise MathError("result is not finite")
+    if abs(value) > MAX_MAGNITUDE:
+        raise MathError("result too large")
+    return value
+
+
+def _evaluate(node: ast.AST) -> Number:
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return _check(node.value)
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_evaluate(node.operand))
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        left = _evaluate(node.left)
+        right = _evaluate(node.right)
+        if isinstance(node.op, ast.Pow) and abs(right) > MAX_EXPONENT:
+            raise MathError("exponent too large")
+        try:
+            return _check(_BINARY_OPERATORS[type(node.op)](left, right))
+        except (ZeroDivisionError, OverflowError) as e:
+            raise MathError(str(e)) from e
+
+    raise MathError(f"unsupported expression: {type(node).__name__}")
+
+
+def safe_eval(expression: str) -> Number:
+    """
+    Evaluate an arithmetic expression
+
+    Raises:
+        MathError: anything but bounded arithmetic on number literals
+    """
+    expression = expression.strip()
+    if not expression or len(expression) > MAX_EXPRESSION_LENGTH:
+        raise MathError("expression empty or too long")
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise MathError("invalid syntax") from e
+    if sum(1 for _ in ast.walk(tree)) > MAX_NODES:
+        raise MathError("expression too complex")
+    return _evaluate(tree.body)
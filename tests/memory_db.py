@@ -0,0 +1,366 @@
+"""
+In-Memory Database for Tests
+=============================
+A small stand-in for the Motor collections used by the systems under test,
+shared by the test scripts in this directory:
+
+- ``matches`` understands plain values, dotted paths and the ``$in``,
+  ``$nin``, ``$ne``, ``$lt``, ``$lte``, ``$gt``, ``$gte`` and ``$exists``
+  operators; updates apply ``$set``, ``$inc``, ``$unset`` and
+  ``$setOnInsert`` (on upsert)
+- every call is one round-trip: it is counted (``reads`` / ``writes`` on the
+  collection and on its ``MemoryDatabase``) and yields to the event loop,
+  sleeping ``delay`` seconds when set
+- ``fail`` makes every call raise, ``fail_writes`` fails that many writes
+- ``unique`` names a field kept unique like a unique index
+
+``ObjectIdCollection`` generates ObjectId keys; tests subclass
+``MemoryCollection`` for anything more specific (custom aggregations).
+
+    from memory_db import MemoryCollection, MemoryDatabase
+"""
+import asyncio
+from types import SimpleNamespace
+
+_MISSING = object()
+
+
+def get_path(doc, path, default=None):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return default
+        doc = doc[part]
+    return doc
+
+
+def set_path(doc, path, value):
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[last] = value
+
+
+def unset_path(doc, path):
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(last, None)
+
+
+def _compare(value, op, operand):
+    if op == "$in":
+        return value in operand
+    if op == "$nin":
+        return value not in operand
+    if op == "$ne":
+        return value != operand
+    if op == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if value is _MISSING or value is None:
+        return False
+    if op == "$lt":
+        return value < operand
+    if op == "$lte":
+        return value <= operand
+    if op == "$gt":
+        return value > operand
+    if op == "$gte":
+        return value >= operand
+    raise NotImplementedError(f"query operator {op}")
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        value = get_path(doc, key, _MISSING)
+        if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif (None if value is _MISSING else value) != condition:
+            return False
+    return True
+
+
+def apply_update(doc, update):
+    for path, value in update.get("$inc", {}).items():
+        set_path(doc, path, get_path(doc, path, 0) + value)
+    for path, value in update.get("$set", {}).items():
+        set_path(doc, path, value)
+    for path in update.get("$unset", {}):
+        unset_path(doc, path)
+
+
+def upsert_document(query, update):
+    """The document an upsert inserts: equality fields of the query plus the update"""
+    doc = {
+        key: value for key, value in query.items()
+        if not key.startswith("$") and not isinstance(value, dict)
+    }
+    for path, value in update.get("$setOnInsert", {}).items():
+        set_path(doc, path, value)
+    apply_update(doc, update)
+    return doc
+
+
+def result(**fields):
+    return SimpleNamespace(acknowledged=True, **fields)
+
+
+class MemoryCursor:
+    def __init__(self, docs, delay=0):
+        self.docs = list(docs)
+        self.delay = delay
+
+    def sort(self, *args, **kwargs):
+        return self
+
+    def limit(self, count):
+        if count:
+            self.docs = self.docs[:count]
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(self.delay)
+        return list(self.docs)
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryCollection:
+    """One collection; returned documents are copies, like a real driver's"""
+
+    def __init__(self, docs=None, name=None, unique=None, delay=0, db=None):
+        self.docs = docs if docs is not None else []
+        self.name = name
+        self.unique = unique
+        self.delay = delay
+        self.db = db
+        self.reads = 0
+        self.writes = 0
+        self.fail = False
+        self.fail_writes = 0
+        self.bulk_writes = []
+        self._next_id = 0
+
+    @property
+    def calls(self):
+        return self.reads + self.writes
+
+    def new_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    def _count(self, write=False):
+        if write:
+            self.writes += 1
+        else:
+            self.reads += 1
+        if self.db is not None:
+            self.db.count(write)
+        if self.fail:
+            raise RuntimeError("database down")
+        if write and self.fail_writes:
+            self.fail_writes -= 1
+            raise RuntimeError("write failed")
+
+    async def _round_trip(self, write=False):
+        self._count(write)
+        await asyncio.sleep(self.delay)
+
+    def _first(self, query):
+        return next((doc for doc in self.docs if matches(doc, query)), None)
+
+    def _check_unique(self, doc):
+        key = doc.get(self.unique) if self.unique else None
+        return key is None or not any(other.get(self.unique) == key for other in self.docs)
+
+    def _update(self, query, update, upsert=False):
+        doc = self._first(query)
+        if doc is not None:
+            apply_update(doc, update)
+            return doc, result(matched_count=1, modified_count=1, upserted_id=None)
+        if upsert:
+            doc = upsert_document(query, update)
+            doc.setdefault("_id", self.new_id())
+            self.docs.append(doc)
+            return doc, result(matched_count=0, modified_count=0, upserted_id=doc["_id"])
+        return None, result(matched_count=0, modified_count=0, upserted_id=None)
+
+    # ==================== Reads ====================
+
+    def find(self, query=None, projection=None):
+        self._count()
+        return MemoryCursor([dict(doc) for doc in self.docs if matches(doc, query or {})], self.delay)
+
+    async def find_one(self, query=None, projection=None, **kwargs):
+        await self._round_trip()
+        doc = self._first(query or {})
+        return dict(doc) if doc is not None else None
+
+    async def count_documents(self, query):
+        await self._round_trip()
+        return sum(1 for doc in self.docs if matches(doc, query))
+
+    def aggregate(self, pipeline, **kwargs):
+        """``$match`` and ``$group`` by one field with ``{"$sum": 1}`` counters; an empty result ends the pipeline"""
+        self._count()
+        docs = list(self.docs)
+        for stage in pipeline:
+            if not docs:
+                break
+            if "$match" in stage:
+                docs = [doc for doc in docs if matches(doc, stage["$match"])]
+            elif "$group" in stage:
+                group = stage["$group"]
+                field = group["_id"].lstrip("$")
+                counters = [name for name in group if name != "_id"]
+                grouped = {}
+                for doc in docs:
+                    key = get_path(doc, field)
+                    row = grouped.setdefault(key, dict({"_id": key}, **{name: 0 for name in counters}))
+                    for name in counters:
+                        row[name] += 1
+                docs = list(grouped.values())
+            else:
+                raise NotImplementedError(f"aggregation stage {list(stage)}")
+        return MemoryCursor(docs, self.delay)
+
+    # ==================== Writes ====================
+
+    async def insert_one(self, doc):
+        await self._round_trip(write=True)
+        if not self._check_unique(doc):
+            from pymongo.errors import DuplicateKeyError
+            raise DuplicateKeyError(f"duplicate {self.unique}")
+        doc.setdefault("_id", self.new_id())
+        self.docs.append(dict(doc))
+        return result(inserted_id=doc["_id"])
+
+    async def insert_many(self, docs, ordered=True):
+        await self._round_trip(write=True)
+        errors, inserted = [], []
+        for index, doc in enumerate(docs):
+            if not self._check_unique(doc):
+                errors.append({"index": index, "code": 11000})
+                if ordered:
+                    break
+                continue
+            doc.setdefault("_id", self.new_id())
+            self.docs.append(dict(doc))
+            inserted.append(doc["_id"])
+        if errors:
+            from pymongo.errors import BulkWriteError
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return result(inserted_ids=inserted)
+
+    async def update_one(self, query, update, upsert=False):
+        await self._round_trip(write=True)
+        return self._update(query, update, upsert)[1]
+
+    async def update_many(self, query, update, upsert=False):
+        await self._round_trip(write=True)
+        docs = [doc for doc in self.docs if matches(doc, query)]
+        for doc in docs:
+            apply_update(doc, update)
+        if not docs and upsert:
+            return self._update(query, update, upsert)[1]
+        return result(matched_count=len(docs), modified_count=len(docs), upserted_id=None)
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False, return_document=False, **kwargs):
+        await self._round_trip(write=True)
+        before = self._first(query)
+        before = dict(before) if before is not None else None
+        doc, _ = self._update(query, update, upsert)
+        if doc is None:
+            return None
+        return dict(doc) if return_document else before
+
+    async def find_one_and_delete(self, query, projection=None):
+        await self._round_trip(write=True)
+        doc = self._first(query)
+        if doc is not None:
+            self.docs.remove(doc)
+            return dict(doc)
+        return None
+
+    async def delete_one(self, query):
+        await self._round_trip(write=True)
+        doc = self._first(query)
+        if doc is not None:
+            self.docs.remove(doc)
+        return result(deleted_count=int(doc is not None))
+
+    async def delete_many(self, query):
+        await self._round_trip(write=True)
+        before = len(self.docs)
+        self.docs = [doc for doc in self.docs if not matches(doc, query)]
+        return result(deleted_count=before - len(self.docs))
+
+    async def bulk_write(self, operations, ordered=True):
+        """Applies ``UpdateOne`` operations (``_filter`` / ``_doc`` / ``_upsert``)"""
+        await self._round_trip(write=True)
+        self.bulk_writes.append(list(operations))
+        for operation in operations:
+            self._update(operation._filter, operation._doc, getattr(operation, "_upsert", False))
+        return result()
+
+
+class ObjectIdCollection(MemoryCollection):
+    """Keyed by ObjectId, for code that converts ids with ``ObjectId(...)``"""
+
+    def new_id(self):
+        from bson import ObjectId
+        return ObjectId()
+
+
+class MemoryDatabase:
+    """Collections are created on first access (``db.name`` or ``db["name"]``)"""
+
+    collection_class = MemoryCollection
+
+    def __init__(self, **collections):
+        self.reads = 0
+        self.writes = 0
+        self.collections = {}
+        for name, collection in collections.items():
+            self.add(name, collection)
+
+    @property
+    def calls(self):
+        return self.reads + self.writes
+
+    def count(self, write):
+        if write:
+            self.writes += 1
+        else:
+            self.reads += 1
+
+    def add(self, name, collection):
+        collection.db = self
+        if collection.name is None:
+            collection.name = name
+        self.collections[name] = collection
+        return collection
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name == "collections":
+            raise AttributeError(name)
+        collection = self.collections.get(name)
+        if collection is None:
+            collection = self.add(name, self.collection_class())
+        return collection
+
+    def __getitem__(self, name):
+        return getattr(self, name)
@@ -0,0 +1,125 @@
+"""
+Auto-Message Component Index Test
+==================================
+Checks how automessages/automessage_system.py resolves button and dropdown
+clicks from its in-memory component index, against an in-memory collection
+that counts reads:
+
+- legacy custom_ids and compact "am:<id>" / "am:s:<id>" ids hit the index
+- editing, disabling or deleting a message updates the index
+- "am:" ids of messages not indexed yet fall back to one read, and disabled
+  or unknown messages are remembered so repeated clicks skip the database
+
+    python tests/test_automessage_index.py
+"""
+import os
+import sys
+import asyncio
+
+from bson import ObjectId
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import automessages.automessage_system as automessage_module
+from automessages.automessage_system import AutoMessageSystem, COMPONENT_PREFIX, SELECT_PREFIX
+from memory_db import MemoryDatabase, ObjectIdCollection
+
+
+async def make_system():
+    db = MemoryDatabase(auto_messages=ObjectIdCollection(), auto_messages_settings=ObjectIdCollection())
+    system = AutoMessageSystem(db)
+    rules = await system.create_message("1", "rules", "button", "rules_btn", "text", "Read the rules")
+    roles = await system.create_message("1", "roles", "dropdown", "menu:roles", "text", "Pick a role")
+    await system.create_message("1", "hello", "keyword", "hello", "text", "Hi!")
+    await system.load_component_index()
+    return system, db.auto_messages, rules, roles
+
+
+def test_index_hits():
+    async def run():
+        system, collection, rules, roles = await make_system()
+        reads = collection.reads
+        assert (await system.find_matching_button("1", "rules_btn"))["name"] == "rules"
+        assert (await system.find_matching_button("1", f"{COMPONENT_PREFIX}{rules['_id']}"))["name"] == "rules"
+        assert (await system.find_matching_dropdown("1", "menu", "roles"))["name"] == "roles"
+        assert (await system.find_matching_dropdown("1", f"{SELECT_PREFIX}menu", str(roles["_id"])))["name"] == "roles"
+        # Other guild / wrong component type never match
+        assert await system.find_matching_button("2", f"{COMPONENT_PREFIX}{rules['_id']}") is None
+        assert await system.find_matching_button("1", f"{COMPONENT_PREFIX}{roles['_id']}") is None
+        assert system.encode_button_id("1", "rules_btn") == f"{COMPONENT_PREFIX}{rules['_id']}"
+        return collection.reads - reads
+
+    assert asyncio.run(run()) == 0
+    print("✅ legacy and am:/am:s: ids resolved from the index without database reads")
+
+
+def test_invalidation():
+    async def run():
+        system, collection, rules, roles = await make_system()
+
+        await system.update_message("1", "rules", {"trigger.value": "rules_v2"})
+        assert await system.find_matching_button("1", "rules_btn") is None
+        assert (await system.find_matching_button("1", "rules_v2"))["name"] == "rules"
+
+        await system.toggle_message("1", "rules")
+        reads = collection.reads
+        assert await system.find_matching_button("1", "rules_v2") is None
+        assert await system.find_matching_button("1", f"{COMPONENT_PREFIX}{rules['_id']}") is None
+        assert collection.reads == reads + 1  # one fallback read for the disabled message
+
+        await system.toggle_message("1", "rules")
+        assert (await system.find_matching_button("1", f"{COMPONENT_PREFIX}{rules['_id']}"))["name"] == "rules"
+
+        await system.delete_message("1", "roles")
+        assert await system.find_matching_dropdown("1", "menu", "roles") is None
+
+    asyncio.run(run())
+    print("✅ edit, disable, re-enable and delete update the index")
+
+
+def test_fallback_and_negative_cache():
+    async def run():
+        system, collection, rules, roles = await make_system()
+        # Created by another process (dashboard) after the index was loaded
+        other = {
+            "_id": ObjectId(), "guild_id": "1", "name": "faq",
+            "trigger": {"type": "button", "value": "faq_btn"}, "settings": {"enabled": True}
+        }
+        disabled = dict(other, _id=ObjectId(), name="old", settings={"enabled": False})
+        collection.docs.extend([other, disabled])
+
+        reads = collection.reads
+        assert (await system.find_matching_button("1", f"{COMPONENT_PREFIX}{other['_id']}"))["name"] == "faq"
+        assert (await system.find_matching_button("1", f"{COMPONENT_PREFIX}{other['_id']}"))["name"] == "faq"
+        assert collection.reads == reads + 1  # indexed after the first read
+
+        unknown = f"{COMPONENT_PREFIX}{ObjectId()}"
+        reads = collection.reads
+        for _ in range(20):
+            assert await system.find_matching_button("1", f"{COMPONENT_PREFIX}{disabled['_id']}") is None
+            assert await system.find_matching_button("1", unknown) is None
+        assert await system.find_matching_button("1", f"{COMPONENT_PREFIX}not-an-id") is None
+        assert collection.reads == reads + 2  # one read each, then cached as missing
+
+        # The negative entry expires
+        system.missing_component_ids[str(disabled["_id"])] = 0
+        await system.find_matching_button("1", f"{COMPONENT_PREFIX}{disabled['_id']}")
+        assert collection.reads == reads + 3
+
+        # A full reload (5-minute task) forgets the missing entries
+        await system.load_component_index()
+        assert system.missing_component_ids == {}
+
+    asyncio.run(run())
+    print(f"✅ fallback read for unindexed ids; disabled/unknown ids cached for {automessage_module.MISSING_COMPONENT_TTL}s")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Auto-Message Component Index Test")
+    print("=" * 50)
+    test_index_hits()
+    test_invalidation()
+    test_fallback_and_negative_cache()
+    print("\n🎉 All auto-message component index tests passed!")
@@ -0,0 +1,116 @@
+"""
+Custom Command Registry Test
+=============================
+Checks the in-memory command registry (lookups, invalidation, collapsed
+loads) and the batched usage buffer of custom_commands/registry.py with an
+in-memory stand-in for the schema.
+
+    python tests/test_command_registry.py
+"""
+import os
+import sys
+import asyncio
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from custom_commands.registry import CommandRegistry, UsageBuffer
+
+
+class MemorySchema:
+    def __init__(self):
+        self.commands = {
+            1: [
+                {"name": "hello", "aliases": ["hi", "hey"], "response_content": "Hello!"},
+                {"name": "hi", "aliases": [], "response_content": "Hi!"},
+            ]
+        }
+        self.loads = 0
+        self.counts = {}
+        self.logs = []
+        self.fail_logs = False
+
+    async def get_guild_commands(self, guild_id):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        return list(self.commands.get(guild_id, []))
+
+    async def increment_usage_many(self, counts):
+        for key, (uses, _) in counts.items():
+            self.counts[key] = self.counts.get(key, 0) + uses
+
+    async def log_command_usage_many(self, logs):
+        if self.fail_logs:
+            raise RuntimeError("database unavailable")
+        self.logs.extend(logs)
+
+
+async def _test_registry():
+    schema = MemorySchema()
+    registry = CommandRegistry(schema.get_guild_commands)
+
+    # Concurrent misses share one load
+    results = await asyncio.gather(*(registry.get_command(1, "HELLO") for _ in range(10)))
+    assert all(result["name"] == "hello" for result in results)
+    assert schema.loads == 1
+
+    # Names win over aliases, aliases resolve, unknown names miss
+    assert (await registry.get_command(1, "hi"))["response_content"] == "Hi!"
+    assert (await registry.get_command(1, "hey"))["name"] == "hello"
+    assert await registry.get_command(1, "nope") is None
+    assert schema.loads == 1
+    print(f"✅ Lookups served from memory ({registry.get_stats()})")
+
+    # Invalidation reloads the guild
+    schema.commands[1].append({"name": "new", "aliases": []})
+    registry.invalidate(1)
+    assert (await registry.get_command(1, "new"))["name"] == "new"
+    assert schema.loads == 2
+
+    # A load racing an invalidation isn't cached
+    load = asyncio.ensure_future(registry.get_guild(2))
+    await asyncio.sleep(0)
+    registry.invalidate(2)
+    await load
+    await registry.get_guild(2)
+    assert schema.loads == 4
+    print("✅ Invalidation and racing loads")
+
+
+async def _test_usage_buffer():
+    schema = MemorySchema()
+    usage = UsageBuffer(schema, max_pending=1000)
+    for _ in range(5):
+        usage.record(1, "Hello", 10, 20)
+    usage.record(1, "hello", 10, 20, success=False, error_message="boom")
+    assert schema.counts == {} and usage.pending == 6
+
+    schema.fail_logs = True
+    assert await usage.flush() == 0
+    assert schema.counts == {(1, "hello"): 5}
+    assert usage.pending == 6
+
+    schema.fail_logs = False
+    assert await usage.flush() == 6
+    assert schema.counts == {(1, "hello"): 5}, "counters must not be applied twice"
+    assert len(schema.logs) == 6 and sum(not log["success"] for log in schema.logs) == 1
+    print("✅ Usage aggregated, flushed in batches, retried without double counting")
+
+
+def test_registry():
+    print("=" * 70)
+    print("🧪 Command registry")
+    print("=" * 70)
+    asyncio.run(_test_registry())
+
+
+def test_usage_buffer():
+    print("=" * 70)
+    print("🧪 Usage buffer")
+    print("=" * 70)
+    asyncio.run(_test_usage_buffer())
+
+
+if __name__ == "__main__":
+    test_registry()
+    test_usage_buffer()
@@ -0,0 +1,121 @@
+"""
+Cooldown Store Test + Microbenchmark
+=====================================
+Checks scheduling/cooldowns.py (check-and-set, expiry/eviction, shared
+Redis-style backing through an in-memory stand-in, metrics) and measures
+``acquire`` throughput.
+
+    python tests/test_cooldown_store.py
+"""
+import os
+import sys
+import time
+import asyncio
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from scheduling.cooldowns import CooldownStore
+
+ITERATIONS = 200_000
+
+
+class MemoryRedis:
+    """The SET NX PX / PTTL / DELETE subset used by the store"""
+
+    def __init__(self):
+        self.keys = {}
+
+    def _alive(self, name):
+        end = self.keys.get(name)
+        if end is not None and end <= time.time():
+            del self.keys[name]
+            end = None
+        return end
+
+    async def set(self, name, value, px=None, nx=False):
+        if nx and self._alive(name) is not None:
+            return None
+        self.keys[name] = time.time() + px / 1000
+        return True
+
+    async def pttl(self, name):
+        end = self._alive(name)
+        return -2 if end is None else int((end - time.time()) * 1000)
+
+    async def delete(self, name):
+        self.keys.pop(name, None)
+
+
+async def _test_local():
+    store = CooldownStore()
+    assert await store.acquire("work", "1:2", 0.2) is None
+    remaining = await store.acquire("work", "1:2", 0.2)
+    assert remaining and 0 < remaining <= 0.2
+    assert await store.acquire("work", "1:3", 0.2) is None, "keys are independent"
+    assert await store.acquire("crime", "1:2", 0.2) is None, "features are independent"
+    assert await store.acquire("work", "1:4", 0) is None and store.peek("work", "1:4") is None
+
+    await store.reset("work", "1:3")
+    assert await store.remaining("work", "1:3") is None
+
+    await asyncio.sleep(0.25)
+    assert await store.acquire("work", "1:2", 0.2) is None, "cooldown expired"
+    stats = store.get_stats()
+    assert stats["features"]["work"]["active"] == 1
+    assert stats["features"]["crime"]["active"] == 0
+    assert stats["features"]["crime"]["evicted"] == 1
+    print(f"✅ Check-and-set, reset, expiry and eviction ({stats['features']['work']})")
+
+
+async def _test_shared():
+    redis = MemoryRedis()
+    first, second = CooldownStore(redis), CooldownStore(redis)
+    assert await first.acquire("daily", 42, 60) is None
+    remaining = await second.acquire("daily", 42, 60)
+    assert remaining and remaining > 59, "second process sees the first one's cooldown"
+    assert second.peek("daily", 42) is not None, "remote cooldown cached locally"
+
+    await first.set("daily", 7, until=time.time() + 30)
+    assert 29 < await second.remaining("daily", 7) <= 30
+    await first.reset("daily", 7)
+    second._entries["daily"].pop("7")
+    assert await second.remaining("daily", 7) is None
+    print("✅ Cooldowns shared between processes through Redis")
+
+
+async def _throughput():
+    store = CooldownStore()
+    started = time.perf_counter()
+    for index in range(ITERATIONS):
+        await store.acquire("bench", index % 5000, 60)
+    elapsed = time.perf_counter() - started
+    print(f"acquire()        {ITERATIONS / elapsed / 1e6:6.2f} M calls/s  ({elapsed / ITERATIONS * 1e9:6.0f} ns/call)")
+    print(f"memory           {store.get_stats()['features']['bench']['memory_bytes'] / 1024:.0f} KB for 5,000 running cooldowns")
+
+
+def test_local_store():
+    print("=" * 70)
+    print("🧪 Local cooldown store")
+    print("=" * 70)
+    asyncio.run(_test_local())
+
+
+def test_shared_store():
+    print("=" * 70)
+    print("🧪 Redis-backed cooldown store")
+    print("=" * 70)
+    asyncio.run(_test_shared())
+
+
+def test_acquire_throughput():
+    print("=" * 70)
+    print(f"⏱️ acquire() throughput ({ITERATIONS:,} calls)")
+    print("=" * 70)
+    asyncio.run(_throughput())
+
+
+if __name__ == "__main__":
+    test_local_store()
+    test_shared_store()
+    test_acquire_throughput()
@@ -0,0 +1,134 @@
+"""
+Deadline Scheduler Test
+========================
+Runs scheduling/deadlines.py with short deadlines:
+
+- jobs fire in deadline order, batched kinds get their due keys together
+- moving a deadline (earlier or later) and cancelling a job
+- failed handlers are retried, then given up, and a given-up job is not
+  brought back by the periodic reload
+
+    python tests/test_deadlines.py
+"""
+import os
+import sys
+import time
+import asyncio
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import scheduling.deadlines as deadlines_module
+from scheduling.deadlines import DeadlineScheduler
+
+
+class Recorder:
+    def __init__(self, fail=0):
+        self.calls = []
+        self.fail = fail
+
+    async def __call__(self, key):
+        self.calls.append(key)
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("handler failed")
+
+
+def test_ordering():
+    async def run():
+        scheduler = DeadlineScheduler(resync_interval=0)
+        fired, batches = Recorder(), Recorder()
+        scheduler.register("job", fired)
+        scheduler.register("expiry", batches, batch_size=2)
+        now = time.time()
+        scheduler.schedule("job", "c", now + 0.06)
+        scheduler.schedule("job", "a", now + 0.02)
+        scheduler.schedule("job", "b", now + 0.04)
+        for key in ("x", "y", "z"):
+            scheduler.schedule("expiry", key, now + 0.03)
+        scheduler.start()
+        await asyncio.sleep(0.12)
+        await scheduler.stop()
+        return scheduler, fired, batches
+
+    scheduler, fired, batches = asyncio.run(run())
+    assert fired.calls == ["a", "b", "c"], fired.calls
+    assert sorted(map(len, batches.calls)) == [1, 2], batches.calls
+    assert scheduler.pending() == 0 and scheduler.stats["fired"] == 6
+    print("✅ jobs fire in deadline order, batched kinds in chunks of batch_size")
+
+
+def test_reschedule_and_cancel():
+    async def run():
+        scheduler = DeadlineScheduler(resync_interval=0)
+        fired = Recorder()
+        scheduler.register("job", fired)
+        now = time.time()
+        scheduler.schedule("job", "later", now + 10)
+        scheduler.schedule("job", "moved", now + 10)
+        scheduler.schedule("job", "cancelled", now + 0.02)
+        scheduler.start()
+        await asyncio.sleep(0.01)
+
+        # The runner sleeps on "cancelled"; an earlier deadline wakes it
+        scheduler.schedule("job", "moved", time.time() + 0.01)
+        scheduler.cancel("job", "cancelled")
+        scheduler.schedule("job", "later", time.time() + 0.2)
+        await asyncio.sleep(0.05)
+        snapshot = list(fired.calls)
+        await scheduler.stop()
+        return scheduler, snapshot
+
+    scheduler, fired = asyncio.run(run())
+    assert fired == ["moved"], fired
+    assert scheduler.pending() == 1 and scheduler.next_deadline() is not None
+    print("✅ moved deadlines fire at the new time, cancelled jobs never fire")
+
+
+def test_retry_and_give_up():
+    async def run():
+        scheduler = DeadlineScheduler(resync_interval=0.05)
+        flaky, broken = Recorder(fail=1), Recorder(fail=100)
+        when = time.time()
+
+        async def loader():
+            return [("g1", when)]
+
+        scheduler.register("flaky", flaky)
+        scheduler.register("broken", broken, loader=loader)
+        scheduler.schedule("flaky", "f1", when)
+        scheduler.start()
+        await asyncio.sleep(0.3)
+        given_up = scheduler.pending("broken")
+        calls = len(broken.calls)
+
+        # Reloads keep skipping it; an explicit schedule brings it back
+        await scheduler.reload("broken")
+        skipped = scheduler.pending("broken")
+        scheduler.schedule("broken", "g1", time.time())
+        await asyncio.sleep(0.02)
+        await scheduler.stop()
+        return scheduler, flaky, broken, given_up, calls, skipped
+
+    deadlines_module.RETRY_DELAY, retry_delay = 0.01, deadlines_module.RETRY_DELAY
+    try:
+        scheduler, flaky, broken, given_up, calls, skipped = asyncio.run(run())
+    finally:
+        deadlines_module.RETRY_DELAY = retry_delay
+
+    max_attempts = deadlines_module.MAX_ATTEMPTS
+    assert flaky.calls == ["f1", "f1"], flaky.calls
+    assert calls == max_attempts, broken.calls
+    assert given_up == 0 and skipped == 0
+    assert len(broken.calls) > max_attempts  # schedule() lifted the give-up
+    print(f"✅ failed jobs retried, given up after {max_attempts} attempts and not reloaded")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Deadline Scheduler Test")
+    print("=" * 50)
+    test_ordering()
+    test_reschedule_and_cancel()
+    test_retry_and_give_up()
+    print("\n🎉 All deadline scheduler tests passed!")
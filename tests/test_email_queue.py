@@ -0,0 +1,267 @@
+"""
+Email Queue Test
+================
+Runs the Resend transport and the outbound queue against a local stub HTTP
+server (no emails leave the machine):
+
+- single and batch sends hit ``/emails`` and ``/emails/batch``
+- a rejected batch falls back to single sends (a few at a time); a
+  rate-limited batch is requeued whole; invalid addresses fail
+- localized templates are compiled once per (template, language)
+
+The queue round trip (enqueue -> claim -> send -> results) also runs when
+MONGODB_URI points at a MongoDB instance.
+
+    python tests/test_email_queue.py
+"""
+import os
+import sys
+import asyncio
+import importlib.util
+from datetime import datetime
+
+from aiohttp import web
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# The bot's ``email`` package shadows the standard library one (which aiohttp
+# needs), so load it under another name
+_spec = importlib.util.spec_from_file_location(
+    "kingdom_email",
+    os.path.join(ROOT, "email", "__init__.py"),
+    submodule_search_locations=[os.path.join(ROOT, "email")]
+)
+kingdom_email = importlib.util.module_from_spec(_spec)
+sys.modules["kingdom_email"] = kingdom_email
+_spec.loader.exec_module(kingdom_email)
+
+from kingdom_email.transport import ResendTransport, EmailSendError
+from kingdom_email.email_queue import EmailQueue
+from kingdom_email.email_service import EmailService
+
+
+class StubResend:
+    """Minimal Resend API: rejects ``invalid@`` recipients, rate-limits single sends to ``busy@`` once"""
+
+    def __init__(self):
+        self.requests = []
+        self.sent = []
+        self._busy_seen = set()
+        self.app = web.Application()
+        self.app.router.add_post("/emails", self.send)
+        self.app.router.add_post("/emails/batch", self.send_batch)
+
+    def _check(self, message, rate_limit: bool = True):
+        recipient = message["to"][0]
+        if recipient.startswith("invalid@"):
+            return 422, "Invalid `to` field"
+        if rate_limit and recipient.startswith("busy@") and recipient not in self._busy_seen:
+            self._busy_seen.add(recipient)
+            return 429, "Too many requests"
+        return None
+
+    def _accept(self, message):
+        self.sent.append(message)
+        return {"id": f"stub-{len(self.sent)}"}
+
+    async def send(self, request):
+        message = await request.json()
+        self.requests.append(("single", 1))
+        error = self._check(message)
+        if error:
+            return web.json_response({"message": error[1]}, status=error[0])
+        return web.json_response(self._accept(message))
+
+    async def send_batch(self, request):
+        messages = await request.json()
+        self.requests.append(("batch", len(messages)))
+        for message in messages:
+            error = self._check(message, rate_limit=False)
+            if error:
+                return web.json_response({"message": error[1]}, status=error[0])
+        return web.json_response({"data": [self._accept(message) for message in messages]})
+
+
+async def start_stub():
+    stub = StubResend()
+    runner = web.AppRunner(stub.app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return stub, runner, f"http://127.0.0.1:{port}"
+
+
+def message(to_email: str):
+    return {"from": "test@kingdom77.com", "to": [to_email], "subject": "Test", "html": "<p>Hi</p>"}
+
+
+async def test_transport():
+    """Single and batch sends against the stub"""
+    print("=" * 70)
+    print("🧪 Resend transport")
+    print("=" * 70)
+
+    stub, runner, url = await start_stub()
+    transport = ResendTransport(api_key="re_test", base_url=url)
+    try:
+        resend_id = await transport.send(message("a@example.com"))
+        assert resend_id == "stub-1", resend_id
+        print("✅ Single send")
+
+        ids = await transport.send_batch([message(f"user{i}@example.com") for i in range(50)])
+        assert len(ids) == 50 and all(ids), ids
+        assert stub.requests[-1] == ("batch", 50), stub.requests[-1]
+        print("✅ 50 emails in one batch request")
+
+        try:
+            await transport.send(message("invalid@example.com"))
+            raise AssertionError("invalid recipient accepted")
+        except EmailSendError as e:
+            assert e.status == 422 and not e.retryable
+        try:
+            await transport.send(message("busy@example.com"))
+            raise AssertionError("rate limit not reported")
+        except EmailSendError as e:
+            assert e.status == 429 and e.retryable
+        print("✅ Errors classified (422 final, 429 retryable)")
+    finally:
+        await transport.close()
+        await runner.cleanup()
+
+
+def test_render_cache():
+    """Templates are compiled once per (template, language)"""
+    print("=" * 70)
+    print("🧪 Template rendering")
+    print("=" * 70)
+
+    service = EmailService()
+    variables = {"user_name": "<b>Sam</b>", "guild_name": "Guild", "dashboard_url": "https://x"}
+
+    subject, html = service.render_template("subscription_expired", variables, "en")
+    assert "&lt;b&gt;Sam&lt;/b&gt;" in html and "<b>Sam</b>" not in html
+    assert "<strong>Guild</strong>" in html and 'href="https://x"' in html
+    assert subject == "⏰ Kingdom-77 Premium Expired"
+    print("✅ Variables filled and escaped")
+
+    _, html_ar = service.render_template("subscription_expired", variables, "ar")
+    assert 'dir="rtl"' in html_ar
+    service.render_template("subscription_expired", dict(variables, user_name="Alex"), "en")
+    assert len(service._compiled) == 2, service._compiled.keys()
+    print("✅ One compiled layout per (template, language)")
+
+
+class FlakyTransport:
+    """Batch requests fail with ``error``; single sends succeed and track concurrency"""
+
+    def __init__(self, error):
+        self.error = error
+        self.singles = 0
+        self.active = 0
+        self.max_active = 0
+
+    async def send_batch(self, messages):
+        raise self.error
+
+    async def send(self, message):
+        self.singles += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return f"single-{self.singles}"
+
+
+class RecordingSchema:
+    def __init__(self):
+        self.results = None
+
+    async def record_results(self, sent, retry, failed):
+        self.results = (sent, retry, failed)
+
+
+async def test_batch_errors():
+    """Retryable batch errors requeue the batch; rejected batches split with bounded concurrency"""
+    print("=" * 70)
+    print("🧪 Batch error handling")
+    print("=" * 70)
+
+    emails = [{"to_email": f"user{i}@example.com", "subject": "Test", "html_content": "<p>Hi</p>"}
+              for i in range(20)]
+
+    transport = FlakyTransport(EmailSendError("Resend 429: slow down", status=429, retryable=True))
+    schema = RecordingSchema()
+    counts = await EmailQueue(schema, transport, from_email="test@kingdom77.com").deliver(emails)
+    assert counts == {"sent": 0, "retry": 20, "failed": 0}, counts
+    assert transport.singles == 0
+    print("✅ Rate-limited batch requeued with backoff, no single-send fan-out")
+
+    transport = FlakyTransport(EmailSendError("Resend 422: invalid", status=422, retryable=False))
+    counts = await EmailQueue(schema, transport, from_email="test@kingdom77.com").deliver(emails)
+    assert counts == {"sent": 20, "retry": 0, "failed": 0}, counts
+    assert transport.max_active <= kingdom_email.email_queue.SINGLE_SEND_CONCURRENCY
+    print(f"✅ Rejected batch split into single sends ({transport.max_active} at a time)")
+
+
+async def test_queue_round_trip():
+    """enqueue -> claim -> batch send -> results, against MongoDB and the stub"""
+    if not os.getenv("MONGODB_URI"):
+        print("⏭️ MONGODB_URI not set, skipping queue round trip")
+        return
+
+    print("=" * 70)
+    print("🧪 Email queue round trip")
+    print("=" * 70)
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+    sys.path.insert(0, ROOT)
+    from database.email_schema import EmailSchema
+
+    client = AsyncIOMotorClient(os.environ["MONGODB_URI"], serverSelectionTimeoutMS=5000)
+    db = client[f"email_queue_test_{os.getpid()}"]
+    stub, runner, url = await start_stub()
+    schema = EmailSchema(db)
+    queue = EmailQueue(schema, ResendTransport(api_key="re_test", base_url=url),
+                       from_email="test@kingdom77.com", workers=2, batch_size=20, poll_interval=0.2)
+    try:
+        await schema.initialize()
+        for i in range(40):
+            await queue.enqueue(f"user{i}@example.com", "Test", "<p>Hi</p>", email_type="test")
+        # Lowest priority: claimed together in the last batch, which the API rejects
+        for recipient in ("invalid@example.com", "busy@example.com"):
+            await queue.enqueue(recipient, "Test", "<p>Hi</p>", email_type="test", priority=9)
+
+        started = datetime.utcnow()
+        queue.start()
+        for _ in range(100):
+            await asyncio.sleep(0.1)
+            pending = await schema.email_queue.count_documents({"status": {"$in": ["pending", "sending"]},
+                                                                "scheduled_for": {"$lte": datetime.utcnow()}})
+            if not pending:
+                break
+        elapsed = (datetime.utcnow() - started).total_seconds()
+
+        counts = {status: await schema.email_queue.count_documents({"status": status})
+                  for status in ("sent", "pending", "failed")}
+        print(f"⏱️ Drained in {elapsed:.2f}s: {counts} via {len(stub.requests)} requests")
+        assert counts == {"sent": 40, "pending": 1, "failed": 1}, counts
+        busy = await schema.email_queue.find_one({"to_email": "busy@example.com"})
+        assert busy["attempts"] == 1 and busy["scheduled_for"] > started
+        assert await schema.email_log.count_documents({"status": "sent"}) == 40
+        print("✅ Sent in batches; rate-limited email rescheduled; invalid email failed")
+    finally:
+        await queue.stop()
+        await runner.cleanup()
+        await client.drop_database(db.name)
+
+
+async def main():
+    await test_transport()
+    test_render_cache()
+    await test_batch_errors()
+    await test_queue_round_trip()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,161 @@
+"""
+Premium Entitlement Cache Test
+===============================
+Checks premium/entitlements.py against a counting loader:
+
+- entries end exactly at the subscription's ``expires_at`` and are re-read
+  after ``refresh_seconds`` (``negative_seconds`` for free guilds)
+- concurrent misses for a guild collapse into one load; a failed load
+  reaches every waiter and the next call retries
+- invalidation drops one guild (or all) and notifies ``on_invalidate``;
+  cancelling or renewing a subscription invalidates only its guild
+
+    python tests/test_entitlement_cache.py
+"""
+import os
+import sys
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from premium.entitlements import EntitlementCache, FREE_TIER_LIMITS
+from premium.premium_system import PremiumSystem
+from database.premium_schema import PremiumSchema, MONGODB_DB
+from memory_db import MemoryDatabase, ObjectIdCollection
+
+
+class Loader:
+    def __init__(self, subscriptions=None):
+        self.subscriptions = subscriptions or {}
+        self.loads = 0
+        self.fail = False
+
+    async def __call__(self, guild_id):
+        self.loads += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("database down")
+        return self.subscriptions.get(guild_id)
+
+
+def subscription(expires_in):
+    return {"tier": "basic", "features": ["xp_boost"], "expires_at": datetime.utcnow() + expires_in}
+
+
+def test_expiry_and_refresh():
+    loader = Loader({"1": subscription(timedelta(milliseconds=50)), "2": subscription(timedelta(days=30))})
+    cache = EntitlementCache(loader, refresh_seconds=0.15, negative_seconds=0.15)
+
+    async def run():
+        assert (await cache.get("1"))["tier"] == "basic"
+        assert "xp_boost" in (await cache.get(1))["features"]
+        await cache.get("2")
+        assert (await cache.get("3"))["limits"] == FREE_TIER_LIMITS
+        assert loader.loads == 3 and cache.hits == 1
+
+        # Guild 1's subscription ends: the entry goes with it
+        await asyncio.sleep(0.06)
+        del loader.subscriptions["1"]
+        assert cache.peek("1") is None
+        assert (await cache.get("1"))["tier"] is None
+        assert cache.peek("2") is not None and cache.peek("3") is not None
+        assert loader.loads == 4
+
+        # Entries older than refresh_seconds / negative_seconds are re-read
+        await asyncio.sleep(0.1)
+        await cache.get("2")
+        await cache.get("3")
+        assert loader.loads == 6
+
+    asyncio.run(run())
+    print("✅ entries expire at expires_at and after refresh_seconds / negative_seconds")
+
+
+def test_collapsed_misses():
+    loader = Loader({"1": subscription(timedelta(days=30))})
+    cache = EntitlementCache(loader)
+
+    async def run():
+        entries = await asyncio.gather(*(cache.get("1") for _ in range(50)))
+        assert loader.loads == 1 and all(entry is entries[0] for entry in entries)
+
+        loader.fail = True
+        cache.invalidate("1")
+        results = await asyncio.gather(*(cache.get("1") for _ in range(10)), return_exceptions=True)
+        assert loader.loads == 2 and all(isinstance(result, RuntimeError) for result in results)
+
+        loader.fail = False
+        assert (await cache.get("1"))["tier"] == "basic"
+        assert loader.loads == 3
+
+    asyncio.run(run())
+    print("✅ 50 concurrent misses -> 1 load; a failed load reaches every waiter and is retried")
+
+
+def test_invalidation():
+    loader = Loader({"1": subscription(timedelta(days=30)), "2": subscription(timedelta(days=30))})
+    cache = EntitlementCache(loader)
+    notified = []
+    cache.on_invalidate = notified.append
+
+    async def run():
+        await cache.get("1")
+        await cache.get("2")
+        cache.invalidate(1)
+        assert cache.peek("1") is None and cache.peek("2") is not None
+        cache.invalidate("2", propagate=False)
+        await cache.get("1")
+        cache.invalidate()
+        assert cache.get_stats()["entries"] == 0
+
+    asyncio.run(run())
+    assert notified == ["1", None]
+    print("✅ invalidate drops one guild or all, and notifies other shards unless told not to")
+
+
+def test_subscription_changes_invalidate_guild():
+    db = MemoryDatabase(premium_subscriptions=ObjectIdCollection())
+    schema = PremiumSchema({MONGODB_DB: db})
+    subscriptions = db.premium_subscriptions
+    for guild_id in ("1", "2"):
+        subscriptions.docs.append({
+            "_id": subscriptions.new_id(), "guild_id": guild_id, "status": "active",
+            "tier": "basic", "expires_at": datetime.utcnow() + timedelta(days=3)
+        })
+    cache = EntitlementCache(Loader({"1": subscription(timedelta(days=3)), "2": subscription(timedelta(days=3))}))
+    premium = SimpleNamespace(schema=schema, entitlements=cache)
+    first, second = (str(doc["_id"]) for doc in subscriptions.docs)
+
+    async def run():
+        await cache.get("1")
+        await cache.get("2")
+        assert await PremiumSystem.cancel_subscription(premium, first)
+        assert cache.peek("1") is None and cache.peek("2") is not None
+
+        await cache.get("1")
+        assert await PremiumSystem.renew_subscription(premium, second, 30)
+        assert cache.peek("2") is None and cache.peek("1") is not None
+
+        missing = str(subscriptions.new_id())
+        assert not await PremiumSystem.cancel_subscription(premium, missing)
+        assert not await PremiumSystem.renew_subscription(premium, missing)
+        assert cache.peek("1") is not None
+
+    asyncio.run(run())
+    assert subscriptions.docs[0]["status"] == "cancelled"
+    assert subscriptions.docs[1]["expires_at"] > datetime.utcnow() + timedelta(days=32)
+    print("✅ cancel / renew invalidate only the subscription's guild")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Premium Entitlement Cache Test")
+    print("=" * 50)
+    test_expiry_and_refresh()
+    test_collapsed_misses()
+    test_invalidation()
+    test_subscription_changes_invalidate_guild()
+    print("\n🎉 All entitlement cache tests passed!")
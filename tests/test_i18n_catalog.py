@@ -0,0 +1,141 @@
+"""
+i18n Catalog Test + Microbenchmark
+===================================
+Checks the compiled catalogs (localization/i18n.py) against a plain nested
+lookup of the locale JSON files, the catalog cache, and measures ``t()``
+throughput.
+
+    python tests/test_i18n_catalog.py
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from localization.i18n import I18nManager, CATALOG_CACHE
+
+LOCALES = os.path.join(ROOT, "localization", "locales")
+ITERATIONS = 200_000
+
+
+def reference_translate(translations, key, lang_code, **kwargs):
+    """Nested walk + English fallback (the behaviour the catalogs must keep)"""
+    def lookup(data):
+        for part in key.split("."):
+            if not isinstance(data, dict) or part not in data:
+                return None
+            data = data[part]
+        return data if isinstance(data, str) else None
+
+    value = lookup(translations.get(lang_code, {}))
+    if value is None and lang_code != "en":
+        value = lookup(translations.get("en", {}))
+    if value is None:
+        return key
+    try:
+        return value.format(**kwargs)
+    except (KeyError, IndexError, ValueError):
+        return value
+
+
+def all_keys(data, prefix=""):
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield from all_keys(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}"
+
+
+def test_catalog_matches_reference():
+    print("=" * 70)
+    print("🧪 Compiled catalogs vs nested lookup")
+    print("=" * 70)
+
+    manager = I18nManager(LOCALES, use_cache=False)
+    with open(os.path.join(LOCALES, "en.json"), encoding="utf-8") as f:
+        keys = set(all_keys(json.load(f)))
+    for data in manager.translations.values():
+        keys.update(all_keys(data))
+    keys.add("does.not.exist")
+
+    variables = {"latency": 42, "user": "Sam", "username": "Sam", "count": 3, "amount": 10, "level": 5}
+    checked = 0
+    for lang_code in manager.SUPPORTED_LANGUAGES:
+        for key in keys:
+            expected = reference_translate(manager.translations, key, lang_code, **variables)
+            actual = manager.translate(key, lang_code, **variables)
+            assert actual == expected, f"{lang_code}/{key}: {actual!r} != {expected!r}"
+            checked += 1
+    print(f"✅ {checked} lookups identical across {len(manager.SUPPORTED_LANGUAGES)} languages")
+
+    manager.set_user_language("1", "ar")
+    manager.set_guild_language("2", "de")
+    assert manager.translate("general.yes", user_id="1", guild_id="2") == manager.translate("general.yes", "ar")
+    assert manager.translate("general.yes", user_id="3", guild_id="2") == manager.translate("general.yes", "de")
+    assert manager.translate("general.yes", guild_id="2") == manager.translate("general.yes", "en")
+    print("✅ User > guild > default language resolution")
+
+
+def test_catalog_cache():
+    print("=" * 70)
+    print("🧪 Catalog cache")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in os.listdir(LOCALES):
+            if name.endswith(".json"):
+                shutil.copy(os.path.join(LOCALES, name), tmp)
+
+        started = time.perf_counter()
+        compiled = I18nManager(tmp)
+        compile_ms = (time.perf_counter() - started) * 1000
+        assert os.path.exists(os.path.join(tmp, CATALOG_CACHE))
+
+        started = time.perf_counter()
+        cached = I18nManager(tmp)
+        cache_ms = (time.perf_counter() - started) * 1000
+        assert cached.catalogs == compiled.catalogs
+        print(f"✅ Cache hit ({compile_ms:.1f} ms compiled, {cache_ms:.1f} ms from cache)")
+
+        # Editing a locale file invalidates the cache
+        en_file = os.path.join(tmp, "en.json")
+        with open(en_file, encoding="utf-8") as f:
+            data = json.load(f)
+        data["general"]["yes"] = "Yep"
+        with open(en_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        assert I18nManager(tmp).translate("general.yes", "en") == "Yep"
+        print("✅ Cache rebuilt after a locale change")
+
+
+def test_translate_throughput():
+    print("=" * 70)
+    print(f"⏱️ t() throughput ({ITERATIONS:,} calls each)")
+    print("=" * 70)
+
+    manager = I18nManager(LOCALES, use_cache=False)
+    manager.set_user_language("1", "ar")
+    cases = [
+        ("plain", lambda: manager.translate("general.yes", "fr")),
+        ("formatted", lambda: manager.translate("commands.ping.response", "de", latency=42)),
+        ("user language", lambda: manager.translate("general.no", user_id="1")),
+        ("en fallback", lambda: manager.translate("general.yes", "xx")),
+        ("reference (nested)", lambda: reference_translate(manager.translations, "commands.ping.response", "de", latency=42)),
+    ]
+    for name, call in cases:
+        started = time.perf_counter()
+        for _ in range(ITERATIONS):
+            call()
+        elapsed = time.perf_counter() - started
+        print(f"{name:<22} {ITERATIONS / elapsed / 1e6:6.2f} M calls/s  ({elapsed / ITERATIONS * 1e9:6.0f} ns/call)")
+
+
+if __name__ == "__main__":
+    test_catalog_matches_reference()
+    test_catalog_cache()
+    test_translate_throughput()
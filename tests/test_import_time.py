@@ -0,0 +1,99 @@
+"""
+Import-Time Regression Test
+============================
+Imports main.py in a fresh interpreter with ``-X importtime`` and checks that
+heavy optional dependencies stay lazy (see startup/lazy.py) and that the total
+import time stays within budget.
+
+The budget is relative to a baseline measured in the same run (importing the
+dependencies main.py needs anyway), so it holds on slow and fast machines.
+
+    python tests/test_import_time.py            # report + checks
+    IMPORT_TIME_MAX_RATIO=2 python tests/test_import_time.py
+    IMPORT_TIME_BUDGET_MS=1500 python tests/test_import_time.py   # extra absolute cap
+"""
+import os
+import re
+import sys
+import subprocess
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Must not be imported while main.py loads
+LAZY_MODULES = ["deep_translator", "langdetect", "PIL"]
+
+# Required dependencies imported by main.py in any case (the baseline)
+BASELINE_MODULES = ["discord", "discord.ext.commands", "motor.motor_asyncio", "pymongo"]
+
+# Cumulative import time of main.py, as a multiple of the baseline
+MAX_RATIO = float(os.getenv("IMPORT_TIME_MAX_RATIO", "4"))
+
+# Optional absolute cap (ms), for machines whose timings are known
+BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "0")) or None
+
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_import(module: str = "main"):
+    """Return {module: (self_us, cumulative_us, depth)} for a fresh import of ``module`` (comma-separated for several)"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    env.pop("TOKEN", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            timings[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return timings
+
+
+def print_report(timings, limit: int = 15):
+    top_level = {}
+    for name, (_, cumulative_us, _) in timings.items():
+        root = name.split(".")[0]
+        top_level[root] = max(top_level.get(root, 0), cumulative_us)
+
+    print(f"{'package':<30} {'cumulative ms':>14}")
+    for root, cumulative_us in sorted(top_level.items(), key=lambda item: -item[1])[:limit]:
+        print(f"{root:<30} {cumulative_us / 1000:>14.1f}")
+
+
+def test_import_time():
+    """main.py imports without heavy optional deps and within budget"""
+    print("=" * 70)
+    print("🧪 Import-time regression (python -X importtime -c 'import main')")
+    print("=" * 70)
+
+    timings = measure_import("main")
+    print_report(timings)
+
+    eager = [name for name in timings if name.split(".")[0] in LAZY_MODULES]
+    assert not eager, f"Imported eagerly: {sorted(eager)[:10]}"
+    print(f"\n✅ Lazy modules not imported: {', '.join(LAZY_MODULES)}")
+
+    baseline = measure_import(", ".join(BASELINE_MODULES))
+    baseline_roots = {name.split(".")[0] for name in BASELINE_MODULES}
+    baseline_ms = sum(
+        cumulative_us for name, (_, cumulative_us, depth) in baseline.items()
+        if depth == 0 and name.split(".")[0] in baseline_roots
+    ) / 1000
+    budget_ms = baseline_ms * MAX_RATIO
+    if BUDGET_MS is not None:
+        budget_ms = min(budget_ms, BUDGET_MS)
+
+    total_ms = timings["main"][1] / 1000
+    print(f"⏱️ main: {total_ms:.1f} ms, baseline {baseline_ms:.1f} ms "
+          f"({', '.join(BASELINE_MODULES)}), budget {budget_ms:.0f} ms")
+    assert total_ms <= budget_ms, f"import main took {total_ms:.1f} ms > {budget_ms:.0f} ms"
+    print("✅ Import time within budget")
+
+
+if __name__ == "__main__":
+    test_import_time()
@@ -0,0 +1,242 @@
+"""
+Join Pipeline Test
+===================
+Checks the member-join pipeline of joins/: the in-memory join-rate window,
+the shared config snapshot (one round of queries per guild), one role
+request per join, buffered join rows, and the batched surge mode with its
+latency metrics, and draining on shutdown, against in-memory collections
+and guilds.
+
+    python tests/test_join_pipeline.py
+"""
+import os
+import sys
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+import joins.pipeline as pipeline_module
+from joins import JoinRateWindow, JoinSnapshotCache, JoinPipeline
+from memory_db import MemoryCollection, MemoryDatabase
+
+pipeline_module.SURGE_BATCH_INTERVAL = 0.01
+pipeline_module.SURGE_EDITS_PER_SECOND = 10000
+pipeline_module.WRITE_FLUSH_SECONDS = 0.01
+
+
+def make_db(welcome=None, join_roles=(), logging=None):
+    def config(docs=()):
+        # Config reads take a moment, so concurrent joins overlap the snapshot load
+        return MemoryCollection(list(docs), delay=0.005)
+
+    return MemoryDatabase(
+        welcome_settings=config([welcome] if welcome else []),
+        guild_autoroles_config=config(),
+        join_roles=config(join_roles),
+        server_logs_settings=config([logging] if logging else []),
+        reaction_roles=config(),
+        level_roles=config(),
+        captcha_verifications=config(),
+        welcome_cards=config(),
+    )
+
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+
+    def is_default(self):
+        return self.id == 1
+
+
+class FakeChannel:
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, content=None, **kwargs):
+        self.messages.append(content or kwargs)
+
+
+class FakeGuild:
+    def __init__(self, guild_id=1):
+        self.id = guild_id
+        self.name = "Kingdom"
+        self._roles = {role_id: FakeRole(role_id) for role_id in (1, 10, 11, 12)}
+        self.channels = {500: FakeChannel(), 600: FakeChannel()}
+        self.members = {}
+        self.me = SimpleNamespace(top_role=None)
+
+    @property
+    def member_count(self):
+        return len(self.members)
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+
+class FakeMember:
+    def __init__(self, guild, user_id):
+        self.guild = guild
+        self.id = user_id
+        self.bot = False
+        self.name = f"user{user_id}"
+        self.discriminator = "0"
+        self.mention = f"<@{user_id}>"
+        self.display_avatar = SimpleNamespace(url="https://cdn/avatar.png")
+        self.created_at = datetime.utcnow() - timedelta(days=user_id % 10)
+        self.roles = [guild.get_role(1)]
+        self.role_requests = 0
+        guild.members[user_id] = self
+
+    def __str__(self):
+        return self.name
+
+    async def add_roles(self, *roles, reason=None):
+        self.role_requests += 1
+        self.roles.extend(roles)
+
+    async def remove_roles(self, *roles, reason=None):
+        self.role_requests += 1
+
+    async def edit(self, roles, reason=None):
+        self.role_requests += 1
+        self.roles = [self.guild.get_role(1)] + list(roles)
+
+    async def send(self, *args, **kwargs):
+        pass
+
+
+WELCOME = {
+    "guild_id": 1, "enabled": True, "welcome_type": "text", "welcome_channels": [500],
+    "welcome_message": "Welcome {user}!", "auto_role_enabled": True, "auto_roles": [12]
+}
+JOIN_ROLES = [
+    {"guild_id": 1, "role_id": 10, "target_type": "all", "enabled": True},
+    {"guild_id": 1, "role_id": 11, "target_type": "humans", "enabled": True},
+]
+LOGGING = {
+    "guild_id": 1, "enabled": True, "log_types": {"member_join": True}, "channels": {"member_logs": 600}
+}
+
+
+def make_pipeline(welcome=WELCOME):
+    db = make_db(welcome, JOIN_ROLES, LOGGING)
+    pipeline = JoinPipeline(SimpleNamespace(), db, window=JoinRateWindow(), snapshots=JoinSnapshotCache())
+    return pipeline, db
+
+
+def test_window():
+    window = JoinRateWindow(window_seconds=60)
+    for second in range(30):
+        window.record(1, now=float(second))
+    assert window.count(1, now=30.0) == 30
+    assert window.count(1, now=75.0) == 14
+    assert window.count(1, now=200.0) == 0 and len(window) == 0
+    print("✅ join-rate window counts the last 60s per guild and forgets idle guilds")
+
+
+def test_inline_join():
+    pipeline, db = make_pipeline()
+    guild = FakeGuild()
+
+    async def run():
+        members = [FakeMember(guild, user) for user in range(100, 105)]
+        await asyncio.gather(*(pipeline.handle(member) for member in members))
+        await asyncio.sleep(0.05)
+        return members
+
+    members = asyncio.run(run())
+    assert db.reads == 4, db.reads  # one snapshot for the whole burst
+    for member in members:
+        assert member.role_requests == 1
+        assert sorted(role.id for role in member.roles) == [1, 10, 11, 12]
+    assert len(guild.channels[500].messages) == 5
+    assert len(guild.channels[600].messages) == 5
+    assert len(db.join_history.docs) == 5 and len(db.member_logs.docs) == 5
+    assert db.writes == 4  # 2 insert_many + 2 counter bulk writes
+    assert pipeline.metrics.inline == 5 and pipeline.metrics.latency.calls == 5
+    print(f"✅ 5 joins: 4 queries, 1 role request each, rows in {db.writes} bulk writes")
+
+
+def test_surge():
+    pipeline, db = make_pipeline()
+    guild = FakeGuild()
+
+    async def run():
+        members = [FakeMember(guild, user) for user in range(200)]
+        await asyncio.gather(*(pipeline.handle(member) for member in members))
+        await asyncio.gather(*pipeline._workers.values())
+        await pipeline.flush()
+        return members
+
+    members = asyncio.run(run())
+    threshold = pipeline_module.DEFAULT_SURGE_THRESHOLD
+    assert pipeline.metrics.inline == threshold - 1
+    assert pipeline.metrics.queued == 200 - threshold + 1
+    assert all(member.role_requests == 1 for member in members)
+    batches = pipeline.metrics.batches
+    # One welcome / one log embed per batch instead of one per member
+    assert len(guild.channels[500].messages) == threshold - 1 + batches
+    assert len(guild.channels[600].messages) == threshold - 1 + batches
+    assert len(db.join_history.docs) == 200
+    stats = pipeline.get_stats()
+    assert stats["latency"]["calls"] == 200 and stats["queue_wait"]["calls"] == 200 - threshold + 1
+    assert stats["surging_guilds"] == [1]
+    print(f"✅ 200-join surge: {threshold - 1} inline, {stats['queued']} queued in {batches} batches, "
+          f"{len(guild.channels[500].messages)} welcome messages, "
+          f"p95 latency {stats['latency']['p95_ms']}ms")
+
+
+def test_stop_drains():
+    pipeline, db = make_pipeline()
+    guild = FakeGuild()
+
+    async def run():
+        members = [FakeMember(guild, user) for user in range(100)]
+        await asyncio.gather(*(pipeline.handle(member) for member in members))
+        # Bot closing right after a surge: queued joins and buffered rows are kept
+        await pipeline.stop(timeout=5)
+        return members
+
+    members = asyncio.run(run())
+    assert all(member.role_requests == 1 for member in members)
+    assert len(db.join_history.docs) == 100 and pipeline.pending_rows == 0
+    print("✅ stop() on close finishes queued surge joins and writes buffered rows")
+
+
+def test_raid_suppresses_welcome():
+    pipeline, db = make_pipeline(dict(WELCOME, anti_raid_enabled=True, anti_raid_threshold=5))
+    guild = FakeGuild()
+
+    async def run():
+        members = [FakeMember(guild, user) for user in range(30)]
+        await asyncio.gather(*(pipeline.handle(member) for member in members))
+        await asyncio.gather(*pipeline._workers.values())
+        return members
+
+    members = asyncio.run(run())
+    assert len(guild.channels[500].messages) == 4  # only the joins before the raid
+    # Join roles still given during the raid, welcome auto role not
+    assert sorted(role.id for role in members[-1].roles) == [1, 10, 11]
+    print("✅ anti-raid threshold reached: welcome suppressed, join roles still given")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Join Pipeline Test")
+    print("=" * 50)
+    test_window()
+    test_inline_join()
+    test_surge()
+    test_stop_drains()
+    test_raid_suppresses_welcome()
+    print("\n🎉 All join pipeline tests passed!")
@@ -0,0 +1,207 @@
+"""
+Level-Role Ladder Test
+=======================
+Checks the level-role ladder of autoroles/level_ladder.py (target role sets,
+``remove_previous``, the per-guild cache) and the one-call reconciliation and
+bulk resync of ``AutoRoleSystem``, against in-memory collections and members.
+
+    python tests/test_level_ladder.py
+"""
+import os
+import sys
+import time
+import asyncio
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from autoroles.level_ladder import LevelRoleLadder, LevelLadderCache
+from memory_db import MemoryCollection, MemoryDatabase
+
+
+STACKED = [
+    {"level": 5, "role_id": 105},
+    {"level": 10, "role_id": 110},
+    {"level": 25, "role_id": 125},
+]
+
+REPLACING = [
+    {"level": 25, "role_id": 225, "remove_previous": True},
+    {"level": 5, "role_id": 205, "remove_previous": True},
+    {"level": 10, "role_id": 210, "remove_previous": True},
+    {"level": 10, "role_id": 211},
+]
+
+
+def test_targets():
+    stacked = LevelRoleLadder(STACKED)
+    assert stacked.target(4) == []
+    assert stacked.target(12) == [105, 110]
+    assert stacked.target(99) == [105, 110, 125]
+
+    replacing = LevelRoleLadder(REPLACING)
+    assert replacing.min_level == 5
+    assert replacing.target(7) == [205]
+    # Both level-10 roles are kept, level 5 is replaced
+    assert replacing.target(10) == [210, 211]
+    assert replacing.target(30) == [225]
+    assert not LevelRoleLadder([])
+    print("✅ target role sets follow levels and remove_previous")
+
+
+def test_reconcile():
+    ladder = LevelRoleLadder(REPLACING)
+    # Level 30 member still holding level 5/10 roles and an unrelated role
+    add, remove = ladder.reconcile(30, {205, 210, 999})
+    assert add == [225] and remove == [205, 210]
+    # Roles above the member's level are left alone
+    assert ladder.reconcile(7, {205, 225}) == ([], [])
+    assert ladder.reconcile(10, {210, 211}) == ([], [])
+    print("✅ reconcile returns the roles to add and remove")
+
+
+def test_cache():
+    cache = LevelLadderCache(refresh_seconds=60)
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0.01)
+        return list(STACKED)
+
+    async def run():
+        await asyncio.gather(*(cache.get(1, loader) for _ in range(50)))
+        for _ in range(100):
+            await cache.get(1, loader)
+        assert len(loads) == 1
+        cache.invalidate(1)
+        await cache.get(1, loader)
+        assert len(loads) == 2
+        cache.refresh_seconds = 0
+        cache.invalidate()
+        await cache.get(1, loader)
+        await cache.get(1, loader)
+        assert len(loads) == 4
+
+    asyncio.run(run())
+    print("✅ 150 lookups -> 1 load; invalidation and expiry reload")
+
+
+class FakeRole:
+    def __init__(self, role_id, position=1):
+        self.id = role_id
+        self.position = position
+
+    def __lt__(self, other):
+        return self.position < other.position
+
+    def is_default(self):
+        return False
+
+
+class FakeMember:
+    def __init__(self, guild, user_id, role_ids):
+        self.guild = guild
+        self.id = user_id
+        self.roles = [guild.get_role(role_id) for role_id in role_ids]
+        self.calls = []
+
+    async def add_roles(self, role, reason=None):
+        self.calls.append("add_roles")
+        self.roles.append(role)
+
+    async def remove_roles(self, role, reason=None):
+        self.calls.append("remove_roles")
+        self.roles.remove(role)
+
+    async def edit(self, roles, reason=None):
+        self.calls.append("edit")
+        self.roles = list(roles)
+
+
+class FakeGuild:
+    def __init__(self, guild_id, role_ids):
+        self.id = guild_id
+        self._roles = {role_id: FakeRole(role_id) for role_id in role_ids}
+        self.me = SimpleNamespace(top_role=FakeRole(0, position=100))
+        self.members = {}
+
+    def get_role(self, role_id):
+        return self._roles.get(role_id)
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+
+def make_system(level_roles, user_levels=()):
+    from autoroles.autorole_system import AutoRoleSystem
+
+    db = MemoryDatabase(
+        reaction_roles=MemoryCollection(),
+        level_roles=MemoryCollection([dict(lr, guild_id=1, enabled=True) for lr in level_roles]),
+        join_roles=MemoryCollection(),
+        guild_autoroles_config=MemoryCollection([{"guild_id": 1, "level_roles_enabled": True}]),
+        user_levels=MemoryCollection(list(user_levels))
+    )
+    system = AutoRoleSystem(db)
+    system.ladders = LevelLadderCache()
+    return system, db
+
+
+def test_assign_one_call():
+    system, db = make_system(REPLACING)
+    guild = FakeGuild(1, [205, 210, 211, 225])
+    member = FakeMember(guild, 7, [205])
+    guild.members[7] = member
+    bot = SimpleNamespace(get_guild=lambda guild_id: guild if guild_id == 1 else None)
+
+    granted = asyncio.run(system.assign_level_roles(1, 7, 10, bot))
+    assert [role.id for role in granted] == [210, 211]
+    assert member.calls == ["edit"]
+    assert sorted(role.id for role in member.roles) == [210, 211]
+
+    # Below the first rung: no role lookups at all
+    assert asyncio.run(system.assign_level_roles(1, 7, 2, bot)) == []
+    assert db.level_roles.reads == 1
+    print("✅ level-up applies 2 adds + 1 removal in one member.edit, ladder read once")
+
+
+def test_resync():
+    users = [{"guild_id": "1", "user_id": str(user), "level": user % 40} for user in range(200)]
+    system, db = make_system(REPLACING, users)
+    guild = FakeGuild(1, [205, 210, 211, 225])
+    for user in range(190):  # 10 members left the server
+        guild.members[user] = FakeMember(guild, user, [])
+    # Already in sync
+    guild.members[30] = FakeMember(guild, 30, [225])
+
+    start = time.perf_counter()
+    summary = asyncio.run(system.resync_level_roles(guild, batch_size=50, edits_per_second=1000))
+    elapsed = time.perf_counter() - start
+
+    expected_scanned = sum(1 for doc in users if doc["level"] >= 5)
+    assert summary["scanned"] == expected_scanned
+    assert summary["missing"] == sum(1 for doc in users if doc["level"] >= 5 and int(doc["user_id"]) >= 190)
+    for user, member in guild.members.items():
+        ladder = LevelRoleLadder(REPLACING)
+        assert sorted(role.id for role in member.roles) == sorted(ladder.target(user % 40)), user
+        assert len(member.calls) <= 1
+    assert guild.members[30].calls == []
+    edits = sum(len(member.calls) for member in guild.members.values())
+    assert summary["updated"] == edits
+    assert elapsed >= (edits - 1) / 1000
+    print(f"✅ resync: {summary['scanned']} scanned, {edits} members updated with one call each, "
+          f"{summary['missing']} missing, paced over {elapsed * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Level-Role Ladder Test")
+    print("=" * 50)
+    test_targets()
+    test_reconcile()
+    test_cache()
+    test_assign_one_call()
+    test_resync()
+    print("\n🎉 All level-role ladder tests passed!")
@@ -0,0 +1,140 @@
+"""
+Metrics Rollup Test
+====================
+Checks how database/metrics_schema.py seeds running totals: every total is
+seeded by one helper (from mod_actions by action_type, tickets with int
+guild ids, user_levels with str guild ids), partially seeded documents are
+reseeded, and the leveling_users gauge is recounted once stale; and how
+MetricsBuffer batches hot-path counters into one bulk write, against
+in-memory collections.
+
+    python tests/test_metrics_rollup.py
+"""
+import os
+import sys
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from database.metrics_schema import MetricsSchema, MetricsBuffer, SEEDED_TOTALS, GAUGE_REFRESH
+from memory_db import MemoryDatabase
+
+
+def make_db():
+    db = MemoryDatabase()
+    db.user_levels.docs = [{"guild_id": "1", "user_id": str(user)} for user in range(5)]
+    db.tickets.docs = [
+        {"guild_id": 1, "status": "open"},
+        {"guild_id": 1, "status": "claimed"},
+        {"guild_id": 1, "status": "closed"},
+    ]
+    db.mod_actions.docs = [
+        {"guild_id": "1", "action_type": "warn"},
+        {"guild_id": "1", "action_type": "warn"},
+        {"guild_id": "1", "action_type": "ban"},
+    ]
+    # Old collection with different keys, must not be used for the seed
+    db.moderation_logs.docs = [{"guild_id": "1", "action": "kick"}]
+    return db
+
+
+def test_seed_all_totals():
+    db = make_db()
+    metrics = MetricsSchema(db)
+
+    async def run():
+        first = await metrics.load_totals(1)
+        calls = db.user_levels.calls
+        second = await metrics.load_totals("1")
+        return first, second, calls
+
+    first, second, calls = asyncio.run(run())
+    expected = {
+        "leveling_users": 5, "tickets_open": 2, "tickets_closed": 1,
+        "moderation_actions": {"warn": 2, "ban": 1}
+    }
+    assert first == expected, first
+    assert second == expected, second
+    assert db.user_levels.calls == calls  # second read served from the totals document
+    assert asyncio.run(metrics.get_totals(1)) == expected
+    print("✅ every total seeded once, moderation actions from mod_actions by action_type")
+
+
+def test_partial_seed_reseeded():
+    db = make_db()
+    metrics = MetricsSchema(db)
+    # Seeded by an older caller with only the ticket totals
+    db.guild_metric_totals.docs = [{
+        "guild_id": "1", "seeded": True, "gauges_at": datetime.utcnow(),
+        "totals": {"tickets_open": 2, "tickets_closed": 1}
+    }]
+    assert asyncio.run(metrics.get_totals(1)) is None
+    totals = asyncio.run(metrics.load_totals(1))
+    assert set(SEEDED_TOTALS) <= set(totals)
+    assert totals["leveling_users"] == 5 and totals["moderation_actions"] == {"warn": 2, "ban": 1}
+    print("✅ partially seeded totals are reseeded instead of staying missing")
+
+
+def test_gauge_refresh():
+    db = make_db()
+    metrics = MetricsSchema(db)
+    asyncio.run(metrics.load_totals(1))
+    db.user_levels.docs = db.user_levels.docs[:3]  # users reset / removed
+    assert asyncio.run(metrics.load_totals(1))["leveling_users"] == 5
+
+    db.guild_metric_totals.docs[0]["gauges_at"] = datetime.utcnow() - GAUGE_REFRESH - timedelta(seconds=1)
+    totals = asyncio.run(metrics.load_totals(1))
+    assert totals["leveling_users"] == 3
+    assert totals["tickets_open"] == 2
+    assert db.guild_metric_totals.docs[0]["totals"]["leveling_users"] == 3
+    print("✅ leveling_users recounted once stale, so removed users do not drift the total")
+
+
+def test_buffered_counters():
+    db = MemoryDatabase()
+    buffer = MetricsBuffer(MetricsSchema(db), delay=0.01)
+    now = datetime(2026, 1, 1, 12, 30)
+
+    async def run():
+        for message in range(50):
+            buffer.record(1, {"messages": 1, "xp_gained": 20, "level_ups": 1 if message == 10 else 0}, now)
+        buffer.record(2, {"messages": 1, "xp_gained": 15, "level_ups": 0}, now)
+        assert db.guild_metrics.calls == 0  # nothing written on the hot path
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    assert db.guild_metrics.calls == 1 and buffer.pending == 0
+    buckets = {(doc["guild_id"], doc["granularity"]): doc for doc in db.guild_metrics.docs}
+    assert len(buckets) == 4
+    assert buckets[("1", "hour")]["counters"] == {"messages": 50, "xp_gained": 1000, "level_ups": 1}
+    assert buckets[("2", "day")]["counters"] == {"messages": 1, "xp_gained": 15}
+    print("✅ 51 XP events written as 4 bucket upserts in one bulk write")
+
+
+def test_failed_flush_requeued():
+    db = MemoryDatabase()
+    buffer = MetricsBuffer(MetricsSchema(db))
+    now = datetime(2026, 1, 1, 12, 30)
+    buffer.record(1, {"messages": 3}, now)
+    db.guild_metrics.fail_writes = 1
+    assert asyncio.run(buffer.flush()) == 0
+    buffer.record(1, {"messages": 2}, now)
+    assert asyncio.run(buffer.flush()) == 2
+    hour = next(doc for doc in db.guild_metrics.docs if doc["granularity"] == "hour")
+    assert hour["counters"]["messages"] == 5
+    print("✅ failed flush keeps its counters for the next flush")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Metrics Rollup Test")
+    print("=" * 50)
+    test_seed_all_totals()
+    test_partial_seed_reseeded()
+    test_gauge_refresh()
+    test_buffered_counters()
+    test_failed_flush_requeued()
+    print("\n🎉 All metrics rollup tests passed!")
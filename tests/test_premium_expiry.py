@@ -0,0 +1,159 @@
+"""
+Premium Expiry Test
+====================
+Runs premium/expiry.py on the shared deadline scheduler against an in-memory
+subscriptions collection:
+
+- subscriptions due at the same moment are expired in batches of
+  ``BATCH_SIZE`` (one ``update_many`` each), with cache invalidation, the
+  ``premium_expired`` event and the email for every expired one
+- subscriptions that went overdue while the bot was down are expired by the
+  first reload; ones beyond ``LOAD_HORIZON`` are left for a later reload
+- a subscription renewed after it was scheduled is skipped
+
+    python tests/test_premium_expiry.py
+"""
+import os
+import sys
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from database.premium_schema import PremiumSchema, MONGODB_DB
+from premium.expiry import SubscriptionExpiry, EXPIRY_KIND, BATCH_SIZE, LOAD_HORIZON
+from memory_db import MemoryDatabase, ObjectIdCollection
+
+
+class Entitlements:
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, guild_id=None):
+        self.invalidated.append(guild_id)
+
+
+class EmailSchema:
+    async def can_send_email(self, user_id, email_type):
+        return True
+
+
+class EmailService:
+    def __init__(self):
+        self.sent = []
+
+    async def send_subscription_expired(self, to_email, user_name, guild_name, user_id):
+        self.sent.append(to_email)
+
+
+class Bot:
+    def __init__(self):
+        self.events = []
+
+    async def wait_until_ready(self):
+        pass
+
+    def dispatch(self, event, *args):
+        self.events.append((event, *args))
+
+
+def make_expiry(subscriptions):
+    db = MemoryDatabase(premium_subscriptions=ObjectIdCollection())
+    schema = PremiumSchema({MONGODB_DB: db})
+    for subscription in subscriptions:
+        subscription.setdefault("_id", db.premium_subscriptions.new_id())
+        db.premium_subscriptions.docs.append(subscription)
+    premium = SimpleNamespace(
+        schema=schema, entitlements=Entitlements(),
+        email_schema=EmailSchema(), email_service=EmailService()
+    )
+    bot = Bot()
+    return SubscriptionExpiry(premium, bot), premium, bot, db.premium_subscriptions
+
+
+def subscription(guild, expires_at, email=True):
+    return {
+        "user_id": f"u{guild}", "guild_id": str(guild), "tier": "basic",
+        "status": "active", "expires_at": expires_at,
+        "metadata": {"user_email": f"owner{guild}@example.com"} if email else {}
+    }
+
+
+def test_batched_expiry():
+    count = BATCH_SIZE * 2 + 50
+
+    async def run():
+        due = datetime.utcnow() + timedelta(milliseconds=50)
+        expiry, premium, bot, collection = make_expiry([
+            subscription(guild, due, email=guild % 2 == 0) for guild in range(count)
+        ])
+        await asyncio.sleep(0.01)
+        assert expiry.scheduler.pending(EXPIRY_KIND) == count
+        writes = collection.writes
+        await asyncio.sleep(0.15)
+        await expiry.scheduler.stop()
+        return premium, bot, collection, collection.writes - writes
+
+    premium, bot, collection, writes = asyncio.run(run())
+    assert all(doc["status"] == "expired" for doc in collection.docs)
+    assert writes == 3, writes  # one update_many per batch
+    assert sorted(premium.entitlements.invalidated, key=int) == [str(guild) for guild in range(count)]
+    assert len(bot.events) == count and bot.events[0][0] == "premium_expired"
+    assert len(premium.email_service.sent) == count // 2
+    print(f"✅ {count} subscriptions due together expired in {writes} writes of up to {BATCH_SIZE}")
+
+
+def test_overdue_on_startup():
+    async def run():
+        now = datetime.utcnow()
+        expiry, premium, bot, collection = make_expiry([
+            subscription(1, now - timedelta(days=2)),
+            subscription(2, now - timedelta(minutes=5)),
+            subscription(3, now + LOAD_HORIZON + timedelta(hours=1)),
+            dict(subscription(4, now - timedelta(days=1)), status="cancelled"),
+        ])
+        await asyncio.sleep(0.05)
+        pending = expiry.scheduler.pending(EXPIRY_KIND)
+        await expiry.scheduler.stop()
+        return premium, collection, pending
+
+    premium, collection, pending = asyncio.run(run())
+    status = {doc["guild_id"]: doc["status"] for doc in collection.docs}
+    assert status == {"1": "expired", "2": "expired", "3": "active", "4": "cancelled"}, status
+    assert sorted(premium.entitlements.invalidated) == ["1", "2"]
+    assert pending == 0  # guild 3 is beyond the horizon, picked up by a later reload
+    print("✅ overdue subscriptions expired on startup, later ones left for the periodic reload")
+
+
+def test_renewed_skipped():
+    async def run():
+        expiry, premium, bot, collection = make_expiry([])
+        doc = subscription(1, datetime.utcnow() + timedelta(milliseconds=50))
+        doc["_id"] = collection.new_id()
+        collection.docs.append(doc)
+        await asyncio.sleep(0.01)
+        expiry.schedule(doc)
+        assert expiry.scheduler.pending(EXPIRY_KIND) == 1
+
+        # Renewed before the deadline fires (the schema extends expires_at)
+        doc["expires_at"] += timedelta(days=30)
+        await asyncio.sleep(0.1)
+        await expiry.scheduler.stop()
+        return premium, bot, doc
+
+    premium, bot, doc = asyncio.run(run())
+    assert doc["status"] == "active"
+    assert bot.events == [] and premium.entitlements.invalidated == [] and premium.email_service.sent == []
+    print("✅ subscription renewed after scheduling is not expired")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Premium Expiry Test")
+    print("=" * 50)
+    test_batched_expiry()
+    test_overdue_on_startup()
+    test_renewed_skipped()
+    print("\n🎉 All premium expiry tests passed!")
@@ -0,0 +1,129 @@
+"""
+Reaction-Role Index Test
+=========================
+Checks the in-memory reaction-role index (O(1) rejection of unrelated
+reactions, emoji matching, one load under concurrent events, lazy retry after
+a failed load) and the batched
+role statistics of autoroles/reaction_index.py.
+
+    python tests/test_reaction_role_index.py
+"""
+import os
+import sys
+import time
+import asyncio
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from autoroles.reaction_index import ReactionRoleIndex, RoleStatsBuffer
+from memory_db import MemoryCollection
+
+
+PANELS = [
+    {
+        "guild_id": 1, "message_id": 100, "mode": "unique", "enabled": True,
+        "roles": [
+            {"emoji": "🔴", "role_id": 11},
+            {"emoji": "<:blue:555>", "role_id": 12},
+            {"emoji": "🔴", "role_id": 13},
+        ]
+    },
+    {"guild_id": 1, "message_id": 101, "mode": "toggle", "enabled": False,
+     "roles": [{"emoji": "🟢", "role_id": 21}]},
+]
+
+
+def panels_collection():
+    # The load yields for a while, like a real query, so concurrent events overlap it
+    return MemoryCollection([dict(panel) for panel in PANELS], delay=0.01)
+
+
+def test_lookup_and_rejection():
+    index = ReactionRoleIndex()
+    collection = panels_collection()
+    asyncio.run(index.ensure_loaded(collection))
+
+    panel, role = index.match(1, 100, "🔴")
+    assert panel["message_id"] == 100 and role["role_id"] == 11  # first entry wins
+    assert index.match(1, 100, "<:blue:555>")[1]["role_id"] == 12
+    assert index.match(1, 100, "🟣") == (None, None)
+    assert index.match(1, 101, "🟢") == (None, None)  # disabled panel
+    assert index.match(2, 100, "🔴") == (None, None)  # other guild
+    assert index.match(1, 999, "🔴") == (None, None)  # not a panel
+    assert index.get(1, 101) is not None
+
+    index.put({"guild_id": 1, "message_id": 102, "roles": [{"emoji": "⭐", "role_id": 31}]})
+    assert index.match(1, 102, "⭐")[1]["role_id"] == 31
+    index.discard(102)
+    assert 102 not in index
+
+    start = time.perf_counter()
+    for message_id in range(100000):
+        index.match(1, 10_000 + message_id, "🔴")
+    per_event = (time.perf_counter() - start) / 100000 * 1e6
+    print(f"✅ panels matched by message and emoji; unrelated reactions rejected in {per_event:.2f}µs")
+
+
+def test_single_load():
+    index = ReactionRoleIndex()
+    collection = panels_collection()
+
+    async def burst():
+        await asyncio.gather(*(index.ensure_loaded(collection) for _ in range(50)))
+
+    asyncio.run(burst())
+    assert collection.reads == 1 and len(index) == 2
+    print("✅ 50 concurrent first events load the index once")
+
+
+def test_failed_load_retried():
+    index = ReactionRoleIndex()
+    collection = panels_collection()
+    collection.fail = True
+    try:
+        asyncio.run(index.ensure_loaded(collection))
+        raise AssertionError("load did not fail")
+    except RuntimeError:
+        pass
+    assert not index.loaded
+
+    # The cog starts anyway; the first reaction loads the index
+    collection.fail = False
+    asyncio.run(index.ensure_loaded(collection))
+    assert index.loaded and index.match(1, 100, "🔴")[1]["role_id"] == 11
+    print("✅ failed load at startup retried lazily on first use")
+
+
+def test_stats_buffer():
+    buffer = RoleStatsBuffer(delay=0.05)
+    config = MemoryCollection()
+
+    async def storm():
+        for i in range(300):
+            buffer.record(config, i % 3, "total_roles_given")
+        buffer.record(config, 0, "total_roles_removed", 2)
+        await asyncio.sleep(0.1)
+
+    asyncio.run(storm())
+    assert len(config.bulk_writes) == 1 and len(config.bulk_writes[0]) == 3
+    assert buffer.pending == 0
+
+    config.fail = True
+    buffer.record(config, 5, "total_roles_given")
+    assert asyncio.run(buffer.flush()) == 0
+    assert buffer.pending == 1
+    config.fail = False
+    assert asyncio.run(buffer.flush()) == 1
+    print("✅ 301 stat changes -> 1 bulk write of 3 guild updates; failed flushes are kept")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Reaction-Role Index Test")
+    print("=" * 50)
+    test_lookup_and_rejection()
+    test_single_load()
+    test_failed_load_retried()
+    test_stats_buffer()
+    print("\n🎉 All reaction-role index tests passed!")
@@ -0,0 +1,147 @@
+"""
+Suggestion Voting Test
+=======================
+Checks the single-upsert vote path of database/suggestions_schema.py
+(counters, vote changes, closed suggestions, concurrent voters), the
+settings cache, and the debounced message refresh of
+suggestions/suggestions_system.py, against in-memory collections that count
+database round-trips.
+
+    python tests/test_suggestion_votes.py
+"""
+import os
+import sys
+import time
+import asyncio
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from database.suggestions_schema import SuggestionsSchema
+from scheduling import DeadlineScheduler
+from memory_db import MemoryDatabase
+
+
+def make_schema(status="pending"):
+    db = MemoryDatabase()
+    db.suggestions.docs.append({
+        "guild_id": "1", "suggestion_id": 1, "status": status, "message_id": "55",
+        "upvotes": 0, "downvotes": 0, "neutral_votes": 0
+    })
+    return SuggestionsSchema(db), db
+
+
+def counts(db):
+    doc = db.suggestions.docs[0]
+    return doc["upvotes"], doc["downvotes"], doc["neutral_votes"]
+
+
+def test_vote_round_trips_and_counters():
+    schema, db = make_schema()
+    result = asyncio.run(schema.add_vote(1, 1, 10, "upvote", closed_statuses=("denied",)))
+    assert result["changed"] and result["old_vote"] is None
+    assert result["suggestion"]["upvotes"] == 1
+    assert db.calls == 2, db.calls
+
+    result = asyncio.run(schema.add_vote(1, 1, 10, "downvote"))
+    assert result["old_vote"] == "upvote"
+    assert counts(db) == (0, 1, 0)
+
+    # Same vote again: counters untouched
+    asyncio.run(schema.add_vote(1, 1, 10, "downvote"))
+    assert counts(db) == (0, 1, 0)
+
+    assert asyncio.run(schema.remove_vote(1, 1, 10))
+    assert not asyncio.run(schema.remove_vote(1, 1, 10))
+    assert counts(db) == (0, 0, 0) and not db.suggestion_votes.docs
+    print("✅ vote = 2 round-trips, counters follow changes and removals")
+
+
+def test_closed_and_missing_suggestions():
+    schema, db = make_schema(status="denied")
+    result = asyncio.run(schema.add_vote(1, 1, 10, "upvote", closed_statuses=("denied", "duplicate")))
+    assert not result["changed"]
+    assert counts(db) == (0, 0, 0) and not db.suggestion_votes.docs
+
+    result = asyncio.run(schema.add_vote(1, 99, 10, "upvote", closed_statuses=("denied",)))
+    assert not result["changed"] and not db.suggestion_votes.docs
+    print("✅ votes on closed or missing suggestions are rolled back")
+
+
+def test_concurrent_voters():
+    schema, db = make_schema()
+
+    async def storm():
+        await asyncio.gather(*(
+            schema.add_vote(1, 1, user, ("upvote", "downvote", "neutral")[user % 3])
+            for user in range(300)
+        ))
+        # Half of the voters change their mind at the same time
+        await asyncio.gather(*(schema.add_vote(1, 1, user, "upvote") for user in range(0, 300, 2)))
+
+    asyncio.run(storm())
+    votes = [doc["vote_type"] for doc in db.suggestion_votes.docs]
+    expected = (votes.count("upvote"), votes.count("downvote"), votes.count("neutral"))
+    assert counts(db) == expected, (counts(db), expected)
+    print(f"✅ 450 concurrent votes: counters {counts(db)} match the vote documents")
+
+
+def test_settings_cache():
+    schema, db = make_schema()
+    asyncio.run(schema.get_settings(1))
+    before = db.calls
+    for _ in range(100):
+        asyncio.run(schema.get_settings(1))
+    assert db.calls == before
+    asyncio.run(schema.update_settings(1, {"allow_voting": False}))
+    assert asyncio.run(schema.get_settings(1))["allow_voting"] is False
+    print("✅ settings served from memory and invalidated on update")
+
+
+def test_debounced_refresh():
+    import suggestions.suggestions_system as module
+    from suggestions.suggestions_system import SuggestionsSystem
+
+    module.EMBED_REFRESH_SECONDS = 0.2
+    edits = []
+
+    async def storm():
+        _, db = make_schema()
+        system = SuggestionsSystem(db, SimpleNamespace())
+        system.scheduler = DeadlineScheduler()
+        system.scheduler.register(module.EMBED_REFRESH_KIND, system._on_embed_refresh)
+        system.scheduler.start()
+
+        async def edit(suggestion, settings):
+            edits.append((time.time(), suggestion["upvotes"]))
+        system._edit_suggestion_message = edit
+
+        started = time.time()
+        user = 0
+        while time.time() - started < 0.7:
+            await system.vote(1, 1, user, "upvote")
+            user += 1
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.3)
+        await system.scheduler.stop()
+        return user
+
+    voters = asyncio.run(storm())
+    gaps = [b[0] - a[0] for a, b in zip(edits, edits[1:])]
+    assert 2 <= len(edits) <= 6, edits
+    assert all(gap >= 0.19 for gap in gaps), gaps
+    assert edits[-1][1] == voters
+    print(f"✅ {voters} votes in 0.7s -> {len(edits)} message edits, last shows all votes")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Suggestion Voting Test")
+    print("=" * 50)
+    test_vote_round_trips_and_counters()
+    test_closed_and_missing_suggestions()
+    test_concurrent_voters()
+    test_settings_cache()
+    test_debounced_refresh()
+    print("\n🎉 All suggestion voting tests passed!")
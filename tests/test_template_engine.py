@@ -0,0 +1,202 @@
+"""
+Template Engine Test + Microbenchmark
+======================================
+Checks the compiled template engine (templating/), the safe ``{math:}``
+evaluator, and compares rendering throughput with the previous parser
+(regex scan + if/elif chain on every call).
+
+    python tests/test_template_engine.py
+"""
+import os
+import re
+import sys
+import time
+import random
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from templating import TemplateEngine, safe_eval, MathError, render_level_up
+
+ITERATIONS = 100_000
+
+CTX = SimpleNamespace(
+    author=SimpleNamespace(mention="<@1>", name="Sam", id=1),
+    guild=SimpleNamespace(name="Kingdom", id=2, member_count=77),
+    channel=SimpleNamespace(mention="<#3>", name="general", id=3),
+)
+
+
+def legacy_parse(content, ctx, args=None):
+    """The previous CommandParser.parse_variables (subset of variables)"""
+    def value_of(variable):
+        var_lower = variable.lower()
+        if var_lower == "user":
+            return ctx.author.mention
+        elif var_lower == "user.name":
+            return ctx.author.name
+        elif var_lower == "user.id":
+            return str(ctx.author.id)
+        elif var_lower == "server":
+            return ctx.guild.name
+        elif var_lower == "server.id":
+            return str(ctx.guild.id)
+        elif var_lower == "server.members":
+            return str(ctx.guild.member_count)
+        elif var_lower == "channel":
+            return ctx.channel.mention
+        elif var_lower == "channel.name":
+            return ctx.channel.name
+        elif var_lower == "args":
+            return args or ""
+        elif var_lower.startswith("args["):
+            match = re.match(r'args\[(\d+)\]', var_lower)
+            if match and args:
+                index = int(match.group(1))
+                arg_list = args.split()
+                if 0 <= index < len(arg_list):
+                    return arg_list[index]
+        elif var_lower.startswith("math:"):
+            expression = variable[5:]
+            try:
+                return str(eval(expression, {"__builtins__": {}}, {}))
+            except Exception:
+                return f"[Invalid Math: {expression}]"
+        else:
+            return f"[Unknown Variable: {variable}]"
+
+    for var in re.findall(r'\{([^}]+)\}', content):
+        value = value_of(var)
+        if value is not None:
+            content = content.replace(f"{{{var}}}", str(value))
+    return content
+
+
+def _math(argument):
+    try:
+        return str(safe_eval(argument))
+    except MathError:
+        return f"[Invalid Math: {argument}]"
+
+
+def _argument(scope, index):
+    arg_list = scope[1].split() if scope[1] else []
+    return arg_list[index] if 0 <= index < len(arg_list) else None
+
+
+ENGINE = TemplateEngine(
+    resolvers={
+        "user": lambda s: s[0].author.mention,
+        "user.name": lambda s: s[0].author.name,
+        "user.id": lambda s: str(s[0].author.id),
+        "server": lambda s: s[0].guild.name,
+        "server.id": lambda s: str(s[0].guild.id),
+        "server.members": lambda s: str(s[0].guild.member_count),
+        "channel": lambda s: s[0].channel.mention,
+        "channel.name": lambda s: s[0].channel.name,
+        "args": lambda s: s[1] or "",
+    },
+    functions={"math": _math},
+    indexed={"args": _argument},
+    unknown=lambda variable: None if variable.lower().startswith("args[") else f"[Unknown Variable: {variable}]",
+    case_sensitive=False
+)
+
+TEMPLATES = [
+    "Hello {user}, welcome to {server}!",
+    "{USER.name} ({user.id}) in {channel.name} — {server.members} members",
+    "No variables at all",
+    "args: {args} / first={args[0]} / third={args[2]}",
+    "{math:2+3*4} {math:(7-1)/4} {math:10//3} {math:2**10}",
+    "{math:__import__('os')}",
+    "{nope} and {user}",
+    "",
+]
+
+
+def test_matches_legacy():
+    print("=" * 70)
+    print("🧪 Compiled templates vs previous parser")
+    print("=" * 70)
+    for template in TEMPLATES:
+        for args in (None, "alpha beta"):
+            expected = legacy_parse(template, CTX, args)
+            actual = ENGINE.render(template, (CTX, args))
+            if "__import__" in template:
+                expected = "[Invalid Math: __import__('os')]"
+            assert actual == expected, f"{template!r}: {actual!r} != {expected!r}"
+    print(f"✅ {len(TEMPLATES) * 2} renders identical")
+
+    # Substituted values are not parsed again
+    assert ENGINE.render("{args}", (CTX, "{user}")) == "{user}"
+    # Resolvers returning None keep the variable
+    assert ENGINE.render("{args[5]}", (CTX, "a")) == "{args[5]}"
+    assert render_level_up("GG {user} → {level} {other}", "<@1>", "Sam", 7) == "GG <@1> → 7 {other}"
+    print("✅ No re-expansion, None keeps the variable, unknown level-up variables kept")
+
+
+def test_safe_math():
+    print("=" * 70)
+    print("🧪 Safe arithmetic")
+    print("=" * 70)
+    assert safe_eval("2+2") == 4
+    assert safe_eval(" -(3 - 5) * 2 ") == 4
+    assert safe_eval("7 % 4 + 9 // 2") == 7
+    assert safe_eval("1.5 * 2") == 3.0
+    rejected = [
+        "9**9**9", "10**100", "1/0", "__import__('os')", "(1).__class__",
+        "a+1", "'x'*3", "[1]*3", "True+1", "1e308*10", "+".join(["1"] * 100), "",
+    ]
+    for expression in rejected:
+        try:
+            safe_eval(expression)
+        except MathError:
+            continue
+        raise AssertionError(f"{expression!r} was accepted")
+    print(f"✅ Arithmetic evaluated, {len(rejected)} unsafe/oversized expressions rejected")
+
+
+def test_cache():
+    print("=" * 70)
+    print("🧪 Template cache")
+    print("=" * 70)
+    engine = TemplateEngine({"x": lambda s: s}, cache_size=3)
+    first = engine.compile("{x}1")
+    assert engine.compile("{x}1") is first
+    for index in range(2, 6):
+        engine.compile(f"{{x}}{index}")
+    assert engine.compile("{x}1") is not first
+    assert len(engine._cache) == 3
+    picks = TemplateEngine({}, functions={"pick": lambda a: (lambda s: random.choice(a.split("|")))})
+    assert picks.render("{pick:a|b}", None) in ("a", "b")
+    print("✅ LRU eviction, callable function results resolved per render")
+
+
+def test_render_throughput():
+    print("=" * 70)
+    print(f"⏱️ Render throughput ({ITERATIONS:,} renders each)")
+    print("=" * 70)
+    template = "Hey {user}! Welcome to {server} ({server.members} members). You said {args[0]}, {math:6*7}."
+    scope = (CTX, "hello world")
+    assert ENGINE.render(template, scope) == legacy_parse(template, CTX, "hello world")
+
+    results = {}
+    for name, call in (
+        ("previous parser", lambda: legacy_parse(template, CTX, "hello world")),
+        ("compiled", lambda: ENGINE.render(template, scope)),
+    ):
+        started = time.perf_counter()
+        for _ in range(ITERATIONS):
+            call()
+        elapsed = time.perf_counter() - started
+        results[name] = elapsed
+        print(f"{name:<16} {ITERATIONS / elapsed / 1e3:8.0f} k renders/s  ({elapsed / ITERATIONS * 1e6:6.2f} µs/render)")
+    print(f"⚡ {results['previous parser'] / results['compiled']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    test_matches_legacy()
+    test_safe_math()
+    test_cache()
+    test_render_throughput()
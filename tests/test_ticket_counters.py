@@ -0,0 +1,138 @@
+"""
+Ticket Counters Test
+=====================
+Checks the atomic ticket number allocator and the open-ticket counters of
+tickets/counters.py under concurrent "create ticket" clicks, against an
+in-memory stand-in for the collections that yields between operations (like
+a real database round-trip), and compares them with the previous
+read-then-increment flow.
+
+    python tests/test_ticket_counters.py
+"""
+import os
+import sys
+import time
+import asyncio
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from tickets.counters import TicketCounters
+from memory_db import MemoryCollection
+
+
+OPEN = {"$in": ["open", "in_progress"]}
+
+
+def make_counters(tickets=None):
+    config = MemoryCollection([{"guild_id": 1, "next_ticket_number": 1}])
+    return TicketCounters(config, MemoryCollection(), MemoryCollection(tickets)), config
+
+
+async def legacy_click(config, tickets, user_id, limit):
+    """Previous flow: count open tickets, read next_ticket_number, insert, then $inc"""
+    open_count = await tickets.count_documents({"guild_id": 1, "user_id": user_id, "status": OPEN})
+    if open_count >= limit:
+        return None
+    number = (await config.find_one({"guild_id": 1}))["next_ticket_number"]
+    await tickets.insert_one({"guild_id": 1, "user_id": user_id, "ticket_number": number, "status": "open"})
+    await config.update_one({"guild_id": 1}, {"$inc": {"next_ticket_number": 1}})
+    return number
+
+
+async def click(counters, tickets, user_id, limit):
+    if not await counters.reserve(1, user_id, limit):
+        return None
+    number = await counters.allocate_number(1)
+    await tickets.insert_one({"guild_id": 1, "user_id": user_id, "ticket_number": number, "status": "open"})
+    return number
+
+
+async def burst(fn, clicks):
+    return await asyncio.gather(*(fn(user_id) for user_id in clicks))
+
+
+def test_legacy_flow_races():
+    config = MemoryCollection([{"guild_id": 1, "next_ticket_number": 1}])
+    tickets = MemoryCollection()
+    numbers = asyncio.run(burst(lambda user: legacy_click(config, tickets, user, 3), [7] * 10))
+    created = [number for number in numbers if number is not None]
+    assert len(created) > 3, "expected the old flow to exceed the limit"
+    assert len(set(created)) < len(created), "expected the old flow to reuse numbers"
+    print(f"✅ old flow under 10 concurrent clicks: {len(created)} tickets (limit 3), "
+          f"{len(created) - len(set(created))} duplicate numbers")
+
+
+def test_concurrent_clicks_respect_limit():
+    counters, config = make_counters()
+    tickets = counters.tickets
+    numbers = asyncio.run(burst(lambda user: click(counters, tickets, user, 3), [7] * 10 + [8] * 2))
+    created = [number for number in numbers if number is not None]
+    assert len(created) == 5
+    assert sorted(created) == [1, 2, 3, 4, 5]
+    assert config.docs[0]["next_ticket_number"] == 6
+    open_counts = {doc["user_id"]: doc["open"] for doc in counters.counters.docs}
+    assert open_counts == {7: 3, 8: 2}
+    print("✅ 12 concurrent clicks: limit held, numbers 1-5 unique")
+
+
+def test_release_and_seed():
+    # Tickets created before the counters existed are counted once
+    existing = [{"guild_id": 1, "user_id": 9, "status": "open"}, {"guild_id": 1, "user_id": 9, "status": "closed"}]
+    counters, _ = make_counters(existing)
+    assert asyncio.run(counters.open_count(1, 9)) == 1
+    assert asyncio.run(counters.reserve(1, 9, 2))
+    assert not asyncio.run(counters.reserve(1, 9, 2))
+    asyncio.run(counters.release(1, 9))
+    assert asyncio.run(counters.reserve(1, 9, 2))
+    # Unlimited (premium) and never below zero
+    assert asyncio.run(counters.reserve(1, 9, None))
+    for _ in range(5):
+        asyncio.run(counters.release(1, 9))
+    assert asyncio.run(counters.open_count(1, 9)) == 0
+    print("✅ counters seed from existing tickets, release and never go negative")
+
+
+def test_missing_config():
+    counters = TicketCounters(MemoryCollection(), MemoryCollection(), MemoryCollection())
+    assert asyncio.run(counters.allocate_number(1)) is None
+    print("✅ allocate_number reports a missing config")
+
+
+def test_benchmark():
+    users = list(range(200))
+    # Pre-existing history: the old count_documents grows with the tickets collection
+    history = [{"guild_id": 1, "user_id": i % 500, "status": "closed"} for i in range(20000)]
+
+    config = MemoryCollection([{"guild_id": 1, "next_ticket_number": 1}])
+    tickets = MemoryCollection(list(history))
+    start = time.perf_counter()
+    asyncio.run(burst(lambda user: legacy_click(config, tickets, user, 3), users))
+    legacy_time = time.perf_counter() - start
+    legacy_created = sum(1 for doc in tickets.docs if doc["status"] == "open")
+    legacy_numbers = len({doc["ticket_number"] for doc in tickets.docs if doc["status"] == "open"})
+
+    counters, config = make_counters(list(history))
+    for user in users:
+        counters.counters.docs.append({"guild_id": 1, "user_id": user, "open": 0})
+    start = time.perf_counter()
+    asyncio.run(burst(lambda user: click(counters, counters.tickets, user, 3), users))
+    new_time = time.perf_counter() - start
+    new_numbers = len({doc["ticket_number"] for doc in counters.tickets.docs if doc["status"] == "open"})
+
+    assert new_numbers == len(users)
+    print(f"✅ 200 concurrent clicks over 20,000 tickets: old {legacy_time * 1000:.0f}ms "
+          f"({legacy_numbers} distinct numbers for {legacy_created} tickets), "
+          f"new {new_time * 1000:.0f}ms ({new_numbers} distinct numbers, no scans)")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Ticket Counters Test")
+    print("=" * 50)
+    test_legacy_flow_races()
+    test_concurrent_clicks_respect_limit()
+    test_release_and_seed()
+    test_missing_config()
+    test_benchmark()
+    print("\n🎉 All ticket counter tests passed!")
@@ -0,0 +1,176 @@
+"""
+Ticket Transcript Pipeline Test
+================================
+Checks the chunked transcript storage and the incremental exports of
+tickets/transcripts.py with an in-memory stand-in for the chunks collection.
+
+    python tests/test_ticket_transcripts.py
+"""
+import os
+import sys
+import json
+import asyncio
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from tickets.transcripts import (
+    TranscriptWriter,
+    encode_chunk,
+    decode_chunk,
+    iter_transcript_messages,
+    render_transcript
+)
+
+
+class MemoryCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction):
+        self.docs = sorted(self.docs, key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class MemoryChunks:
+    def __init__(self):
+        self.docs = []
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def delete_many(self, query):
+        self.docs = [doc for doc in self.docs if doc["transcript_id"] != query["transcript_id"]]
+
+    def find(self, query):
+        return MemoryCursor([doc for doc in self.docs if doc["transcript_id"] == query["transcript_id"]])
+
+
+START = datetime(2025, 1, 1, 12, 0, 0)
+
+
+def make_messages(count):
+    return [
+        {
+            "author_id": 100 + i % 3,
+            "author_name": f"user{i % 3}",
+            "content": f"message <{i}> & more text " * 3,
+            "timestamp": START + timedelta(seconds=i),
+            "attachments": ["https://cdn.example/a.png"] if i % 50 == 0 else []
+        }
+        for i in range(count)
+    ]
+
+
+async def write(chunks, messages, transcript_id="t1", chunk_messages=200):
+    writer = TranscriptWriter(chunks, transcript_id, 1, chunk_messages=chunk_messages)
+    for message in messages:
+        await writer.add(message)
+    await writer.close()
+    return writer
+
+
+async def collect(stream):
+    return [item async for item in stream]
+
+
+def test_codec_roundtrip():
+    messages = make_messages(10)
+    data = encode_chunk(messages)
+    assert decode_chunk(data) == messages
+    print(f"✅ codec round-trip ({len(data)} compressed bytes for 10 messages)")
+
+
+def test_chunked_write_and_read():
+    chunks = MemoryChunks()
+    messages = make_messages(1050)
+    writer = asyncio.run(write(chunks, messages))
+
+    assert writer.message_count == 1050
+    assert writer.chunk_count == 6 and len(chunks.docs) == 6
+    assert [doc["seq"] for doc in chunks.docs] == list(range(6))
+    assert max(doc["message_count"] for doc in chunks.docs) == 200
+    assert writer.participants == {100, 101, 102}
+    assert writer.first_timestamp == START
+    assert writer.compressed_bytes < writer.raw_bytes
+
+    # Segments read back in order, even if stored out of order
+    chunks.docs.reverse()
+    read = asyncio.run(collect(iter_transcript_messages(chunks, {"_id": "t1"})))
+    assert read == messages
+    print(f"✅ chunked storage: {writer.chunk_count} segments, "
+          f"{writer.raw_bytes} -> {writer.compressed_bytes} bytes")
+
+
+def test_abort_removes_segments():
+    chunks = MemoryChunks()
+    asyncio.run(write(chunks, make_messages(50), transcript_id="keep"))
+    writer = asyncio.run(write(chunks, make_messages(450), transcript_id="drop"))
+    asyncio.run(writer.abort())
+    assert {doc["transcript_id"] for doc in chunks.docs} == {"keep"}
+    print("✅ abort removes only its own segments")
+
+
+def test_legacy_transcript():
+    messages = make_messages(5)
+    read = asyncio.run(collect(iter_transcript_messages(MemoryChunks(), {"_id": "x", "messages": messages})))
+    assert read == messages
+    print("✅ legacy embedded transcripts are still readable")
+
+
+def test_exports():
+    chunks = MemoryChunks()
+    messages = make_messages(1000)
+    asyncio.run(write(chunks, messages))
+    transcript = {"_id": "t1", "ticket_number": 7, "category": "support", "user_id": 100,
+                  "message_count": 1000, "closed_at": START}
+
+    def export(export_format, buffer_size=64 * 1024):
+        stream = iter_transcript_messages(chunks, transcript)
+        return asyncio.run(collect(render_transcript(transcript, stream, export_format, buffer_size)))
+
+    html_parts = export("html", buffer_size=8 * 1024)
+    html_text = "".join(html_parts)
+    assert len(html_parts) > 1
+    assert html_text.startswith("<!DOCTYPE html>") and html_text.endswith("</html>\n")
+    assert html_text.count('<div class="msg">') == 1000
+    assert "&lt;0&gt; &amp; more" in html_text and "<0>" not in html_text
+
+    txt_text = "".join(export("txt"))
+    assert txt_text.startswith("Ticket #7 - support")
+    assert "[2025-01-01 12:00:00] user0: message <0>" in txt_text
+    assert txt_text.count("[attachment]") == 20
+
+    data = json.loads("".join(export("json")))
+    assert data["transcript"]["ticket_number"] == 7
+    assert len(data["messages"]) == 1000
+
+    try:
+        export("pdf")
+        assert False, "unknown format accepted"
+    except ValueError:
+        pass
+    print(f"✅ html/txt/json exports ({len(html_parts)} html pieces)")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Ticket Transcript Pipeline Test")
+    print("=" * 50)
+    test_codec_roundtrip()
+    test_chunked_write_and_read()
+    test_abort_removes_segments()
+    test_legacy_transcript()
+    test_exports()
+    print("\n🎉 All ticket transcript tests passed!")
@@ -0,0 +1,162 @@
+"""
+Weekly Summary Job Test
+========================
+Runs email/weekly_summary.py against in-memory collections:
+
+- guilds are handled in chunks and the last guild is checkpointed per chunk
+- a run interrupted mid-way resumes after the checkpoint, and a completed
+  week is not run again
+- the per-week ``dedupe_key`` keeps a re-run from queueing (or, without a
+  queue, sending) the same summary twice
+
+    python tests/test_weekly_summary.py
+"""
+import os
+import sys
+import asyncio
+import importlib.util
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+# The bot's ``email`` package shadows the standard library one, so load it
+# under another name (as tests/test_email_queue.py does)
+_spec = importlib.util.spec_from_file_location(
+    "kingdom_email",
+    os.path.join(ROOT, "email", "__init__.py"),
+    submodule_search_locations=[os.path.join(ROOT, "email")]
+)
+kingdom_email = importlib.util.module_from_spec(_spec)
+sys.modules["kingdom_email"] = kingdom_email
+_spec.loader.exec_module(kingdom_email)
+
+from kingdom_email.weekly_summary import WeeklySummaryJob
+from database.email_schema import EmailSchema
+from memory_db import MemoryCollection, MemoryCursor, MemoryDatabase
+
+WEEK = datetime(2026, 1, 5)
+GUILDS = 7
+
+
+class Subscriptions(MemoryCollection):
+    """Premium subscriptions, grouped per guild like the job's pipeline"""
+
+    def aggregate(self, pipeline, allowDiskUse=False):
+        after = pipeline[0]["$match"].get("guild_id", {}).get("$gt")
+        return MemoryCursor([
+            {"_id": doc["guild_id"], "recipients": [{"user_id": doc["user_id"], "email": doc["email"]}]}
+            for doc in sorted(self.docs, key=lambda doc: doc["guild_id"])
+            if after is None or doc["guild_id"] > after
+        ])
+
+
+class Queue:
+    """Outbound queue: persists through EmailSchema.queue_emails (dedupe on the unique index)"""
+
+    def __init__(self, schema, fail_on_call=None):
+        self.schema = schema
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+
+    async def enqueue_many(self, emails):
+        self.calls += 1
+        if self.calls == self.fail_on_call:
+            raise RuntimeError("bot restarted")
+        return await self.schema.queue_emails(emails)
+
+
+class Service:
+    def __init__(self, queue=None):
+        self.queue = queue
+        self.sent = []
+
+    def build_weekly_summary(self, user_name, guild_name, stats):
+        return f"Weekly summary of {stats['guild_id']}", "<p>stats</p>"
+
+    async def send_email(self, to_email, subject, html_content, tags=None):
+        self.sent.append(to_email)
+        return True
+
+
+def make_job(queue_fail_on_call=None, with_queue=True):
+    email_db = MemoryDatabase(email_queue=MemoryCollection(unique="dedupe_key"))
+    email_schema = EmailSchema(email_db)
+    subscriptions = Subscriptions([
+        {"guild_id": f"{guild:03d}", "user_id": f"u{guild}", "email": f"owner{guild}@example.com"}
+        for guild in range(GUILDS)
+    ])
+    service = Service(Queue(email_schema, queue_fail_on_call) if with_queue else None)
+    job = WeeklySummaryJob(
+        bot_db=MemoryDatabase(),
+        premium_schema=SimpleNamespace(subscriptions=subscriptions),
+        economy_db=MemoryDatabase(),
+        email_schema=email_schema,
+        email_service=service,
+        chunk_size=3
+    )
+    return job, email_db, service
+
+
+def test_checkpoint_and_resume():
+    job, email_db, service = make_job(queue_fail_on_call=2)
+
+    try:
+        asyncio.run(job.run(WEEK))
+        raise AssertionError("interrupted run finished")
+    except RuntimeError:
+        pass
+    checkpoint = email_db.job_checkpoints.docs[0]
+    assert checkpoint["last_guild_id"] == "002" and checkpoint["guilds"] == 3, checkpoint
+    assert "completed_at" not in checkpoint
+    assert len(email_db.email_queue.docs) == 3
+
+    checkpoint = asyncio.run(job.run(WEEK))
+    assert checkpoint["completed_at"] and checkpoint["guilds"] == GUILDS and checkpoint["queued"] == GUILDS
+    assert checkpoint["last_guild_id"] == f"{GUILDS - 1:03d}"
+    assert service.queue.calls == 2 + 2  # resumed with guilds 3-5 and 6
+    assert len(email_db.email_queue.docs) == GUILDS
+
+    calls = service.queue.calls
+    asyncio.run(job.run(WEEK))
+    assert service.queue.calls == calls  # completed week is not run again
+    print(f"✅ {GUILDS} guilds in chunks of 3: interrupted after chunk 1, resumed at guild 003")
+
+
+def test_dedupe_key():
+    job, email_db, service = make_job()
+    # A previous run queued guild 001's summary, but crashed before its checkpoint
+    asyncio.run(service.queue.schema.queue_emails([{
+        "to_email": "owner1@example.com", "subject": "s", "html_content": "h",
+        "email_type": "weekly_summary", "dedupe_key": f"weekly_summary:{WEEK:%Y-%m-%d}:001:u1"
+    }]))
+
+    checkpoint = asyncio.run(job.run(WEEK))
+    keys = [doc["dedupe_key"] for doc in email_db.email_queue.docs]
+    assert len(keys) == len(set(keys)) == GUILDS
+    assert checkpoint["queued"] == GUILDS - 1
+    print("✅ already queued dedupe_key skipped on a re-run")
+
+
+def test_dedupe_without_queue():
+    job, email_db, service = make_job(with_queue=False)
+    asyncio.run(job.run(WEEK))
+    assert len(service.sent) == GUILDS
+    assert all(doc["status"] == "sent" for doc in email_db.email_queue.docs)
+
+    # Same week again from scratch (checkpoint lost): nothing is sent twice
+    email_db.job_checkpoints.docs.clear()
+    checkpoint = asyncio.run(job.run(WEEK))
+    assert len(service.sent) == GUILDS and checkpoint["queued"] == 0
+    print("✅ direct sends (no queue) recorded by dedupe_key, re-run sends nothing")
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Weekly Summary Job Test")
+    print("=" * 50)
+    test_checkpoint_and_resume()
+    test_dedupe_key()
+    test_dedupe_without_queue()
+    print("\n🎉 All weekly summary tests passed!")
@@ -0,0 +1,110 @@
+"""
+Ticket Counters
+Atomic ticket numbers and per-user open-ticket counters.
+
+- Ticket numbers come from ``next_ticket_number`` in ``guild_ticket_config``,
+  claimed with one ``find_one_and_update`` ``$inc``: concurrent panel clicks
+  always get distinct numbers.
+- Open tickets per user are kept in ``ticket_user_counters``
+  (``{guild_id, user_id, open}``). ``reserve`` increments the counter only
+  while it is below the limit, in the same single update, so the limit holds
+  under concurrent clicks; ``release`` gives the slot back (ticket closed or
+  creation failed).
+
+Counters that don't exist yet (users whose tickets predate this module) are
+seeded once from the ``tickets`` collection.
+"""
+
+import logging
+from typing import Optional
+
+from database.tickets_schema import get_user_open_tickets_query
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_COLLECTION = "ticket_user_counters"
+
+
+class TicketCounters:
+    """Ticket number allocator and open-ticket counters of one database"""
+
+    def __init__(self, config, counters, tickets):
+        """
+        Args:
+            config: guild_ticket_config collection (holds next_ticket_number)
+            counters: ticket_user_counters collection
+            tickets: tickets collection (used to seed missing counters)
+        """
+        self.config = config
+        self.counters = counters
+        self.tickets = tickets
+
+    # ==================== Ticket numbers ====================
+
+    async def allocate_number(self, guild_id: int) -> Optional[int]:
+        """
+        Claim the next ticket number of a guild.
+
+        Returns:
+            The number, or None when the guild has no ticket config yet
+        """
+        config = await self.config.find_one_and_update(
+            {"guild_id": guild_id},
+            {"$inc": {"next_ticket_number": 1}},
+            projection={"next_ticket_number": 1},
+            return_document=True
+        )
+        if config is None:
+            return None
+        return config["next_ticket_number"] - 1
+
+    # ==================== Open tickets ====================
+
+    async def _seed(self, guild_id: int, user_id: int):
+        """Create a missing counter from the user's open tickets"""
+        count = await self.tickets.count_documents(get_user_open_tickets_query(guild_id, user_id))
+        # A concurrent seed wins; $setOnInsert never overwrites it
+        await self.counters.update_one(
+            {"guild_id": guild_id, "user_id": user_id},
+            {"$setOnInsert": {"open": count}},
+            upsert=True
+        )
+
+    async def open_count(self, guild_id: int, user_id: int) -> int:
+        """Open tickets of a user"""
+        counter = await self.counters.find_one({"guild_id": guild_id, "user_id": user_id})
+        if counter is None:
+            await self._seed(guild_id, user_id)
+            counter = await self.counters.find_one({"guild_id": guild_id, "user_id": user_id})
+        return counter["open"] if counter else 0
+
+    async def reserve(self, guild_id: int, user_id: int, limit: Optional[int] = None) -> bool:
+        """
+        Take one open-ticket slot of a user.
+
+        Args:
+            limit: Max open tickets (None = unlimited)
+
+        Returns:
+            False when the user already has ``limit`` open tickets
+        """
+        query = {"guild_id": guild_id, "user_id": user_id}
+        if limit is not None:
+            query["open"] = {"$lt": limit}
+
+        for _ in range(2):
+            result = await self.counters.update_one(query, {"$inc": {"open": 1}})
+            if result.modified_count:
+                return True
+            # Either the limit was reached or the counter doesn't exist yet
+            if await self.counters.find_one({"guild_id": guild_id, "user_id": user_id}, {"_id": 1}):
+                return False
+            await self._seed(guild_id, user_id)
+        return False
+
+    async def release(self, guild_id: int, user_id: int):
+        """Give back one open-ticket slot"""
+        await self.counters.update_one(
+            {"guild_id": guild_id, "user_id": user_id, "open": {"$gt": 0}},
+            {"$inc": {"open": -1}}
+        )
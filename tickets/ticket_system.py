@@ -9,6 +9,7 @@ import discord
 from typing import Optional, Dict, List, Any
 from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
 from database.tickets_schema import (
     create_ticket_document,
     create_ticket_category_document,
@@ -17,9 +18,16 @@ from database.tickets_schema import (
     format_transcript_message,
     get_user_open_tickets_query,
     get_ticket_by_channel_query,
-    get_active_tickets_query,
     validate_ticket_config
 )
+from database.metrics_schema import MetricsSchema, metric_key
+from .counters import COUNTERS_COLLECTION, TicketCounters
+from .transcripts import (
+    CHUNKS_COLLECTION,
+    TranscriptWriter,
+    iter_transcript_messages,
+    render_transcript
+)
 
 
 class TicketSystem:
@@ -37,6 +45,9 @@ class TicketSystem:
         self.categories = db.ticket_categories
         self.config = db.guild_ticket_config
         self.transcripts = db.ticket_transcripts
+        self.transcript_chunks = db[CHUNKS_COLLECTION]
+        self.metrics = MetricsSchema(db)
+        self.counters = TicketCounters(self.config, db[COUNTERS_COLLECTION], self.tickets)
     
     # ====================================
     # إدارة إعدادات السيرفر
@@ -196,28 +207,48 @@ class TicketSystem:
     # إدارة التذاكر
     # ====================================
     
+    async def allocate_ticket_number(self, guild_id: int) -> int:
+        """
+        حجز رقم التذكرة التالي (عملية واحدة ذرية، بدون تكرار عند الضغط المتزامن)
+        
+        Args:
+            guild_id: معرف السيرفر
+        
+        Returns:
+            رقم التذكرة
+        """
+        ticket_number = await self.counters.allocate_number(guild_id)
+        if ticket_number is None:
+            # إنشاء الإعدادات الافتراضية ثم المحاولة مرة أخرى
+            await self.get_guild_config(guild_id)
+            ticket_number = await self.counters.allocate_number(guild_id)
+        return ticket_number
+    
     async def create_ticket(
         self,
         guild_id: int,
         user_id: int,
         channel_id: int,
-        category: str
+        category: str,
+        ticket_number: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         إنشاء تذكرة جديدة
         
+        يجب حجز مكان التذكرة للمستخدم مسبقاً عبر reserve_ticket_slot
+        
         Args:
             guild_id: معرف السيرفر
             user_id: معرف المستخدم
             channel_id: معرف قناة التذكرة
             category: فئة التذكرة
+            ticket_number: رقم محجوز عبر allocate_ticket_number (اختياري)
         
         Returns:
             مستند التذكرة
         """
-        # الحصول على رقم التذكرة التالي
-        config = await self.get_guild_config(guild_id)
-        ticket_number = config.get("next_ticket_number", 1)
+        if ticket_number is None:
+            ticket_number = await self.allocate_ticket_number(guild_id)
         
         # إنشاء التذكرة
         ticket_doc = create_ticket_document(
@@ -226,15 +257,10 @@ class TicketSystem:
         
         await self.tickets.insert_one(ticket_doc)
         
-        # تحديث رقم التذكرة التالي والإحصائيات
+        # تحديث الإحصائيات
         await self.config.update_one(
             {"guild_id": guild_id},
-            {
-                "$inc": {
-                    "next_ticket_number": 1,
-                    "total_tickets_created": 1
-                }
-            }
+            {"$inc": {"total_tickets_created": 1}}
         )
         
         # تحديث عداد الفئة
@@ -243,6 +269,13 @@ class TicketSystem:
             {"$inc": {"ticket_count": 1}}
         )
         
+        # تحديث إحصائيات لوحة التحكم
+        await self.metrics.increment(
+            guild_id,
+            {"tickets_created": 1, metric_key("tickets_by_category", category): 1},
+            totals={"tickets_open": 1}
+        )
+        
         return ticket_doc
     
     async def get_ticket(
@@ -295,10 +328,8 @@ class TicketSystem:
         guild_id: int,
         user_id: int
     ) -> int:
-        """عد التذاكر المفتوحة للمستخدم"""
-        return await self.tickets.count_documents(
-            get_user_open_tickets_query(guild_id, user_id)
-        )
+        """عد التذاكر المفتوحة للمستخدم (من العداد المحفوظ)"""
+        return await self.counters.open_count(guild_id, user_id)
     
     async def update_ticket(
         self,
@@ -347,8 +378,11 @@ class TicketSystem:
         """
         now = datetime.utcnow()
         
-        result = await self.tickets.update_one(
-            get_ticket_by_channel_query(guild_id, channel_id),
+        query = get_ticket_by_channel_query(guild_id, channel_id)
+        query["status"] = {"$ne": "closed"}
+        
+        ticket = await self.tickets.find_one_and_update(
+            query,
             {
                 "$set": {
                     "status": "closed",
@@ -357,17 +391,26 @@ class TicketSystem:
                     "close_reason": reason,
                     "updated_at": now
                 }
-            }
+            },
+            projection={"user_id": 1}
         )
         
-        if result.modified_count > 0:
+        if ticket is not None:
+            # إعادة مكان التذكرة لصاحبها
+            await self.counters.release(guild_id, ticket["user_id"])
+            
             # تحديث إحصائيات السيرفر
             await self.config.update_one(
                 {"guild_id": guild_id},
                 {"$inc": {"total_tickets_closed": 1}}
             )
+            await self.metrics.increment(
+                guild_id,
+                {"tickets_closed": 1},
+                totals={"tickets_open": -1, "tickets_closed": 1}
+            )
         
-        return result.modified_count > 0
+        return ticket is not None
     
     async def add_participant(
         self,
@@ -405,6 +448,38 @@ class TicketSystem:
     # نظام النصوص (Transcripts)
     # ====================================
     
+    async def archive_transcript(
+        self,
+        guild_id: int,
+        ticket: Dict[str, Any],
+        channel: discord.TextChannel,
+        limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        حفظ نص محادثة التذكرة مباشرة من القناة
+        
+        تُقرأ الرسائل صفحةً صفحة وتُكتب على شكل أجزاء مضغوطة،
+        فلا تُجمع المحادثة كاملة في الذاكرة
+        
+        Args:
+            guild_id: معرف السيرفر
+            ticket: مستند التذكرة
+            channel: قناة التذكرة
+            limit: الحد الأقصى للرسائل (None = كل الرسائل)
+        
+        Returns:
+            مستند النص المحفوظ
+        """
+        writer = TranscriptWriter(self.transcript_chunks, ObjectId(), guild_id)
+        try:
+            async for message in self.iter_channel_messages(channel, limit):
+                await writer.add(message)
+            await writer.close()
+            return await self._insert_transcript(guild_id, ticket, writer)
+        except Exception:
+            await writer.abort()
+            raise
+    
     async def save_transcript(
         self,
         guild_id: int,
@@ -412,7 +487,7 @@ class TicketSystem:
         messages: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """
-        حفظ نص محادثة التذكرة
+        حفظ نص محادثة التذكرة من قائمة رسائل جاهزة
         
         Args:
             guild_id: معرف السيرفر
@@ -422,14 +497,37 @@ class TicketSystem:
         Returns:
             مستند النص المحفوظ
         """
+        writer = TranscriptWriter(self.transcript_chunks, ObjectId(), guild_id)
+        try:
+            for message in messages:
+                await writer.add(message)
+            await writer.close()
+            return await self._insert_transcript(guild_id, ticket, writer)
+        except Exception:
+            await writer.abort()
+            raise
+    
+    async def _insert_transcript(
+        self,
+        guild_id: int,
+        ticket: Dict[str, Any],
+        writer: TranscriptWriter
+    ) -> Dict[str, Any]:
+        """حفظ مستند النص بعد كتابة كل الأجزاء"""
         transcript_doc = create_ticket_transcript_document(
             guild_id=guild_id,
             ticket_id=str(ticket["_id"]),
             ticket_number=ticket["ticket_number"],
             user_id=ticket["user_id"],
             category=ticket["category"],
-            messages=messages
+            message_count=writer.message_count,
+            participants=list(writer.participants),
+            started_at=writer.first_timestamp,
+            chunk_count=writer.chunk_count,
+            raw_bytes=writer.raw_bytes,
+            compressed_bytes=writer.compressed_bytes
         )
+        transcript_doc["_id"] = writer.transcript_id
         
         # حساب مدة التذكرة
         if ticket.get("closed_at") and ticket.get("created_at"):
@@ -444,49 +542,87 @@ class TicketSystem:
         guild_id: int,
         ticket_number: int
     ) -> Optional[Dict[str, Any]]:
-        """الحصول على نص محادثة محفوظ"""
-        return await self.transcripts.find_one({
-            "guild_id": guild_id,
-            "ticket_number": ticket_number
-        })
+        """الحصول على آخر نص محادثة محفوظ (البيانات الوصفية فقط)"""
+        return await self.transcripts.find_one(
+            {"guild_id": guild_id, "ticket_number": ticket_number},
+            sort=[("closed_at", -1)]
+        )
     
-    async def collect_messages_for_transcript(
+    def iter_transcript(self, transcript: Dict[str, Any]):
+        """رسائل نص محفوظ، جزءاً بعد جزء"""
+        return iter_transcript_messages(self.transcript_chunks, transcript)
+    
+    def export_transcript(self, transcript: Dict[str, Any], export_format: str = "html"):
+        """تصدير نص محفوظ (html / txt / json) على شكل أجزاء نصية"""
+        return render_transcript(transcript, self.iter_transcript(transcript), export_format)
+    
+    async def iter_channel_messages(
         self,
         channel: discord.TextChannel,
-        limit: int = 1000
-    ) -> List[Dict[str, Any]]:
+        limit: Optional[int] = None
+    ):
         """
-        جمع الرسائل من قناة التذكرة
+        رسائل قناة التذكرة منسقة للحفظ، من الأقدم للأحدث
+        
+        channel.history يجلب الرسائل من Discord صفحةً صفحة (100 رسالة)
         
         Args:
             channel: قناة التذكرة
-            limit: الحد الأقصى للرسائل
-        
-        Returns:
-            قائمة الرسائل المنسقة
+            limit: الحد الأقصى للرسائل (None = كل الرسائل)
         """
-        messages = []
-        
         async for message in channel.history(limit=limit, oldest_first=True):
             # تجاهل رسائل البوت الإدارية
             if message.author.bot and not message.content:
                 continue
             
-            msg_data = format_transcript_message(
+            yield format_transcript_message(
                 author_id=message.author.id,
                 author_name=str(message.author),
                 content=message.content,
                 timestamp=message.created_at,
                 attachments=[att.url for att in message.attachments]
             )
-            messages.append(msg_data)
+    
+    async def collect_messages_for_transcript(
+        self,
+        channel: discord.TextChannel,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        جمع الرسائل من قناة التذكرة في قائمة
         
-        return messages
+        لحفظ النصوص استخدم archive_transcript (بدون تحميل المحادثة كاملة)
+        
+        Args:
+            channel: قناة التذكرة
+            limit: الحد الأقصى للرسائل
+        
+        Returns:
+            قائمة الرسائل المنسقة
+        """
+        return [message async for message in self.iter_channel_messages(channel, limit)]
     
     # ====================================
     # دوال مساعدة
     # ====================================
     
+    async def _get_ticket_limit(
+        self,
+        config: Dict[str, Any],
+        guild_id: int,
+        bot=None
+    ) -> Optional[int]:
+        """الحد الأقصى للتذاكر المفتوحة لكل مستخدم (None = غير محدود)"""
+        # Check if guild has unlimited tickets (premium feature)
+        if bot and hasattr(bot, 'premium_system') and bot.premium_system:
+            try:
+                if await bot.premium_system.has_feature(str(guild_id), "unlimited_tickets"):
+                    return None
+            except Exception:
+                pass
+        
+        return config.get("max_tickets_per_user", 3)
+    
     async def can_user_create_ticket(
         self,
         guild_id: int,
@@ -496,6 +632,8 @@ class TicketSystem:
         """
         التحقق إذا كان المستخدم يستطيع إنشاء تذكرة
         
+        للتحقق والحجز معاً عند الإنشاء استخدم reserve_ticket_slot
+        
         Args:
             guild_id: Server ID
             user_id: User ID
@@ -509,27 +647,54 @@ class TicketSystem:
         if not config.get("enabled"):
             return False, "نظام التذاكر غير مفعل في هذا السيرفر"
         
+        max_tickets = await self._get_ticket_limit(config, guild_id, bot)
+        if max_tickets is None:
+            return True, "يمكن إنشاء تذكرة (Unlimited Tickets - Premium)"
+        
         # التحقق من عدد التذاكر المفتوحة
         open_count = await self.count_user_open_tickets(guild_id, user_id)
         
-        # Check if guild has unlimited tickets (premium feature)
-        has_unlimited = False
-        if bot and hasattr(bot, 'premium_system') and bot.premium_system:
-            try:
-                has_unlimited = await bot.premium_system.has_feature(str(guild_id), "unlimited_tickets")
-            except Exception:
-                pass
+        if open_count >= max_tickets:
+            return False, f"لديك بالفعل {open_count} تذاكر مفتوحة. الحد الأقصى هو {max_tickets} (قم بالترقية لـ Premium للحصول على عدد غير محدود)"
         
-        if has_unlimited:
-            return True, "يمكن إنشاء تذكرة (Unlimited Tickets - Premium)"
+        return True, "يمكن إنشاء تذكرة"
+    
+    async def reserve_ticket_slot(
+        self,
+        guild_id: int,
+        user_id: int,
+        bot=None
+    ) -> tuple[bool, str]:
+        """
+        التحقق من حد التذاكر وحجز مكان تذكرة للمستخدم في عملية واحدة ذرية
         
-        max_tickets = config.get("max_tickets_per_user", 3)
+        يجب إعادة المكان عبر release_ticket_slot إذا فشل إنشاء التذكرة
         
-        if open_count >= max_tickets:
+        Args:
+            guild_id: Server ID
+            user_id: User ID
+            bot: Bot instance for premium check (optional)
+        
+        Returns:
+            (تم الحجز/لم يتم, رسالة)
+        """
+        config = await self.get_guild_config(guild_id)
+        
+        if not config.get("enabled"):
+            return False, "نظام التذاكر غير مفعل في هذا السيرفر"
+        
+        max_tickets = await self._get_ticket_limit(config, guild_id, bot)
+        
+        if not await self.counters.reserve(guild_id, user_id, max_tickets):
+            open_count = await self.count_user_open_tickets(guild_id, user_id)
             return False, f"لديك بالفعل {open_count} تذاكر مفتوحة. الحد الأقصى هو {max_tickets} (قم بالترقية لـ Premium للحصول على عدد غير محدود)"
         
         return True, "يمكن إنشاء تذكرة"
     
+    async def release_ticket_slot(self, guild_id: int, user_id: int):
+        """إعادة مكان تذكرة محجوز لم تُنشأ"""
+        await self.counters.release(guild_id, user_id)
+    
     async def get_ticket_statistics(
         self,
         guild_id: int
@@ -537,10 +702,9 @@ class TicketSystem:
         """الحصول على إحصائيات التذاكر"""
         config = await self.get_guild_config(guild_id)
         
-        # عد التذاكر النشطة
-        active_tickets = await self.tickets.count_documents(
-            get_active_tickets_query(guild_id)
-        )
+        # عد التذاكر النشطة (من الإحصائيات المجمعة إن وجدت)
+        totals = await self.metrics.load_totals(guild_id)
+        active_tickets = totals.get("tickets_open", 0)
         
         return {
             "total_created": config.get("total_tickets_created", 0),
@@ -0,0 +1,255 @@
+"""
+Ticket Transcripts
+Streaming transcript storage and export.
+
+Messages are never collected into one list or one document:
+
+- ``TranscriptWriter`` buffers up to ``chunk_messages`` formatted messages,
+  then writes them as one zlib-compressed JSON segment to the
+  ``ticket_transcript_chunks`` collection. The ``ticket_transcripts``
+  document only keeps metadata (message count, participants, sizes).
+- ``iter_transcript_messages`` reads the segments back one at a time (and
+  still understands legacy transcripts that embed ``messages``).
+- ``render_transcript`` turns that stream into HTML / TXT / JSON text pieces
+  for the dashboard's streaming download.
+"""
+
+import json
+import zlib
+import html
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+CHUNKS_COLLECTION = "ticket_transcript_chunks"
+CHUNK_ENCODING = "zlib+json"
+
+# Messages per stored segment (~a few dozen KB compressed)
+DEFAULT_CHUNK_MESSAGES = 200
+# Export text is yielded in pieces of about this many characters
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+TRANSCRIPT_MEDIA_TYPES = {
+    "html": "text/html; charset=utf-8",
+    "txt": "text/plain; charset=utf-8",
+    "json": "application/json",
+}
+
+
+# ==================== Segment codec ====================
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _serialize(messages: List[Dict[str, Any]]) -> bytes:
+    return json.dumps(messages, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_chunk(messages: List[Dict[str, Any]]) -> bytes:
+    """Serialize and compress a list of formatted transcript messages"""
+    return zlib.compress(_serialize(messages), 6)
+
+
+def decode_chunk(data: bytes) -> List[Dict[str, Any]]:
+    """Inverse of ``encode_chunk`` (timestamps come back as datetimes)"""
+    messages = json.loads(zlib.decompress(bytes(data)).decode("utf-8"))
+    for message in messages:
+        timestamp = message.get("timestamp")
+        if isinstance(timestamp, str):
+            try:
+                message["timestamp"] = datetime.fromisoformat(timestamp)
+            except ValueError:
+                pass
+    return messages
+
+
+# ==================== Writing ====================
+
+class TranscriptWriter:
+    """Writes a transcript as compressed segments while messages stream in"""
+
+    def __init__(
+        self,
+        chunks,
+        transcript_id: Any,
+        guild_id: int,
+        chunk_messages: int = DEFAULT_CHUNK_MESSAGES
+    ):
+        """
+        Args:
+            chunks: ticket_transcript_chunks collection
+            transcript_id: _id of the transcript document the segments belong to
+            guild_id: Guild of the transcript
+            chunk_messages: Messages per segment
+        """
+        self.chunks = chunks
+        self.transcript_id = transcript_id
+        self.guild_id = guild_id
+        self.chunk_messages = chunk_messages
+        self._buffer: List[Dict[str, Any]] = []
+        self.message_count = 0
+        self.chunk_count = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self.participants: Set[int] = set()
+        self.first_timestamp: Optional[datetime] = None
+
+    async def add(self, message: Dict[str, Any]):
+        """Append one formatted message (see ``format_transcript_message``)"""
+        if self.first_timestamp is None:
+            self.first_timestamp = message.get("timestamp")
+        self.participants.add(message["author_id"])
+        self.message_count += 1
+        self._buffer.append(message)
+        if len(self._buffer) >= self.chunk_messages:
+            await self._write_chunk()
+
+    async def _write_chunk(self):
+        messages, self._buffer = self._buffer, []
+        raw = _serialize(messages)
+        data = zlib.compress(raw, 6)
+        self.raw_bytes += len(raw)
+        self.compressed_bytes += len(data)
+        await self.chunks.insert_one({
+            "transcript_id": self.transcript_id,
+            "guild_id": self.guild_id,
+            "seq": self.chunk_count,
+            "message_count": len(messages),
+            "encoding": CHUNK_ENCODING,
+            "data": data
+        })
+        self.chunk_count += 1
+
+    async def close(self):
+        """Write the last partial segment"""
+        if self._buffer:
+            await self._write_chunk()
+
+    async def abort(self):
+        """Remove the segments written so far"""
+        self._buffer = []
+        await self.chunks.delete_many({"transcript_id": self.transcript_id})
+
+
+# ==================== Reading ====================
+
+async def iter_transcript_messages(chunks, transcript: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the messages of a transcript, one stored segment at a time"""
+    # Transcripts saved before chunked storage embed their messages
+    if "messages" in transcript:
+        for message in transcript["messages"]:
+            yield message
+        return
+
+    cursor = chunks.find({"transcript_id": transcript["_id"]}).sort("seq", 1)
+    async for chunk in cursor:
+        for message in decode_chunk(chunk["data"]):
+            yield message
+
+
+# ==================== Export ====================
+
+def _format_time(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value or "")
+
+
+def _txt_header(transcript: Dict[str, Any]) -> str:
+    return (
+        f"Ticket #{transcript.get('ticket_number')} - {transcript.get('category', '')}\n"
+        f"User: {transcript.get('user_id')}\n"
+        f"Messages: {transcript.get('message_count', 0)}\n"
+        f"Closed: {_format_time(transcript.get('closed_at'))}\n"
+        + "=" * 60 + "\n\n"
+    )
+
+
+def _txt_message(message: Dict[str, Any]) -> str:
+    text = f"[{_format_time(message.get('timestamp'))}] {message.get('author_name')}: {message.get('content', '')}\n"
+    for url in message.get("attachments") or []:
+        text += f"    [attachment] {url}\n"
+    return text
+
+
+def _html_header(transcript: Dict[str, Any]) -> str:
+    title = html.escape(f"Ticket #{transcript.get('ticket_number')} - {transcript.get('category', '')}")
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+        f"<title>{title}</title>"
+        "<style>body{font-family:sans-serif;background:#313338;color:#dbdee1;margin:2em}"
+        ".msg{margin:.6em 0}.author{font-weight:bold;color:#fff}.time{color:#949ba4;font-size:.8em;margin-left:.5em}"
+        ".content{white-space:pre-wrap}a{color:#00a8fc}</style></head><body>\n"
+        f"<h1>{title}</h1>\n"
+        f"<p>User: {html.escape(str(transcript.get('user_id')))} &middot; "
+        f"Messages: {transcript.get('message_count', 0)} &middot; "
+        f"Closed: {html.escape(_format_time(transcript.get('closed_at')))}</p>\n<hr>\n"
+    )
+
+
+def _html_message(message: Dict[str, Any]) -> str:
+    attachments = "".join(
+        f"<div><a href=\"{html.escape(url, quote=True)}\">{html.escape(url)}</a></div>"
+        for url in message.get("attachments") or []
+    )
+    return (
+        "<div class=\"msg\">"
+        f"<span class=\"author\">{html.escape(str(message.get('author_name')))}</span>"
+        f"<span class=\"time\">{html.escape(_format_time(message.get('timestamp')))}</span>"
+        f"<div class=\"content\">{html.escape(message.get('content') or '')}</div>"
+        f"{attachments}</div>\n"
+    )
+
+
+def _json_metadata(transcript: Dict[str, Any]) -> str:
+    metadata = {
+        key: transcript.get(key)
+        for key in ("ticket_number", "user_id", "category", "message_count", "participants", "created_at", "closed_at")
+    }
+    return json.dumps(metadata, default=_json_default, ensure_ascii=False)
+
+
+async def render_transcript(
+    transcript: Dict[str, Any],
+    messages: AsyncIterator[Dict[str, Any]],
+    export_format: str = "html",
+    buffer_size: int = EXPORT_BUFFER_SIZE
+) -> AsyncIterator[str]:
+    """
+    Render a transcript incrementally.
+
+    Args:
+        transcript: Transcript metadata document
+        messages: Message stream (``iter_transcript_messages``)
+        export_format: html, txt or json
+        buffer_size: Approximate size of each yielded piece
+    """
+    if export_format == "html":
+        header, render_message, footer = _html_header(transcript), _html_message, "</body></html>\n"
+    elif export_format == "txt":
+        header, render_message, footer = _txt_header(transcript), _txt_message, ""
+    elif export_format == "json":
+        header = '{"transcript":' + _json_metadata(transcript) + ',"messages":['
+        footer = "]}\n"
+        first = [True]
+
+        def render_message(message):
+            text = ("" if first[0] else ",") + json.dumps(message, default=_json_default, ensure_ascii=False)
+            first[0] = False
+            return text
+    else:
+        raise ValueError(f"Unknown transcript format: {export_format}")
+
+    parts = [header]
+    size = len(header)
+    async for message in messages:
+        text = render_message(message)
+        parts.append(text)
+        size += len(text)
+        if size >= buffer_size:
+            yield "".join(parts)
+            parts, size = [], 0
+    parts.append(footer)
+    yield "".join(parts)
@@ -3,6 +3,8 @@ Welcome System Core - Kingdom-77 Bot
 Advanced welcome system with card generation, captcha, and auto-role.
 """
 
+from __future__ import annotations
+
 import discord
 from discord import Member, Guild, TextChannel
 from datetime import datetime, timedelta
@@ -10,14 +12,32 @@ from typing import Optional, Dict, Any, List
 import random
 import string
 import asyncio
-try:
-    from PIL import Image, ImageDraw, ImageFont, ImageFilter
-except ImportError:
-    Image = ImageDraw = ImageFont = ImageFilter = None
 import io
 import aiohttp
 
 from database.welcome_schema import WelcomeSchema
+from joins.window import join_rate
+from startup.lazy import lazy_import
+from templating import TemplateEngine
+
+# Pillow is imported when the first card/captcha is rendered
+Image = lazy_import("PIL.Image")
+ImageDraw = lazy_import("PIL.ImageDraw")
+ImageFont = lazy_import("PIL.ImageFont")
+ImageFilter = lazy_import("PIL.ImageFilter")
+
+# Welcome/goodbye/DM variables, resolved against the member
+WELCOME_VARIABLES = TemplateEngine(resolvers={
+    "user": lambda member: member.mention,
+    "user.name": lambda member: member.name,
+    "user.id": lambda member: str(member.id),
+    "server": lambda member: member.guild.name,
+    "server.name": lambda member: member.guild.name,
+    "server.members": lambda member: str(member.guild.member_count),
+    "count": lambda member: str(member.guild.member_count),
+    "date": lambda member: datetime.now().strftime("%Y-%m-%d"),
+    "time": lambda member: datetime.now().strftime("%H:%M:%S"),
+})
 
 
 class WelcomeSystem:
@@ -36,43 +56,80 @@ class WelcomeSystem:
         self.captcha_height = 100
     
     async def on_member_join(self, member: Member) -> None:
-        """Handle member join event"""
+        """Handle member join event (the bot routes joins through joins.JoinPipeline)"""
         try:
             settings = await self.schema.get_settings(member.guild.id)
             if not settings or not settings.get("enabled", False):
                 return
             
             # Check anti-raid
-            if await self._check_anti_raid(member.guild.id):
+            if self._check_anti_raid(settings, join_rate.record(member.guild.id)):
                 # Raid detected, don't send welcome
                 return
             
-            # Record join in history
-            await self.schema.add_join_history(
-                member.guild.id,
-                member.id,
-                "join"
-            )
-            
-            # Check if captcha is required
-            if settings.get("captcha_enabled", False):
-                await self._send_captcha(member, settings)
-                return
-            
-            # Auto-role
-            if settings.get("auto_role_enabled", False):
+            # Auto-role (not before the captcha is solved)
+            if settings.get("auto_role_enabled", False) and not settings.get("captcha_enabled", False):
                 await self._assign_auto_role(member, settings)
             
-            # Send welcome message
-            await self._send_welcome(member, settings)
-            
-            # Send DM
-            if settings.get("dm_enabled", False):
-                await self._send_dm_welcome(member, settings)
+            await self.welcome_member(member, settings)
                 
         except Exception as e:
             print(f"Error in on_member_join: {e}")
     
+    async def welcome_member(self, member: Member, settings: Dict[str, Any]) -> bool:
+        """
+        Send the captcha, or the welcome message and DM, to a new member.
+        
+        Returns:
+            True if a welcome message was sent (False for captcha)
+        """
+        # Check if captcha is required
+        if settings.get("captcha_enabled", False):
+            await self._send_captcha(member, settings)
+            return False
+        
+        # Send welcome message
+        await self._send_welcome(member, settings)
+        
+        # Send DM
+        if settings.get("dm_enabled", False):
+            await self._send_dm_welcome(member, settings)
+        return True
+    
+    async def welcome_members(self, members: List[Member], settings: Dict[str, Any]) -> bool:
+        """
+        Welcome a burst of members with one message per channel (join surges).
+        
+        Captchas are still sent one by one; cards and DMs are skipped.
+        
+        Returns:
+            True if a welcome message was sent
+        """
+        if settings.get("captcha_enabled", False):
+            for member in members:
+                await self._send_captcha(member, settings)
+            return False
+        
+        if not members:
+            return False
+        
+        guild = members[0].guild
+        sent = False
+        for channel_id in settings.get("welcome_channels", []):
+            channel = guild.get_channel(channel_id)
+            if not channel:
+                continue
+            try:
+                mentions = ", ".join(member.mention for member in members)
+                await channel.send(
+                    f"👋 Welcome {mentions} to **{guild.name}**!",
+                    allowed_mentions=discord.AllowedMentions(users=False)
+                )
+                sent = True
+            except Exception as e:
+                print(f"Error sending welcome: {e}")
+        return sent
+    
     async def on_member_remove(self, member: Member) -> None:
         """Handle member leave event"""
         try:
@@ -173,24 +230,7 @@ class WelcomeSystem:
     
     def _replace_variables(self, text: str, member: Member) -> str:
         """Replace variables in text"""
-        guild = member.guild
-        
-        variables = {
-            "{user}": member.mention,
-            "{user.name}": member.name,
-            "{user.id}": str(member.id),
-            "{server}": guild.name,
-            "{server.name}": guild.name,
-            "{server.members}": str(guild.member_count),
-            "{count}": str(guild.member_count),
-            "{date}": datetime.now().strftime("%Y-%m-%d"),
-            "{time}": datetime.now().strftime("%H:%M:%S"),
-        }
-        
-        for var, value in variables.items():
-            text = text.replace(var, value)
-        
-        return text
+        return WELCOME_VARIABLES.render(text, member)
     
     async def _create_welcome_embed(self, member: Member, settings: Dict[str, Any]) -> discord.Embed:
         """Create welcome embed"""
@@ -614,14 +654,13 @@ class WelcomeSystem:
         except Exception as e:
             print(f"Error assigning auto-role: {e}")
     
-    async def _check_anti_raid(self, guild_id: int) -> bool:
-        """Check if raid is detected"""
-        settings = await self.schema.get_settings(guild_id)
+    def _check_anti_raid(self, settings: Dict[str, Any], joins: int) -> bool:
+        """Check if raid is detected (joins = joins in the last minute, see joins.join_rate)"""
         if not settings or not settings.get("anti_raid_enabled", False):
             return False
         
         threshold = settings.get("anti_raid_threshold", 10)
-        return await self.schema.is_raid_detected(guild_id, threshold)
+        return joins >= threshold
     
     async def test_welcome(self, member: Member) -> None:
         """Test welcome message"""